@@ -33,6 +33,7 @@ setup(
         "console_scripts": [
             "skype-parser=parser.skype_parser:main",
             "skype-to-postgres=db.skype_to_postgres:main",
+            "skype-synthetic-export=utils.synthetic_export:main",
         ],
     },
 )
\ No newline at end of file
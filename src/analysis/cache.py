@@ -0,0 +1,362 @@
+"""
+Analysis Result Cache for Skype Parser
+
+Export data does not change after it has been loaded, so analysis results
+can be reused until the export is loaded again or deleted. This module
+provides an in-process LRU cache with an opt-in on-disk tier, keyed by
+(method, export_id, params), and a wrapper that routes the methods of
+SkypeReportGenerator and SkypeQueryExamples through it.
+
+Every cached result carries an ETag (a hash of the result) and the time it
+was computed, which the API sends as ETag and Last-Modified headers.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.utils.file_utils import make_private_dir
+
+logger = logging.getLogger(__name__)
+
+# Results kept in memory before the least recently used is dropped
+DEFAULT_MAX_ENTRIES = 256
+
+# Method name prefixes whose results are cached by CachedAnalysis
+CACHEABLE_PREFIXES = ("get_", "find_", "generate_")
+
+
+class CacheEntry:
+    """A cached result with its validators."""
+
+    __slots__ = ("value", "etag", "last_modified")
+
+    def __init__(self, value: Any, etag: str, last_modified: datetime):
+        """
+        Initialize the entry.
+
+        Args:
+            value: The cached result
+            etag: Hash of the result, without quotes
+            last_modified: When the result was computed (UTC)
+        """
+        self.value = value
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class AnalysisCache:
+    """
+    LRU cache of analysis results scoped by export.
+
+    Entries live in memory and, when cache_dir is set, also on disk so that
+    they survive restarts and can be shared between worker processes. Disk
+    entries are stored as JSON, so only JSON-serializable results reach
+    that tier; the directory is private to the current user.
+    invalidate_export() drops both tiers for one export; with a disk tier,
+    memory entries whose file was removed by another process are dropped
+    on their next lookup.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of results kept in memory
+            cache_dir: Directory for the on-disk tier (None disables it)
+
+        Raises:
+            PermissionError: If cache_dir is owned by another user
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if cache_dir:
+            make_private_dir(cache_dir)
+
+    @staticmethod
+    def make_key(method: str, export_id: int, params: Hashable = ()) -> Tuple:
+        """
+        Build a cache key.
+
+        Args:
+            method: Qualified method name
+            export_id: The export the result belongs to
+            params: Other method parameters
+
+        Returns:
+            The cache key
+        """
+        return (method, export_id, params)
+
+    def _disk_path(self, key: Tuple) -> str:
+        """Return the on-disk path of an entry."""
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"export_{key[1]}", f"{digest}.json")
+
+    def _read_disk(self, key: Tuple) -> Optional[CacheEntry]:
+        """Load an entry from the on-disk tier."""
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            value, etag = stored["value"], stored["etag"]
+            last_modified = datetime.fromisoformat(stored["last_modified"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache file {path}: {e}")
+            return None
+        return CacheEntry(value, etag, last_modified)
+
+    def _write_disk(self, key: Tuple, entry: CacheEntry) -> None:
+        """Store an entry in the on-disk tier."""
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            data = json.dumps({
+                "value": entry.value,
+                "etag": entry.etag,
+                "last_modified": entry.last_modified.isoformat(),
+            })
+        except (TypeError, ValueError):
+            # Kept in memory only; such entries are not shared between processes
+            logger.debug(f"Not writing non-JSON result of {key[0]} to the disk cache")
+            return
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write cache file {path}: {e}")
+
+    def _remember(self, key: Tuple, entry: CacheEntry) -> None:
+        """Add an entry to the memory tier. Must be called with the lock held."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Tuple) -> Optional[CacheEntry]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            The cache entry, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            # With a disk tier, another process may have invalidated the export
+            if entry is not None and self.cache_dir and not os.path.exists(self._disk_path(key)):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            with self._lock:
+                self._remember(key, entry)
+                self.disk_hits += 1
+        return entry
+
+    def get_or_compute(
+        self,
+        method: str,
+        export_id: int,
+        params: Hashable,
+        compute: Callable[[], Any],
+    ) -> CacheEntry:
+        """
+        Return a cached result, computing and storing it on a miss.
+
+        A result computed while its export was invalidated is returned but
+        not stored, so stale data never enters the cache.
+
+        Args:
+            method: Qualified method name
+            export_id: The export the result belongs to
+            params: Other method parameters (must be hashable)
+            compute: Function computing the result
+
+        Returns:
+            The cache entry
+        """
+        key = self.make_key(method, export_id, params)
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            self.misses += 1
+            generation = self._generations.get(export_id, 0)
+
+        value = compute()
+        etag = hashlib.sha256(
+            json.dumps(value, sort_keys=True, default=repr).encode("utf-8")
+        ).hexdigest()[:32]
+        entry = CacheEntry(value, etag, datetime.now(timezone.utc).replace(microsecond=0))
+
+        with self._lock:
+            if self._generations.get(export_id, 0) != generation:
+                return entry
+
+        # Write the file first, as memory entries without a file are dropped
+        self._write_disk(key, entry)
+        with self._lock:
+            if self._generations.get(export_id, 0) == generation:
+                self._remember(key, entry)
+        return entry
+
+    def invalidate_export(self, export_id: int) -> None:
+        """
+        Drop every cached result of an export.
+
+        Call this when an export is loaded again or deleted.
+
+        Args:
+            export_id: The export to invalidate
+        """
+        with self._lock:
+            self._generations[export_id] = self._generations.get(export_id, 0) + 1
+            for key in [key for key in self._entries if key[1] == export_id]:
+                del self._entries[key]
+
+        if self.cache_dir:
+            shutil.rmtree(os.path.join(self.cache_dir, f"export_{export_id}"), ignore_errors=True)
+
+        logger.info(f"Invalidated cached analysis results for export {export_id}")
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            for export_id in {key[1] for key in self._entries}:
+                self._generations[export_id] = self._generations.get(export_id, 0) + 1
+            self._entries.clear()
+
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.startswith("export_"):
+                    shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with memory hits, disk hits, misses and the number of entries
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+class CachedAnalysis:
+    """
+    Wrapper that caches the results of an analysis object.
+
+    Methods named get_*, find_* or generate_* that take the export ID as
+    their first argument are served from the cache; every other attribute
+    is passed through unchanged.
+
+    Example:
+        reports = CachedAnalysis(SkypeReportGenerator(db_connection), get_analysis_cache())
+        reports.generate_full_report(export_id)
+    """
+
+    def __init__(self, target: Any, cache: Optional[AnalysisCache] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            target: A SkypeReportGenerator, SkypeQueryExamples or similar object
+            cache: The cache to use (defaults to the global cache)
+        """
+        self._target = target
+        self._cache = cache or get_analysis_cache()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr) or not name.startswith(CACHEABLE_PREFIXES):
+            return attr
+
+        method = f"{type(self._target).__name__}.{name}"
+
+        def cached(export_id: int, *args: Any, **kwargs: Any) -> Any:
+            params = (args, tuple(sorted(kwargs.items())))
+            try:
+                hash(params)
+            except TypeError:
+                return attr(export_id, *args, **kwargs)
+            return self._cache.get_or_compute(
+                method, export_id, params, lambda: attr(export_id, *args, **kwargs)
+            ).value
+
+        cached.__name__ = name
+        cached.__doc__ = attr.__doc__
+        return cached
+
+
+# Create a global analysis cache instance
+_analysis_cache = None
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """
+    Get the global analysis cache instance.
+
+    The on-disk tier is only used when ANALYSIS_CACHE_DIR is set. It is
+    needed whenever exports are loaded in other processes than the one
+    reading the cache, as their invalidations only arrive through it.
+
+    Returns:
+        AnalysisCache: Analysis cache instance
+    """
+    global _analysis_cache
+
+    if _analysis_cache is None:
+        _analysis_cache = AnalysisCache(
+            max_entries=int(os.environ.get("ANALYSIS_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+            cache_dir=os.environ.get("ANALYSIS_CACHE_DIR") or None,
+        )
+
+    return _analysis_cache
+
+
+def invalidate_export(export_id: int) -> None:
+    """
+    Drop every cached analysis result of an export.
+
+    Args:
+        export_id: The export that was loaded again or deleted
+    """
+    get_analysis_cache().invalidate_export(export_id)
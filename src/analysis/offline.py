@@ -0,0 +1,553 @@
+"""
+Offline Analytics Module for Skype Parser
+
+This module computes the reports of SkypeReportGenerator and the timelines
+of SkypeQueryExamples directly from parsed or streamed export data, without
+a database.
+
+Messages are stored as NumPy columns: timestamps as int64 microseconds since
+the epoch (UTC) and conversations, senders and message types as integer
+codes into small lookup tables. Every statistic is a vectorized group-by
+(bincount, unique) over those columns, so a report over millions of
+messages takes seconds, most of it spent reading the messages.
+
+Example:
+    analytics = OfflineAnalytics.from_conversations(stream_conversations("export.tar"))
+    report = analytics.generate_full_report()
+"""
+
+import logging
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from src.analysis.reporting import DAY_NAMES
+
+logger = logging.getLogger(__name__)
+
+# Message type whose content lengths are reported, as in the length report
+TEXT_MESSAGE_TYPE = "RichText"
+
+# Timestamp value of messages without a (valid) timestamp; the same as NumPy's NaT
+MISSING_TIMESTAMP = -(2 ** 63)
+
+# Timestamps are parsed by NumPy in chunks of this many messages
+TIMESTAMP_CHUNK_SIZE = 65536
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Units matching DATE_TRUNC for the supported timeline intervals
+TIMELINE_UNITS = {"hour": "h", "day": "D", "week": "W", "month": "M"}
+
+
+def _to_micros(value: Any) -> int:
+    """
+    Convert a message timestamp to microseconds since the epoch.
+
+    Naive timestamps are taken as UTC, aware ones are converted to UTC.
+
+    Args:
+        value: datetime or ISO 8601 string (a trailing Z is accepted)
+
+    Returns:
+        Microseconds since the epoch, or MISSING_TIMESTAMP
+    """
+    if isinstance(value, str):
+        if not value:
+            return MISSING_TIMESTAMP
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return MISSING_TIMESTAMP
+    elif not isinstance(value, datetime):
+        return MISSING_TIMESTAMP
+    if value.tzinfo is None:
+        return (value - _EPOCH) // _MICROSECOND
+    return (value - _EPOCH_UTC) // _MICROSECOND
+
+
+class _Categories:
+    """Maps values to consecutive integer codes."""
+
+    def __init__(self):
+        self.codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def code(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code_all(self, values: List[Any], missing: Optional[int] = None) -> List[int]:
+        """Encode values; falsy values become missing when it is given."""
+        codes, code = self.codes, self.code
+        if missing is None:
+            return [codes[v] if v in codes else code(v) for v in values]
+        return [(codes[v] if v in codes else code(v)) if v else missing for v in values]
+
+
+class OfflineAnalytics:
+    """
+    In-memory analytics over the messages of one export.
+
+    Messages are appended row by row into compact buffers and turned into
+    NumPy arrays on the first query. Report methods return the same
+    structures as SkypeReportGenerator; the export ID is implied.
+    """
+
+    def __init__(self, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Initialize an empty engine.
+
+        Args:
+            metadata: Export metadata for the summary (user_id, export_date,
+                file_source, created_at)
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy is required for offline analytics")
+
+        self.metadata = dict(metadata or {})
+        self.conversations = _Categories()
+        self.display_names: Dict[int, str] = {}
+        self.senders = _Categories()
+        self.sender_ids = _Categories()
+        self.message_types = _Categories()
+
+        self._timestamps = array("q")
+        self._pending_timestamps: List[Any] = []
+        self._conversation_codes = array("q")
+        self._sender_codes = array("q")
+        self._sender_id_codes = array("q")
+        self._type_codes = array("q")
+        self._lengths = array("q")
+        self._columns: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_parsed(cls, parsed_data: Dict[str, Any], **metadata: Any) -> "OfflineAnalytics":
+        """
+        Build an engine from the output of parse_skype_data().
+
+        Args:
+            parsed_data: Parsed export with user_id, export_date and conversations
+            **metadata: Extra summary metadata, e.g. file_source
+
+        Returns:
+            OfflineAnalytics: The filled engine
+        """
+        metadata.setdefault("user_id", parsed_data.get("user_id"))
+        metadata.setdefault("export_date", parsed_data.get("export_datetime") or parsed_data.get("export_date"))
+        conversations = parsed_data.get("conversations") or []
+        if isinstance(conversations, dict):
+            conversations = conversations.values()
+        return cls.from_conversations(conversations, parsed_data.get("id_to_display_name"), **metadata)
+
+    @classmethod
+    def from_conversations(
+        cls,
+        conversations: Iterable[Dict[str, Any]],
+        id_to_display_name: Optional[Dict[str, str]] = None,
+        **metadata: Any,
+    ) -> "OfflineAnalytics":
+        """
+        Build an engine from parsed or raw conversations, e.g. from stream_conversations().
+
+        Args:
+            conversations: Conversation dictionaries
+            id_to_display_name: Display names of raw sender IDs
+            **metadata: Summary metadata (user_id, export_date, file_source, created_at)
+
+        Returns:
+            OfflineAnalytics: The filled engine
+        """
+        analytics = cls(metadata)
+        for conversation in conversations:
+            analytics.add_conversation_data(conversation, id_to_display_name)
+        return analytics
+
+    def add_conversation(self, conversation_id: str, display_name: Optional[str] = None) -> int:
+        """
+        Register a conversation, so conversations without messages are counted.
+
+        Args:
+            conversation_id: Conversation ID
+            display_name: Conversation display name
+
+        Returns:
+            int: The conversation code
+        """
+        code = self.conversations.code(conversation_id)
+        if display_name:
+            self.display_names[code] = display_name
+        return code
+
+    def add_message(
+        self,
+        conversation_id: str,
+        timestamp: Any,
+        sender_id: Optional[str],
+        sender_name: Optional[str],
+        message_type: Optional[str],
+        content: Optional[str],
+    ) -> None:
+        """
+        Add one message.
+
+        Args:
+            conversation_id: Conversation the message belongs to
+            timestamp: Message timestamp (datetime or ISO 8601 string)
+            sender_id: Sender ID
+            sender_name: Sender display name
+            message_type: Message type
+            content: Message content
+        """
+        self._extend(
+            self.conversations.code(conversation_id),
+            [timestamp], [sender_id], [sender_name], [message_type], [content],
+        )
+
+    def _extend(
+        self,
+        conversation_code: int,
+        timestamps: List[Any],
+        sender_ids: List[Optional[str]],
+        sender_names: List[Optional[str]],
+        message_types: List[Optional[str]],
+        contents: List[Optional[str]],
+    ) -> None:
+        """Append the columns of messages of one conversation."""
+        self._pending_timestamps.extend(timestamps)
+        if len(self._pending_timestamps) >= TIMESTAMP_CHUNK_SIZE:
+            self._flush_timestamps()
+
+        self._conversation_codes.extend([conversation_code] * len(timestamps))
+        self._sender_codes.extend(self.senders.code_all(
+            [name or sender_id or "" for name, sender_id in zip(sender_names, sender_ids)]
+        ))
+        self._sender_id_codes.extend(self.sender_ids.code_all(sender_ids, missing=-1))
+        self._type_codes.extend(self.message_types.code_all([t or "" for t in message_types]))
+        self._lengths.extend([len(content) if content is not None else -1 for content in contents])
+        self._columns = None
+
+    def _flush_timestamps(self) -> None:
+        """Parse the pending timestamps into the timestamp buffer."""
+        pending = self._pending_timestamps
+        if not pending:
+            return
+        self._pending_timestamps = []
+
+        # Export timestamps are UTC strings ending in Z, which NumPy parses much faster
+        if all(isinstance(value, str) and value.endswith("Z") for value in pending):
+            try:
+                parsed = np.array([value[:-1] for value in pending], dtype="datetime64[us]")
+                self._timestamps.frombytes(parsed.astype(np.int64).tobytes())
+                return
+            except ValueError:
+                pass
+        self._timestamps.extend(_to_micros(value) for value in pending)
+
+    def add_conversation_data(
+        self, conversation: Dict[str, Any], id_to_display_name: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Add a conversation and its messages.
+
+        Accepts conversations from parse_skype_data() (messages with
+        timestamp/from_id/from_name/type) and raw export conversations
+        (MessageList with originalarrivaltime/from/messagetype).
+
+        Args:
+            conversation: Conversation dictionary
+            id_to_display_name: Display names of raw sender IDs
+        """
+        names = id_to_display_name or {}
+        code = self.add_conversation(
+            conversation.get("id"),
+            conversation.get("display_name") or conversation.get("displayName"),
+        )
+        messages = conversation.get("messages")
+        if messages is None:
+            messages = conversation.get("MessageList") or []
+
+        get_name = names.get
+        sender_ids = [msg.get("from_id") or msg.get("sender_id") or msg.get("from") for msg in messages]
+        self._extend(
+            code,
+            [msg.get("timestamp") or msg.get("originalarrivaltime") for msg in messages],
+            sender_ids,
+            [
+                msg.get("from_name") or msg.get("sender_name") or get_name(sender_id)
+                for msg, sender_id in zip(messages, sender_ids)
+            ],
+            [msg.get("message_type") or msg.get("type") or msg.get("messagetype") for msg in messages],
+            [msg.get("content") for msg in messages],
+        )
+
+    @property
+    def message_count(self) -> int:
+        """Number of messages added."""
+        return len(self._conversation_codes)
+
+    def _get_columns(self) -> Dict[str, Any]:
+        """Return the message columns as NumPy arrays, building them if needed."""
+        if self._columns is None:
+            self._flush_timestamps()
+
+            def codes(buffer: array) -> Any:
+                # Copy, so the buffers can still grow afterwards
+                return np.frombuffer(buffer, dtype=np.int64).copy() if buffer else np.empty(0, np.int64)
+
+            timestamps = codes(self._timestamps)
+            has_timestamp = timestamps != MISSING_TIMESTAMP
+
+            self._columns = {
+                "timestamp": timestamps,
+                "has_timestamp": has_timestamp,
+                "datetime": timestamps[has_timestamp].astype("datetime64[us]"),
+                "conversation": codes(self._conversation_codes),
+                "sender": codes(self._sender_codes),
+                "sender_id": codes(self._sender_id_codes),
+                "message_type": codes(self._type_codes),
+                "length": codes(self._lengths),
+            }
+        return self._columns
+
+    @staticmethod
+    def _to_datetime(micros: int) -> Optional[datetime]:
+        """Convert microseconds since the epoch to a naive UTC datetime."""
+        if micros == MISSING_TIMESTAMP:
+            return None
+        return _EPOCH + timedelta(microseconds=int(micros))
+
+    @staticmethod
+    def _percentage(count: int, total: int) -> float:
+        return round(count * 100.0 / total, 2) if total else 0
+
+    def get_export_summary(self) -> Dict[str, Any]:
+        """
+        Get a summary of the export.
+
+        Returns:
+            A dictionary containing summary information about the export.
+        """
+        columns = self._get_columns()
+        timestamps = columns["timestamp"][columns["has_timestamp"]]
+        first_message = self._to_datetime(timestamps.min()) if timestamps.size else None
+        last_message = self._to_datetime(timestamps.max()) if timestamps.size else None
+
+        return {
+            "export_id": self.metadata.get("export_id"),
+            "user_id": self.metadata.get("user_id"),
+            "export_date": self.metadata.get("export_date"),
+            "file_source": self.metadata.get("file_source"),
+            "created_at": self.metadata.get("created_at"),
+            "conversation_count": len(self.conversations.values),
+            "message_count": self.message_count,
+            "first_message": first_message,
+            "last_message": last_message,
+            "duration_days": (last_message - first_message).days if first_message else None,
+        }
+
+    def get_conversation_statistics(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get statistics for the conversations with the most messages.
+
+        Args:
+            limit: The maximum number of conversations to return.
+
+        Returns:
+            A list of dictionaries containing statistics for each conversation.
+        """
+        columns = self._get_columns()
+        conversation_count = len(self.conversations.values)
+        conversations = columns["conversation"]
+        counts = np.bincount(conversations, minlength=conversation_count)
+
+        # Time range per conversation; conversations without timestamps keep the sentinels
+        with_time = conversations[columns["has_timestamp"]]
+        timestamps = columns["timestamp"][columns["has_timestamp"]]
+        first = np.full(conversation_count, np.iinfo(np.int64).max, dtype=np.int64)
+        last = np.full(conversation_count, MISSING_TIMESTAMP, dtype=np.int64)
+        np.minimum.at(first, with_time, timestamps)
+        np.maximum.at(last, with_time, timestamps)
+
+        # Distinct (conversation, sender ID) pairs
+        has_sender = columns["sender_id"] >= 0
+        pairs = np.unique(
+            conversations[has_sender] * max(len(self.sender_ids.values), 1) + columns["sender_id"][has_sender]
+        )
+        participants = np.bincount(pairs // max(len(self.sender_ids.values), 1), minlength=conversation_count)
+
+        result = []
+        for code in np.argsort(-counts, kind="stable")[:limit]:
+            first_message = self._to_datetime(first[code]) if last[code] != MISSING_TIMESTAMP else None
+            last_message = self._to_datetime(last[code])
+            result.append({
+                "conversation_id": self.conversations.values[code],
+                "display_name": self.display_names.get(code),
+                "message_count": int(counts[code]),
+                "first_message_time": first_message,
+                "last_message_time": last_message,
+                "duration_days": (last_message - first_message).days if first_message else None,
+                "participant_count": int(participants[code]),
+            })
+        return result
+
+    def _distribution(self, codes: Any, values: List[Any], key: str, count_key: str) -> List[Dict[str, Any]]:
+        """Count codes and return rows ordered by count, most frequent first."""
+        counts = np.bincount(codes, minlength=len(values))
+        total = int(counts.sum())
+        return [
+            {key: values[code], count_key: int(counts[code]), "percentage": self._percentage(int(counts[code]), total)}
+            for code in np.argsort(-counts, kind="stable")
+            if counts[code]
+        ]
+
+    def get_message_type_distribution(self) -> List[Dict[str, Any]]:
+        """
+        Get the distribution of message types.
+
+        Returns:
+            A list of dictionaries containing the count and percentage for each message type.
+        """
+        columns = self._get_columns()
+        return self._distribution(columns["message_type"], self.message_types.values, "message_type", "count")
+
+    def get_activity_by_hour(self) -> List[Dict[str, Any]]:
+        """
+        Get the distribution of messages by hour of day.
+
+        Returns:
+            A list of dictionaries containing the count for each hour of the day.
+        """
+        hours = self._get_columns()["datetime"].astype("datetime64[h]").astype(np.int64) % 24
+        counts = np.bincount(hours, minlength=24)
+        return [{"hour": hour, "message_count": int(count)} for hour, count in enumerate(counts) if count]
+
+    def get_activity_by_day_of_week(self) -> List[Dict[str, Any]]:
+        """
+        Get the distribution of messages by day of week (Sunday is 0).
+
+        Returns:
+            A list of dictionaries containing the count for each day of the week.
+        """
+        days = self._get_columns()["datetime"].astype("datetime64[D]").astype(np.int64)
+        # 1970-01-01 was a Thursday (4)
+        counts = np.bincount((days + 4) % 7, minlength=7)
+        return [
+            {"day_of_week": day, "message_count": int(count), "day_name": DAY_NAMES[day]}
+            for day, count in enumerate(counts)
+            if count
+        ]
+
+    def get_top_senders(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get the top message senders.
+
+        Args:
+            limit: The maximum number of senders to return.
+
+        Returns:
+            A list of dictionaries containing the count for each sender.
+        """
+        columns = self._get_columns()
+        return self._distribution(columns["sender"], self.senders.values, "sender_name", "message_count")[:limit]
+
+    def get_message_length_statistics(self) -> Dict[str, Any]:
+        """
+        Get statistics about the lengths of text messages.
+
+        Returns:
+            A dictionary containing statistics about message lengths.
+        """
+        columns = self._get_columns()
+        text_code = self.message_types.codes.get(TEXT_MESSAGE_TYPE, -1)
+        lengths = columns["length"][(columns["message_type"] == text_code) & (columns["length"] >= 0)]
+        if not lengths.size:
+            return {
+                "avg_length": None,
+                "min_length": None,
+                "max_length": None,
+                "median_length": None,
+                "stddev_length": None,
+            }
+
+        return {
+            "avg_length": float(lengths.mean()),
+            "min_length": int(lengths.min()),
+            "max_length": int(lengths.max()),
+            "median_length": float(np.median(lengths)),
+            "stddev_length": float(lengths.std(ddof=1)) if lengths.size > 1 else None,
+        }
+
+    def generate_full_report(self) -> Dict[str, Any]:
+        """
+        Generate a full report, as SkypeReportGenerator.generate_full_report() does.
+
+        Returns:
+            A dictionary containing all report data.
+        """
+        return {
+            "summary": self.get_export_summary(),
+            "conversation_statistics": self.get_conversation_statistics(),
+            "message_type_distribution": self.get_message_type_distribution(),
+            "activity_by_hour": self.get_activity_by_hour(),
+            "activity_by_day_of_week": self.get_activity_by_day_of_week(),
+            "top_senders": self.get_top_senders(),
+            "message_length_statistics": self.get_message_length_statistics(),
+        }
+
+    def _timeline(self, mask: Any, interval: str) -> List[Dict[str, Any]]:
+        """Count the messages selected by mask per DATE_TRUNC(interval) bucket."""
+        columns = self._get_columns()
+        datetimes = columns["datetime"][mask[columns["has_timestamp"]]]
+        unit = TIMELINE_UNITS.get(interval.lower(), "D")
+        if unit == "W":
+            # Weeks start on Monday; 1970-01-01 was a Thursday
+            days = datetimes.astype("datetime64[D]").astype(np.int64)
+            buckets = (days - (days + 3) % 7).astype("datetime64[D]")
+        else:
+            buckets = datetimes.astype(f"datetime64[{unit}]")
+
+        intervals, counts = np.unique(buckets, return_counts=True)
+        return [
+            {"time_interval": time_interval, "message_count": int(count)}
+            for time_interval, count in zip(intervals.astype("datetime64[us]").tolist(), counts)
+        ]
+
+    def get_conversation_timeline(self, conversation_id: str, interval: str = "day") -> List[Dict[str, Any]]:
+        """
+        Get a timeline of message activity for a specific conversation.
+
+        Args:
+            conversation_id: The ID of the conversation to analyze.
+            interval: The time interval to group by ('hour', 'day', 'week', 'month').
+
+        Returns:
+            A list of dictionaries containing the message count for each time interval.
+        """
+        code = self.conversations.codes.get(conversation_id, -1)
+        return self._timeline(self._get_columns()["conversation"] == code, interval)
+
+    def get_user_activity_timeline(self, sender_name: str, interval: str = "day") -> List[Dict[str, Any]]:
+        """
+        Get a timeline of message activity for a specific user.
+
+        Args:
+            sender_name: The name of the sender to analyze.
+            interval: The time interval to group by ('hour', 'day', 'week', 'month').
+
+        Returns:
+            A list of dictionaries containing the message count for each time interval.
+        """
+        code = self.senders.codes.get(sender_name, -1)
+        return self._timeline(self._get_columns()["sender"] == code, interval)
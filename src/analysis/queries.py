@@ -6,9 +6,10 @@ that has been processed by the ETL pipeline.
 """
 
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
+from src.analysis.search import DEFAULT_PAGE_SIZE, MessageSearch
 from src.utils.interfaces import DatabaseConnectionProtocol
 from src.utils.di import get_service
 
@@ -31,8 +32,44 @@ class SkypeQueryExamples:
                 retrieved from the dependency injection system.
         """
         self.db_connection = db_connection or get_service(DatabaseConnectionProtocol)
+        self._search: Optional[MessageSearch] = None
         logger.info("SkypeQueryExamples initialized")
 
+    def _stream(self, query: str, params: Tuple) -> Iterator[Dict[str, Any]]:
+        """
+        Stream query results, using a server-side cursor when the connection supports it.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+
+        Yields:
+            Result rows as dictionaries
+        """
+        stream_query = getattr(self.db_connection, "stream_query", None)
+        if stream_query is None:
+            yield from self.db_connection.execute_query(query, params) or []
+            return
+        for row in stream_query(query, params):
+            yield dict(row)
+
+    def search_messages(self, export_id: int, query: str, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0) -> Dict[str, Any]:
+        """
+        Full-text search over the messages of an export.
+
+        Args:
+            export_id: The ID of the export to search.
+            query: Words, "quoted phrases" and prefix* terms that must all match.
+            limit: Number of results per page.
+            offset: Number of results to skip.
+
+        Returns:
+            A page of ranked results with highlighted headlines (see MessageSearch.search).
+        """
+        if self._search is None:
+            self._search = MessageSearch(self.db_connection)
+        return self._search.search(export_id, query, limit, offset)
+
     def find_conversations_with_keyword(self, export_id: int, keyword: str, limit: int = 100) -> List[Dict[str, Any]]:
         """
         Find conversations containing a specific keyword.
@@ -43,31 +80,9 @@ class SkypeQueryExamples:
             limit: The maximum number of results to return.
 
         Returns:
-            A list of dictionaries containing matching conversations.
-        """
-        query = """
-            SELECT
-                m.id,
-                m.conversation_id,
-                c.display_name as conversation_name,
-                m.sender_name,
-                m.timestamp,
-                m.content
-            FROM
-                skype_messages m
-            JOIN
-                skype_conversations c ON m.conversation_id = c.conversation_id AND m.export_id = c.export_id
-            WHERE
-                m.export_id = %s
-                AND m.content ILIKE %s
-            ORDER BY
-                m.timestamp DESC
-            LIMIT %s
+            A list of dictionaries containing matching messages, best matches first.
         """
-
-        result = self.db_connection.execute_query(query, (export_id, f"%{keyword}%", limit))
-
-        return result if result else []
+        return self.search_messages(export_id, keyword, limit)["results"]
 
     def get_conversation_timeline(self, export_id: int, conversation_id: str, interval: str = 'day') -> List[Dict[str, Any]]:
         """
@@ -177,6 +192,39 @@ class SkypeQueryExamples:
 
         return result if result else []
 
+    def iter_conversation_messages(self, export_id: int, conversation_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all messages of a conversation in timestamp order.
+
+        The result set is unbounded, so rows are read through a server-side
+        cursor instead of being fetched all at once.
+
+        Args:
+            export_id: The ID of the export to read.
+            conversation_id: The ID of the conversation to read.
+
+        Yields:
+            Dictionaries containing message data.
+        """
+        query = """
+            SELECT
+                id,
+                sender_id,
+                sender_name,
+                timestamp,
+                message_type,
+                content
+            FROM
+                skype_messages
+            WHERE
+                export_id = %s
+                AND conversation_id = %s
+            ORDER BY
+                timestamp, id
+        """
+
+        yield from self._stream(query, (export_id, conversation_id))
+
     def get_message_length_by_sender(self, export_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get average message length by sender.
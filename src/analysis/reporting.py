@@ -11,11 +11,79 @@ import os
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
+from src.analysis.queries import SkypeQueryExamples
 from src.utils.di import get_service
 from src.utils.interfaces import DatabaseConnectionProtocol
 
 logger = logging.getLogger(__name__)
 
+DAY_NAMES = [
+    "Sunday",
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+]
+
+
+def _json_value(value: Any) -> Any:
+    """Decode a JSON column that the driver returned as text."""
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _length_statistics(length_counts: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Compute message length statistics from a histogram of lengths.
+
+    Matches AVG, MIN, MAX, PERCENTILE_CONT(0.5) and STDDEV over the lengths.
+
+    Args:
+        length_counts: Mapping of length (as a string) to number of messages
+
+    Returns:
+        A dictionary containing statistics about message lengths.
+    """
+    histogram = sorted((int(length), count) for length, count in length_counts.items() if count)
+    total = sum(count for _, count in histogram)
+    if not total:
+        return {
+            "avg_length": None,
+            "min_length": None,
+            "max_length": None,
+            "median_length": None,
+            "stddev_length": None,
+        }
+
+    mean = sum(length * count for length, count in histogram) / total
+
+    def nth(index: int) -> int:
+        seen = 0
+        for length, count in histogram:
+            seen += count
+            if index < seen:
+                return length
+        return histogram[-1][0]
+
+    if total % 2:
+        median = float(nth(total // 2))
+    else:
+        median = (nth(total // 2 - 1) + nth(total // 2)) / 2
+
+    stddev = None
+    if total > 1:
+        variance = sum(count * (length - mean) ** 2 for length, count in histogram) / (total - 1)
+        stddev = variance ** 0.5
+
+    return {
+        "avg_length": mean,
+        "min_length": histogram[0][0],
+        "max_length": histogram[-1][0],
+        "median_length": median,
+        "stddev_length": stddev,
+    }
+
 
 # Add the generate_report function for backward compatibility
 def generate_report(
@@ -97,6 +165,40 @@ class SkypeReportGenerator:
         self.db_connection = db_connection or get_service(DatabaseConnectionProtocol)
         logger.info("SkypeReportGenerator initialized")
 
+    def _query_aggregates(self, query: str, params: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read load-time aggregates.
+
+        Args:
+            query: Query against one of the aggregate tables.
+            params: Query parameters.
+
+        Returns:
+            The result rows, or None if the aggregates are not available
+            (the loader did not store them or the tables do not exist).
+        """
+        try:
+            result = self.db_connection.execute_query(query, params)
+        except Exception as e:
+            logger.debug(f"Aggregates not available, scanning messages instead: {e}")
+            return None
+        return result or None
+
+    def _get_export_aggregates(self, export_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the load-time aggregates of an export.
+
+        Args:
+            export_id: The ID of the export.
+
+        Returns:
+            The skype_export_aggregates row, or None if there is none.
+        """
+        result = self._query_aggregates(
+            "SELECT * FROM skype_export_aggregates WHERE export_id = %s", (export_id,)
+        )
+        return result[0] if result else None
+
     def get_export_summary(self, export_id: int) -> Dict[str, Any]:
         """
         Get a summary of a Skype export.
@@ -128,6 +230,17 @@ class SkypeReportGenerator:
 
         export_data = export_result[0]
 
+        aggregates = self._get_export_aggregates(export_id)
+        if aggregates:
+            return self._build_export_summary(
+                export_id,
+                export_data,
+                aggregates["conversation_count"],
+                aggregates["message_count"],
+                aggregates["first_message"],
+                aggregates["last_message"],
+            )
+
         # Get conversation count
         conversation_query = """
             SELECT
@@ -177,6 +290,38 @@ class SkypeReportGenerator:
             date_range_result[0]["last_message"] if date_range_result else None
         )
 
+        return self._build_export_summary(
+            export_id, export_data, conversation_count, message_count, first_message, last_message
+        )
+
+    @staticmethod
+    def _build_export_summary(
+        export_id: int,
+        export_data: Dict[str, Any],
+        conversation_count: int,
+        message_count: int,
+        first_message: Any,
+        last_message: Any,
+    ) -> Dict[str, Any]:
+        """
+        Build the export summary dictionary.
+
+        Args:
+            export_id: The ID of the export.
+            export_data: The skype_exports row.
+            conversation_count: Number of conversations.
+            message_count: Number of messages.
+            first_message: Timestamp of the first message.
+            last_message: Timestamp of the last message.
+
+        Returns:
+            A dictionary containing summary information about the export.
+        """
+        if isinstance(first_message, str):
+            first_message = datetime.fromisoformat(first_message)
+        if isinstance(last_message, str):
+            last_message = datetime.fromisoformat(last_message)
+
         # Calculate duration in days
         duration_days = None
         if first_message and last_message:
@@ -209,6 +354,36 @@ class SkypeReportGenerator:
         Returns:
             A list of dictionaries containing statistics for each conversation.
         """
+        aggregates = self._query_aggregates(
+            """
+            SELECT
+                conversation_id,
+                display_name,
+                message_count,
+                first_message AS first_message_time,
+                last_message AS last_message_time,
+                participant_count
+            FROM
+                skype_conversation_aggregates
+            WHERE
+                export_id = %s
+            ORDER BY
+                message_count DESC
+            LIMIT %s
+            """,
+            (export_id, limit),
+        )
+        if aggregates:
+            for row in aggregates:
+                first, last = row["first_message_time"], row["last_message_time"]
+                if first and last:
+                    if isinstance(first, str):
+                        first, last = datetime.fromisoformat(first), datetime.fromisoformat(last)
+                    row["duration_days"] = (last - first).days
+                else:
+                    row["duration_days"] = None
+            return aggregates
+
         query = """
             SELECT
                 c.id,
@@ -246,6 +421,21 @@ class SkypeReportGenerator:
         Returns:
             A list of dictionaries containing the count and percentage for each message type.
         """
+        aggregates = self._get_export_aggregates(export_id)
+        if aggregates:
+            type_counts = _json_value(aggregates["message_type_counts"]) or {}
+            total = sum(type_counts.values())
+            return [
+                {
+                    "message_type": message_type,
+                    "count": count,
+                    "percentage": round(count * 100.0 / total, 2),
+                }
+                for message_type, count in sorted(
+                    type_counts.items(), key=lambda item: item[1], reverse=True
+                )
+            ]
+
         query = """
             SELECT
                 message_type,
@@ -279,6 +469,15 @@ class SkypeReportGenerator:
         Returns:
             A list of dictionaries containing the count for each hour of the day.
         """
+        aggregates = self._get_export_aggregates(export_id)
+        if aggregates:
+            hour_counts = _json_value(aggregates["hour_counts"]) or []
+            return [
+                {"hour": hour, "message_count": count}
+                for hour, count in enumerate(hour_counts)
+                if count
+            ]
+
         query = """
             SELECT
                 EXTRACT(HOUR FROM timestamp) as hour,
@@ -293,7 +492,7 @@ class SkypeReportGenerator:
                 hour
         """
 
-        result = self.db_connection.execute_query(query, (export_id, export_id))
+        result = self.db_connection.execute_query(query, (export_id,))
 
         return result if result else []
 
@@ -307,6 +506,15 @@ class SkypeReportGenerator:
         Returns:
             A list of dictionaries containing the count for each day of the week.
         """
+        aggregates = self._get_export_aggregates(export_id)
+        if aggregates:
+            weekday_counts = _json_value(aggregates["weekday_counts"]) or []
+            return [
+                {"day_of_week": day, "message_count": count, "day_name": DAY_NAMES[day]}
+                for day, count in enumerate(weekday_counts)
+                if count
+            ]
+
         query = """
             SELECT
                 EXTRACT(DOW FROM timestamp) as day_of_week,
@@ -321,20 +529,11 @@ class SkypeReportGenerator:
                 day_of_week
         """
 
-        result = self.db_connection.execute_query(query, (export_id, export_id))
+        result = self.db_connection.execute_query(query, (export_id,))
 
         # Convert day_of_week number to name
-        day_names = [
-            "Sunday",
-            "Monday",
-            "Tuesday",
-            "Wednesday",
-            "Thursday",
-            "Friday",
-            "Saturday",
-        ]
         for row in result:
-            row["day_name"] = day_names[int(row["day_of_week"])]
+            row["day_name"] = DAY_NAMES[int(row["day_of_week"])]
 
         return result if result else []
 
@@ -349,6 +548,28 @@ class SkypeReportGenerator:
         Returns:
             A list of dictionaries containing the count for each sender.
         """
+        aggregates = self._get_export_aggregates(export_id)
+        if aggregates:
+            senders = self._query_aggregates(
+                """
+                SELECT
+                    sender_name,
+                    message_count
+                FROM
+                    skype_sender_aggregates
+                WHERE
+                    export_id = %s
+                ORDER BY
+                    message_count DESC
+                LIMIT %s
+                """,
+                (export_id, limit),
+            ) or []
+            total = aggregates["message_count"]
+            for row in senders:
+                row["percentage"] = round(row["message_count"] * 100.0 / total, 2) if total else 0
+            return senders
+
         query = """
             SELECT
                 sender_name,
@@ -383,6 +604,10 @@ class SkypeReportGenerator:
         Returns:
             A dictionary containing statistics about message lengths.
         """
+        aggregates = self._get_export_aggregates(export_id)
+        if aggregates:
+            return _length_statistics(_json_value(aggregates["text_length_counts"]) or {})
+
         query = """
             SELECT
                 AVG(LENGTH(content)) as avg_length,
@@ -410,6 +635,38 @@ class SkypeReportGenerator:
 
         return result[0]
 
+    def export_conversation_messages(
+        self, export_id: int, conversation_id: str, output_file: str
+    ) -> int:
+        """
+        Export all messages of a conversation to a JSON Lines file.
+
+        Messages are streamed from the database and written one per line,
+        so memory use does not grow with the size of the conversation.
+
+        Args:
+            export_id: The ID of the export to read.
+            conversation_id: The ID of the conversation to export.
+            output_file: Path of the JSON Lines file to write.
+
+        Returns:
+            The number of messages written.
+        """
+        queries = SkypeQueryExamples(self.db_connection)
+        output_dir = os.path.dirname(output_file)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        count = 0
+        with open(output_file, "w", encoding="utf-8") as f:
+            for message in queries.iter_conversation_messages(export_id, conversation_id):
+                f.write(json.dumps(message, default=str))
+                f.write("\n")
+                count += 1
+
+        logger.info(f"Exported {count} messages from {conversation_id} to {output_file}")
+        return count
+
     def generate_full_report(self, export_id: int) -> Dict[str, Any]:
         """
         Generate a full report for a Skype export.
@@ -0,0 +1,481 @@
+"""
+Full-Text Search Module for Skype Parser
+
+This module provides ranked message search with phrase and prefix queries,
+highlighted snippets and pagination.
+
+On PostgreSQL, messages carry a stored tsvector column (content_tsv) that
+is computed when rows are inserted and indexed with GIN, so a search is an
+index lookup instead of an ILIKE scan over every message. Databases
+created before the column existed fall back to an ILIKE scan until
+MessageSearch.ensure_index() has been run. SQLite and
+offline runs use an in-process inverted index built from the messages of
+an export the first time it is searched.
+
+Query syntax:
+    budget report        messages containing both words
+    "budget report"      the exact phrase
+    budg*                words starting with "budg"
+"""
+
+import html
+import logging
+import math
+import re
+import sqlite3
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.di import get_service
+from src.utils.interfaces import DatabaseConnectionProtocol
+
+logger = logging.getLogger(__name__)
+
+# Default number of results per page
+DEFAULT_PAGE_SIZE = 20
+
+# Text search configuration used for the tsvector column and queries
+TEXT_SEARCH_CONFIG = "english"
+
+# Highlight markers and snippet length, the same for both backends
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+HEADLINE_MAX_WORDS = 35
+HEADLINE_MIN_WORDS = 15
+
+# ts_headline marks matches with these control characters so its output can
+# be HTML-escaped before they are replaced with the highlight markers
+_HEADLINE_START = "\x02"
+_HEADLINE_STOP = "\x03"
+
+# One statement per entry; the column is filled by PostgreSQL on every insert
+CREATE_SEARCH_INDEX_SQL = (
+    f"""
+    ALTER TABLE skype_messages
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(content, ''))) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_messages_content_tsv
+    ON skype_messages USING gin (content_tsv)
+    """,
+)
+
+SEARCH_MESSAGES_SQL = f"""
+    SELECT
+        r.*,
+        ts_headline(
+            '{TEXT_SEARCH_CONFIG}', r.content, to_tsquery('{TEXT_SEARCH_CONFIG}', %s),
+            'StartSel={_HEADLINE_START}, StopSel={_HEADLINE_STOP}, MaxWords={HEADLINE_MAX_WORDS}, MinWords={HEADLINE_MIN_WORDS}'
+        ) AS headline
+    FROM (
+        SELECT
+            m.id,
+            m.conversation_id,
+            c.display_name AS conversation_name,
+            m.sender_name,
+            m.timestamp,
+            m.content,
+            ts_rank_cd(m.content_tsv, q) AS rank
+        FROM
+            skype_messages m
+        JOIN
+            skype_conversations c ON m.conversation_id = c.conversation_id AND m.export_id = c.export_id
+        CROSS JOIN
+            to_tsquery('{TEXT_SEARCH_CONFIG}', %s) AS q
+        WHERE
+            m.export_id = %s
+            AND m.content_tsv @@ q
+        ORDER BY
+            rank DESC, m.timestamp DESC, m.id
+        LIMIT %s OFFSET %s
+    ) r
+    ORDER BY
+        r.rank DESC, r.timestamp DESC, r.id
+"""
+
+INDEX_MESSAGES_SQL = """
+    SELECT
+        m.id,
+        m.conversation_id,
+        c.display_name AS conversation_name,
+        m.sender_name,
+        m.timestamp,
+        m.content
+    FROM
+        skype_messages m
+    JOIN
+        skype_conversations c ON m.conversation_id = c.conversation_id AND m.export_id = c.export_id
+    WHERE
+        m.export_id = %s
+"""
+
+HAS_SEARCH_INDEX_SQL = """
+    SELECT 1
+    FROM information_schema.columns
+    WHERE table_name = 'skype_messages' AND column_name = 'content_tsv'
+"""
+
+_WORD = re.compile(r"\w+")
+_QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lower-case words.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of words
+    """
+    return [word.lower() for word in _WORD.findall(text or "")]
+
+
+def parse_query(query: str) -> List[Tuple[str, Tuple[str, ...]]]:
+    """
+    Parse a search query into clauses that must all match.
+
+    Args:
+        query: Search query
+
+    Returns:
+        List of (kind, words) clauses, where kind is "term", "prefix" or "phrase"
+    """
+    clauses = []
+    for match in _QUERY_PART.finditer(query or ""):
+        phrase, token = match.groups()
+        if phrase is not None:
+            words = tokenize(phrase)
+        elif token.endswith("*") and len(tokenize(token)) == 1:
+            clauses.append(("prefix", tuple(tokenize(token))))
+            continue
+        else:
+            words = tokenize(token)
+
+        if len(words) == 1:
+            clauses.append(("term", tuple(words)))
+        elif words:
+            # Like PostgreSQL, a hyphenated or quoted group is a phrase
+            clauses.append(("phrase", tuple(words)))
+    return clauses
+
+
+def to_tsquery(clauses: List[Tuple[str, Tuple[str, ...]]]) -> str:
+    """
+    Build a PostgreSQL tsquery from parsed clauses.
+
+    Clauses only contain word characters, so the result cannot contain
+    tsquery operators from the user's input.
+
+    Args:
+        clauses: Clauses from parse_query()
+
+    Returns:
+        tsquery text
+    """
+    parts = []
+    for kind, words in clauses:
+        if kind == "prefix":
+            parts.append(f"{words[0]}:*")
+        elif kind == "phrase":
+            parts.append("(" + " <-> ".join(words) + ")")
+        else:
+            parts.append(words[0])
+    return " & ".join(parts)
+
+
+def highlight(content: Optional[str], positions: Iterable[int]) -> str:
+    """
+    Mark matched words in a snippet of content.
+
+    Args:
+        content: Message content
+        positions: Indexes of the matched words
+
+    Returns:
+        The HTML-escaped snippet with matched words wrapped in
+        HIGHLIGHT_START/HIGHLIGHT_STOP
+    """
+    content = content or ""
+    spans = [match.span() for match in _WORD.finditer(content)]
+    positions = sorted(set(positions))
+    if not spans:
+        return html.escape(content)
+
+    start, end = 0, len(spans)
+    if len(spans) > HEADLINE_MAX_WORDS:
+        first = positions[0] if positions else 0
+        start = max(0, min(first - (HEADLINE_MAX_WORDS - HEADLINE_MIN_WORDS) // 2,
+                           len(spans) - HEADLINE_MAX_WORDS))
+        end = start + HEADLINE_MAX_WORDS
+
+    text_start = spans[start][0] if start else 0
+    text_end = spans[end - 1][1] if end < len(spans) else len(content)
+    pieces = []
+    cursor = text_start
+    for position in positions:
+        if not start <= position < end:
+            continue
+        word_start, word_end = spans[position]
+        pieces.append(html.escape(content[cursor:word_start]))
+        pieces.append(f"{HIGHLIGHT_START}{html.escape(content[word_start:word_end])}{HIGHLIGHT_STOP}")
+        cursor = word_end
+    pieces.append(html.escape(content[cursor:text_end]))
+    return "".join(pieces)
+
+
+def _escape_headline(headline: Optional[str]) -> str:
+    """HTML-escape a ts_headline result and replace its markers with the highlight markers."""
+    escaped = html.escape(headline or "")
+    return escaped.replace(_HEADLINE_START, HIGHLIGHT_START).replace(_HEADLINE_STOP, HIGHLIGHT_STOP)
+
+
+def _page(results: List[Dict[str, Any]], limit: int, offset: int) -> Dict[str, Any]:
+    """Build a result page from up to limit + 1 results."""
+    return {
+        "results": results[:limit],
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if len(results) > limit else None,
+    }
+
+
+class InvertedIndex:
+    """
+    In-process positional inverted index over the messages of one export.
+
+    Words are matched exactly (without stemming). Results are ranked by the
+    number of matches, weighted by how rare each clause is and normalized
+    by message length.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.documents: List[Dict[str, Any]] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        self._terms: Optional[List[str]] = None
+
+    def add(self, message: Dict[str, Any]) -> None:
+        """
+        Add a message to the index.
+
+        Args:
+            message: Message row with at least id and content
+        """
+        doc = len(self.documents)
+        self.documents.append(message)
+        words = tokenize(message.get("content"))
+        self._lengths.append(len(words))
+        for position, word in enumerate(words):
+            self._postings.setdefault(word, {}).setdefault(doc, []).append(position)
+        self._terms = None
+
+    def _prefix_postings(self, prefix: str) -> Dict[int, List[int]]:
+        """Merge the postings of every word starting with prefix."""
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        merged: Dict[int, List[int]] = {}
+        for i in range(bisect_left(self._terms, prefix), len(self._terms)):
+            term = self._terms[i]
+            if not term.startswith(prefix):
+                break
+            for doc, positions in self._postings[term].items():
+                merged.setdefault(doc, []).extend(positions)
+        return merged
+
+    def _phrase_postings(self, words: Tuple[str, ...]) -> Dict[int, List[int]]:
+        """Return the positions of every word of each phrase occurrence."""
+        postings = [self._postings.get(word, {}) for word in words]
+        matches: Dict[int, List[int]] = {}
+        for doc in set(postings[0]).intersection(*postings[1:]):
+            following = [set(p[doc]) for p in postings[1:]]
+            for start in postings[0][doc]:
+                if all(start + i + 1 in positions for i, positions in enumerate(following)):
+                    matches.setdefault(doc, []).extend(range(start, start + len(words)))
+        return matches
+
+    def _clause_postings(self, kind: str, words: Tuple[str, ...]) -> Dict[int, List[int]]:
+        if kind == "prefix":
+            return self._prefix_postings(words[0])
+        if kind == "phrase":
+            return self._phrase_postings(words)
+        return self._postings.get(words[0], {})
+
+    def search(self, query: str, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0) -> Dict[str, Any]:
+        """
+        Search the index.
+
+        Args:
+            query: Search query
+            limit: Number of results per page
+            offset: Number of results to skip
+
+        Returns:
+            A page with results (each with rank and headline), limit, offset
+            and next_offset (None on the last page)
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return _page([], limit, offset)
+
+        clause_postings = [self._clause_postings(kind, words) for kind, words in clauses]
+        docs = set(clause_postings[0]).intersection(*clause_postings[1:])
+        total_docs = len(self.documents)
+
+        scored = []
+        for doc in docs:
+            score = sum(
+                len(postings[doc]) * math.log(1 + total_docs / len(postings))
+                for postings in clause_postings
+            ) / math.sqrt(max(self._lengths[doc], 1))
+            scored.append((score, doc))
+
+        # Highest rank first, then newest first, like the PostgreSQL query
+        scored.sort(key=lambda item: str(self.documents[item[1]].get("timestamp") or ""), reverse=True)
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        results = []
+        for score, doc in scored[offset:offset + limit + 1]:
+            message = dict(self.documents[doc])
+            positions = [p for postings in clause_postings for p in postings[doc]]
+            message["rank"] = score
+            message["headline"] = highlight(message.get("content"), positions)
+            results.append(message)
+        return _page(results, limit, offset)
+
+
+class MessageSearch:
+    """
+    Ranked full-text search over the messages of an export.
+
+    PostgreSQL connections search the indexed content_tsv column. SQLite
+    connections (and any connection when backend="memory") use an
+    InvertedIndex per export, built on first use.
+    """
+
+    def __init__(
+        self,
+        db_connection: Optional[DatabaseConnectionProtocol] = None,
+        backend: str = "auto",
+    ):
+        """
+        Initialize the search.
+
+        Args:
+            db_connection: A database connection object. If None, one will be
+                retrieved from the dependency injection system.
+            backend: "postgres", "memory", or "auto" to pick from the connection
+        """
+        self.db_connection = db_connection or get_service(DatabaseConnectionProtocol)
+        if backend == "auto":
+            is_sqlite = isinstance(getattr(self.db_connection, "conn", None), sqlite3.Connection)
+            backend = "memory" if is_sqlite else "postgres"
+        if backend not in ("postgres", "memory"):
+            raise ValueError(f"Unknown search backend: {backend}")
+        self.backend = backend
+        self._indexes: Dict[int, InvertedIndex] = {}
+        self._has_index: Optional[bool] = None
+
+    def ensure_index(self) -> None:
+        """
+        Add the content_tsv column and its GIN index to skype_messages.
+
+        Existing rows are indexed once; new rows are indexed as they are
+        inserted. Does nothing for the in-process backend.
+        """
+        if self.backend != "postgres":
+            return
+        for statement in CREATE_SEARCH_INDEX_SQL:
+            self.db_connection.execute(statement)
+        self._has_index = True
+        logger.info("Full-text search index is in place")
+
+    def _has_search_index(self) -> bool:
+        """Return whether skype_messages has the content_tsv column, checking once."""
+        if self._has_index is None:
+            self._has_index = bool(self.db_connection.execute_query(HAS_SEARCH_INDEX_SQL))
+            if not self._has_index:
+                logger.warning(
+                    "skype_messages has no content_tsv column; searching with ILIKE. "
+                    "Run MessageSearch.ensure_index() to index messages."
+                )
+        return self._has_index
+
+    def _fallback_search(self, export_id: int, query: str, limit: int, offset: int) -> Dict[str, Any]:
+        """Search with ILIKE and rank the candidate rows in an InvertedIndex."""
+        clauses = parse_query(query)
+        words = sorted({word for _, clause_words in clauses for word in clause_words})
+        sql = INDEX_MESSAGES_SQL + "".join("    AND m.content ILIKE %s\n" for _ in words)
+        # Words only contain word characters, of which "_" is the one LIKE wildcard
+        patterns = tuple("%" + word.replace("_", "\\_") + "%" for word in words)
+
+        index = InvertedIndex()
+        for row in self.db_connection.execute_query(sql, (export_id,) + patterns) or []:
+            index.add(dict(row))
+        return index.search(query, limit, offset)
+
+    def invalidate(self, export_id: int) -> None:
+        """
+        Drop the in-process index of an export after it was reloaded or deleted.
+
+        Args:
+            export_id: The export to drop
+        """
+        self._indexes.pop(export_id, None)
+
+    def _get_index(self, export_id: int) -> InvertedIndex:
+        """Return the in-process index of an export, building it if needed."""
+        index = self._indexes.get(export_id)
+        if index is not None:
+            return index
+
+        index = InvertedIndex()
+        stream_query = getattr(self.db_connection, "stream_query", None)
+        if stream_query is not None:
+            rows = stream_query(INDEX_MESSAGES_SQL, (export_id,))
+        else:
+            rows = self.db_connection.execute_query(INDEX_MESSAGES_SQL, (export_id,)) or []
+        for row in rows:
+            index.add(dict(row))
+
+        logger.info(f"Built search index for export {export_id} ({len(index.documents)} messages)")
+        self._indexes[export_id] = index
+        return index
+
+    def search(
+        self, export_id: int, query: str, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Search the messages of an export.
+
+        Args:
+            export_id: The ID of the export to search.
+            query: Words, "quoted phrases" and prefix* terms that must all match.
+            limit: Number of results per page.
+            offset: Number of results to skip.
+
+        Returns:
+            A page with results, limit, offset and next_offset (None on the
+            last page). Each result has the message columns, its rank and a
+            headline with the matches highlighted.
+        """
+        if self.backend == "memory":
+            return self._get_index(export_id).search(query, limit, offset)
+
+        clauses = parse_query(query)
+        if not clauses:
+            return _page([], limit, offset)
+        if not self._has_search_index():
+            return self._fallback_search(export_id, query, limit, offset)
+
+        tsquery = to_tsquery(clauses)
+
+        result = self.db_connection.execute_query(
+            SEARCH_MESSAGES_SQL, (tsquery, tsquery, export_id, limit + 1, offset)
+        ) or []
+        for row in result:
+            row["headline"] = _escape_headline(row.get("headline"))
+        return _page(result, limit, offset)
@@ -7,6 +7,8 @@ that has been processed by the ETL pipeline.
 
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Any, Optional, Tuple
 import json
 from datetime import datetime
@@ -32,6 +34,161 @@ from src.analysis.reporting import SkypeReportGenerator
 
 logger = logging.getLogger(__name__)
 
+# Output formats: rendered images, or chart specs that a client can draw itself
+OUTPUT_FORMATS = ("png", "svg", "json")
+
+# Charts generated by generate_all_visualizations, named after their report section
+CHARTS = (
+    "message_type_distribution",
+    "activity_by_hour",
+    "activity_by_day_of_week",
+    "top_senders",
+    "conversation_statistics",
+)
+
+
+def build_chart_spec(chart: str, data: List[Dict[str, Any]], export_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Build the spec of a chart from report data.
+
+    A spec holds everything needed to draw the chart and is plain JSON, so
+    it can be sent to a worker process or written out instead of an image.
+
+    Args:
+        chart: Chart name (one of CHARTS).
+        data: The report section the chart is drawn from.
+        export_id: The ID of the export, for the title.
+
+    Returns:
+        The chart spec, or None if there is no data.
+    """
+    if not data:
+        return None
+
+    if chart == "message_type_distribution":
+        return {
+            "chart": chart,
+            "type": "pie",
+            "title": f"Message Type Distribution (Export ID: {export_id})",
+            "labels": [str(item["message_type"]) for item in data],
+            "values": [int(item["count"]) for item in data],
+            "figsize": [10, 8],
+        }
+
+    if chart == "activity_by_hour":
+        return {
+            "chart": chart,
+            "type": "bar",
+            "title": f"Message Activity by Hour of Day (Export ID: {export_id})",
+            "labels": [int(item["hour"]) for item in data],
+            "values": [int(item["message_count"]) for item in data],
+            "x_label": "Hour of Day (24-hour format)",
+            "y_label": "Number of Messages",
+            "x_ticks": list(range(0, 24)),
+            "color": "skyblue",
+            "grid": "y",
+            "figsize": [12, 6],
+        }
+
+    if chart == "activity_by_day_of_week":
+        data = sorted(data, key=lambda x: x["day_of_week"])
+        return {
+            "chart": chart,
+            "type": "bar",
+            "title": f"Message Activity by Day of Week (Export ID: {export_id})",
+            "labels": [item["day_name"] for item in data],
+            "values": [int(item["message_count"]) for item in data],
+            "x_label": "Day of Week",
+            "y_label": "Number of Messages",
+            "color": "lightgreen",
+            "grid": "y",
+            "figsize": [10, 6],
+        }
+
+    if chart == "top_senders":
+        # Reverse the order so the top sender is drawn at the top
+        return {
+            "chart": chart,
+            "type": "barh",
+            "title": f"Top {len(data)} Message Senders (Export ID: {export_id})",
+            "labels": [str(item["sender_name"]) for item in reversed(data)],
+            "values": [int(item["message_count"]) for item in reversed(data)],
+            "x_label": "Number of Messages",
+            "y_label": "Sender",
+            "color": "coral",
+            "grid": "x",
+            "value_labels": True,
+            "figsize": [12, 8],
+        }
+
+    if chart == "conversation_statistics":
+        return {
+            "chart": chart,
+            "type": "barh",
+            "title": f"Top {len(data)} Conversations by Message Count (Export ID: {export_id})",
+            "labels": [str(item["display_name"]) for item in reversed(data)],
+            "values": [int(item["message_count"]) for item in reversed(data)],
+            "x_label": "Number of Messages",
+            "y_label": "Conversation",
+            "color": "lightblue",
+            "grid": "x",
+            "value_labels": True,
+            "figsize": [12, 8],
+        }
+
+    raise ValueError(f"Unknown chart: {chart}")
+
+
+def render_chart(spec: Dict[str, Any], output_path: str, dpi: int = 300) -> str:
+    """
+    Write a chart to a file.
+
+    The format follows the file extension: .json writes the spec itself,
+    .png and .svg are drawn with Matplotlib. This is a module-level function
+    so that it can run in a worker process.
+
+    Args:
+        spec: Chart spec from build_chart_spec().
+        output_path: Path of the file to write.
+        dpi: Resolution of PNG images.
+
+    Returns:
+        The path of the written file.
+    """
+    if output_path.endswith(".json"):
+        with open(output_path, "w") as f:
+            json.dump(spec, f)
+        return output_path
+
+    plt.figure(figsize=spec["figsize"])
+    labels, values = spec["labels"], spec["values"]
+
+    if spec["type"] == "pie":
+        plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
+        plt.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+    elif spec["type"] == "bar":
+        plt.bar(labels, values, color=spec["color"])
+    else:
+        plt.barh(labels, values, color=spec["color"])
+
+    if spec.get("x_label"):
+        plt.xlabel(spec["x_label"])
+    if spec.get("y_label"):
+        plt.ylabel(spec["y_label"])
+    plt.title(spec["title"])
+    if spec.get("x_ticks"):
+        plt.xticks(spec["x_ticks"])
+    if spec.get("grid"):
+        plt.grid(axis=spec["grid"], linestyle='--', alpha=0.7)
+    if spec.get("value_labels"):
+        for i, count in enumerate(values):
+            plt.text(count + 0.5, i, str(count), va='center')
+
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+    return output_path
+
+
 class SkypeDataVisualizer:
     """
     A class for generating visualizations of Skype data.
@@ -40,16 +197,33 @@ class SkypeDataVisualizer:
     that has been processed by the ETL pipeline and stored in a PostgreSQL database.
     """
 
-    def __init__(self, report_generator: Optional[SkypeReportGenerator] = None, output_dir: str = "output/visualizations"):
+    def __init__(
+        self,
+        report_generator: Optional[SkypeReportGenerator] = None,
+        output_dir: str = "output/visualizations",
+        output_format: str = "png",
+        dpi: int = 300,
+        max_workers: Optional[int] = None,
+    ):
         """
         Initialize the SkypeDataVisualizer.
 
         Args:
             report_generator: A SkypeReportGenerator object. If None, a new one will be created.
             output_dir: The directory where visualizations will be saved.
+            output_format: "png", "svg", or "json" for chart specs instead of images.
+            dpi: Resolution of PNG images.
+            max_workers: Number of processes rendering charts in
+                generate_all_visualizations (None = CPU count, 1 = no pool).
         """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}")
+
         self.report_generator = report_generator or SkypeReportGenerator()
         self.output_dir = output_dir
+        self.output_format = output_format
+        self.dpi = dpi
+        self.max_workers = max_workers
 
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
@@ -70,11 +244,40 @@ class SkypeDataVisualizer:
         Returns:
             True if visualization libraries are available, False otherwise.
         """
+        if self.output_format == "json":
+            return True
         if not MATPLOTLIB_AVAILABLE:
             logger.warning("Matplotlib is not installed. Visualizations cannot be generated.")
             return False
         return True
 
+    def _output_path(self, filename: str) -> str:
+        """Return the output path of a file, with the extension of the output format."""
+        root, _ = os.path.splitext(filename)
+        return os.path.join(self.output_dir, f"{root}.{self.output_format}")
+
+    def _visualize(self, chart: str, data: List[Dict[str, Any]], export_id: int, filename: str) -> Optional[str]:
+        """
+        Render one chart in this process.
+
+        Args:
+            chart: Chart name (one of CHARTS).
+            data: The report section the chart is drawn from.
+            export_id: The ID of the export to visualize.
+            filename: The filename for the visualization.
+
+        Returns:
+            The path to the saved visualization, or None if there is no data.
+        """
+        spec = build_chart_spec(chart, data, export_id)
+        if spec is None:
+            logger.warning(f"No {chart.replace('_', ' ')} data found for export ID {export_id}")
+            return None
+
+        output_path = render_chart(spec, self._output_path(filename), self.dpi)
+        logger.info(f"{chart.replace('_', ' ').capitalize()} visualization saved to {output_path}")
+        return output_path
+
     def visualize_message_type_distribution(self, export_id: int, filename: str = "message_type_distribution.png") -> Optional[str]:
         """
         Generate a pie chart of message type distribution.
@@ -89,35 +292,8 @@ class SkypeDataVisualizer:
         if not self._check_visualization_libraries():
             return None
 
-        # Get message type distribution data
         data = self.report_generator.get_message_type_distribution(export_id)
-
-        if not data:
-            logger.warning(f"No message type distribution data found for export ID {export_id}")
-            return None
-
-        # Create figure
-        plt.figure(figsize=(10, 8))
-
-        # Extract data for pie chart
-        labels = [item["message_type"] for item in data]
-        sizes = [item["count"] for item in data]
-
-        # Create pie chart
-        plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
-        plt.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-
-        # Add title
-        plt.title(f"Message Type Distribution (Export ID: {export_id})")
-
-        # Save figure
-        output_path = os.path.join(self.output_dir, filename)
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        logger.info(f"Message type distribution visualization saved to {output_path}")
-
-        return output_path
+        return self._visualize("message_type_distribution", data, export_id, filename)
 
     def visualize_activity_by_hour(self, export_id: int, filename: str = "activity_by_hour.png") -> Optional[str]:
         """
@@ -133,42 +309,8 @@ class SkypeDataVisualizer:
         if not self._check_visualization_libraries():
             return None
 
-        # Get activity by hour data
         data = self.report_generator.get_activity_by_hour(export_id)
-
-        if not data:
-            logger.warning(f"No activity by hour data found for export ID {export_id}")
-            return None
-
-        # Create figure
-        plt.figure(figsize=(12, 6))
-
-        # Extract data for bar chart
-        hours = [int(item["hour"]) for item in data]
-        counts = [item["message_count"] for item in data]
-
-        # Create bar chart
-        plt.bar(hours, counts, color='skyblue')
-
-        # Add labels and title
-        plt.xlabel('Hour of Day (24-hour format)')
-        plt.ylabel('Number of Messages')
-        plt.title(f"Message Activity by Hour of Day (Export ID: {export_id})")
-
-        # Set x-axis ticks
-        plt.xticks(range(0, 24))
-
-        # Add grid
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-        # Save figure
-        output_path = os.path.join(self.output_dir, filename)
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        logger.info(f"Activity by hour visualization saved to {output_path}")
-
-        return output_path
+        return self._visualize("activity_by_hour", data, export_id, filename)
 
     def visualize_activity_by_day_of_week(self, export_id: int, filename: str = "activity_by_day_of_week.png") -> Optional[str]:
         """
@@ -184,42 +326,8 @@ class SkypeDataVisualizer:
         if not self._check_visualization_libraries():
             return None
 
-        # Get activity by day of week data
         data = self.report_generator.get_activity_by_day_of_week(export_id)
-
-        if not data:
-            logger.warning(f"No activity by day of week data found for export ID {export_id}")
-            return None
-
-        # Create figure
-        plt.figure(figsize=(10, 6))
-
-        # Sort data by day of week
-        data.sort(key=lambda x: x["day_of_week"])
-
-        # Extract data for bar chart
-        days = [item["day_name"] for item in data]
-        counts = [item["message_count"] for item in data]
-
-        # Create bar chart
-        plt.bar(days, counts, color='lightgreen')
-
-        # Add labels and title
-        plt.xlabel('Day of Week')
-        plt.ylabel('Number of Messages')
-        plt.title(f"Message Activity by Day of Week (Export ID: {export_id})")
-
-        # Add grid
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-        # Save figure
-        output_path = os.path.join(self.output_dir, filename)
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        logger.info(f"Activity by day of week visualization saved to {output_path}")
-
-        return output_path
+        return self._visualize("activity_by_day_of_week", data, export_id, filename)
 
     def visualize_top_senders(self, export_id: int, limit: int = 10, filename: str = "top_senders.png") -> Optional[str]:
         """
@@ -236,47 +344,8 @@ class SkypeDataVisualizer:
         if not self._check_visualization_libraries():
             return None
 
-        # Get top senders data
         data = self.report_generator.get_top_senders(export_id, limit)
-
-        if not data:
-            logger.warning(f"No top senders data found for export ID {export_id}")
-            return None
-
-        # Create figure
-        plt.figure(figsize=(12, 8))
-
-        # Extract data for bar chart
-        senders = [item["sender_name"] for item in data]
-        counts = [item["message_count"] for item in data]
-
-        # Reverse the order for better visualization
-        senders.reverse()
-        counts.reverse()
-
-        # Create horizontal bar chart
-        plt.barh(senders, counts, color='coral')
-
-        # Add labels and title
-        plt.xlabel('Number of Messages')
-        plt.ylabel('Sender')
-        plt.title(f"Top {len(data)} Message Senders (Export ID: {export_id})")
-
-        # Add grid
-        plt.grid(axis='x', linestyle='--', alpha=0.7)
-
-        # Add count labels to the bars
-        for i, count in enumerate(counts):
-            plt.text(count + 0.5, i, str(count), va='center')
-
-        # Save figure
-        output_path = os.path.join(self.output_dir, filename)
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-
-        logger.info(f"Top senders visualization saved to {output_path}")
-
-        return output_path
+        return self._visualize("top_senders", data, export_id, filename)
 
     def visualize_conversation_statistics(self, export_id: int, limit: int = 10, filename: str = "conversation_statistics.png") -> Optional[str]:
         """
@@ -293,70 +362,65 @@ class SkypeDataVisualizer:
         if not self._check_visualization_libraries():
             return None
 
-        # Get conversation statistics data
         data = self.report_generator.get_conversation_statistics(export_id, limit)
+        return self._visualize("conversation_statistics", data, export_id, filename)
 
-        if not data:
-            logger.warning(f"No conversation statistics data found for export ID {export_id}")
-            return None
-
-        # Create figure
-        plt.figure(figsize=(12, 8))
-
-        # Extract data for bar chart
-        conversations = [item["display_name"] for item in data]
-        counts = [item["message_count"] for item in data]
-
-        # Reverse the order for better visualization
-        conversations.reverse()
-        counts.reverse()
-
-        # Create horizontal bar chart
-        plt.barh(conversations, counts, color='lightblue')
-
-        # Add labels and title
-        plt.xlabel('Number of Messages')
-        plt.ylabel('Conversation')
-        plt.title(f"Top {len(data)} Conversations by Message Count (Export ID: {export_id})")
-
-        # Add grid
-        plt.grid(axis='x', linestyle='--', alpha=0.7)
-
-        # Add count labels to the bars
-        for i, count in enumerate(counts):
-            plt.text(count + 0.5, i, str(count), va='center')
-
-        # Save figure
-        output_path = os.path.join(self.output_dir, filename)
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
+    def _render_all(self, jobs: List[Tuple[str, Dict[str, Any], str]]) -> Dict[str, str]:
+        """
+        Render charts, in a process pool when there is more than one image to draw.
 
-        logger.info(f"Conversation statistics visualization saved to {output_path}")
+        Args:
+            jobs: (chart, spec, output path) tuples.
 
-        return output_path
+        Returns:
+            A dictionary mapping chart names to file paths.
+        """
+        workers = min(self.max_workers or os.cpu_count() or 1, len(jobs))
+        if self.output_format != "json" and workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        chart: executor.submit(render_chart, spec, path, self.dpi)
+                        for chart, spec, path in jobs
+                    }
+                    return {chart: future.result() for chart, future in futures.items()}
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"Process pool unavailable, rendering charts sequentially: {e}")
+
+        return {chart: render_chart(spec, path, self.dpi) for chart, spec, path in jobs}
 
     def generate_all_visualizations(self, export_id: int) -> Dict[str, Optional[str]]:
         """
         Generate all visualizations for a Skype export.
 
+        The report data is fetched once and the charts are rendered in
+        parallel worker processes.
+
         Args:
             export_id: The ID of the export to visualize.
 
         Returns:
             A dictionary mapping visualization names to file paths.
         """
-        visualizations = {
-            "message_type_distribution": self.visualize_message_type_distribution(export_id),
-            "activity_by_hour": self.visualize_activity_by_hour(export_id),
-            "activity_by_day_of_week": self.visualize_activity_by_day_of_week(export_id),
-            "top_senders": self.visualize_top_senders(export_id),
-            "conversation_statistics": self.visualize_conversation_statistics(export_id)
-        }
+        visualizations: Dict[str, Optional[str]] = {chart: None for chart in CHARTS}
+        if self._check_visualization_libraries():
+            report = self.report_generator.generate_full_report(export_id)
+
+            jobs = []
+            for chart in CHARTS:
+                spec = build_chart_spec(chart, report.get(chart), export_id)
+                if spec is None:
+                    logger.warning(f"No {chart.replace('_', ' ')} data found for export ID {export_id}")
+                    continue
+                jobs.append((chart, spec, self._output_path(f"{chart}.{self.output_format}")))
+
+            visualizations.update(self._render_all(jobs))
 
         # Create a JSON file with visualization paths
         metadata = {
             "export_id": export_id,
             "generated_at": datetime.now().isoformat(),
+            "format": self.output_format,
             "visualizations": {k: v for k, v in visualizations.items() if v is not None}
         }
 
@@ -366,4 +430,4 @@ class SkypeDataVisualizer:
 
         logger.info(f"Generated {sum(1 for v in visualizations.values() if v is not None)} visualizations for export ID {export_id}")
 
-        return visualizations
\ No newline at end of file
+        return visualizations
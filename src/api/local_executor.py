@@ -0,0 +1,477 @@
+"""
+Local Task Executor for Skype Parser API
+
+This module runs background tasks without a message broker. Jobs are kept
+in a SQLite queue, so they survive restarts of the API, and are run by up
+to max_workers worker processes, highest priority first. Queued and running
+jobs can be cancelled; a running job's worker process is terminated.
+
+Several API processes can share one queue file: claiming a job and the
+concurrency limit are enforced inside SQLite transactions. The file is only
+readable by the user running the API.
+"""
+
+import getpass
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+
+from src.utils.file_utils import make_private_dir
+
+logger = logging.getLogger(__name__)
+
+# Default location of the job queue, in a directory private to the current user
+DEFAULT_QUEUE_PATH = os.path.join(
+    tempfile.gettempdir(), f"skype_parser_{getpass.getuser()}", "tasks.db"
+)
+
+# Default number of jobs running at the same time
+DEFAULT_MAX_WORKERS = 2
+
+# Seconds between checks for finished and cancelled jobs
+DEFAULT_POLL_INTERVAL = 0.5
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+CREATE_JOBS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        task_name TEXT NOT NULL,
+        kwargs TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL,
+        owner_pid INTEGER,
+        owner_started_at REAL,
+        progress TEXT,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL
+    )
+"""
+
+CREATE_JOBS_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, priority DESC, created_at)
+"""
+
+# Columns added to queues created by earlier versions
+ADDED_JOB_COLUMNS = {"owner_started_at": "REAL"}
+
+JOB_COLUMNS = (
+    "id", "task_name", "priority", "status", "progress", "result", "error",
+    "created_at", "started_at", "finished_at",
+)
+
+
+def _connect(queue_path: str) -> sqlite3.Connection:
+    """Open the job queue."""
+    conn = sqlite3.connect(queue_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _make_private_file(path: str) -> None:
+    """
+    Create a file only the current user can access, or check an existing one.
+
+    Raises:
+        PermissionError: If the file is owned by another user
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    try:
+        info = os.fstat(fd)
+    finally:
+        os.close(fd)
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"Refusing to use {path}: it is owned by another user")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o600)
+
+
+def _process_started_at(pid: int) -> Optional[float]:
+    """Return when a process started, or None if it does not exist."""
+    try:
+        return psutil.Process(pid).create_time()
+    except psutil.NoSuchProcess:
+        return None
+
+
+def _owner_alive(pid: Optional[int], started_at: Optional[float]) -> bool:
+    """
+    Check whether the process that claimed a job is still running.
+
+    A process is identified by its PID and start time, since PIDs are
+    reused, e.g. by the same program after a container restart.
+    """
+    if not pid or started_at is None:
+        return False
+    try:
+        current = _process_started_at(pid)
+    except psutil.Error:
+        # The process exists but cannot be inspected
+        return True
+    return current is not None and abs(current - started_at) < 0.1
+
+
+def _run_job(queue_path: str, job_id: str, func: Callable[..., Any], kwargs: Dict[str, Any]) -> None:
+    """
+    Run a job in a worker process and store its outcome.
+
+    The function is called with task_id=job_id and the job's keyword
+    arguments. A result dictionary with success=False marks the job failed.
+    """
+    try:
+        result = func(task_id=job_id, **kwargs)
+        failed = isinstance(result, dict) and result.get("success") is False
+        status, error = ("failed", result.get("error")) if failed else ("succeeded", None)
+    except BaseException as e:
+        logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+        result, status, error = None, "failed", str(e)
+
+    conn = _connect(queue_path)
+    try:
+        # A cancelled job keeps its status
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+            "WHERE id = ? AND status = 'running'",
+            (status, json.dumps(result, default=str), error, time.time(), job_id),
+        )
+    finally:
+        conn.close()
+
+
+def report_progress(queue_path: str, job_id: str, progress: Dict[str, Any]) -> None:
+    """
+    Store the progress of a running job.
+
+    Args:
+        queue_path: Path of the job queue
+        job_id: The job ID
+        progress: Progress data (e.g. ProgressTracker.get_status())
+    """
+    conn = _connect(queue_path)
+    try:
+        conn.execute(
+            "UPDATE jobs SET progress = ? WHERE id = ?",
+            (json.dumps(progress, default=str), job_id),
+        )
+    finally:
+        conn.close()
+
+
+class LocalTaskExecutor:
+    """
+    Persistent priority job queue run by local worker processes.
+
+    Tasks are registered by name; the functions must be defined at module
+    level so that worker processes can import them.
+    """
+
+    def __init__(
+        self,
+        tasks: Dict[str, Callable[..., Any]],
+        queue_path: str = DEFAULT_QUEUE_PATH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        start_method: Optional[str] = "spawn",
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            tasks: Task functions by name
+            queue_path: Path of the SQLite job queue. The default directory
+                is created with mode 0700; the file always gets mode 0600
+            max_workers: Maximum number of jobs running at the same time
+            poll_interval: Seconds between checks for finished and cancelled jobs
+            start_method: multiprocessing start method for worker processes
+        """
+        self.tasks = tasks
+        self.queue_path = queue_path
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self._mp_context = multiprocessing.get_context(start_method)
+        self._workers: Dict[str, Any] = {}
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        queue_dir = os.path.dirname(queue_path)
+        if queue_path == DEFAULT_QUEUE_PATH:
+            make_private_dir(queue_dir)
+        elif queue_dir:
+            os.makedirs(queue_dir, mode=0o700, exist_ok=True)
+        # Jobs hold file paths and task arguments; SQLite creates the WAL
+        # and shared memory files with the permissions of the database
+        _make_private_file(queue_path)
+        conn = _connect(queue_path)
+        try:
+            conn.execute(CREATE_JOBS_TABLE_SQL)
+            conn.execute(CREATE_JOBS_INDEX_SQL)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in ADDED_JOB_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        finally:
+            conn.close()
+
+        self._requeue_orphans()
+
+    def _requeue_orphans(self) -> None:
+        """Put jobs back in the queue whose dispatching process is gone."""
+        conn = _connect(self.queue_path)
+        try:
+            rows = conn.execute(
+                "SELECT id, owner_pid, owner_started_at FROM jobs WHERE status = 'running'"
+            ).fetchall()
+            for job_id, owner_pid, owner_started_at in rows:
+                if not _owner_alive(owner_pid, owner_started_at):
+                    conn.execute(
+                        "UPDATE jobs SET status = 'queued', owner_pid = NULL, owner_started_at = NULL, "
+                        "started_at = NULL WHERE id = ? AND status = 'running'",
+                        (job_id,),
+                    )
+                    logger.warning(f"Requeued job {job_id} of stopped process {owner_pid}")
+        finally:
+            conn.close()
+
+    def start(self) -> None:
+        """Start dispatching jobs in a background thread."""
+        with self._lock:
+            if self._dispatcher is not None and self._dispatcher.is_alive():
+                return
+            self._stopped.clear()
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name="local-task-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+
+    def shutdown(self, cancel_running: bool = False) -> None:
+        """
+        Stop dispatching jobs.
+
+        Args:
+            cancel_running: Terminate running jobs (they are requeued on the next start)
+        """
+        self._stopped.set()
+        self._wake.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        if cancel_running:
+            for job_id, process in list(self._workers.items()):
+                process.terminate()
+                process.join()
+                self._set_status(job_id, "queued", from_status="running")
+            self._workers.clear()
+
+    def submit(self, task_name: str, kwargs: Dict[str, Any], priority: int = 0, job_id: Optional[str] = None) -> str:
+        """
+        Add a job to the queue.
+
+        Args:
+            task_name: Name of a registered task
+            kwargs: JSON-serializable keyword arguments for the task
+            priority: Jobs with higher priority run first
+            job_id: Job ID (generated if not given)
+
+        Returns:
+            str: The job ID
+        """
+        if task_name not in self.tasks:
+            raise ValueError(f"Unknown task: {task_name}")
+
+        job_id = job_id or str(uuid.uuid4())
+        conn = _connect(self.queue_path)
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, task_name, kwargs, priority, status, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, task_name, json.dumps(kwargs), priority, time.time()),
+            )
+        finally:
+            conn.close()
+
+        logger.info(f"Queued job {job_id} ({task_name}, priority {priority})")
+        self.start()
+        self._wake.set()
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Args:
+            job_id: The job ID
+
+        Returns:
+            bool: True if the job was cancelled, False if it had already finished
+        """
+        conn = _connect(self.queue_path)
+        try:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id),
+            )
+            cancelled = cursor.rowcount > 0
+        finally:
+            conn.close()
+
+        if cancelled:
+            logger.info(f"Cancelled job {job_id}")
+            # The dispatcher running the job terminates its worker
+            self._wake.set()
+        return cancelled
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job.
+
+        Args:
+            job_id: The job ID
+
+        Returns:
+            The job with its status, progress and result, or None if unknown
+        """
+        conn = _connect(self.queue_path)
+        try:
+            row = conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+
+        job = dict(zip(JOB_COLUMNS, row))
+        for key in ("progress", "result"):
+            if job[key] is not None:
+                job[key] = json.loads(job[key])
+        return job
+
+    def list_jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List jobs in queue order.
+
+        Args:
+            status: Only list jobs with this status
+
+        Returns:
+            List of jobs (without results)
+        """
+        query = "SELECT id, task_name, priority, status, created_at FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY priority DESC, created_at, rowid"
+
+        conn = _connect(self.queue_path)
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(("id", "task_name", "priority", "status", "created_at"), row)) for row in rows]
+
+    def _set_status(self, job_id: str, status: str, from_status: str, error: Optional[str] = None) -> None:
+        conn = _connect(self.queue_path)
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = COALESCE(?, error), finished_at = ? "
+                "WHERE id = ? AND status = ?",
+                (status, error, time.time() if status != "queued" else None, job_id, from_status),
+            )
+        finally:
+            conn.close()
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        """Mark the next queued job as running, unless the concurrency limit is reached."""
+        conn = _connect(self.queue_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                running = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()[0]
+                row = None
+                if running < self.max_workers:
+                    row = conn.execute(
+                        "SELECT id, task_name, kwargs FROM jobs WHERE status = 'queued' "
+                        "ORDER BY priority DESC, created_at, rowid LIMIT 1"
+                    ).fetchone()
+                if row is not None:
+                    pid = os.getpid()
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', owner_pid = ?, owner_started_at = ?, "
+                        "started_at = ? WHERE id = ?",
+                        (pid, _process_started_at(pid), time.time(), row[0]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return {"id": row[0], "task_name": row[1], "kwargs": json.loads(row[2])}
+
+    def _reap(self) -> None:
+        """Handle finished workers and terminate workers of cancelled jobs."""
+        if not self._workers:
+            return
+
+        conn = _connect(self.queue_path)
+        try:
+            placeholders = ", ".join("?" * len(self._workers))
+            statuses = dict(conn.execute(
+                f"SELECT id, status FROM jobs WHERE id IN ({placeholders})", tuple(self._workers)
+            ).fetchall())
+        finally:
+            conn.close()
+
+        for job_id, process in list(self._workers.items()):
+            if statuses.get(job_id) == "cancelled" and process.is_alive():
+                logger.info(f"Terminating worker of cancelled job {job_id}")
+                process.terminate()
+            if process.is_alive():
+                continue
+            process.join()
+            del self._workers[job_id]
+            if process.exitcode != 0:
+                # The worker died before storing an outcome
+                self._set_status(job_id, "failed", "running", f"Worker exited with code {process.exitcode}")
+
+    def _dispatch_loop(self) -> None:
+        """Start queued jobs as worker slots become free."""
+        while not self._stopped.is_set():
+            try:
+                self._reap()
+                while len(self._workers) < self.max_workers:
+                    job = self._claim_next()
+                    if job is None:
+                        break
+                    process = self._mp_context.Process(
+                        target=_run_job,
+                        args=(self.queue_path, job["id"], self.tasks[job["task_name"]], job["kwargs"]),
+                        name=f"task-{job['id']}",
+                    )
+                    process.start()
+                    self._workers[job["id"]] = process
+                    logger.info(f"Started job {job['id']} in process {process.pid}")
+            except Exception as e:
+                logger.error(f"Error dispatching jobs: {e}", exc_info=True)
+
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
@@ -16,7 +16,7 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 from src.api.skype_api import SkypeParserAPI
-from src.api.tasks import celery_app
+from src.api.tasks import TASK_BACKENDS, celery_app
 from src.api.user_management import get_user_manager
 
 # Configure logging
@@ -113,7 +113,16 @@ def parse_args():
         '--async-threshold',
         type=int,
         default=50 * 1024 * 1024,  # 50 MB
-        help='File size threshold for asynchronous processing in bytes (default: 50MB)'
+        help='Size in bytes up to which uploads are processed first (default: 50MB)'
+    )
+
+    parser.add_argument(
+        '--task-backend',
+        type=str,
+        choices=TASK_BACKENDS,
+        default=os.environ.get('TASK_BACKEND', 'auto'),
+        help='Backend for background tasks: celery, local, or auto to use Celery '
+             'if its broker is reachable (default: auto)'
     )
 
     parser.add_argument(
@@ -133,14 +142,14 @@ def parse_args():
         '--worker-concurrency',
         type=int,
         default=2,
-        help='Number of worker processes (default: 2)'
+        help='Number of worker processes, for Celery or the local backend (default: 2)'
     )
 
     parser.add_argument(
         '--user-file',
         type=str,
         default='users.json',
-        help='Path to the user data file (default: users.json)'
+        help='Path to the user data file; .db, .sqlite and .sqlite3 files use SQLite (default: users.json)'
     )
 
     parser.add_argument(
@@ -190,6 +199,11 @@ def parse_args():
 
 def run_worker(args):
     """Run a Celery worker."""
+    if celery_app is None:
+        logger.error('Celery is not installed')
+        print('Error: Celery is not installed; use --task-backend local instead of a worker')
+        return False
+
     # Configure Celery
     celery_app.conf.update(
         broker_url=args.redis_url,
@@ -305,6 +319,8 @@ def main():
     # Set environment variables for Celery
     os.environ['CELERY_BROKER_URL'] = args.redis_url
     os.environ['CELERY_RESULT_BACKEND'] = args.redis_url
+    os.environ['TASK_BACKEND'] = args.task_backend
+    os.environ.setdefault('LOCAL_TASK_WORKERS', str(args.worker_concurrency))
 
     # Handle user management commands
     if args.create_user:
@@ -319,7 +335,8 @@ def main():
 
     # Run worker if requested
     if args.worker:
-        run_worker(args)
+        if run_worker(args) is False:
+            sys.exit(1)
         return
 
     # Set up database configuration
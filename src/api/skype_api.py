@@ -7,6 +7,7 @@ It includes endpoints for file upload, authentication, and processing status.
 
 import logging
 import os
+import re
 import tempfile
 import uuid
 from datetime import datetime, timedelta
@@ -16,17 +17,22 @@ from typing import Any, Dict, Optional, Tuple, Union
 
 from flask import Flask, Response, g, jsonify, request, session
 from flask_cors import CORS
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, join_room
+from markupsafe import escape
 from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 
-from src.api.tasks import submit_task
+from src.analysis.cache import AnalysisCache, CacheEntry, get_analysis_cache
+from src.analysis.reporting import SkypeReportGenerator
+from src.analysis.search import DEFAULT_PAGE_SIZE, MessageSearch
+from src.api.tasks import cancel_task, get_task_status, submit_task
+from src.api.uploads import UploadManager, UploadOffsetError
 from src.api.user_management import get_user_manager
-from src.db.etl.context import ETLContext
-
-# Import the new ETL pipeline
-from src.db.etl.pipeline_manager import ETLPipeline
-from src.db.progress_tracker import get_tracker
+from src.db.aggregates import delete_export
+from src.db.connection import DatabaseConnection
+from src.db.progress_tracker import FINAL_STATUSES, get_broadcaster, get_tracker
+from src.utils.di import ServiceProvider
+from src.utils.interfaces import DatabaseConnectionProtocol
 from src.utils.validation import ValidationError
 
 # Configure logging
@@ -40,8 +46,10 @@ ALLOWED_EXTENSIONS = {"tar", "json"}
 MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500 MB
 ASYNC_THRESHOLD = (
     50 * 1024 * 1024
-)  # 50 MB - Files larger than this will be processed asynchronously
+)  # 50 MB - Files up to this size are queued ahead of larger ones
+SMALL_UPLOAD_PRIORITY = 1  # Task priority of uploads up to ASYNC_THRESHOLD
 API_VERSION = "1.0.0"  # Current API version
+MAX_SEARCH_PAGE_SIZE = 100  # Largest page returned by the search endpoint
 
 
 class SkypeParserAPI:
@@ -72,7 +80,7 @@ class SkypeParserAPI:
             db_config: Database configuration for the ETL pipeline
             api_key: API key for authentication
             enable_cors: Whether to enable CORS for the API
-            async_threshold: File size threshold for asynchronous processing (in bytes)
+            async_threshold: Size up to which uploads are processed first (in bytes)
             user_file: Path to the user data file
             secret_key: Secret key for session encryption
         """
@@ -85,6 +93,10 @@ class SkypeParserAPI:
         # Set up SocketIO
         self.socketio = SocketIO(self.app, cors_allowed_origins="*")
 
+        # Last status sent to the Socket.IO room of every subscribed task
+        self._subscriptions: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._relay_started = False
+
         # Set up file size limit
         self.app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
 
@@ -104,12 +116,38 @@ class SkypeParserAPI:
 
         # Store configuration
         self.db_config = db_config
+        # Task arguments are queued without the database password, which
+        # local worker processes inherit through the environment instead
+        if db_config and db_config.get("password"):
+            os.environ.setdefault("DB_PASSWORD", db_config["password"])
         self.api_key = api_key or os.environ.get("API_KEY")
         self.async_threshold = async_threshold
 
         # Initialize user manager
         self.user_manager = get_user_manager(user_file)
 
+        # Analysis results are cached until their export is reloaded or
+        # deleted. Exports are loaded in worker processes, whose
+        # invalidations only reach this process through the disk tier.
+        self.analysis_cache = get_analysis_cache()
+        if not self.analysis_cache.cache_dir:
+            logger.warning(
+                "ANALYSIS_CACHE_DIR is not set; analysis results are not cached, "
+                "since exports are loaded in worker processes"
+            )
+            self.analysis_cache = AnalysisCache(max_entries=0)
+
+        # Resumable chunked uploads, submitted for processing when complete
+        self.upload_manager = UploadManager(
+            os.path.join(self.upload_folder, "chunked"), on_complete=self._submit_upload
+        )
+
+        # Services that live for one request, such as the database
+        # connection, are resolved from a scope opened for each request
+        self.service_provider = ServiceProvider()
+        self.service_provider.register_scoped(DatabaseConnectionProtocol, self._connect_database)
+        self._setup_request_scope()
+
         # Set up routes
         self._setup_routes()
 
@@ -119,6 +157,36 @@ class SkypeParserAPI:
         # Set up SocketIO events
         self._setup_socketio_events()
 
+    def _setup_request_scope(self) -> None:
+        """Open a service scope for each request and close it when the request ends."""
+
+        @self.app.before_request
+        def open_request_scope():
+            g.service_scope = self.service_provider.create_scope()
+
+        @self.app.teardown_request
+        def close_request_scope(exc):
+            scope = g.pop("service_scope", None)
+            if scope is not None:
+                scope.close()
+
+    def _connect_database(self) -> DatabaseConnection:
+        """Open a database connection for the current request's scope."""
+        db_connection = DatabaseConnection(self.db_config)
+        db_connection.connect()
+        return db_connection
+
+    def _get_db_connection(self) -> DatabaseConnectionProtocol:
+        """
+        Get the database connection of the current request.
+
+        The connection is opened on first use and closed when the request ends.
+
+        Returns:
+            The request's database connection
+        """
+        return g.service_scope.get(DatabaseConnectionProtocol)
+
     def _setup_routes(self) -> None:
         """Set up the API routes."""
 
@@ -424,41 +492,24 @@ class SkypeParserAPI:
                 )
                 file.save(file_path)
 
-                # Check if file should be processed asynchronously
-                if os.path.getsize(file_path) > self.async_threshold:
-                    # Submit task for asynchronous processing
-                    task_id = submit_task(
-                        file_path=file_path,
-                        user_display_name=user_display_name,
-                        db_config=self.db_config,
-                        output_dir=self.output_folder,
-                    )
-
-                    # Return task ID
-                    return jsonify({"task_id": task_id})
-                else:
-                    # Process file synchronously
-                    pipeline = ETLPipeline(
-                        context=ETLContext(
-                            db_config=self.db_config, output_dir=self.output_folder
-                        )
-                    )
-
-                    # Run the pipeline
-                    results = pipeline.run_pipeline(
-                        file_path=file_path, user_display_name=user_display_name
-                    )
+                # Small uploads are queued ahead of large ones
+                priority = (
+                    SMALL_UPLOAD_PRIORITY
+                    if os.path.getsize(file_path) <= self.async_threshold
+                    else 0
+                )
 
-                    # Clean up the file
-                    try:
-                        os.remove(file_path)
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to clean up temporary file {file_path}: {e}"
-                        )
+                # Submit task for asynchronous processing
+                task_id = submit_task(
+                    file_path=file_path,
+                    user_display_name=user_display_name,
+                    db_config=self.db_config,
+                    output_dir=self.output_folder,
+                    priority=priority,
+                )
 
-                    # Return results
-                    return jsonify(results)
+                # Return task ID
+                return jsonify({"task_id": task_id})
 
             except RequestEntityTooLarge:
                 return jsonify({"error": "File too large"}), 413
@@ -477,6 +528,85 @@ class SkypeParserAPI:
             """
             return upload()
 
+        # Chunked upload endpoints
+        @self.app.route("/api/uploads", methods=["POST"])
+        @require_api_key
+        def create_upload():
+            """
+            API endpoint for starting a resumable chunked upload.
+
+            Expects a JSON body with filename, size and optionally sha256
+            and user_display_name.
+            """
+            data = request.get_json(silent=True) or {}
+            try:
+                upload = self.upload_manager.create(
+                    filename=data.get("filename", ""),
+                    total_size=data.get("size"),
+                    owner=g.user["username"],
+                    user_display_name=data.get("user_display_name", g.user.get("display_name", "")),
+                    sha256=data.get("sha256"),
+                )
+            except ValidationError as e:
+                return jsonify({"error": str(e)}), 400
+
+            response = self._upload_response(upload)
+            response["chunk_size"] = self.upload_manager.chunk_size
+            return jsonify(response), 201
+
+        # Versioned chunked upload endpoint
+        @self.app.route("/api/v1/uploads", methods=["POST"])
+        @require_api_key
+        def create_upload_v1():
+            """
+            API endpoint for starting a resumable chunked upload (v1).
+            """
+            return create_upload()
+
+        @self.app.route("/api/uploads/<upload_id>", methods=["GET", "PUT", "DELETE"])
+        @require_api_key
+        def upload_chunk(upload_id):
+            """
+            API endpoint for sending a chunk, checking progress, or aborting an upload.
+
+            PUT requests carry the raw chunk bytes and a
+            "Content-Range: bytes <first>-<last>/<size>" header. The response
+            of the last chunk contains the ID of the processing task.
+            """
+            owner = g.user["username"]
+            try:
+                if request.method == "GET":
+                    return jsonify(self._upload_response(self.upload_manager.get(upload_id, owner)))
+
+                if request.method == "DELETE":
+                    self.upload_manager.delete(upload_id, owner)
+                    return "", 204
+
+                offset, length = self._parse_content_range(request.headers.get("Content-Range"))
+                upload = self.upload_manager.write_chunk(
+                    upload_id, offset, request.stream, length, owner
+                )
+                status = 202 if upload["status"] == "complete" else 200
+                return jsonify(self._upload_response(upload)), status
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            except UploadOffsetError as e:
+                return jsonify({"error": str(e), "offset": e.offset}), 409
+            except ValidationError as e:
+                return jsonify({"error": str(e)}), 400
+            except Exception as e:
+                logger.error(f"Error receiving upload chunk: {e}", exc_info=True)
+                return jsonify({"error": str(e)}), 500
+
+        # Versioned chunk endpoint
+        @self.app.route("/api/v1/uploads/<upload_id>", methods=["GET", "PUT", "DELETE"])
+        @require_api_key
+        def upload_chunk_v1(upload_id):
+            """
+            API endpoint for sending a chunk, checking progress, or aborting an upload (v1).
+            """
+            return upload_chunk(upload_id)
+
         # Task status endpoint
         @self.app.route("/api/status/<task_id>", methods=["GET"])
         @require_api_key
@@ -485,15 +615,12 @@ class SkypeParserAPI:
             API endpoint for checking the status of a task.
             """
             try:
-                # Get tracker for task
-                tracker = get_tracker(task_id)
-
-                # Check if tracker exists
-                if not tracker:
+                status = self._get_task_status(task_id)
+                if status is None:
                     return jsonify({"error": f"Task {task_id} not found"}), 404
 
                 # Return status
-                return jsonify(tracker.get_status())
+                return jsonify(status)
             except Exception as e:
                 logger.error(f"Error getting task status: {e}", exc_info=True)
                 return jsonify({"error": str(e)}), 500
@@ -507,6 +634,33 @@ class SkypeParserAPI:
             """
             return task_status(task_id)
 
+        # Task cancellation endpoint
+        @self.app.route("/api/cancel/<task_id>", methods=["POST"])
+        @require_api_key
+        def cancel(task_id):
+            """
+            API endpoint for cancelling a queued or running task.
+            """
+            try:
+                if not cancel_task(task_id):
+                    return (
+                        jsonify({"error": f"Task {task_id} not found or already finished"}),
+                        404,
+                    )
+                return jsonify({"task_id": task_id, "status": "cancelled"})
+            except Exception as e:
+                logger.error(f"Error cancelling task: {e}", exc_info=True)
+                return jsonify({"error": str(e)}), 500
+
+        # Versioned task cancellation endpoint
+        @self.app.route("/api/v1/cancel/<task_id>", methods=["POST"])
+        @require_api_key
+        def cancel_v1(task_id):
+            """
+            API endpoint for cancelling a queued or running task (v1).
+            """
+            return cancel(task_id)
+
         # List exports endpoint
         @self.app.route("/api/exports", methods=["GET"])
         @require_api_key
@@ -544,6 +698,32 @@ class SkypeParserAPI:
             """
             return list_exports()
 
+        # Delete export endpoint
+        @self.app.route("/api/exports/<int:export_id>", methods=["DELETE"])
+        @require_api_key
+        def delete_export_endpoint(export_id):
+            """
+            API endpoint for deleting an export and its cached analysis results.
+            """
+            if not self.db_config:
+                return jsonify({"error": "Deleting exports requires a database"}), 503
+
+            try:
+                delete_export(self._get_db_connection(), export_id)
+                return jsonify({"export_id": export_id, "status": "deleted"})
+            except Exception as e:
+                logger.error(f"Error deleting export: {e}", exc_info=True)
+                return jsonify({"error": str(e)}), 500
+
+        # Versioned delete export endpoint
+        @self.app.route("/api/v1/exports/<int:export_id>", methods=["DELETE"])
+        @require_api_key
+        def delete_export_endpoint_v1(export_id):
+            """
+            API endpoint for deleting an export and its cached analysis results (v1).
+            """
+            return delete_export_endpoint(export_id)
+
         # Analysis endpoint
         @self.app.route("/api/analysis/<int:export_id>", methods=["GET"])
         @require_api_key
@@ -552,23 +732,13 @@ class SkypeParserAPI:
             API endpoint for getting analysis data for an export.
             """
             try:
-                # TODO: Implement getting analysis data from database
-                # This is a placeholder implementation
-                return jsonify(
-                    {
-                        "message_count": 1234,
-                        "conversation_count": 42,
-                        "date_range": {
-                            "start": "2022-01-01T00:00:00.000000",
-                            "end": datetime.now().isoformat(),
-                        },
-                        "top_contacts": [
-                            {"name": "Jane Doe", "message_count": 567},
-                            {"name": "John Smith", "message_count": 456},
-                            {"name": "Bob Johnson", "message_count": 345},
-                        ],
-                    }
+                entry = self.analysis_cache.get_or_compute(
+                    "SkypeParserAPI.analysis", export_id, (),
+                    lambda: self._compute_analysis(export_id),
                 )
+                return self._conditional_response(jsonify(entry.value), entry)
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
             except Exception as e:
                 logger.error(f"Error getting analysis data: {e}", exc_info=True)
                 return jsonify({"error": str(e)}), 500
@@ -590,23 +760,15 @@ class SkypeParserAPI:
             API endpoint for getting an HTML report for an export.
             """
             try:
-                # TODO: Implement generating HTML report
-                # This is a placeholder implementation
-                html = f"""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <title>Skype Export Report</title>
-                </head>
-                <body>
-                    <h1>Skype Export Report</h1>
-                    <p>Export ID: {export_id}</p>
-                    <p>Generated at: {datetime.now().isoformat()}</p>
-                    <p>This is a placeholder report.</p>
-                </body>
-                </html>
-                """
-                return Response(html, mimetype="text/html")
+                entry = self.analysis_cache.get_or_compute(
+                    "SkypeParserAPI.report", export_id, (),
+                    lambda: self._compute_report_html(export_id),
+                )
+                return self._conditional_response(
+                    Response(entry.value, mimetype="text/html"), entry
+                )
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
             except Exception as e:
                 logger.error(f"Error generating report: {e}", exc_info=True)
                 return jsonify({"error": str(e)}), 500
@@ -620,6 +782,42 @@ class SkypeParserAPI:
             """
             return report(export_id)
 
+        # Search endpoint
+        @self.app.route("/api/search/<int:export_id>", methods=["GET"])
+        @require_api_key
+        def search(export_id):
+            """
+            API endpoint for full-text search over the messages of an export.
+            """
+            query = request.args.get("q", "").strip()
+            if not query:
+                return jsonify({"error": "Missing search query"}), 400
+
+            try:
+                limit = min(max(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_SEARCH_PAGE_SIZE)
+                offset = max(int(request.args.get("offset", 0)), 0)
+            except ValueError:
+                return jsonify({"error": "limit and offset must be integers"}), 400
+
+            if not self.db_config:
+                return jsonify({"error": "Search requires a database"}), 503
+
+            try:
+                page = MessageSearch(self._get_db_connection()).search(export_id, query, limit, offset)
+                return jsonify(page)
+            except Exception as e:
+                logger.error(f"Error searching messages: {e}", exc_info=True)
+                return jsonify({"error": str(e)}), 500
+
+        # Versioned search endpoint
+        @self.app.route("/api/v1/search/<int:export_id>", methods=["GET"])
+        @require_api_key
+        def search_v1(export_id):
+            """
+            API endpoint for full-text search over the messages of an export (v1).
+            """
+            return search(export_id)
+
     def _setup_error_handlers(self) -> None:
         """Set up error handlers."""
 
@@ -679,16 +877,242 @@ class SkypeParserAPI:
             if not task_id:
                 return {"error": "No task_id provided"}
 
+            status = self._get_task_status(task_id)
+            if status is None:
+                return {"error": f"Task {task_id} not found"}
+
             logger.info(f"Client {request.sid} subscribed to task {task_id}")
 
-            # Get tracker for task
-            tracker = get_tracker(task_id)
-            if not tracker:
-                return {"error": f"Task {task_id} not found"}
+            # Further progress is sent to the task's room as "progress" events
+            join_room(task_id)
+            if status["status"] not in FINAL_STATUSES:
+                self._subscriptions.setdefault(task_id, status)
+                if not self._relay_started:
+                    self._relay_started = True
+                    self.socketio.start_background_task(self._relay_progress)
 
             # Return current status
+            return status
+
+    def _get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a task, from its progress tracker or task backend.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            Status of the task, or None if the task is unknown
+        """
+        tracker = get_tracker(task_id)
+        if tracker:
             return tracker.get_status()
 
+        # Tasks run by the local executor are tracked in its queue
+        return get_task_status(task_id)
+
+    def _relay_progress(self) -> None:
+        """
+        Send the progress of subscribed tasks to their Socket.IO rooms.
+
+        Tasks run in other processes, so their status is polled at the
+        progress emit rate and sent when it changes, until the task is done.
+        """
+        interval = get_broadcaster().interval
+        while True:
+            self.socketio.sleep(interval)
+            for task_id, last_status in list(self._subscriptions.items()):
+                try:
+                    status = self._get_task_status(task_id)
+                except Exception as e:
+                    logger.error(f"Error getting status of task {task_id}: {e}")
+                    continue
+
+                if status is None or status["status"] in FINAL_STATUSES:
+                    self._subscriptions.pop(task_id, None)
+                if status is not None and status != last_status:
+                    self.socketio.emit("progress", dict(status, task_id=task_id), to=task_id)
+                    if task_id in self._subscriptions:
+                        self._subscriptions[task_id] = status
+
+    def _conditional_response(self, response: Response, entry: CacheEntry) -> Response:
+        """
+        Add cache validators to a response and honour conditional requests.
+
+        Clients that send a matching If-None-Match or an If-Modified-Since at
+        or after the time the result was computed get an empty 304 response.
+
+        Args:
+            response: The full response
+            entry: The cache entry the response was built from
+
+        Returns:
+            Response: The response, or a 304 Not Modified response
+        """
+        response.set_etag(entry.etag)
+        response.last_modified = entry.last_modified
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response.make_conditional(request)
+
+    def _get_full_report(self, export_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Generate the full report of an export from the database.
+
+        Args:
+            export_id: The export to report on
+
+        Returns:
+            The report, or None if no database is configured
+
+        Raises:
+            LookupError: If the export does not exist
+        """
+        if not self.db_config:
+            return None
+
+        report = SkypeReportGenerator(self._get_db_connection()).generate_full_report(export_id)
+
+        if "error" in report["summary"]:
+            raise LookupError(report["summary"]["error"])
+        return report
+
+    def _compute_analysis(self, export_id: int) -> Dict[str, Any]:
+        """
+        Compute the analysis data of an export.
+
+        Args:
+            export_id: The export to analyze
+
+        Returns:
+            Dict[str, Any]: Message and conversation counts, date range and top contacts
+        """
+        report = self._get_full_report(export_id)
+        if report is None:
+            # No database configured: return placeholder data
+            return {
+                "message_count": 1234,
+                "conversation_count": 42,
+                "date_range": {
+                    "start": "2022-01-01T00:00:00.000000",
+                    "end": datetime.now().isoformat(),
+                },
+                "top_contacts": [
+                    {"name": "Jane Doe", "message_count": 567},
+                    {"name": "John Smith", "message_count": 456},
+                    {"name": "Bob Johnson", "message_count": 345},
+                ],
+            }
+
+        summary = report["summary"]
+        return {
+            "message_count": summary["message_count"],
+            "conversation_count": summary["conversation_count"],
+            "date_range": {
+                "start": summary["first_message"].isoformat() if summary["first_message"] else None,
+                "end": summary["last_message"].isoformat() if summary["last_message"] else None,
+            },
+            "top_contacts": [
+                {"name": sender["sender_name"], "message_count": sender["message_count"]}
+                for sender in report["top_senders"]
+            ],
+        }
+
+    def _compute_report_html(self, export_id: int) -> str:
+        """
+        Render the HTML report of an export.
+
+        Args:
+            export_id: The export to report on
+
+        Returns:
+            str: The HTML document
+        """
+        report = self._get_full_report(export_id)
+        if report is None:
+            body = "<p>This is a placeholder report.</p>"
+        else:
+            summary = report["summary"]
+            rows = "".join(
+                f"<tr><th>{escape(str(label))}</th><td>{escape(str(summary[key]))}</td></tr>"
+                for label, key in (
+                    ("Conversations", "conversation_count"),
+                    ("Messages", "message_count"),
+                    ("First message", "first_message"),
+                    ("Last message", "last_message"),
+                )
+            )
+            senders = "".join(
+                f"<li>{escape(str(sender['sender_name']))}: {sender['message_count']}</li>"
+                for sender in report["top_senders"]
+            )
+            body = f"<table>{rows}</table><h2>Top senders</h2><ul>{senders}</ul>"
+
+        return f"""
+                <!DOCTYPE html>
+                <html>
+                <head>
+                    <title>Skype Export Report</title>
+                </head>
+                <body>
+                    <h1>Skype Export Report</h1>
+                    <p>Export ID: {export_id}</p>
+                    <p>Generated at: {datetime.now().isoformat()}</p>
+                    {body}
+                </body>
+                </html>
+                """
+
+    def _submit_upload(self, upload: Dict[str, Any]) -> str:
+        """
+        Submit a completed chunked upload to the ETL pipeline.
+
+        Args:
+            upload: The upload metadata
+
+        Returns:
+            str: Task ID
+        """
+        return submit_task(
+            file_path=upload["file_path"],
+            user_display_name=upload["user_display_name"],
+            db_config=self.db_config,
+            output_dir=self.output_folder,
+        )
+
+    @staticmethod
+    def _upload_response(upload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the public view of an upload.
+
+        Args:
+            upload: The upload metadata
+
+        Returns:
+            Dict[str, Any]: Upload ID, progress, status and task ID
+        """
+        keys = ("upload_id", "filename", "total_size", "offset", "status", "sha256", "task_id", "error")
+        return {key: upload.get(key) for key in keys}
+
+    @staticmethod
+    def _parse_content_range(header: Optional[str]) -> Tuple[int, int]:
+        """
+        Parse a "bytes <first>-<last>/<size>" Content-Range header.
+
+        Args:
+            header: The header value
+
+        Returns:
+            Tuple[int, int]: Offset and length of the chunk
+
+        Raises:
+            ValidationError: If the header is missing or malformed
+        """
+        match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+|\*)", (header or "").strip())
+        if not match or int(match.group(2)) < int(match.group(1)):
+            raise ValidationError("Content-Range header must be 'bytes <first>-<last>/<size>'")
+        first, last = int(match.group(1)), int(match.group(2))
+        return first, last - first + 1
+
     def _allowed_file(self, filename: str) -> bool:
         """
         Check if a file has an allowed extension.
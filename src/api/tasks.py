@@ -1,22 +1,55 @@
 """
 Task Queue Module for Skype Parser API
 
-This module provides asynchronous task processing for the Skype Parser API
-using Celery. It handles long-running tasks such as processing large Skype
-export files.
+This module provides asynchronous task processing for the Skype Parser API.
+It handles long-running tasks such as processing large Skype export files.
+
+Tasks run on Celery when a broker is reachable, or on the local executor
+(a persistent job queue run by local worker processes) otherwise, so a
+single-node deployment does not need Redis or RabbitMQ. Set TASK_BACKEND
+to "celery" or "local" to choose the backend explicitly.
 """
 
 import logging
 import os
-import tempfile
-from typing import Any, Dict, Optional
-
-from celery import Celery
-from celery.signals import task_failure, task_success
+import threading
+from typing import Any, Dict, List, Optional
+
+try:
+    from celery import Celery, chord, group
+    from celery.signals import task_failure, task_success
+
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+from src.api.local_executor import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_QUEUE_PATH,
+    LocalTaskExecutor,
+    report_progress,
+)
 
 # Import the new ETL pipeline
 from src.db import ETLContext, ETLPipeline
-from src.db.progress_tracker import create_tracker, get_tracker, remove_tracker
+from src.db.etl import Loader, Transformer
+from src.db.etl.sharding import (
+    DEFAULT_SHARD_COUNT,
+    aggregate_shard_progress,
+    build_export_index,
+    create_export_archive,
+    discard_sharded_export,
+    finalize_sharded_export,
+    plan_shards,
+    process_shard,
+)
+from src.db.progress_tracker import (
+    ProgressTracker,
+    create_tracker,
+    get_progress_store,
+    get_tracker,
+    remove_tracker,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -24,46 +57,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Celery
-celery_app = Celery("skype_parser")
+TASK_BACKENDS = ("auto", "celery", "local")
+
+# Exports at least this large are split into shards processed by several
+# Celery workers (overridden by the FAN_OUT_THRESHOLD environment variable)
+FAN_OUT_THRESHOLD = 1024 * 1024 * 1024  # 1 GB
+
+# Status of a Celery task by task state
+CELERY_SHARD_STATUSES = {
+    "PENDING": "pending",
+    "RECEIVED": "pending",
+    "STARTED": "running",
+    "PROGRESS": "running",
+    "RETRY": "running",
+    "SUCCESS": "completed",
+    "FAILURE": "failed",
+    "REVOKED": "failed",
+}
+
+# Messages for local jobs that have not reported progress yet
+JOB_MESSAGES = {
+    "queued": "Waiting for a worker...",
+    "running": "Starting asynchronous processing...",
+    "succeeded": "Processing completed successfully",
+    "failed": "Task failed",
+    "cancelled": "Task cancelled",
+}
+
+
+def _task_db_config(db_config: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Remove the credentials from a database configuration before it is queued.
 
-# Configure Celery
-celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
-    timezone="UTC",
-    enable_utc=True,
-)
+    Task arguments are stored in plaintext by the job queue and the broker,
+    so workers read the password from their own environment instead.
 
+    Args:
+        db_config: Database configuration
+
+    Returns:
+        The configuration without its password
+    """
+    if db_config is None:
+        return None
+    return {key: value for key, value in db_config.items() if key != "password"}
+
+
+def _worker_db_config(db_config: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Restore the credentials of a queued database configuration in a worker.
 
-@celery_app.task(bind=True, name="process_skype_export")
-def process_skype_export(
-    self,
+    Args:
+        db_config: Database configuration from the task arguments
+
+    Returns:
+        The configuration with the password from DB_PASSWORD
+    """
+    if db_config is None:
+        return None
+    config = dict(db_config)
+    if not config.get("password") and os.environ.get("DB_PASSWORD"):
+        config["password"] = os.environ["DB_PASSWORD"]
+    return config
+
+
+def run_skype_export(
+    task_id: str,
     file_path: str,
     user_display_name: Optional[str] = None,
     db_config: Optional[Dict[str, Any]] = None,
     output_dir: Optional[str] = None,
-    task_id: Optional[str] = None,
     cleanup: bool = True,
 ) -> Dict[str, Any]:
     """
-    Process a Skype export file asynchronously.
+    Process a Skype export file.
+
+    This is the body of the processing task, shared by the Celery task and
+    the local executor.
 
     Args:
+        task_id: Task ID for progress tracking
         file_path: Path to the Skype export file
         user_display_name: Display name of the user
-        db_config: Database configuration
+        db_config: Database configuration (without its password, see _task_db_config)
         output_dir: Output directory for transformed data
-        task_id: Task ID for progress tracking
         cleanup: Whether to clean up the file after processing
 
     Returns:
         dict: Results of the ETL pipeline
     """
-    # Use the Celery task ID if no task ID is provided
-    task_id = task_id or self.request.id
-
+    db_config = _worker_db_config(db_config)
     try:
         # Create a progress tracker for this task
         tracker = get_tracker(task_id) or create_tracker(task_id)
@@ -140,31 +223,385 @@ def process_skype_export(
         return {"success": False, "error": str(e), "task_id": task_id}
 
 
-@task_success.connect(sender="process_skype_export")
-def on_task_success(sender=None, result=None, **kwargs):
+def run_local_export(task_id: str, queue_path: str, **kwargs: Any) -> Dict[str, Any]:
     """
-    Handle successful task completion.
-    """
-    if result and "task_id" in result:
-        task_id = result["task_id"]
-        logger.info(f"Task {task_id} completed successfully")
+    Process a Skype export file in a local executor worker.
+
+    Progress is stored in the job queue, where the API reads it along with
+    cancellations and crashed workers, rather than in the progress store.
+
+    Args:
+        task_id: Task ID for progress tracking
+        queue_path: Path of the local job queue
+        **kwargs: Arguments for run_skype_export
 
-        # Clean up the tracker
+    Returns:
+        dict: Results of the ETL pipeline
+    """
+    tracker = create_tracker(task_id, shared=False)
+    tracker.add_listener(lambda _: report_progress(queue_path, task_id, tracker.get_status()))
+    try:
+        return run_skype_export(task_id, **kwargs)
+    finally:
         remove_tracker(task_id)
 
 
-@task_failure.connect(sender="process_skype_export")
-def on_task_failure(sender=None, task_id=None, exception=None, **kwargs):
+def _remove_export_files(file_path: str, source_path: str, cleanup: bool) -> None:
     """
-    Handle task failure.
+    Remove the temporary files of a sharded export.
+
+    Args:
+        file_path: Path to the uploaded Skype export file
+        source_path: Path to messages.json, if it had to be extracted
+        cleanup: Whether to remove the uploaded file too
     """
-    logger.error(f"Task {task_id} failed: {exception}")
+    paths = {file_path, source_path} if cleanup else {source_path} - {file_path}
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Failed to clean up temporary file {path}: {e}")
+
+
+if CELERY_AVAILABLE:
+    # Initialize Celery
+    celery_app = Celery("skype_parser")
+
+    # Configure Celery
+    celery_app.conf.update(
+        task_serializer="json",
+        accept_content=["json"],
+        result_serializer="json",
+        timezone="UTC",
+        enable_utc=True,
+    )
 
-    # Update the tracker with the error
-    tracker = get_tracker(task_id)
-    if tracker:
-        tracker.error(message="Task failed", error=str(exception))
-        remove_tracker(task_id)
+    @celery_app.task(bind=True, name="process_skype_export")
+    def process_skype_export(
+        self,
+        file_path: str,
+        user_display_name: Optional[str] = None,
+        db_config: Optional[Dict[str, Any]] = None,
+        output_dir: Optional[str] = None,
+        task_id: Optional[str] = None,
+        cleanup: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Process a Skype export file asynchronously.
+
+        Args:
+            file_path: Path to the Skype export file
+            user_display_name: Display name of the user
+            db_config: Database configuration
+            output_dir: Output directory for transformed data
+            task_id: Task ID for progress tracking
+            cleanup: Whether to clean up the file after processing
+
+        Returns:
+            dict: Results of the ETL pipeline
+        """
+        # Use the Celery task ID if no task ID is provided
+        return run_skype_export(
+            task_id or self.request.id,
+            file_path,
+            user_display_name=user_display_name,
+            db_config=db_config,
+            output_dir=output_dir,
+            cleanup=cleanup,
+        )
+
+    @celery_app.task(bind=True, name="process_skype_export_sharded")
+    def process_skype_export_sharded(
+        self,
+        file_path: str,
+        user_display_name: Optional[str] = None,
+        db_config: Optional[Dict[str, Any]] = None,
+        output_dir: Optional[str] = None,
+        shard_count: int = DEFAULT_SHARD_COUNT,
+        cleanup: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Split a Skype export into shards processed by several workers.
+
+        The conversations are indexed and dispatched as a chord: one
+        load_export_shard task per range of conversations, followed by
+        finalize_sharded_export once all shards are loaded, or by
+        discard_sharded_export if a shard fails.
+
+        Args:
+            file_path: Path to the Skype export file
+            user_display_name: Display name of the user
+            db_config: Database configuration
+            output_dir: Output directory for transformed data
+            shard_count: Maximum number of shards
+            cleanup: Whether to clean up the file after processing
+
+        Returns:
+            dict: The archive ID and the task IDs of the shards and the finalize step
+        """
+        task_id = self.request.id
+        self.update_state(state="PROGRESS", meta={"stage": "indexing"})
+
+        worker_db_config = _worker_db_config(db_config)
+        context = ETLContext(db_config=worker_db_config, output_dir=output_dir, task_id=task_id)
+        loader = Loader(context=context, db_config=worker_db_config)
+        index = build_export_index(file_path, temp_dir=output_dir)
+        shards = plan_shards(index, shard_count)
+        archive_id = create_export_archive(loader, file_path, index, user_display_name)
+
+        header = group(
+            load_export_shard.s(
+                index["source"], index["metadata"], shard, archive_id,
+                user_display_name, db_config, output_dir, task_id,
+            ).set(task_id=f"{task_id}-shard-{shard['shard']}")
+            for shard in shards
+        )
+        callback = finalize_sharded_export_task.s(
+            task_id, archive_id, file_path, index["source"]["path"], index["metadata"],
+            db_config, output_dir, cleanup,
+        ).set(task_id=f"{task_id}-finalize")
+        # The callback never runs if a shard fails
+        callback.on_error(discard_sharded_export_task.s(
+            task_id, archive_id, file_path, index["source"]["path"], db_config, output_dir, cleanup,
+            [f"{task_id}-shard-{shard['shard']}" for shard in shards],
+        ))
+        chord(header)(callback)
+
+        logger.info(f"Dispatched {len(shards)} shards of {file_path} for task {task_id}")
+        return {
+            "task_id": task_id,
+            "archive_id": archive_id,
+            "message_count": index["message_count"],
+            "shards": [
+                {"task_id": f"{task_id}-shard-{shard['shard']}", "messages": shard["messages"]}
+                for shard in shards
+            ],
+            "finalize_task_id": f"{task_id}-finalize",
+        }
+
+    @celery_app.task(bind=True, name="load_export_shard")
+    def load_export_shard(
+        self,
+        source: Dict[str, Any],
+        metadata: Dict[str, Any],
+        shard: Dict[str, Any],
+        archive_id: str,
+        user_display_name: Optional[str],
+        db_config: Optional[Dict[str, Any]],
+        output_dir: Optional[str],
+        task_id: str,
+    ) -> Dict[str, Any]:
+        """
+        Transform and load one shard of a Skype export.
+
+        Progress is reported as task state, from which the status of the
+        whole export is aggregated.
+
+        Returns:
+            dict: Result of process_shard()
+        """
+        db_config = _worker_db_config(db_config)
+        context = ETLContext(db_config=db_config, output_dir=output_dir, task_id=task_id)
+
+        def report(messages_done: int, messages: int) -> None:
+            self.update_state(
+                state="PROGRESS", meta={"messages_done": messages_done, "messages": messages}
+            )
+
+        return process_shard(
+            Transformer(context=context),
+            Loader(context=context, db_config=db_config),
+            source,
+            metadata,
+            shard,
+            archive_id,
+            user_display_name,
+            progress_callback=report,
+        )
+
+    @celery_app.task(name="finalize_sharded_export")
+    def finalize_sharded_export_task(
+        shard_results: List[Dict[str, Any]],
+        task_id: str,
+        archive_id: str,
+        file_path: str,
+        source_path: str,
+        metadata: Dict[str, Any],
+        db_config: Optional[Dict[str, Any]],
+        output_dir: Optional[str],
+        cleanup: bool,
+    ) -> Dict[str, Any]:
+        """
+        Combine the shard results of a Skype export once all shards are loaded.
+
+        Returns:
+            dict: Results in the format of process_skype_export
+        """
+        db_config = _worker_db_config(db_config)
+        context = ETLContext(db_config=db_config, output_dir=output_dir, task_id=task_id)
+        summary = finalize_sharded_export(
+            Loader(context=context, db_config=db_config), shard_results, metadata, file_path
+        )
+        _remove_export_files(file_path, source_path, cleanup)
+
+        logger.info(f"Task {task_id} completed successfully with {summary['shards']} shards")
+        return {
+            "success": True,
+            "task_id": task_id,
+            "archive_id": archive_id,
+            "export_id": summary["export_id"],
+            "shards": summary["shards"],
+            "conversations": summary["conversations"],
+            "message_count": summary["messages"],
+        }
+
+    @celery_app.task(name="discard_sharded_export")
+    def discard_sharded_export_task(
+        request,
+        exc,
+        traceback,
+        task_id: str,
+        archive_id: str,
+        file_path: str,
+        source_path: str,
+        db_config: Optional[Dict[str, Any]],
+        output_dir: Optional[str],
+        cleanup: bool,
+        shard_task_ids: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Discard a Skype export whose shards could not all be loaded.
+
+        Runs as the error callback of the chord: the partially loaded
+        archive is removed along with the temporary files. Shards that have
+        not started are revoked; running shards stop at their next batch
+        once the archive is gone and remove what they loaded since.
+        """
+        logger.error(f"Task {task_id} failed in a shard: {exc}")
+        if shard_task_ids:
+            celery_app.control.revoke(shard_task_ids)
+        try:
+            db_config = _worker_db_config(db_config)
+            context = ETLContext(db_config=db_config, output_dir=output_dir, task_id=task_id)
+            discard_sharded_export(Loader(context=context, db_config=db_config), archive_id)
+        finally:
+            _remove_export_files(file_path, source_path, cleanup)
+
+    @task_success.connect(sender="process_skype_export")
+    def on_task_success(sender=None, result=None, **kwargs):
+        """
+        Handle successful task completion.
+        """
+        if result and "task_id" in result:
+            task_id = result["task_id"]
+            logger.info(f"Task {task_id} completed successfully")
+
+            # Clean up the tracker
+            remove_tracker(task_id)
+
+    @task_failure.connect(sender="process_skype_export")
+    def on_task_failure(sender=None, task_id=None, exception=None, **kwargs):
+        """
+        Handle task failure.
+        """
+        logger.error(f"Task {task_id} failed: {exception}")
+
+        # Update the tracker with the error
+        tracker = get_tracker(task_id)
+        if tracker:
+            tracker.error(message="Task failed", error=str(exception))
+            remove_tracker(task_id)
+
+else:
+    celery_app = None
+
+
+# Tasks the local executor can run
+LOCAL_TASKS = {"process_skype_export": run_local_export}
+
+_task_backend: Optional[str] = None
+_local_executor: Optional[LocalTaskExecutor] = None
+_lock = threading.Lock()
+
+
+def _broker_available() -> bool:
+    """
+    Check whether Celery is installed and its broker is reachable.
+
+    Returns:
+        bool: True if tasks can be sent to Celery workers
+    """
+    if not CELERY_AVAILABLE or not os.environ.get("CELERY_BROKER_URL"):
+        return False
+
+    try:
+        with celery_app.connection_for_write() as connection:
+            connection.ensure_connection(max_retries=1)
+        return True
+    except Exception as e:
+        logger.warning(f"Celery broker is not reachable: {e}")
+        return False
+
+
+def get_task_backend() -> str:
+    """
+    Get the backend that runs tasks.
+
+    The backend is read from the TASK_BACKEND environment variable. With
+    "auto" (the default) Celery is used if its broker is reachable, and the
+    local executor otherwise.
+
+    Returns:
+        str: "celery" or "local"
+    """
+    global _task_backend
+
+    with _lock:
+        if _task_backend is None:
+            backend = os.environ.get("TASK_BACKEND", "auto").lower()
+            if backend not in TASK_BACKENDS:
+                raise ValueError(
+                    f"Unknown task backend: {backend}. Expected one of: {', '.join(TASK_BACKENDS)}"
+                )
+            if backend == "celery" and not CELERY_AVAILABLE:
+                raise RuntimeError("Task backend 'celery' requires Celery to be installed")
+            if backend == "auto":
+                backend = "celery" if _broker_available() else "local"
+
+            _task_backend = backend
+            logger.info(f"Using {backend} task backend")
+
+    return _task_backend
+
+
+def get_local_executor() -> LocalTaskExecutor:
+    """
+    Get the global local executor.
+
+    The queue path and number of workers are read from the LOCAL_TASK_QUEUE
+    and LOCAL_TASK_WORKERS environment variables.
+
+    Returns:
+        LocalTaskExecutor: The running executor
+    """
+    global _local_executor
+
+    with _lock:
+        if _local_executor is None:
+            _local_executor = LocalTaskExecutor(
+                LOCAL_TASKS,
+                queue_path=os.environ.get("LOCAL_TASK_QUEUE", DEFAULT_QUEUE_PATH),
+                max_workers=int(os.environ.get("LOCAL_TASK_WORKERS", DEFAULT_MAX_WORKERS)),
+            )
+            # Run jobs left in the queue by a previous process
+            _local_executor.start()
+
+    return _local_executor
+
+
+def _fan_out_threshold() -> int:
+    """Get the export size from which submitted exports are split into shards."""
+    return int(os.environ.get("FAN_OUT_THRESHOLD", FAN_OUT_THRESHOLD))
 
 
 def submit_task(
@@ -173,6 +610,8 @@ def submit_task(
     db_config: Optional[Dict[str, Any]] = None,
     output_dir: Optional[str] = None,
     cleanup: bool = True,
+    priority: int = 0,
+    fan_out: Optional[bool] = None,
 ) -> str:
     """
     Submit a task to process a Skype export file asynchronously.
@@ -180,25 +619,184 @@ def submit_task(
     Args:
         file_path: Path to the Skype export file
         user_display_name: Display name of the user
-        db_config: Database configuration
+        db_config: Database configuration. Its password is not queued:
+            workers read it from DB_PASSWORD
         output_dir: Output directory for transformed data
         cleanup: Whether to clean up the file after processing
+        priority: Tasks with higher priority run first
+        fan_out: Whether to split the export into shards processed by several
+            Celery workers (default: if it is at least FAN_OUT_THRESHOLD bytes)
 
     Returns:
         str: Task ID
     """
-    # Submit the task
-    task = process_skype_export.delay(
-        file_path=file_path,
-        user_display_name=user_display_name,
-        db_config=db_config,
-        output_dir=output_dir,
-        cleanup=cleanup,
-    )
+    kwargs = {
+        "file_path": file_path,
+        "user_display_name": user_display_name,
+        "db_config": _task_db_config(db_config),
+        "output_dir": output_dir,
+        "cleanup": cleanup,
+    }
+
+    backend = get_task_backend()
+    if fan_out is None:
+        fan_out = backend == "celery" and os.path.getsize(file_path) >= _fan_out_threshold()
+    elif fan_out and backend != "celery":
+        logger.warning("Sharded processing requires the Celery backend, processing in one task")
+        fan_out = False
+
+    if fan_out:
+        # Progress is aggregated from the shards' task states
+        kwargs["shard_count"] = int(os.environ.get("SHARD_COUNT", DEFAULT_SHARD_COUNT))
+        task_id = process_skype_export_sharded.apply_async(kwargs=kwargs, priority=priority).id
+    elif backend == "celery":
+        # Submit the task
+        task = process_skype_export.apply_async(kwargs=kwargs, priority=priority)
+        task_id = task.id
+
+        # Store the task's initial progress, where workers and every API
+        # process find it
+        ProgressTracker(task_id, store=get_progress_store())
+    else:
+        executor = get_local_executor()
+        kwargs["queue_path"] = executor.queue_path
+        task_id = executor.submit("process_skype_export", kwargs, priority=priority)
+
+    logger.info(f"Submitted task {task_id} to process Skype export file: {file_path}")
+
+    return task_id
+
+
+def _get_sharded_task(task_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the dispatch result of a sharded Celery task.
 
-    # Create a progress tracker for this task
-    create_tracker(task.id)
+    Args:
+        task_id: Task ID of process_skype_export_sharded
+
+    Returns:
+        The task's result once its shards are dispatched, None otherwise
+    """
+    result = celery_app.AsyncResult(task_id)
+    if result.state == "SUCCESS" and isinstance(result.result, dict) and "shards" in result.result:
+        return result.result
+    return None
 
-    logger.info(f"Submitted task {task.id} to process Skype export file: {file_path}")
 
-    return task.id
+def cancel_task(task_id: str) -> bool:
+    """
+    Cancel a queued or running task.
+
+    Args:
+        task_id: Task ID
+
+    Returns:
+        bool: True if the task was cancelled, False if it is unknown or finished
+    """
+    if get_task_backend() == "local":
+        return get_local_executor().cancel(task_id)
+
+    tracker = get_tracker(task_id)
+    if tracker is not None:
+        if tracker.status in ("completed", "failed"):
+            return False
+        celery_app.control.revoke(task_id, terminate=True)
+        tracker.update(status="cancelled", message=JOB_MESSAGES["cancelled"])
+        remove_tracker(task_id)
+        return True
+
+    # Sharded tasks: revoke the dispatch task, or its shards and finalize step
+    state = celery_app.AsyncResult(task_id).state
+    if state in ("STARTED", "PROGRESS"):
+        celery_app.control.revoke(task_id, terminate=True)
+        return True
+    dispatched = _get_sharded_task(task_id)
+    if dispatched is None:
+        return False
+    if celery_app.AsyncResult(dispatched["finalize_task_id"]).state in ("SUCCESS", "FAILURE", "REVOKED"):
+        return False
+    task_ids = [shard["task_id"] for shard in dispatched["shards"]] + [dispatched["finalize_task_id"]]
+    celery_app.control.revoke(task_ids, terminate=True)
+    return True
+
+
+def _get_sharded_task_status(task_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the status of a sharded Celery task, aggregated from its shards.
+
+    Args:
+        task_id: Task ID of process_skype_export_sharded
+
+    Returns:
+        Status in the format of ProgressTracker.get_status(), or None if the
+        task is not a sharded task
+    """
+    result = celery_app.AsyncResult(task_id)
+    if result.state == "PROGRESS" and isinstance(result.info, dict) and result.info.get("stage"):
+        return {"status": result.info["stage"], "progress": 0, "message": "Indexing conversations..."}
+    if result.state == "FAILURE":
+        return {"status": "failed", "progress": 0, "message": JOB_MESSAGES["failed"], "error": str(result.info)}
+
+    dispatched = _get_sharded_task(task_id)
+    if dispatched is None:
+        return None
+
+    shards = []
+    for shard in dispatched["shards"]:
+        shard_result = celery_app.AsyncResult(shard["task_id"])
+        status = CELERY_SHARD_STATUSES.get(shard_result.state, "pending")
+        info = shard_result.info if shard_result.state == "PROGRESS" else {}
+        shards.append({
+            "status": status,
+            "messages_done": shard["messages"] if status == "completed" else info.get("messages_done", 0),
+            "messages": shard["messages"],
+            "error": str(shard_result.info) if status == "failed" else None,
+        })
+    status = aggregate_shard_progress(shards)
+
+    finalize = celery_app.AsyncResult(dispatched["finalize_task_id"])
+    if finalize.state == "SUCCESS":
+        status.update(
+            status="completed",
+            progress=100,
+            message=JOB_MESSAGES["succeeded"],
+            export_id=finalize.result.get("export_id"),
+        )
+    elif finalize.state in ("FAILURE", "REVOKED"):
+        status.update(status="failed", message=JOB_MESSAGES["failed"], error=str(finalize.info))
+    elif status["status"] == "completed":
+        status.update(status="finalizing", progress=99, message="Combining shard results...")
+    return status
+
+
+def get_task_status(task_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the status of a task run by the local executor or split into shards.
+
+    Other Celery tasks report their status through progress trackers.
+
+    Args:
+        task_id: Task ID
+
+    Returns:
+        Status in the format of ProgressTracker.get_status(), or None if unknown
+    """
+    if get_task_backend() == "celery":
+        return _get_sharded_task_status(task_id)
+
+    job = get_local_executor().get_job(task_id)
+    if job is None:
+        return None
+
+    status = job["progress"] or {
+        "status": job["status"],
+        "progress": 0,
+        "message": JOB_MESSAGES[job["status"]],
+    }
+    # The worker cannot report a cancellation or its own crash
+    if job["status"] == "cancelled":
+        status.update(status="cancelled", message=JOB_MESSAGES["cancelled"])
+    elif job["status"] == "failed" and status["status"] != "failed":
+        status.update(status="failed", message=JOB_MESSAGES["failed"], error=job["error"])
+    status["priority"] = job["priority"]
+    return status
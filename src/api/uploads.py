@@ -0,0 +1,488 @@
+"""
+Resumable Upload Module for Skype Parser API
+
+This module receives Skype export files in chunks. Each chunk is streamed
+from the request to disk while the file is hashed and its TAR or JSON
+structure is checked, so nothing is buffered in memory and a broken file
+is rejected as soon as the bad bytes arrive. An interrupted upload resumes
+from the last byte on disk. When the last chunk lands, the finished file is
+handed to a callback that submits it to the ETL pipeline.
+
+Upload state lives next to the data in the upload folder, so any API worker
+process can accept the next chunk of an upload.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tarfile
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from werkzeug.utils import secure_filename
+
+from src.utils.validation import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Suggested chunk size for clients
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB
+
+# Largest export accepted through chunked uploads
+MAX_UPLOAD_SIZE = 20 * 1024 * 1024 * 1024  # 20 GB
+
+# Size of the reads from the request stream
+READ_SIZE = 1024 * 1024
+
+UPLOAD_EXTENSIONS = ("tar", "json")
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_BLOCK_SIZE = tarfile.BLOCKSIZE
+
+
+class UploadOffsetError(Exception):
+    """Raised when a chunk does not start where the upload currently ends."""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+class TarStreamValidator:
+    """
+    Checks the member headers of a TAR archive as it is received.
+
+    Only the 512-byte headers are inspected; member data is skipped without
+    being buffered.
+    """
+
+    def __init__(self):
+        self.position = 0
+        self.members = []
+        self._next_header = 0
+        self._header = b""
+        self._zero_blocks = 0
+        self._finished = False
+
+    def feed(self, data: bytes) -> None:
+        """
+        Check the next bytes of the archive.
+
+        Args:
+            data: Bytes following the ones already fed
+
+        Raises:
+            ValidationError: If a header is invalid
+        """
+        pos = 0
+        while pos < len(data) and not self._finished:
+            if self.position < self._next_header:
+                skip = min(self._next_header - self.position, len(data) - pos)
+                pos += skip
+                self.position += skip
+                continue
+
+            take = data[pos:pos + _BLOCK_SIZE - len(self._header)]
+            self._header += take
+            pos += len(take)
+            self.position += len(take)
+            if len(self._header) == _BLOCK_SIZE:
+                self._read_header(self._header)
+                self._header = b""
+        # Bytes after the end-of-archive marker are ignored, as tarfile does
+        self.position += len(data) - pos
+
+    def _read_header(self, header: bytes) -> None:
+        if header == tarfile.NUL * _BLOCK_SIZE:
+            self._zero_blocks += 1
+            self._finished = self._zero_blocks == 2
+            self._next_header = self.position
+            return
+
+        try:
+            info = tarfile.TarInfo.frombuf(header, tarfile.ENCODING, "surrogateescape")
+        except tarfile.HeaderError as e:
+            raise ValidationError(f"Invalid TAR header at byte {self.position - _BLOCK_SIZE}: {e}")
+
+        self._zero_blocks = 0
+        self.members.append(info.name)
+        data_blocks = -(-info.size // _BLOCK_SIZE)
+        self._next_header = self.position + data_blocks * _BLOCK_SIZE
+
+    def finish(self) -> None:
+        """
+        Check the archive is complete.
+
+        Raises:
+            ValidationError: If the archive is truncated or has no messages.json
+        """
+        if self._header or self.position < self._next_header:
+            raise ValidationError("TAR archive is truncated")
+        if not any(name.endswith("messages.json") for name in self.members):
+            raise ValidationError("No messages.json file found in TAR archive")
+
+
+class JsonStreamValidator:
+    """Checks that a JSON export is a single object as it is received."""
+
+    def __init__(self):
+        self._first = None
+        self._last = None
+
+    def feed(self, data: bytes) -> None:
+        """
+        Check the next bytes of the document.
+
+        Args:
+            data: Bytes following the ones already fed
+
+        Raises:
+            ValidationError: If the document does not start with an object
+        """
+        stripped = data.strip()
+        if not stripped:
+            return
+        if self._first is None:
+            self._first = stripped[:1]
+            if self._first != b"{":
+                raise ValidationError("JSON export must be an object")
+        self._last = stripped[-1:]
+
+    def finish(self) -> None:
+        """
+        Check the document is complete.
+
+        Raises:
+            ValidationError: If the document is empty or truncated
+        """
+        if self._first is None or self._last != b"}":
+            raise ValidationError("JSON export is empty or truncated")
+
+
+class _ReceiveState:
+    """Hash and validator of an upload, valid up to offset."""
+
+    def __init__(self, extension: str):
+        self.offset = 0
+        self.hasher = hashlib.sha256()
+        self.validator = TarStreamValidator() if extension == "tar" else JsonStreamValidator()
+
+    def feed(self, data: bytes) -> None:
+        self.hasher.update(data)
+        self.validator.feed(data)
+        self.offset += len(data)
+
+
+class UploadManager:
+    """
+    Manages resumable chunked uploads in an upload folder.
+
+    For each upload the folder holds <id>.json (metadata), <id>.part (the
+    bytes received so far) and, once complete, <id>_<filename>.
+    """
+
+    def __init__(
+        self,
+        upload_folder: str,
+        on_complete: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_upload_size: int = MAX_UPLOAD_SIZE,
+    ):
+        """
+        Initialize the upload manager.
+
+        Args:
+            upload_folder: Directory for uploads
+            on_complete: Called with the upload metadata when the last chunk
+                has been received; returns the ID of the task processing it
+            chunk_size: Chunk size suggested to clients
+            max_upload_size: Largest accepted upload in bytes
+        """
+        self.upload_folder = upload_folder
+        self.on_complete = on_complete
+        self.chunk_size = chunk_size
+        self.max_upload_size = max_upload_size
+        self._states: Dict[str, _ReceiveState] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+        os.makedirs(upload_folder, exist_ok=True)
+
+    def _path(self, upload_id: str, suffix: str) -> str:
+        return os.path.join(self.upload_folder, f"{upload_id}{suffix}")
+
+    def _lock(self, upload_id: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _save(self, upload: Dict[str, Any]) -> None:
+        """Write upload metadata atomically."""
+        path = self._path(upload["upload_id"], ".json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(upload, f)
+        os.replace(tmp_path, path)
+
+    def create(
+        self,
+        filename: str,
+        total_size: int,
+        owner: str,
+        user_display_name: Optional[str] = None,
+        sha256: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Start an upload.
+
+        Args:
+            filename: Name of the export file (.tar or .json)
+            total_size: Size of the file in bytes
+            owner: Username of the uploading user
+            user_display_name: Display name passed to the pipeline
+            sha256: Expected SHA-256 of the file (hex), checked on completion
+
+        Returns:
+            The upload metadata
+
+        Raises:
+            ValidationError: If the file name, size or hash is invalid
+        """
+        filename = secure_filename(filename or "")
+        extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        if extension not in UPLOAD_EXTENSIONS:
+            raise ValidationError(f"File type not allowed. Allowed types: {', '.join(UPLOAD_EXTENSIONS)}")
+        if not isinstance(total_size, int) or isinstance(total_size, bool) or total_size <= 0:
+            raise ValidationError("size must be a positive integer")
+        if total_size > self.max_upload_size:
+            raise ValidationError(f"File too large (maximum {self.max_upload_size} bytes)")
+        if sha256 is not None and not re.fullmatch(r"[0-9a-fA-F]{64}", sha256):
+            raise ValidationError("sha256 must be 64 hexadecimal characters")
+
+        upload = {
+            "upload_id": uuid.uuid4().hex,
+            "filename": filename,
+            "extension": extension,
+            "total_size": total_size,
+            "owner": owner,
+            "user_display_name": user_display_name,
+            "expected_sha256": sha256.lower() if sha256 else None,
+            "sha256": None,
+            "status": "uploading",
+            "error": None,
+            "file_path": None,
+            "task_id": None,
+            "created_at": datetime.now().isoformat(),
+        }
+        open(self._path(upload["upload_id"], ".part"), "wb").close()
+        self._save(upload)
+
+        logger.info(f"Started upload {upload['upload_id']} of {filename} ({total_size} bytes)")
+        return self._with_offset(upload)
+
+    def get(self, upload_id: str, owner: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get an upload.
+
+        Args:
+            upload_id: The upload ID
+            owner: If given, the upload must belong to this user
+
+        Returns:
+            The upload metadata, with the number of bytes received as offset
+
+        Raises:
+            LookupError: If there is no such upload (for this owner)
+        """
+        upload = self._load(upload_id, owner)
+        return self._with_offset(upload)
+
+    def _load(self, upload_id: str, owner: Optional[str]) -> Dict[str, Any]:
+        if not _UPLOAD_ID.match(upload_id or ""):
+            raise LookupError(f"Upload {upload_id} not found")
+        try:
+            with open(self._path(upload_id, ".json")) as f:
+                upload = json.load(f)
+        except FileNotFoundError:
+            raise LookupError(f"Upload {upload_id} not found")
+        if owner is not None and upload["owner"] != owner:
+            raise LookupError(f"Upload {upload_id} not found")
+        return upload
+
+    def _with_offset(self, upload: Dict[str, Any]) -> Dict[str, Any]:
+        if upload["status"] == "uploading":
+            try:
+                offset = os.path.getsize(self._path(upload["upload_id"], ".part"))
+            except FileNotFoundError:
+                offset = 0
+        else:
+            offset = upload["total_size"] if upload["status"] == "complete" else 0
+        return dict(upload, offset=offset)
+
+    def _receive_state(self, upload: Dict[str, Any], part_file: BinaryIO, size: int) -> _ReceiveState:
+        """Return the hash and validator state, replaying the bytes on disk if needed."""
+        upload_id = upload["upload_id"]
+        state = self._states.get(upload_id)
+        if state is not None and state.offset == size:
+            return state
+
+        # Another process received earlier chunks, or this one restarted
+        state = _ReceiveState(upload["extension"])
+        part_file.seek(0)
+        while state.offset < size:
+            data = part_file.read(min(READ_SIZE, size - state.offset))
+            if not data:
+                break
+            state.feed(data)
+        self._states[upload_id] = state
+        return state
+
+    def write_chunk(
+        self,
+        upload_id: str,
+        offset: int,
+        stream: BinaryIO,
+        length: Optional[int],
+        owner: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Append a chunk read from a stream.
+
+        The chunk is hashed, validated and written as it is read. When the
+        upload is complete, the file is finalized and passed to on_complete.
+
+        Args:
+            upload_id: The upload ID
+            offset: Position of the chunk in the file
+            stream: Stream to read the chunk from
+            length: Number of bytes to read (None reads to the end of the stream)
+            owner: If given, the upload must belong to this user
+
+        Returns:
+            The upload metadata
+
+        Raises:
+            LookupError: If there is no such upload
+            UploadOffsetError: If offset is not the number of bytes received so far,
+                or another request is writing to the upload
+            ValidationError: If the chunk makes the file invalid; the upload is failed
+        """
+        with self._lock(upload_id):
+            upload = self._load(upload_id, owner)
+            if upload["status"] != "uploading":
+                raise UploadOffsetError(f"Upload {upload_id} is {upload['status']}", self._with_offset(upload)["offset"])
+
+            with open(self._path(upload_id, ".part"), "r+b") as part_file:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(part_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        raise UploadOffsetError(f"Upload {upload_id} is receiving another chunk", offset)
+
+                size = os.fstat(part_file.fileno()).st_size
+                if offset != size:
+                    raise UploadOffsetError(f"Chunk starts at {offset}, upload is at {size}", size)
+                if length is not None and offset + length > upload["total_size"]:
+                    raise ValidationError("Chunk extends past the announced file size")
+
+                state = self._receive_state(upload, part_file, size)
+                part_file.seek(size)
+                try:
+                    self._copy(stream, part_file, state, length, upload["total_size"])
+                except ValidationError as e:
+                    self._fail(upload, str(e))
+                    raise
+
+            if state.offset == upload["total_size"]:
+                upload = self._finalize(upload, state)
+
+            return self._with_offset(upload)
+
+    @staticmethod
+    def _copy(stream: BinaryIO, part_file: BinaryIO, state: _ReceiveState, length: Optional[int], total_size: int) -> None:
+        """Copy a chunk from the stream to the part file, feeding the state first."""
+        remaining = length
+        while remaining is None or remaining > 0:
+            data = stream.read(READ_SIZE if remaining is None else min(READ_SIZE, remaining))
+            if not data:
+                break
+            if state.offset + len(data) > total_size:
+                raise ValidationError("Upload is larger than the announced file size")
+            state.feed(data)
+            part_file.write(data)
+            if remaining is not None:
+                remaining -= len(data)
+        part_file.flush()
+
+    def _finalize(self, upload: Dict[str, Any], state: _ReceiveState) -> Dict[str, Any]:
+        """Check the complete file, move it in place and hand it to on_complete."""
+        upload_id = upload["upload_id"]
+        try:
+            state.validator.finish()
+            digest = state.hasher.hexdigest()
+            if upload["expected_sha256"] and digest != upload["expected_sha256"]:
+                raise ValidationError("SHA-256 of the upload does not match")
+        except ValidationError as e:
+            self._fail(upload, str(e))
+            raise
+
+        file_path = os.path.join(self.upload_folder, f"{upload_id}_{upload['filename']}")
+        os.replace(self._path(upload_id, ".part"), file_path)
+        self._states.pop(upload_id, None)
+        upload.update(status="complete", sha256=digest, file_path=file_path)
+        self._save(upload)
+        logger.info(f"Upload {upload_id} complete: {file_path} (sha256 {digest})")
+
+        if self.on_complete is not None:
+            try:
+                upload["task_id"] = self.on_complete(upload)
+            except Exception as e:
+                logger.error(f"Could not submit upload {upload_id} for processing: {e}", exc_info=True)
+                upload["error"] = f"Could not submit for processing: {e}"
+            self._save(upload)
+        return upload
+
+    def _fail(self, upload: Dict[str, Any], error: str) -> None:
+        """Mark an upload as failed and drop its data."""
+        upload.update(status="failed", error=error)
+        self._save(upload)
+        self._states.pop(upload["upload_id"], None)
+        try:
+            os.remove(self._path(upload["upload_id"], ".part"))
+        except FileNotFoundError:
+            pass
+        logger.warning(f"Upload {upload['upload_id']} failed: {error}")
+
+    def delete(self, upload_id: str, owner: Optional[str] = None) -> None:
+        """
+        Abort an upload and remove its data.
+
+        Files already handed to the pipeline are left to the pipeline.
+
+        Args:
+            upload_id: The upload ID
+            owner: If given, the upload must belong to this user
+
+        Raises:
+            LookupError: If there is no such upload
+        """
+        with self._lock(upload_id):
+            upload = self._load(upload_id, owner)
+            for suffix in (".part", ".json"):
+                try:
+                    os.remove(self._path(upload_id, suffix))
+                except FileNotFoundError:
+                    pass
+            self._states.pop(upload_id, None)
+        with self._locks_lock:
+            self._locks.pop(upload_id, None)
+        logger.info(f"Deleted upload {upload_id} ({upload['status']})")
@@ -3,16 +3,27 @@ User Management Module for Skype Parser API
 
 This module provides user management functionality for the Skype Parser API,
 including user authentication, registration, and API key management.
+
+Users are stored in a JSON file, kept in memory and written behind in
+batches, or in a SQLite database for large numbers of users or several API
+processes. Both stores index users by a hash of their API key, and recent
+API-key lookups are cached, so authentication time does not grow with the
+number of users.
 """
 
+import atexit
 import hashlib
 import json
 import logging
 import os
 import secrets
+import sqlite3
+import tempfile
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -21,34 +32,77 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class UserManager:
+USER_BACKENDS = ("json", "sqlite")
+
+# File extensions of user files stored in SQLite when no backend is given
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+# Seconds changes are collected before the JSON user file is rewritten
+FLUSH_DELAY = 1.0
+
+# API-key lookups kept in the authentication cache
+AUTH_CACHE_SIZE = 1024
+
+# Seconds a cached lookup is used, so that changes made by other processes
+# (such as a regenerated API key) take effect
+AUTH_CACHE_TTL = 30.0
+
+CREATE_USERS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        api_key_hash TEXT UNIQUE,
+        data TEXT NOT NULL
+    )
+"""
+
+
+def _hash_api_key(api_key: str) -> str:
+    """Hash an API key for the API-key index."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class JSONUserStore:
     """
-    User management class for the Skype Parser API.
+    Users kept in memory and saved to a JSON file.
 
-    This class provides methods for user authentication, registration, and API key management.
-    User data is stored in a JSON file.
+    Changes are written behind: they are collected for flush_delay seconds
+    and then written to a temporary file that replaces the user file, so
+    the file is never left half-written. Pending changes are written when
+    the process exits. The file should not be shared by processes that
+    change users.
     """
 
-    def __init__(self, user_file: Optional[str] = None):
+    def __init__(self, path: str, flush_delay: float = FLUSH_DELAY):
         """
-        Initialize the user manager.
+        Initialize the store and load the user file.
 
         Args:
-            user_file: Path to the user data file
+            path: Path to the user data file
+            flush_delay: Seconds changes are collected before they are written
         """
-        self.user_file = user_file or os.environ.get("USER_FILE", "users.json")
-        self.users = self._load_users()
-
-    def _load_users(self) -> Dict[str, Dict[str, Any]]:
+        self.path = path
+        self.flush_delay = flush_delay
+        self._users = self._load()
+        self._by_key_hash: Dict[str, str] = {}
+        # Users are changed in place, so the indexed hash is kept per user
+        self._key_hashes: Dict[str, str] = {}
+        for user in self._users.values():
+            self._index(user)
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
         """
         Load users from the user data file.
 
         Returns:
             dict: Dictionary of users
         """
-        if os.path.exists(self.user_file):
+        if os.path.exists(self.path):
             try:
-                with open(self.user_file, "r") as f:
+                with open(self.path, "r") as f:
                     return json.load(f)
             except Exception as e:
                 logger.error(f"Error loading user data: {e}")
@@ -56,16 +110,209 @@ class UserManager:
         # Return empty dict if file doesn't exist or there's an error
         return {}
 
-    def _save_users(self) -> None:
-        """Save users to the user data file."""
-        try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(os.path.abspath(self.user_file)), exist_ok=True)
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get a user by username."""
+        return self._users.get(username)
+
+    def get_by_api_key_hash(self, key_hash: str) -> Optional[Dict[str, Any]]:
+        """Get a user by the hash of their API key."""
+        username = self._by_key_hash.get(key_hash)
+        return self._users.get(username) if username else None
+
+    def put(self, user: Dict[str, Any]) -> None:
+        """Add or replace a user."""
+        with self._lock:
+            self._unindex(user["username"])
+            self._users[user["username"]] = user
+            self._index(user)
+            self._schedule_flush()
+
+    def delete(self, username: str) -> None:
+        """Remove a user."""
+        with self._lock:
+            self._unindex(username)
+            self._users.pop(username, None)
+            self._schedule_flush()
+
+    def all(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all users."""
+        return iter(list(self._users.values()))
+
+    def _index(self, user: Dict[str, Any]) -> None:
+        """Add a user's API key to the index."""
+        if user.get("api_key"):
+            key_hash = _hash_api_key(user["api_key"])
+            self._by_key_hash[key_hash] = user["username"]
+            self._key_hashes[user["username"]] = key_hash
+
+    def _unindex(self, username: str) -> None:
+        """Remove a user's API key from the index."""
+        key_hash = self._key_hashes.pop(username, None)
+        if key_hash is not None:
+            self._by_key_hash.pop(key_hash, None)
+
+    def _schedule_flush(self) -> None:
+        """Write the user file once the current batch of changes is collected."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes to the user file."""
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+            data = json.dumps(self._users, separators=(",", ":"))
+
+        with self._write_lock:
+            try:
+                # Create directory if it doesn't exist
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+
+                fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".users-", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        f.write(data)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, self.path)
+                except BaseException:
+                    os.remove(temp_path)
+                    raise
+            except Exception as e:
+                logger.error(f"Error saving user data: {e}")
+
+
+class SQLiteUserStore:
+    """
+    Users stored in a SQLite database.
+
+    Users are read from the database when needed, so memory use does not
+    grow with the number of users, and several processes can share the
+    database.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the store, creating the database if needed.
+
+        Args:
+            path: Path to the SQLite database
+        """
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(CREATE_USERS_TABLE_SQL)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection to the database."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _fetch_one(self, sql: str, params: Tuple) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get a user by username."""
+        return self._fetch_one("SELECT data FROM users WHERE username = ?", (username,))
+
+    def get_by_api_key_hash(self, key_hash: str) -> Optional[Dict[str, Any]]:
+        """Get a user by the hash of their API key."""
+        return self._fetch_one("SELECT data FROM users WHERE api_key_hash = ?", (key_hash,))
+
+    def put(self, user: Dict[str, Any]) -> None:
+        """Add or replace a user."""
+        key_hash = _hash_api_key(user["api_key"]) if user.get("api_key") else None
+        self._connect().execute(
+            "INSERT OR REPLACE INTO users (username, api_key_hash, data) VALUES (?, ?, ?)",
+            (user["username"], key_hash, json.dumps(user)),
+        )
+
+    def delete(self, username: str) -> None:
+        """Remove a user."""
+        self._connect().execute("DELETE FROM users WHERE username = ?", (username,))
+
+    def all(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over all users."""
+        for (data,) in self._connect().execute("SELECT data FROM users ORDER BY username"):
+            yield json.loads(data)
+
+    def flush(self) -> None:
+        """Changes are written immediately; nothing to do."""
 
-            with open(self.user_file, "w") as f:
-                json.dump(self.users, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving user data: {e}")
+
+class UserManager:
+    """
+    User management class for the Skype Parser API.
+
+    This class provides methods for user authentication, registration, and API key management.
+    User data is stored in a JSON file or a SQLite database.
+    """
+
+    def __init__(
+        self,
+        user_file: Optional[str] = None,
+        backend: Optional[str] = None,
+        auth_cache_size: int = AUTH_CACHE_SIZE,
+        auth_cache_ttl: float = AUTH_CACHE_TTL,
+    ):
+        """
+        Initialize the user manager.
+
+        Args:
+            user_file: Path to the user data file
+            backend: "json" or "sqlite" (default: the USER_BACKEND environment
+                variable, or "sqlite" for .db, .sqlite and .sqlite3 files)
+            auth_cache_size: Number of API-key lookups to cache
+            auth_cache_ttl: Seconds a cached API-key lookup is used
+        """
+        self.user_file = user_file or os.environ.get("USER_FILE", "users.json")
+        backend = backend or os.environ.get("USER_BACKEND")
+        if backend is None:
+            is_sqlite = os.path.splitext(self.user_file)[1].lower() in SQLITE_EXTENSIONS
+            backend = "sqlite" if is_sqlite else "json"
+        if backend not in USER_BACKENDS:
+            raise ValueError(f"Unknown user backend {backend!r}, expected one of {USER_BACKENDS}")
+
+        self.backend = backend
+        self.store = SQLiteUserStore(self.user_file) if backend == "sqlite" else JSONUserStore(self.user_file)
+        self.auth_cache_size = auth_cache_size
+        self.auth_cache_ttl = auth_cache_ttl
+        self._auth_cache: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _save_user(self, user: Dict[str, Any], old_api_key: Optional[str] = None) -> None:
+        """
+        Save a user and drop their cached API-key lookups.
+
+        Args:
+            user: User data
+            old_api_key: API key the user had before the change
+        """
+        self.store.put(user)
+        self._invalidate(user.get("api_key"), old_api_key)
+
+    def _invalidate(self, *api_keys: Optional[str]) -> None:
+        """Drop the cached lookups of API keys."""
+        with self._lock:
+            for api_key in api_keys:
+                if api_key:
+                    self._auth_cache.pop(_hash_api_key(api_key), None)
+
+    def flush(self) -> None:
+        """Write pending changes to the user data file."""
+        self.store.flush()
 
     def _hash_password(
         self, password: str, salt: Optional[str] = None
@@ -106,7 +353,7 @@ class UserManager:
             bool: True if registration was successful, False otherwise
         """
         # Check if username already exists
-        if username in self.users:
+        if self.store.get(username) is not None:
             logger.warning(f"Username {username} already exists")
             return False
 
@@ -117,7 +364,7 @@ class UserManager:
         api_key = self._generate_api_key()
 
         # Create user
-        self.users[username] = {
+        user = {
             "username": username,
             "password": hashed_password,
             "salt": salt,
@@ -128,8 +375,8 @@ class UserManager:
             "last_login": None,
         }
 
-        # Save users
-        self._save_users()
+        # Save user
+        self._save_user(user)
 
         logger.info(f"User {username} registered successfully")
         return True
@@ -145,14 +392,12 @@ class UserManager:
         Returns:
             bool: True if authentication was successful, False otherwise
         """
-        # Check if username exists
-        if username not in self.users:
+        # Get user
+        user = self.store.get(username)
+        if user is None:
             logger.warning(f"Username {username} not found")
             return False
 
-        # Get user
-        user = self.users[username]
-
         # Hash the password with the user's salt
         hashed_password, _ = self._hash_password(password, user["salt"])
 
@@ -163,7 +408,7 @@ class UserManager:
 
         # Update last login
         user["last_login"] = time.time()
-        self._save_users()
+        self._save_user(user)
 
         logger.info(f"User {username} authenticated successfully")
         return True
@@ -178,7 +423,7 @@ class UserManager:
         Returns:
             dict: User data, or None if user not found
         """
-        return self.users.get(username)
+        return self.store.get(username)
 
     def get_user_by_api_key(self, api_key: str) -> Optional[Dict[str, Any]]:
         """
@@ -190,11 +435,24 @@ class UserManager:
         Returns:
             dict: User data, or None if user not found
         """
-        for username, user in self.users.items():
-            if user.get("api_key") == api_key:
-                return user
+        key_hash = _hash_api_key(api_key)
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._auth_cache.get(key_hash)
+            if cached is not None and now - cached[0] < self.auth_cache_ttl:
+                self._auth_cache.move_to_end(key_hash)
+                return cached[1]
+
+        user = self.store.get_by_api_key_hash(key_hash)
 
-        return None
+        with self._lock:
+            self._auth_cache[key_hash] = (now, user)
+            self._auth_cache.move_to_end(key_hash)
+            while len(self._auth_cache) > self.auth_cache_size:
+                self._auth_cache.popitem(last=False)
+
+        return user
 
     def update_user(self, username: str, **kwargs) -> bool:
         """
@@ -207,14 +465,12 @@ class UserManager:
         Returns:
             bool: True if update was successful, False otherwise
         """
-        # Check if username exists
-        if username not in self.users:
+        # Get user
+        user = self.store.get(username)
+        if user is None:
             logger.warning(f"Username {username} not found")
             return False
 
-        # Get user
-        user = self.users[username]
-
         # Update user data
         for key, value in kwargs.items():
             if key == "password":
@@ -228,8 +484,8 @@ class UserManager:
             else:
                 user[key] = value
 
-        # Save users
-        self._save_users()
+        # Save user
+        self._save_user(user)
 
         logger.info(f"User {username} updated successfully")
         return True
@@ -244,16 +500,15 @@ class UserManager:
         Returns:
             bool: True if deletion was successful, False otherwise
         """
-        # Check if username exists
-        if username not in self.users:
+        # Get user
+        user = self.store.get(username)
+        if user is None:
             logger.warning(f"Username {username} not found")
             return False
 
         # Delete user
-        del self.users[username]
-
-        # Save users
-        self._save_users()
+        self.store.delete(username)
+        self._invalidate(user.get("api_key"))
 
         logger.info(f"User {username} deleted successfully")
         return True
@@ -277,19 +532,21 @@ class UserManager:
         Returns:
             str: New API key, or None if user not found
         """
-        # Check if username exists
-        if username not in self.users:
+        # Get user
+        user = self.store.get(username)
+        if user is None:
             logger.warning(f"Username {username} not found")
             return None
 
         # Generate new API key
+        old_api_key = user.get("api_key")
         api_key = self._generate_api_key()
 
         # Update user
-        self.users[username]["api_key"] = api_key
+        user["api_key"] = api_key
 
-        # Save users
-        self._save_users()
+        # Save user
+        self._save_user(user, old_api_key)
 
         logger.info(f"API key regenerated for user {username}")
         return api_key
@@ -310,7 +567,7 @@ class UserManager:
                 "created_at": user["created_at"],
                 "last_login": user["last_login"],
             }
-            for user in self.users.values()
+            for user in self.store.all()
         ]
 
 
@@ -0,0 +1,413 @@
+"""
+Load-time aggregates for reports.
+
+The loader feeds every message it inserts through an ExportAggregator and
+stores the result in small per-export, per-conversation and per-sender
+tables. SkypeReportGenerator reads those tables instead of scanning all
+messages of an export for every statistic. delete_export() removes an
+export together with its aggregates and cached analysis results.
+"""
+
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.analysis.cache import invalidate_export
+from src.utils.new_structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# One statement per entry, so the tables can be created through any connection
+CREATE_AGGREGATE_TABLES_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS skype_export_aggregates (
+        export_id INTEGER PRIMARY KEY,
+        conversation_count INTEGER NOT NULL DEFAULT 0,
+        message_count INTEGER NOT NULL DEFAULT 0,
+        first_message TIMESTAMP,
+        last_message TIMESTAMP,
+        hour_counts JSONB,
+        weekday_counts JSONB,
+        message_type_counts JSONB,
+        text_length_counts JSONB,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS skype_conversation_aggregates (
+        export_id INTEGER NOT NULL,
+        conversation_id TEXT NOT NULL,
+        display_name TEXT,
+        message_count INTEGER NOT NULL DEFAULT 0,
+        participant_count INTEGER NOT NULL DEFAULT 0,
+        first_message TIMESTAMP,
+        last_message TIMESTAMP,
+        hour_counts JSONB,
+        weekday_counts JSONB,
+        PRIMARY KEY (export_id, conversation_id)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_conversation_aggregates_message_count
+    ON skype_conversation_aggregates (export_id, message_count DESC)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS skype_sender_aggregates (
+        export_id INTEGER NOT NULL,
+        sender_name TEXT NOT NULL,
+        message_count INTEGER NOT NULL DEFAULT 0,
+        total_length BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (export_id, sender_name)
+    )
+    """,
+)
+
+EXPORT_AGGREGATE_COLUMNS = [
+    "export_id", "conversation_count", "message_count", "first_message", "last_message",
+    "hour_counts", "weekday_counts", "message_type_counts", "text_length_counts",
+]
+CONVERSATION_AGGREGATE_COLUMNS = [
+    "export_id", "conversation_id", "display_name", "message_count", "participant_count",
+    "first_message", "last_message", "hour_counts", "weekday_counts",
+]
+SENDER_AGGREGATE_COLUMNS = ["export_id", "sender_name", "message_count", "total_length"]
+
+AGGREGATE_TABLES = (
+    "skype_export_aggregates",
+    "skype_conversation_aggregates",
+    "skype_sender_aggregates",
+)
+
+# Message type whose content lengths are tracked, as in the length report
+TEXT_MESSAGE_TYPE = "RichText"
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    Parse a message timestamp.
+
+    Args:
+        value: datetime or ISO 8601 string (a trailing Z is accepted)
+
+    Returns:
+        Parsed datetime, or None if the value is missing or invalid
+    """
+    if isinstance(value, datetime):
+        return value
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+class _ActivityStats:
+    """Message count, time range and hour/weekday histograms."""
+
+    def __init__(self):
+        self.message_count = 0
+        self.first_message: Optional[datetime] = None
+        self.last_message: Optional[datetime] = None
+        self.hour_counts = [0] * 24
+        # Indexed like PostgreSQL's EXTRACT(DOW): Sunday is 0
+        self.weekday_counts = [0] * 7
+
+    def add(self, timestamp: Optional[datetime]) -> None:
+        self.message_count += 1
+        if timestamp is None:
+            return
+        if self.first_message is None or timestamp < self.first_message:
+            self.first_message = timestamp
+        if self.last_message is None or timestamp > self.last_message:
+            self.last_message = timestamp
+        self.hour_counts[timestamp.hour] += 1
+        self.weekday_counts[(timestamp.weekday() + 1) % 7] += 1
+
+    def merge(self, other: "_ActivityStats") -> None:
+        self.message_count += other.message_count
+        for timestamp in (other.first_message, other.last_message):
+            if timestamp is None:
+                continue
+            if self.first_message is None or timestamp < self.first_message:
+                self.first_message = timestamp
+            if self.last_message is None or timestamp > self.last_message:
+                self.last_message = timestamp
+        self.hour_counts = [a + b for a, b in zip(self.hour_counts, other.hour_counts)]
+        self.weekday_counts = [a + b for a, b in zip(self.weekday_counts, other.weekday_counts)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "message_count": self.message_count,
+            "first_message": self.first_message.isoformat() if self.first_message else None,
+            "last_message": self.last_message.isoformat() if self.last_message else None,
+            "hour_counts": self.hour_counts,
+            "weekday_counts": self.weekday_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_ActivityStats":
+        stats = cls()
+        stats.message_count = data["message_count"]
+        stats.first_message = parse_timestamp(data["first_message"])
+        stats.last_message = parse_timestamp(data["last_message"])
+        stats.hour_counts = list(data["hour_counts"])
+        stats.weekday_counts = list(data["weekday_counts"])
+        return stats
+
+
+class ExportAggregator:
+    """
+    Accumulates report statistics for one export while it is loaded.
+
+    Memory use grows with the number of conversations, senders and distinct
+    message lengths, not with the number of messages. Aggregators of parts
+    of an export can be serialized with to_dict() and combined with merge().
+    """
+
+    def __init__(self):
+        """Initialize an empty aggregator."""
+        self.export = _ActivityStats()
+        self.conversations: Dict[str, _ActivityStats] = {}
+        self.display_names: Dict[str, str] = {}
+        self.participants: Dict[str, set] = {}
+        self.message_types: Counter = Counter()
+        self.text_lengths: Counter = Counter()
+        self.sender_counts: Counter = Counter()
+        self.sender_lengths: Counter = Counter()
+
+    def add_conversation(self, conversation_id: str, display_name: Optional[str] = None) -> None:
+        """
+        Register a conversation, so conversations without messages are counted.
+
+        Args:
+            conversation_id: Conversation ID
+            display_name: Conversation display name
+        """
+        if conversation_id not in self.conversations:
+            self.conversations[conversation_id] = _ActivityStats()
+            self.participants[conversation_id] = set()
+        if display_name:
+            self.display_names[conversation_id] = display_name
+
+    def add_message(
+        self,
+        conversation_id: str,
+        timestamp: Any,
+        sender_id: Optional[str],
+        sender_name: Optional[str],
+        message_type: Optional[str],
+        content: Optional[str],
+    ) -> None:
+        """
+        Add one message to the statistics.
+
+        Args:
+            conversation_id: Conversation the message belongs to
+            timestamp: Message timestamp (datetime or ISO 8601 string)
+            sender_id: Sender ID
+            sender_name: Sender display name
+            message_type: Message type
+            content: Message content
+        """
+        self.add_conversation(conversation_id)
+        parsed = parse_timestamp(timestamp)
+        self.export.add(parsed)
+        self.conversations[conversation_id].add(parsed)
+        if sender_id:
+            self.participants[conversation_id].add(sender_id)
+
+        self.message_types[message_type or ""] += 1
+
+        length = len(content) if content is not None else 0
+        if content is not None and message_type == TEXT_MESSAGE_TYPE:
+            self.text_lengths[length] += 1
+
+        sender = sender_name or sender_id or ""
+        self.sender_counts[sender] += 1
+        self.sender_lengths[sender] += length
+
+    def merge(self, other: "ExportAggregator") -> None:
+        """
+        Add the statistics of another part of the same export.
+
+        A conversation split across parts is counted once, with the
+        participants of all parts.
+
+        Args:
+            other: Aggregator of another part of the export
+        """
+        self.export.merge(other.export)
+        for conversation_id, stats in other.conversations.items():
+            self.add_conversation(conversation_id, other.display_names.get(conversation_id))
+            self.conversations[conversation_id].merge(stats)
+            self.participants[conversation_id] |= other.participants[conversation_id]
+        self.message_types.update(other.message_types)
+        self.text_lengths.update(other.text_lengths)
+        self.sender_counts.update(other.sender_counts)
+        self.sender_lengths.update(other.sender_lengths)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the statistics to JSON-compatible data.
+
+        Returns:
+            Dictionary accepted by from_dict()
+        """
+        return {
+            "export": self.export.to_dict(),
+            "conversations": {
+                conversation_id: {
+                    "stats": stats.to_dict(),
+                    "display_name": self.display_names.get(conversation_id),
+                    "participants": sorted(self.participants[conversation_id]),
+                }
+                for conversation_id, stats in self.conversations.items()
+            },
+            "message_types": dict(self.message_types),
+            "text_lengths": {str(length): count for length, count in self.text_lengths.items()},
+            "sender_counts": dict(self.sender_counts),
+            "sender_lengths": dict(self.sender_lengths),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExportAggregator":
+        """
+        Restore an aggregator serialized with to_dict().
+
+        Args:
+            data: Serialized statistics
+
+        Returns:
+            ExportAggregator with the same statistics
+        """
+        aggregator = cls()
+        aggregator.export = _ActivityStats.from_dict(data["export"])
+        for conversation_id, conversation in data["conversations"].items():
+            aggregator.add_conversation(conversation_id, conversation["display_name"])
+            aggregator.conversations[conversation_id] = _ActivityStats.from_dict(conversation["stats"])
+            aggregator.participants[conversation_id] = set(conversation["participants"])
+        aggregator.message_types = Counter(data["message_types"])
+        aggregator.text_lengths = Counter(
+            {int(length): count for length, count in data["text_lengths"].items()}
+        )
+        aggregator.sender_counts = Counter(data["sender_counts"])
+        aggregator.sender_lengths = Counter(data["sender_lengths"])
+        return aggregator
+
+    def export_rows(self, export_id: int) -> List[Tuple]:
+        """Return the skype_export_aggregates row for an export."""
+        return [(
+            export_id,
+            len(self.conversations),
+            self.export.message_count,
+            self.export.first_message,
+            self.export.last_message,
+            json.dumps(self.export.hour_counts),
+            json.dumps(self.export.weekday_counts),
+            json.dumps(dict(self.message_types)),
+            json.dumps({str(length): count for length, count in self.text_lengths.items()}),
+        )]
+
+    def conversation_rows(self, export_id: int) -> List[Tuple]:
+        """Return the skype_conversation_aggregates rows for an export."""
+        return [
+            (
+                export_id,
+                conversation_id,
+                self.display_names.get(conversation_id),
+                stats.message_count,
+                len(self.participants[conversation_id]),
+                stats.first_message,
+                stats.last_message,
+                json.dumps(stats.hour_counts),
+                json.dumps(stats.weekday_counts),
+            )
+            for conversation_id, stats in self.conversations.items()
+        ]
+
+    def sender_rows(self, export_id: int) -> List[Tuple]:
+        """Return the skype_sender_aggregates rows for an export."""
+        return [
+            (export_id, sender, count, self.sender_lengths[sender])
+            for sender, count in self.sender_counts.items()
+        ]
+
+    def table_rows(self, export_id: int) -> Dict[str, Tuple[List[str], List[Tuple]]]:
+        """
+        Return the rows of every aggregate table for an export.
+
+        Args:
+            export_id: Export the aggregates belong to
+
+        Returns:
+            (columns, rows) by table name, in AGGREGATE_TABLES order
+        """
+        return {
+            "skype_export_aggregates": (EXPORT_AGGREGATE_COLUMNS, self.export_rows(export_id)),
+            "skype_conversation_aggregates": (
+                CONVERSATION_AGGREGATE_COLUMNS, self.conversation_rows(export_id)
+            ),
+            "skype_sender_aggregates": (SENDER_AGGREGATE_COLUMNS, self.sender_rows(export_id)),
+        }
+
+    def write(self, db_manager, export_id: int) -> None:
+        """
+        Replace the stored aggregates of an export in one transaction.
+
+        Args:
+            db_manager: Database manager with execute, bulk_insert and
+                transaction methods (DatabaseManager or SQLiteDatabaseManager)
+            export_id: Export the aggregates belong to
+        """
+        rows = self.table_rows(export_id)
+
+        db_manager.begin_transaction()
+        try:
+            for statement in CREATE_AGGREGATE_TABLES_SQL:
+                db_manager.execute(statement)
+            for table in AGGREGATE_TABLES:
+                db_manager.execute(f"DELETE FROM {table} WHERE export_id = %s", (export_id,))
+                columns, values = rows[table]
+                if values:
+                    db_manager.bulk_insert(table, columns, values)
+            db_manager.commit()
+        except Exception:
+            db_manager.rollback()
+            raise
+
+        logger.info(
+            f"Stored aggregates for export {export_id}",
+            extra={
+                "conversation_count": len(self.conversations),
+                "message_count": self.export.message_count,
+                "sender_count": len(self.sender_counts),
+            }
+        )
+
+
+def delete_export(db_connection, export_id: int) -> None:
+    """
+    Delete an export row and its aggregates, and drop its cached analysis results.
+
+    Args:
+        db_connection: Database connection with execute, commit and rollback
+            (begin_transaction is called when available)
+        export_id: Export to delete
+    """
+    if hasattr(db_connection, "begin_transaction"):
+        db_connection.begin_transaction()
+    try:
+        for statement in CREATE_AGGREGATE_TABLES_SQL:
+            db_connection.execute(statement)
+        for table in AGGREGATE_TABLES:
+            db_connection.execute(f"DELETE FROM {table} WHERE export_id = %s", (export_id,))
+        db_connection.execute("DELETE FROM skype_exports WHERE id = %s", (export_id,))
+        db_connection.commit()
+    except Exception:
+        db_connection.rollback()
+        raise
+
+    invalidate_export(export_id)
+    logger.info(f"Deleted export {export_id}")
@@ -100,6 +100,7 @@ CREATE TABLE IF NOT EXISTS clean_skype_message_locations (
 
 -- Create indexes for faster querying
 CREATE INDEX IF NOT EXISTS idx_conversation_id ON clean_skype_messages(conversation_id);
+CREATE INDEX IF NOT EXISTS idx_conversation_timestamp ON clean_skype_messages(conversation_id, timestamp, id);
 CREATE INDEX IF NOT EXISTS idx_timestamp ON clean_skype_messages(timestamp);
 CREATE INDEX IF NOT EXISTS idx_sender_id ON clean_skype_messages(sender_id);
 CREATE INDEX IF NOT EXISTS idx_message_type ON clean_skype_messages(message_type);
@@ -107,6 +108,7 @@ CREATE INDEX IF NOT EXISTS idx_conv_first_msg ON clean_skype_conversations(first
 CREATE INDEX IF NOT EXISTS idx_conv_last_msg ON clean_skype_conversations(last_message_time);
 CREATE INDEX IF NOT EXISTS idx_conv_raw_export ON clean_skype_conversations(raw_export_id);
 CREATE INDEX IF NOT EXISTS idx_structured_data ON clean_skype_messages USING GIN (structured_data);
+CREATE INDEX IF NOT EXISTS idx_poll_options_poll_id ON clean_skype_poll_options(poll_id);
 """
 
 # SQL for inserting conversation data
@@ -207,14 +209,40 @@ WHERE raw_export_id = %s
 ORDER BY last_message_time DESC;
 """
 
-# SQL for retrieving messages for a conversation
+# SQL for retrieving a page of messages for a conversation, ordered by
+# (timestamp, id) so pages can be continued with a keyset condition.
+# LIMIT NULL returns all remaining messages.
 GET_MESSAGES_SQL = """
 SELECT
     id, message_id, conversation_id, timestamp, sender_id,
     sender_name, message_type, content, raw_content, is_edited, structured_data, created_at
 FROM clean_skype_messages
 WHERE conversation_id = %s
-ORDER BY timestamp ASC;
+ORDER BY timestamp ASC, id ASC
+LIMIT %s;
+"""
+
+# SQL for retrieving the page of messages after a timestamp
+GET_MESSAGES_AFTER_TIMESTAMP_SQL = """
+SELECT
+    id, message_id, conversation_id, timestamp, sender_id,
+    sender_name, message_type, content, raw_content, is_edited, structured_data, created_at
+FROM clean_skype_messages
+WHERE conversation_id = %s AND timestamp > %s
+ORDER BY timestamp ASC, id ASC
+LIMIT %s;
+"""
+
+# SQL for retrieving the page of messages after a (timestamp, id) key, which
+# continues correctly through messages that share a timestamp
+GET_MESSAGES_AFTER_KEY_SQL = """
+SELECT
+    id, message_id, conversation_id, timestamp, sender_id,
+    sender_name, message_type, content, raw_content, is_edited, structured_data, created_at
+FROM clean_skype_messages
+WHERE conversation_id = %s AND (timestamp, id) > (%s, %s)
+ORDER BY timestamp ASC, id ASC
+LIMIT %s;
 """
 
 # SQL for retrieving conversation by ID
@@ -236,31 +264,117 @@ FROM clean_skype_messages
 WHERE message_id = %s;
 """
 
-# SQL for retrieving media data for a message
-GET_MEDIA_BY_MESSAGE_ID_SQL = """
+# SQL for retrieving media data for a set of messages
+GET_MEDIA_BY_MESSAGE_IDS_SQL = """
 SELECT
     id, message_id, media_filename, media_filesize, media_filetype,
     media_url, media_thumbnail_url, media_width, media_height,
     media_duration, media_description, created_at
 FROM clean_skype_message_media
-WHERE message_id = %s;
+WHERE message_id = ANY(%s);
 """
 
-# SQL for retrieving poll data for a message
-GET_POLL_BY_MESSAGE_ID_SQL = """
+# SQL for retrieving poll data for a set of messages
+GET_POLLS_BY_MESSAGE_IDS_SQL = """
 SELECT
     p.id, p.message_id, p.poll_question, p.created_at,
-    array_agg(o.option_text) as options
+    array_agg(o.option_text ORDER BY o.id) as options
 FROM clean_skype_message_polls p
 LEFT JOIN clean_skype_poll_options o ON p.id = o.poll_id
-WHERE p.message_id = %s
+WHERE p.message_id = ANY(%s)
 GROUP BY p.id, p.message_id, p.poll_question, p.created_at;
 """
 
-# SQL for retrieving location data for a message
-GET_LOCATION_BY_MESSAGE_ID_SQL = """
+# SQL for retrieving location data for a set of messages
+GET_LOCATIONS_BY_MESSAGE_IDS_SQL = """
 SELECT
     id, message_id, latitude, longitude, address, created_at
 FROM clean_skype_message_locations
-WHERE message_id = %s;
-"""
\ No newline at end of file
+WHERE message_id = ANY(%s);
+"""
+
+# Set-based variants of the inserts above, for use with psycopg2's
+# execute_values (the single %s expands to a multi-row VALUES list)
+
+# SQL for upserting a batch of conversations
+BATCH_INSERT_CONVERSATIONS_SQL = """
+INSERT INTO clean_skype_conversations (
+    conversation_id, display_name, raw_export_id,
+    first_message_time, last_message_time, message_count
+)
+VALUES %s
+ON CONFLICT (conversation_id)
+DO UPDATE SET
+    display_name = EXCLUDED.display_name,
+    raw_export_id = EXCLUDED.raw_export_id,
+    first_message_time = EXCLUDED.first_message_time,
+    last_message_time = EXCLUDED.last_message_time,
+    message_count = EXCLUDED.message_count,
+    updated_at = NOW();
+"""
+
+# SQL for inserting a batch of messages; returns the IDs of new messages
+BATCH_INSERT_MESSAGES_SQL = """
+INSERT INTO clean_skype_messages (
+    message_id, conversation_id, timestamp, sender_id,
+    sender_name, message_type, content, raw_content, is_edited, structured_data
+)
+VALUES %s
+ON CONFLICT (message_id)
+DO NOTHING
+RETURNING message_id;
+"""
+
+# SQL for upserting a batch of media rows
+BATCH_INSERT_MEDIA_SQL = """
+INSERT INTO clean_skype_message_media (
+    message_id, media_filename, media_filesize, media_filetype,
+    media_url, media_thumbnail_url, media_width, media_height,
+    media_duration, media_description
+)
+VALUES %s
+ON CONFLICT (message_id)
+DO UPDATE SET
+    media_filename = EXCLUDED.media_filename,
+    media_filesize = EXCLUDED.media_filesize,
+    media_filetype = EXCLUDED.media_filetype,
+    media_url = EXCLUDED.media_url,
+    media_thumbnail_url = EXCLUDED.media_thumbnail_url,
+    media_width = EXCLUDED.media_width,
+    media_height = EXCLUDED.media_height,
+    media_duration = EXCLUDED.media_duration,
+    media_description = EXCLUDED.media_description;
+"""
+
+# SQL for upserting a batch of polls; returns poll IDs for their options
+BATCH_INSERT_POLLS_SQL = """
+INSERT INTO clean_skype_message_polls (
+    message_id, poll_question
+)
+VALUES %s
+ON CONFLICT (message_id)
+DO UPDATE SET
+    poll_question = EXCLUDED.poll_question
+RETURNING id, message_id;
+"""
+
+# SQL for inserting a batch of poll options
+BATCH_INSERT_POLL_OPTIONS_SQL = """
+INSERT INTO clean_skype_poll_options (
+    poll_id, option_text
+)
+VALUES %s;
+"""
+
+# SQL for upserting a batch of location rows
+BATCH_INSERT_LOCATIONS_SQL = """
+INSERT INTO clean_skype_message_locations (
+    message_id, latitude, longitude, address
+)
+VALUES %s
+ON CONFLICT (message_id)
+DO UPDATE SET
+    latitude = EXCLUDED.latitude,
+    longitude = EXCLUDED.longitude,
+    address = EXCLUDED.address;
+"""
@@ -6,10 +6,17 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 
-from psycopg2.extras import Json
+from psycopg2.extras import Json, execute_values
 from psycopg2.pool import SimpleConnectionPool
 
+from ..prepared_statements import PreparedStatementCache
 from .models import (
+    BATCH_INSERT_CONVERSATIONS_SQL,
+    BATCH_INSERT_LOCATIONS_SQL,
+    BATCH_INSERT_MEDIA_SQL,
+    BATCH_INSERT_MESSAGES_SQL,
+    BATCH_INSERT_POLL_OPTIONS_SQL,
+    BATCH_INSERT_POLLS_SQL,
     CREATE_CLEAN_TABLES_SQL,
     INSERT_CONVERSATION_SQL,
     INSERT_MESSAGE_SQL,
@@ -19,11 +26,13 @@ from .models import (
     INSERT_LOCATION_SQL,
     GET_CONVERSATIONS_SQL,
     GET_MESSAGES_SQL,
+    GET_MESSAGES_AFTER_TIMESTAMP_SQL,
+    GET_MESSAGES_AFTER_KEY_SQL,
     GET_CONVERSATION_BY_ID_SQL,
     GET_MESSAGE_BY_ID_SQL,
-    GET_MEDIA_BY_MESSAGE_ID_SQL,
-    GET_POLL_BY_MESSAGE_ID_SQL,
-    GET_LOCATION_BY_MESSAGE_ID_SQL
+    GET_MEDIA_BY_MESSAGE_IDS_SQL,
+    GET_POLLS_BY_MESSAGE_IDS_SQL,
+    GET_LOCATIONS_BY_MESSAGE_IDS_SQL
 )
 
 # Set up logging
@@ -35,6 +44,7 @@ class SkypeCleanDataStorage:
 
     MIN_CONNECTIONS = 1
     MAX_CONNECTIONS = 10
+    DEFAULT_BATCH_SIZE = 1000
 
     def __init__(self, connection_params: Dict[str, str]):
         """
@@ -46,6 +56,8 @@ class SkypeCleanDataStorage:
         """
         self.connection_params = connection_params
         self.pool = None
+        # Per-row inserts and lookups run as prepared statements
+        self.statements = PreparedStatementCache()
         self.initialize_connection_pool()
         self.ensure_tables_exist()
 
@@ -114,7 +126,8 @@ class SkypeCleanDataStorage:
         conn = self.get_connection()
         try:
             with conn.cursor() as cur:
-                cur.execute(
+                self.statements.execute(
+                    cur,
                     INSERT_CONVERSATION_SQL,
                     (
                         conversation_id,
@@ -171,7 +184,8 @@ class SkypeCleanDataStorage:
         try:
             with conn.cursor() as cur:
                 # Insert the message
-                cur.execute(
+                self.statements.execute(
+                    cur,
                     INSERT_MESSAGE_SQL,
                     (
                         message_id, conversation_id, timestamp, sender_id,
@@ -216,28 +230,41 @@ class SkypeCleanDataStorage:
         if any(key.startswith('location_') for key in structured_data.keys()):
             self._store_location_data(cursor, message_id, structured_data)
 
+    @staticmethod
+    def _media_row(message_id: str, structured_data: Dict[str, Any]) -> Tuple:
+        """Build the media table row for a message."""
+        return (
+            message_id,
+            structured_data.get('media_filename', ''),
+            int(structured_data.get('media_filesize', 0)) if structured_data.get('media_filesize', '').isdigit() else 0,
+            structured_data.get('media_filetype', ''),
+            structured_data.get('media_url', ''),
+            structured_data.get('media_thumbnail_url', ''),
+            int(structured_data.get('media_width', 0)) if structured_data.get('media_width', '').isdigit() else None,
+            int(structured_data.get('media_height', 0)) if structured_data.get('media_height', '').isdigit() else None,
+            structured_data.get('media_duration', ''),
+            structured_data.get('media_description', '')
+        )
+
+    @staticmethod
+    def _location_row(message_id: str, structured_data: Dict[str, Any]) -> Tuple:
+        """Build the location table row for a message."""
+        return (
+            message_id,
+            structured_data.get('location_latitude', ''),
+            structured_data.get('location_longitude', ''),
+            structured_data.get('location_address', '')
+        )
+
     def _store_media_data(self, cursor, message_id: str, structured_data: Dict[str, Any]) -> None:
         """Store media data in the media table."""
-        cursor.execute(
-            INSERT_MEDIA_SQL,
-            (
-                message_id,
-                structured_data.get('media_filename', ''),
-                int(structured_data.get('media_filesize', 0)) if structured_data.get('media_filesize', '').isdigit() else 0,
-                structured_data.get('media_filetype', ''),
-                structured_data.get('media_url', ''),
-                structured_data.get('media_thumbnail_url', ''),
-                int(structured_data.get('media_width', 0)) if structured_data.get('media_width', '').isdigit() else None,
-                int(structured_data.get('media_height', 0)) if structured_data.get('media_height', '').isdigit() else None,
-                structured_data.get('media_duration', ''),
-                structured_data.get('media_description', '')
-            )
-        )
+        self.statements.execute(cursor, INSERT_MEDIA_SQL, self._media_row(message_id, structured_data))
 
     def _store_poll_data(self, cursor, message_id: str, structured_data: Dict[str, Any]) -> None:
         """Store poll data in the poll tables."""
         # Insert poll
-        cursor.execute(
+        self.statements.execute(
+            cursor,
             INSERT_POLL_SQL,
             (
                 message_id,
@@ -250,22 +277,11 @@ class SkypeCleanDataStorage:
             poll_id = poll_result[0]
             # Insert poll options
             for option in structured_data['poll_options']:
-                cursor.execute(
-                    INSERT_POLL_OPTION_SQL,
-                    (poll_id, option)
-                )
+                self.statements.execute(cursor, INSERT_POLL_OPTION_SQL, (poll_id, option))
 
     def _store_location_data(self, cursor, message_id: str, structured_data: Dict[str, Any]) -> None:
         """Store location data in the location table."""
-        cursor.execute(
-            INSERT_LOCATION_SQL,
-            (
-                message_id,
-                structured_data.get('location_latitude', ''),
-                structured_data.get('location_longitude', ''),
-                structured_data.get('location_address', '')
-            )
-        )
+        self.statements.execute(cursor, INSERT_LOCATION_SQL, self._location_row(message_id, structured_data))
 
     def get_conversations(self, raw_export_id: int) -> List[Dict[str, Any]]:
         """
@@ -287,42 +303,46 @@ class SkypeCleanDataStorage:
         finally:
             self.return_connection(conn)
 
-    def get_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
+    def get_messages(
+        self,
+        conversation_id: str,
+        after_timestamp: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Get all messages for a conversation with structured data.
+        Get messages for a conversation with structured data.
+
+        Messages are ordered by (timestamp, id). To page through a
+        conversation, pass the timestamp and id of the last message of the
+        previous page as after_timestamp and after_id. Specialized data for
+        the whole page is loaded with one query per table.
 
         Args:
             conversation_id: ID of the conversation
+            after_timestamp: Only return messages after this timestamp
+            limit: Maximum number of messages to return (all if None)
+            after_id: Row id of the last message already seen; breaks ties
+                between messages sharing after_timestamp
 
         Returns:
             list: List of message data
         """
+        if after_timestamp is None:
+            query, params = GET_MESSAGES_SQL, (conversation_id, limit)
+        elif after_id is None:
+            query = GET_MESSAGES_AFTER_TIMESTAMP_SQL
+            params = (conversation_id, after_timestamp, limit)
+        else:
+            query = GET_MESSAGES_AFTER_KEY_SQL
+            params = (conversation_id, after_timestamp, after_id, limit)
+
         conn = self.get_connection()
         try:
             with conn.cursor() as cur:
-                cur.execute(GET_MESSAGES_SQL, (conversation_id,))
-                messages = []
-
-                for row in cur.fetchall():
-                    message = {
-                        'id': row[0],
-                        'message_id': row[1],
-                        'conversation_id': row[2],
-                        'timestamp': row[3],
-                        'sender_id': row[4],
-                        'sender_name': row[5],
-                        'message_type': row[6],
-                        'content': row[7],
-                        'raw_content': row[8],
-                        'is_edited': row[9],
-                        'structured_data': row[10],
-                        'created_at': row[11]
-                    }
-
-                    # Enrich with specialized data
-                    message = self._enrich_message_with_specialized_data(cur, message)
-                    messages.append(message)
-
+                cur.execute(query, params)
+                messages = [self._message_from_row(row) for row in cur.fetchall()]
+                self._load_specialized_data(cur, messages)
                 return messages
         except Exception as e:
             logger.error(f"Failed to get messages: {e}")
@@ -366,30 +386,16 @@ class SkypeCleanDataStorage:
         try:
             with conn.cursor() as cur:
                 # Get basic message data
-                cur.execute(GET_MESSAGE_BY_ID_SQL, (message_id,))
+                self.statements.execute(cur, GET_MESSAGE_BY_ID_SQL, (message_id,))
                 message_row = cur.fetchone()
 
                 if not message_row:
                     return None
 
-                # Create message dict
-                message = {
-                    'id': message_row[0],
-                    'message_id': message_row[1],
-                    'conversation_id': message_row[2],
-                    'timestamp': message_row[3],
-                    'sender_id': message_row[4],
-                    'sender_name': message_row[5],
-                    'message_type': message_row[6],
-                    'content': message_row[7],
-                    'raw_content': message_row[8],
-                    'is_edited': message_row[9],
-                    'structured_data': message_row[10],
-                    'created_at': message_row[11]
-                }
+                message = self._message_from_row(message_row)
 
                 # Get specialized data if available
-                message = self._enrich_message_with_specialized_data(cur, message)
+                self._load_specialized_data(cur, [message])
 
                 return message
         except Exception as e:
@@ -398,24 +404,45 @@ class SkypeCleanDataStorage:
         finally:
             self.return_connection(conn)
 
-    def _enrich_message_with_specialized_data(self, cursor, message: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _message_from_row(row: Tuple) -> Dict[str, Any]:
+        """Build a message dict from a GET_MESSAGES_SQL/GET_MESSAGE_BY_ID_SQL row."""
+        return {
+            'id': row[0],
+            'message_id': row[1],
+            'conversation_id': row[2],
+            'timestamp': row[3],
+            'sender_id': row[4],
+            'sender_name': row[5],
+            'message_type': row[6],
+            'content': row[7],
+            'raw_content': row[8],
+            'is_edited': row[9],
+            'structured_data': row[10],
+            'created_at': row[11]
+        }
+
+    def _load_specialized_data(self, cursor, messages: List[Dict[str, Any]]) -> None:
         """
-        Enrich a message with specialized data from related tables.
+        Attach media, poll and location data to a set of messages.
+
+        Runs one query per specialized table for all of the messages and
+        assembles the results in memory.
 
         Args:
             cursor: Database cursor
-            message: Message data
-
-        Returns:
-            dict: Enriched message data
+            messages: Message data, updated in place
         """
-        message_id = message['message_id']
+        if not messages:
+            return
+
+        by_id = {message['message_id']: message for message in messages}
+        message_ids = list(by_id)
 
         # Get media data
-        cursor.execute(GET_MEDIA_BY_MESSAGE_ID_SQL, (message_id,))
-        media_row = cursor.fetchone()
-        if media_row:
-            message['media'] = {
+        cursor.execute(GET_MEDIA_BY_MESSAGE_IDS_SQL, (message_ids,))
+        for media_row in cursor.fetchall():
+            by_id[media_row[1]]['media'] = {
                 'id': media_row[0],
                 'message_id': media_row[1],
                 'filename': media_row[2],
@@ -431,10 +458,9 @@ class SkypeCleanDataStorage:
             }
 
         # Get poll data
-        cursor.execute(GET_POLL_BY_MESSAGE_ID_SQL, (message_id,))
-        poll_row = cursor.fetchone()
-        if poll_row:
-            message['poll'] = {
+        cursor.execute(GET_POLLS_BY_MESSAGE_IDS_SQL, (message_ids,))
+        for poll_row in cursor.fetchall():
+            by_id[poll_row[1]]['poll'] = {
                 'id': poll_row[0],
                 'message_id': poll_row[1],
                 'question': poll_row[2],
@@ -443,10 +469,9 @@ class SkypeCleanDataStorage:
             }
 
         # Get location data
-        cursor.execute(GET_LOCATION_BY_MESSAGE_ID_SQL, (message_id,))
-        location_row = cursor.fetchone()
-        if location_row:
-            message['location'] = {
+        cursor.execute(GET_LOCATIONS_BY_MESSAGE_IDS_SQL, (message_ids,))
+        for location_row in cursor.fetchall():
+            by_id[location_row[1]]['location'] = {
                 'id': location_row[0],
                 'message_id': location_row[1],
                 'latitude': location_row[2],
@@ -455,62 +480,173 @@ class SkypeCleanDataStorage:
                 'created_at': location_row[5]
             }
 
-        return message
-
     def store_transformed_data(
         self,
         transformed_data: Dict[str, Any],
-        raw_export_id: int
+        raw_export_id: int,
+        batch_size: Optional[int] = None
     ) -> Tuple[int, int]:
         """
         Store transformed data in the database.
 
+        Rows are written with set-based statements, one transaction per batch
+        of batch_size messages. Conversations are written in the batch that
+        contains their first message.
+
         Args:
             transformed_data: The transformed data structure
             raw_export_id: ID of the raw export this data belongs to
+            batch_size: Number of messages per batch (defaults to DEFAULT_BATCH_SIZE)
 
         Returns:
             Tuple[int, int]: (Number of conversations stored, Number of messages stored)
         """
+        batch_size = batch_size or self.DEFAULT_BATCH_SIZE
         conversation_count = 0
         message_count = 0
+        conversation_rows: List[Tuple] = []
+        message_rows: List[Tuple] = []
+        structured_rows: List[Tuple[str, Dict[str, Any]]] = []
 
         try:
-            # Store conversations and messages
             for conv_id, conv_data in transformed_data.get('conversations', {}).items():
-                # Store conversation
-                self.store_conversation(
-                    conversation_id=conv_id,
-                    display_name=conv_data.get('displayName', ''),
-                    raw_export_id=raw_export_id,
-                    first_message_time=conv_data.get('firstMessageTime'),
-                    last_message_time=conv_data.get('lastMessageTime'),
-                    message_count=conv_data.get('messageCount', 0)
-                )
+                conversation_rows.append((
+                    conv_id,
+                    conv_data.get('displayName', ''),
+                    raw_export_id,
+                    conv_data.get('firstMessageTime'),
+                    conv_data.get('lastMessageTime'),
+                    conv_data.get('messageCount', 0)
+                ))
                 conversation_count += 1
 
-                # Store messages for this conversation
                 for msg in conv_data.get('messages', []):
-                    self.store_message(
-                        message_id=msg.get('id', f"{conv_id}_{msg.get('timestamp')}"),
-                        conversation_id=conv_id,
-                        timestamp=msg.get('timestamp'),
-                        sender_id=msg.get('fromId', ''),
-                        sender_name=msg.get('fromName', ''),
-                        message_type=msg.get('type', ''),
-                        content=msg.get('content', ''),
-                        raw_content=msg.get('rawContent', ''),
-                        is_edited=msg.get('isEdited', False),
-                        structured_data=msg.get('structuredData', {})
-                    )
+                    message_id = msg.get('id', f"{conv_id}_{msg.get('timestamp')}")
+                    structured_data = msg.get('structuredData', {})
+                    message_rows.append((
+                        message_id,
+                        conv_id,
+                        msg.get('timestamp'),
+                        msg.get('fromId', ''),
+                        msg.get('fromName', ''),
+                        msg.get('type', ''),
+                        msg.get('content', ''),
+                        msg.get('rawContent', ''),
+                        msg.get('isEdited', False),
+                        Json(structured_data) if structured_data else None
+                    ))
+                    if structured_data:
+                        structured_rows.append((message_id, structured_data))
                     message_count += 1
 
+                    if len(message_rows) >= batch_size:
+                        self._write_batch(conversation_rows, message_rows, structured_rows)
+                        conversation_rows, message_rows, structured_rows = [], [], []
+
+            if conversation_rows or message_rows:
+                self._write_batch(conversation_rows, message_rows, structured_rows)
+
             logger.info(f"Stored {conversation_count} conversations and {message_count} messages")
             return conversation_count, message_count
         except Exception as e:
             logger.error(f"Failed to store transformed data: {e}")
             raise
 
+    def _write_batch(
+        self,
+        conversation_rows: List[Tuple],
+        message_rows: List[Tuple],
+        structured_rows: List[Tuple[str, Dict[str, Any]]]
+    ) -> None:
+        """
+        Write a batch of conversations, messages and specialized rows in one transaction.
+
+        Args:
+            conversation_rows: Conversation rows in INSERT_CONVERSATION_SQL column order
+            message_rows: Message rows in INSERT_MESSAGE_SQL column order
+            structured_rows: (message_id, structured_data) pairs for the messages
+        """
+        conn = self.get_connection()
+        try:
+            with conn.cursor() as cur:
+                if conversation_rows:
+                    # A statement can't upsert the same key twice; keep the last row
+                    unique_conversations = {row[0]: row for row in conversation_rows}
+                    execute_values(
+                        cur, BATCH_INSERT_CONVERSATIONS_SQL,
+                        list(unique_conversations.values()), page_size=len(unique_conversations)
+                    )
+
+                inserted = set()
+                if message_rows:
+                    inserted = {
+                        row[0] for row in execute_values(
+                            cur, BATCH_INSERT_MESSAGES_SQL, message_rows,
+                            page_size=len(message_rows), fetch=True
+                        )
+                    }
+
+                # Specialized data is only stored for newly inserted messages
+                media_rows: Dict[str, Tuple] = {}
+                location_rows: Dict[str, Tuple] = {}
+                polls: Dict[str, Dict[str, Any]] = {}
+                for message_id, structured_data in structured_rows:
+                    if message_id not in inserted:
+                        continue
+                    if any(key.startswith('media_') for key in structured_data):
+                        media_rows[message_id] = self._media_row(message_id, structured_data)
+                    if 'poll_question' in structured_data and 'poll_options' in structured_data:
+                        polls[message_id] = structured_data
+                    if any(key.startswith('location_') for key in structured_data):
+                        location_rows[message_id] = self._location_row(message_id, structured_data)
+
+                if media_rows:
+                    execute_values(
+                        cur, BATCH_INSERT_MEDIA_SQL, list(media_rows.values()),
+                        page_size=len(media_rows)
+                    )
+                if location_rows:
+                    execute_values(
+                        cur, BATCH_INSERT_LOCATIONS_SQL, list(location_rows.values()),
+                        page_size=len(location_rows)
+                    )
+                if polls:
+                    poll_ids = execute_values(
+                        cur, BATCH_INSERT_POLLS_SQL,
+                        [(message_id, data.get('poll_question', '')) for message_id, data in polls.items()],
+                        page_size=len(polls), fetch=True
+                    )
+                    option_rows = [
+                        (poll_id, option)
+                        for poll_id, message_id in poll_ids
+                        for option in polls[message_id]['poll_options']
+                    ]
+                    if option_rows:
+                        execute_values(
+                            cur, BATCH_INSERT_POLL_OPTIONS_SQL, option_rows,
+                            page_size=len(option_rows)
+                        )
+
+            conn.commit()
+            logger.debug(
+                f"Stored batch of {len(conversation_rows)} conversations and {len(message_rows)} messages"
+            )
+        except Exception as e:
+            logger.error(f"Failed to store batch: {e}")
+            conn.rollback()
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def get_statement_stats(self) -> Dict[str, Any]:
+        """
+        Get prepared statement cache statistics.
+
+        Returns:
+            Dict[str, Any]: Cache hits, misses and evictions
+        """
+        return self.statements.get_stats()
+
     def close(self) -> None:
         """Close all database connections."""
         if self.pool:
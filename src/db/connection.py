@@ -7,12 +7,13 @@ DatabaseConnectionProtocol interface for database operations.
 
 import logging
 import os
-from typing import Dict, Any, List, Tuple, Optional, Union
+from typing import Dict, Any, Iterator, List, Tuple, Optional, Union
 import psycopg2
 from psycopg2.extras import DictCursor, execute_values
 
 from src.utils.interfaces import DatabaseConnectionProtocol
 from src.utils.dependencies import get_psycopg2
+from src.utils.db_connection import DEFAULT_STREAM_ITERSIZE, iter_server_side_rows
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +86,10 @@ class DatabaseConnection(DatabaseConnectionProtocol):
             self.connection = None
             logger.info("Disconnected from database")
 
+    def close(self) -> None:
+        """Close the database connection (same as disconnect())."""
+        self.disconnect()
+
     def execute(self, query: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """Execute a database query.
 
@@ -134,6 +139,40 @@ class DatabaseConnection(DatabaseConnectionProtocol):
                 self.connection.rollback()
             raise
 
+    def stream_query(
+        self,
+        query: str,
+        params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+        itersize: int = DEFAULT_STREAM_ITERSIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """Execute a query and stream the results with a server-side cursor.
+
+        Unlike execute_query, only itersize rows are held in memory at a time.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+            itersize: Number of rows to fetch per round trip
+
+        Yields:
+            Dictionaries containing the query results
+
+        Raises:
+            Exception: If query execution fails
+        """
+        self._ensure_connected()
+
+        try:
+            yield from iter_server_side_rows(
+                self.connection, query, params, itersize, as_dicts=True
+            )
+        except Exception as e:
+            error_msg = f"Error streaming query: {e}"
+            logger.error(error_msg)
+            if self.connection:
+                self.connection.rollback()
+            raise
+
     def execute_batch(self, query: str, params_list: List[Dict[str, Any]]) -> None:
         """Execute a batch of database queries.
 
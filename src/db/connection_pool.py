@@ -10,13 +10,15 @@ for each database operation.
 import logging
 import time
 import threading
+from collections import deque
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import psycopg2
 from psycopg2 import pool
 from psycopg2.extras import DictCursor, execute_batch
 
+from src.utils.db_connection import DEFAULT_STREAM_ITERSIZE, iter_server_side_rows
 from src.utils.error_handling import ErrorContext, handle_errors, report_error
 from src.utils.interfaces import DatabaseConnectionProtocol, ConnectionPoolProtocol
 from src.utils.structured_logging import get_logger, log_execution_time
@@ -24,6 +26,50 @@ from src.utils.structured_logging import get_logger, log_execution_time
 # Set up logger
 logger = get_logger(__name__)
 
+# Upper bounds (in milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+# Validation-on-borrow policies
+VALIDATE_NEVER = "never"
+VALIDATE_ALWAYS = "always"
+VALIDATE_IDLE = "idle"
+VALIDATION_POLICIES = (VALIDATE_NEVER, VALIDATE_ALWAYS, VALIDATE_IDLE)
+
+
+class _LatencyHistogram:
+    """Counts durations into fixed millisecond buckets. Not thread-safe."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record one duration in seconds."""
+        ms = seconds * 1000
+        index = len(LATENCY_BUCKETS_MS)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the histogram as a JSON-serializable dictionary."""
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS]
+        labels.append(f">{LATENCY_BUCKETS_MS[-1]}ms")
+        return {
+            "count": self.count,
+            "avg_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
 
 class PostgresConnectionPool(ConnectionPoolProtocol):
     """
@@ -42,6 +88,8 @@ class PostgresConnectionPool(ConnectionPoolProtocol):
         connection_timeout: float = 30.0,
         idle_timeout: float = 300.0,
         max_age: float = 1800.0,
+        validation_policy: str = VALIDATE_NEVER,
+        validation_idle_time: float = 30.0,
     ):
         """
         Initialize the connection pool.
@@ -53,19 +101,47 @@ class PostgresConnectionPool(ConnectionPoolProtocol):
             connection_timeout: Timeout in seconds when acquiring a connection
             idle_timeout: Time in seconds after which idle connections are closed
             max_age: Maximum age of a connection in seconds before it's recycled
+            validation_policy: When to check a connection with SELECT 1 before
+                handing it out: "never", "always", or "idle" (only when it has
+                been idle for longer than validation_idle_time)
+            validation_idle_time: Idle time in seconds after which the "idle"
+                policy validates a connection
+
+        Raises:
+            ValueError: If validation_policy is not a known policy
         """
+        if validation_policy not in VALIDATION_POLICIES:
+            raise ValueError(
+                f"Unknown validation policy {validation_policy!r}, "
+                f"expected one of {', '.join(VALIDATION_POLICIES)}"
+            )
+
         self.db_config = db_config
         self.min_connections = min_connections
         self.max_connections = max_connections
         self.connection_timeout = connection_timeout
         self.idle_timeout = idle_timeout
         self.max_age = max_age
+        self.validation_policy = validation_policy
+        self.validation_idle_time = validation_idle_time
 
         # Connection tracking
         self.pool = None
         self.lock = threading.RLock()
         self.connection_timestamps = {}
         self.in_use_connections = set()
+        # Slots reserved by threads taking a connection outside the lock
+        self._reserved = 0
+
+        # Threads waiting for a connection, in arrival order. Each waiter has
+        # its own condition on the pool lock so a release wakes only the head.
+        self._waiters = deque()
+        self._peak_waiters = 0
+        self._checkout_started = {}
+        self._wait_times = _LatencyHistogram()
+        self._checkout_durations = _LatencyHistogram()
+        self._timeouts = 0
+        self._validation_failures = 0
 
         # Initialize the pool
         self._initialize_pool()
@@ -135,19 +211,21 @@ class PostgresConnectionPool(ConnectionPoolProtocol):
                 len(self.connection_timestamps) > self.min_connections):
                 connections_to_close.append(conn_id)
 
-        # Close identified connections
-        for conn_id in connections_to_close:
-            try:
-                # Find the connection object
-                for conn in self.pool._pool:
-                    if id(conn) == conn_id:
-                        self.pool._pool.remove(conn)
-                        conn.close()
-                        del self.connection_timestamps[conn_id]
-                        logger.debug(f"Closed idle connection (idle for {current_time - timestamp:.1f}s)")
-                        break
-            except Exception as e:
-                logger.warning(f"Error closing idle connection: {e}")
+        # Close identified connections. The underlying pool's own lock guards
+        # its list, as connections are borrowed without holding self.lock.
+        with self.pool._lock:
+            for conn_id in connections_to_close:
+                try:
+                    # Find the connection object
+                    for conn in self.pool._pool:
+                        if id(conn) == conn_id:
+                            self.pool._pool.remove(conn)
+                            conn.close()
+                            del self.connection_timestamps[conn_id]
+                            logger.debug(f"Closed idle connection (idle for {current_time - timestamp:.1f}s)")
+                            break
+                except Exception as e:
+                    logger.warning(f"Error closing idle connection: {e}")
 
     def _recycle_old_connections(self) -> None:
         """Recycle connections that exceed the maximum age."""
@@ -164,29 +242,125 @@ class PostgresConnectionPool(ConnectionPoolProtocol):
                 connections_to_recycle.append(conn_id)
 
         # Recycle identified connections
-        for conn_id in connections_to_recycle:
-            try:
-                # Find the connection object
-                for conn in self.pool._pool:
-                    if id(conn) == conn_id:
-                        self.pool._pool.remove(conn)
-                        conn.close()
-
-                        # Create a new connection
-                        new_conn = psycopg2.connect(**self.db_config)
-                        self.pool._pool.append(new_conn)
-                        self.connection_timestamps[id(new_conn)] = current_time
-
-                        del self.connection_timestamps[conn_id]
-                        logger.debug(f"Recycled old connection (age: {current_time - timestamp:.1f}s)")
-                        break
-            except Exception as e:
-                logger.warning(f"Error recycling old connection: {e}")
+        with self.pool._lock:
+            for conn_id in connections_to_recycle:
+                try:
+                    # Find the connection object
+                    for conn in self.pool._pool:
+                        if id(conn) == conn_id:
+                            self.pool._pool.remove(conn)
+                            conn.close()
+
+                            # Create a new connection
+                            new_conn = psycopg2.connect(**self.db_config)
+                            self.pool._pool.append(new_conn)
+                            self.connection_timestamps[id(new_conn)] = current_time
+
+                            del self.connection_timestamps[conn_id]
+                            logger.debug(f"Recycled old connection (age: {current_time - timestamp:.1f}s)")
+                            break
+                except Exception as e:
+                    logger.warning(f"Error recycling old connection: {e}")
+
+    def _has_capacity(self) -> bool:
+        """Whether another connection can be checked out. Call with the lock held."""
+        return len(self.in_use_connections) + self._reserved < self.max_connections
+
+    def _notify_next_waiter(self) -> None:
+        """Wake the longest-waiting thread if a connection is free. Call with the lock held."""
+        if self._waiters and self._has_capacity():
+            self._waiters[0].notify()
+
+    def _wait_for_capacity(self, deadline: float) -> None:
+        """
+        Block until this thread is first in line and a connection is free.
+
+        Must be called with the lock held.
+
+        Args:
+            deadline: time.monotonic() value after which to give up
+
+        Raises:
+            Exception: If no connection becomes available before the deadline
+        """
+        if not self._waiters and self._has_capacity():
+            return
+
+        waiter = threading.Condition(self.lock)
+        self._waiters.append(waiter)
+        self._peak_waiters = max(self._peak_waiters, len(self._waiters))
+        try:
+            while self._waiters[0] is not waiter or not self._has_capacity():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise Exception(
+                        f"Timed out waiting for database connection after {self.connection_timeout}s"
+                    )
+                waiter.wait(remaining)
+        finally:
+            self._waiters.remove(waiter)
+            # Pass the turn on if a connection is still free
+            self._notify_next_waiter()
+
+    def _needs_validation(self, conn: Any) -> bool:
+        """Whether the validation policy requires checking a borrowed connection."""
+        if self.validation_policy == VALIDATE_ALWAYS:
+            return True
+        if self.validation_policy == VALIDATE_IDLE:
+            last_used = self.connection_timestamps.get(id(conn), 0.0)
+            return time.time() - last_used > self.validation_idle_time
+        return False
+
+    @staticmethod
+    def _is_usable(conn: Any) -> bool:
+        """Check a connection with a trivial query."""
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _borrow(self, connection_pool: pool.ThreadedConnectionPool) -> Any:
+        """
+        Take a usable connection from the underlying pool.
+
+        Call without the lock held, after reserving a slot: opening and
+        validating connections can take a network round trip, during which
+        other threads must be able to release connections.
+
+        Connections that fail validation are discarded and replaced.
+
+        Args:
+            connection_pool: The underlying pool
+
+        Returns:
+            A database connection
+        """
+        while True:
+            conn = connection_pool.getconn()
+            if not self._needs_validation(conn) or self._is_usable(conn):
+                return conn
+
+            logger.warning("Discarding connection that failed validation")
+            with self.lock:
+                self._validation_failures += 1
+                self.connection_timestamps.pop(id(conn), None)
+            connection_pool.putconn(conn, close=True)
 
     def get_connection(self) -> Tuple[Any, DictCursor]:
         """
         Get a connection from the pool.
 
+        When all connections are in use, callers wait on a condition variable
+        and are served in arrival order as connections are released. A slot
+        is reserved under the lock; the connection is then taken and
+        validated without holding it.
+
         Returns:
             A tuple containing (connection, cursor)
 
@@ -196,37 +370,43 @@ class PostgresConnectionPool(ConnectionPoolProtocol):
         if not self.pool:
             self._initialize_pool()
 
-        start_time = time.time()
+        start = time.monotonic()
         conn = None
 
         try:
-            # Try to get a connection with timeout
-            while time.time() - start_time < self.connection_timeout:
-                try:
-                    with self.lock:
-                        conn = self.pool.getconn()
+            with self.lock:
+                self._wait_for_capacity(start + self.connection_timeout)
+                self._reserved += 1
+                connection_pool = self.pool
+
+            try:
+                conn = self._borrow(connection_pool)
+            finally:
+                with self.lock:
+                    self._reserved -= 1
+                    if conn is None:
+                        self._notify_next_waiter()
+                    else:
+                        now = time.monotonic()
                         self.in_use_connections.add(id(conn))
                         self.connection_timestamps[id(conn)] = time.time()
-                        break
-                except pool.PoolError:
-                    # Pool is exhausted, wait and retry
-                    time.sleep(0.1)
-
-            if conn is None:
-                raise Exception(f"Timed out waiting for database connection after {self.connection_timeout}s")
+                        self._checkout_started[id(conn)] = now
+                        self._wait_times.record(now - start)
 
             # Create a cursor
             cursor = conn.cursor(cursor_factory=DictCursor)
 
-            logger.debug(f"Acquired connection from pool (waited {time.time() - start_time:.3f}s)")
+            logger.debug(f"Acquired connection from pool (waited {time.monotonic() - start:.3f}s)")
             return conn, cursor
 
         except Exception as e:
             # If we got a connection but failed to create a cursor, return it to the pool
             if conn:
                 with self.lock:
-                    self.in_use_connections.remove(id(conn))
+                    self.in_use_connections.discard(id(conn))
+                    self._checkout_started.pop(id(conn), None)
                     self.pool.putconn(conn)
+                    self._notify_next_waiter()
 
             logger.error(f"Failed to get connection from pool: {e}")
             raise
@@ -252,11 +432,16 @@ class PostgresConnectionPool(ConnectionPoolProtocol):
                 self.connection_timestamps[id(conn)] = time.time()
 
                 # Remove from in-use set
-                if id(conn) in self.in_use_connections:
-                    self.in_use_connections.remove(id(conn))
+                self.in_use_connections.discard(id(conn))
+                started = self._checkout_started.pop(id(conn), None)
+                if started is not None:
+                    self._checkout_durations.record(time.monotonic() - started)
 
-                # Return to the pool
-                self.pool.putconn(conn)
+                # Return to the pool and wake the next waiter
+                try:
+                    self.pool.putconn(conn)
+                finally:
+                    self._notify_next_waiter()
 
             logger.debug("Released connection back to pool")
         except Exception as e:
@@ -280,6 +465,7 @@ class PostgresConnectionPool(ConnectionPoolProtocol):
                 self.pool.closeall()
                 self.connection_timestamps.clear()
                 self.in_use_connections.clear()
+                self._checkout_started.clear()
                 self.pool = None
                 logger.info("All connections closed")
             except Exception as e:
@@ -299,6 +485,13 @@ class PostgresConnectionPool(ConnectionPoolProtocol):
                 "current_connections": len(self.connection_timestamps) if self.pool else 0,
                 "in_use_connections": len(self.in_use_connections) if self.pool else 0,
                 "available_connections": (len(self.connection_timestamps) - len(self.in_use_connections)) if self.pool else 0,
+                "waiting_threads": len(self._waiters),
+                "peak_waiting_threads": self._peak_waiters,
+                "wait_timeouts": self._timeouts,
+                "validation_policy": self.validation_policy,
+                "validation_failures": self._validation_failures,
+                "wait_time": self._wait_times.as_dict(),
+                "checkout_duration": self._checkout_durations.as_dict(),
             }
 
 
@@ -374,16 +567,61 @@ class PooledDatabaseConnection(DatabaseConnectionProtocol):
         with ErrorContext(
             component="PooledDatabaseConnection", operation="execute", query=query
         ):
-            with self.pool.get_connection()[1] as cursor:
+            conn, cursor = self.pool.get_connection()
+            try:
                 # Execute the query
                 cursor.execute(query, params)
 
                 # Return results for queries that return data
                 if cursor.description:
-                    return cursor.fetchall()
+                    result = cursor.fetchall()
+                else:
+                    # Return rowcount for operations that don't return data
+                    result = cursor.rowcount
+                conn.commit()
+                return result
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                # Return the connection so waiting callers can use it
+                self.pool.release_connection(conn, cursor)
+
+    def stream_query(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        itersize: int = DEFAULT_STREAM_ITERSIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a query and stream the results with a server-side cursor.
+
+        A pooled connection is held until the results are exhausted or the
+        iterator is closed.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+            itersize: Number of rows to fetch per round trip
+
+        Yields:
+            Dictionaries containing the query results
 
-                # Return rowcount for operations that don't return data
-                return cursor.rowcount
+        Raises:
+            psycopg2.Error: If a database error occurs
+        """
+        with ErrorContext(
+            component="PooledDatabaseConnection", operation="stream_query", query=query
+        ):
+            conn, cursor = self.pool.get_connection()
+            try:
+                yield from iter_server_side_rows(conn, query, params, itersize, as_dicts=True)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self.pool.release_connection(conn, cursor)
 
     @log_execution_time(logger)
     def execute_batch(self, query: str, params_list: List[Dict[str, Any]]) -> None:
@@ -400,9 +638,17 @@ class PooledDatabaseConnection(DatabaseConnectionProtocol):
         with ErrorContext(
             component="PooledDatabaseConnection", operation="execute_batch", query=query
         ):
-            with self.pool.get_connection()[1] as cursor:
+            conn, cursor = self.pool.get_connection()
+            try:
                 # Execute the batch
                 execute_batch(cursor, query, params_list)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                # Return the connection so waiting callers can use it
+                self.pool.release_connection(conn, cursor)
 
     def begin_transaction(self) -> None:
         """
@@ -13,6 +13,7 @@ from src.utils.interfaces import DatabaseConnectionProtocol
 from src.utils.new_structured_logging import get_logger, handle_errors
 
 from .database_manager import DatabaseManager
+from .sqlite_manager import DEFAULT_SQLITE_PATH, SQLiteDatabaseManager
 
 logger = get_logger(__name__)
 
@@ -127,11 +128,14 @@ class DatabaseConnectionFactory:
 
         Returns:
             SQLite database connection
-
-        Raises:
-            NotImplementedError: SQLite support is not implemented yet
         """
         logger.info("Creating SQLite database connection")
 
-        # SQLite support is not implemented yet
-        raise NotImplementedError("SQLite support is not implemented yet")
\ No newline at end of file
+        # The Postgres defaults do not apply, so only SQLite keys are read
+        database_path = config.get("database_path") or os.environ.get("DB_SQLITE_PATH", DEFAULT_SQLITE_PATH)
+
+        return SQLiteDatabaseManager(
+            database_path=database_path,
+            pragmas=config.get("pragmas"),
+            connection_timeout=config.get("connection_timeout", 30),
+        )
\ No newline at end of file
@@ -7,13 +7,15 @@ database connection handling, transaction management, and query execution.
 
 import logging
 import os
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import psycopg2
 from psycopg2 import sql
 from psycopg2.extensions import connection, cursor
 from psycopg2.extras import execute_values
 
+from src.db.prepared_statements import MAX_PARAMETERS, PreparedStatementCache
+from src.utils.db_connection import DEFAULT_STREAM_ITERSIZE, iter_server_side_rows
 from src.utils.interfaces import DatabaseConnectionProtocol
 from src.utils.new_structured_logging import get_logger, log_execution_time, handle_errors
 
@@ -53,6 +55,7 @@ class DatabaseManager(DatabaseConnectionProtocol):
         self.application_name = application_name
         self._conn = None
         self._cursor = None
+        self.statements = PreparedStatementCache()
 
         logger.info(
             f"Initialized DatabaseManager for {dbname} on {host}:{port}",
@@ -152,6 +155,28 @@ class DatabaseManager(DatabaseConnectionProtocol):
         self.execute(query, params)
         return self.cursor.fetchall()
 
+    def stream_query(
+        self, query: str, params: Optional[Tuple] = None, itersize: int = DEFAULT_STREAM_ITERSIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """Execute a query and stream the results with a server-side cursor.
+
+        Unlike execute_and_fetch, only itersize rows are held in memory at a time.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+            itersize: Number of rows to fetch per round trip
+
+        Yields:
+            Dictionaries containing the query results
+        """
+        logger.debug(f"Streaming query: {query}")
+        try:
+            yield from iter_server_side_rows(self.conn, query, params, itersize, as_dicts=True)
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}")
+            raise
+
     @log_execution_time(level=logging.DEBUG)
     @handle_errors(log_level="ERROR", default_message="Error executing query and fetching one result")
     def execute_and_fetch_one(self, query: str, params: Optional[Tuple] = None) -> Optional[Tuple]:
@@ -191,21 +216,43 @@ class DatabaseManager(DatabaseConnectionProtocol):
 
         # Build query
         column_names = sql.SQL(', ').join(sql.Identifier(col) for col in columns)
-        query = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+        insert_sql = sql.SQL("INSERT INTO {} ({}) VALUES ").format(
             sql.Identifier(table), column_names
-        )
+        ).as_string(self.conn)
+        row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        prepare = page_size * len(columns) <= MAX_PARAMETERS
+        batch_sql = {}
 
-        # Insert in batches
+        # Insert in batches. Each batch size gets one prepared statement per
+        # connection, so repeated batches are not parsed and planned again.
         total_inserted = 0
         for i in range(0, len(values), page_size):
             batch = values[i:i + page_size]
-            execute_values(self.cursor, query.as_string(self.conn), batch)
+            if prepare:
+                if len(batch) not in batch_sql:
+                    batch_sql[len(batch)] = insert_sql + ", ".join([row_placeholder] * len(batch))
+                self.statements.execute(
+                    self.cursor,
+                    batch_sql[len(batch)],
+                    [value for row in batch for value in row],
+                    key=("bulk_insert", table, tuple(columns), len(batch)),
+                )
+            else:
+                execute_values(self.cursor, insert_sql + "%s", batch, page_size=page_size)
             total_inserted += len(batch)
             logger.debug(f"Inserted batch {i // page_size + 1} ({len(batch)} rows)")
 
         logger.info(f"Inserted {total_inserted} rows into {table}")
         return total_inserted
 
+    def get_statement_stats(self) -> Dict[str, Any]:
+        """Get prepared statement cache statistics.
+
+        Returns:
+            Dictionary with cache hits, misses and evictions
+        """
+        return self.statements.get_stats()
+
     @log_execution_time(level=logging.DEBUG)
     @handle_errors(log_level="ERROR", default_message="Error beginning transaction")
     def begin_transaction(self) -> None:
@@ -13,6 +13,7 @@ from .pipeline_manager import ETLPipeline
 from .extractor import Extractor
 from .transformer import Transformer
 from .loader import Loader
+from .async_loader import AsyncLoader
 from .utils import ProgressTracker, MemoryMonitor
 from .context import ETLContext
 
@@ -21,6 +22,7 @@ __all__ = [
     'Extractor',
     'Transformer',
     'Loader',
+    'AsyncLoader',
     'ProgressTracker',
     'MemoryMonitor',
     'ETLContext'
@@ -0,0 +1,478 @@
+"""
+Asyncio loader module for the ETL pipeline.
+
+This module provides the AsyncLoader class, which loads transformed data
+through an asyncpg connection pool. Rows are built by the same handlers the
+synchronous Loader uses, then written as many concurrent batch inserts so
+that database round trips overlap instead of running one after another.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.analysis.cache import invalidate_export
+from src.db.aggregates import CREATE_AGGREGATE_TABLES_SQL, ExportAggregator, parse_timestamp
+from src.db.handlers.handler_registry import HandlerRegistry
+from src.utils.dependencies import get_asyncpg
+from src.utils.memory_governor import MemoryGovernor
+from src.utils.new_structured_logging import get_logger, log_execution_time, handle_errors
+
+from .context import ETLContext
+from .loader import FAST_TEST_MODE, Loader
+
+logger = get_logger(__name__)
+
+# Batches written at the same time; each one holds a pool connection
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Tables whose rows reference the archive and must be written after it
+DEPENDENT_TABLES = ("conversations", "users", "messages")
+
+
+class _BatchRecorder:
+    """
+    Stand-in database manager that records bulk inserts.
+
+    The insertion handlers only call bulk_insert, so running them against
+    this class yields the rows to write without touching a database.
+    """
+
+    def __init__(self):
+        """Initialize the recorder."""
+        self.inserts: List[Tuple[str, List[str], List[Tuple]]] = []
+
+    def bulk_insert(self, table: str, columns: List[str], values: List[Tuple],
+                    page_size: int = 1000) -> int:
+        """
+        Record rows to insert into a table.
+
+        Args:
+            table: Table name
+            columns: Column names
+            values: Rows to insert
+            page_size: Ignored, batches are cut by the loader
+
+        Returns:
+            Number of rows recorded
+        """
+        self.inserts.append((table, list(columns), list(values)))
+        return len(values)
+
+
+class AsyncLoader(Loader):
+    """
+    Loads transformed data into a database with asyncio.
+
+    The archive row is written first, then the conversation, user and
+    message rows are split into batches that run concurrently over a small
+    connection pool. At most max_concurrency batches are in flight at once.
+    Each batch is written with COPY (or a prepared executemany when
+    use_copy is False) in its own transaction, so a failed load may leave
+    the batches that already committed behind. Report aggregates are
+    written with the export row, as Loader.load does.
+
+    By default the pool is created with asyncpg from db_config. Pass
+    pool_factory to supply any object with the same acquire() and close()
+    interface, for example an in-process stand-in for tests.
+    """
+
+    def __init__(
+        self,
+        context: Optional[ETLContext] = None,
+        db_config: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        pool_min_size: int = 1,
+        pool_max_size: Optional[int] = None,
+        use_copy: bool = True,
+        pool_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+        maintain_aggregates: bool = True,
+    ):
+        """Initialize the loader.
+
+        Args:
+            context: ETL context for sharing state between components
+            db_config: Database configuration (defaults to the context's)
+            batch_size: Number of rows per batch
+            max_concurrency: Maximum number of batches written at once
+            pool_min_size: Minimum number of pooled connections
+            pool_max_size: Maximum number of pooled connections
+                (defaults to max_concurrency)
+            use_copy: Whether to write batches with COPY instead of INSERT
+            pool_factory: Coroutine function returning a connection pool
+            maintain_aggregates: Whether to store report aggregates for the export
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        # Initialize metrics
+        self._metrics = {
+            "start_time": None,
+            "end_time": None,
+            "loading_time_ms": 0,
+            "conversation_count": 0,
+            "message_count": 0,
+            "user_count": 0,
+            "batch_count": 0,
+            "peak_concurrency": 0,
+        }
+
+        self.context = context
+        self.db_config = db_config if db_config is not None else getattr(context, "db_config", None)
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size or max_concurrency
+        self.use_copy = use_copy
+        self.pool_factory = pool_factory
+        self.maintain_aggregates = maintain_aggregates
+        self.handler_registry = HandlerRegistry()
+        self._pool = None
+
+        logger.info(
+            "Initialized AsyncLoader",
+            extra={
+                "batch_size": self.batch_size,
+                "max_concurrency": self.max_concurrency,
+                "use_copy": self.use_copy,
+            }
+        )
+
+    def connect_db(self) -> None:
+        """Check that a connection pool can be created.
+
+        The pool itself is opened by load_async, inside the running event loop.
+
+        Raises:
+            ImportError: If asyncpg is not installed and no pool_factory is set
+            ValueError: If no database configuration is available
+        """
+        if self.pool_factory is not None:
+            return
+        available, _ = get_asyncpg()
+        if not available:
+            raise ImportError("asyncpg is required for AsyncLoader. Install with: pip install asyncpg")
+        if not self.db_config:
+            raise ValueError("Database configuration is required for AsyncLoader")
+
+    def close_db(self) -> None:
+        """Close the database connection.
+
+        Pools opened by load() are closed before it returns, so there is
+        nothing left to close here.
+        """
+        if self._pool is not None:
+            logger.warning("AsyncLoader pool is still open; close it with 'await loader.aclose()'")
+
+    close = close_db
+
+    async def __aenter__(self) -> "AsyncLoader":
+        """Open the pool so that several loads can share it."""
+        if self._pool is None:
+            self._pool = await self._create_pool()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Close the pool opened by __aenter__."""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the connection pool if one is open."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await pool.close()
+            logger.info("Async connection pool closed")
+
+    async def _create_pool(self):
+        """Create the connection pool.
+
+        Returns:
+            Connection pool with acquire() and close()
+        """
+        if self.pool_factory is not None:
+            return await self.pool_factory()
+
+        self.connect_db()
+        _, asyncpg = get_asyncpg()
+        return await asyncpg.create_pool(
+            host=self.db_config.get("host", "localhost"),
+            port=self.db_config.get("port", 5432),
+            database=self.db_config.get("dbname"),
+            user=self.db_config.get("user"),
+            password=self.db_config.get("password"),
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+        )
+
+    @log_execution_time(level=logging.INFO)
+    @handle_errors(log_level="ERROR", default_message="Error loading data")
+    def load(
+        self,
+        raw_data: Dict[str, Any],
+        transformed_data: Dict[str, Any],
+        file_source: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """Load transformed data into the database.
+
+        Runs load_async in a new event loop. Code that already runs in an
+        event loop should await load_async instead.
+
+        Args:
+            raw_data: Raw data from the extractor
+            transformed_data: Transformed data from the transformer
+            file_source: Source of the data
+
+        Returns:
+            Dictionary containing counts of loaded data
+
+        Raises:
+            RuntimeError: If called from a running event loop
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.load_async(raw_data, transformed_data, file_source))
+        raise RuntimeError("AsyncLoader.load() cannot run inside an event loop; use 'await load_async()'")
+
+    async def load_async(
+        self,
+        raw_data: Dict[str, Any],
+        transformed_data: Dict[str, Any],
+        file_source: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """Load transformed data into the database.
+
+        Args:
+            raw_data: Raw data from the extractor
+            transformed_data: Transformed data from the transformer
+            file_source: Source of the data
+
+        Returns:
+            Dictionary containing counts of loaded data
+        """
+        logger.info("Loading data into database (async)")
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+
+        self._validate_input_data(transformed_data)
+        data_to_insert = self._prepare_data_for_insertion(transformed_data)
+        self._add_archive_info(data_to_insert, file_source)
+
+        recorder, counts = self._build_rows(data_to_insert)
+        aggregator = self._aggregate(data_to_insert)
+        batch_size = self._current_batch_size()
+
+        owns_pool = self._pool is None
+        pool = await self._create_pool() if owns_pool else self._pool
+        try:
+            # Dependent rows reference the archive, so it is committed first
+            archives = [insert for insert in recorder.inserts if insert[0] == "archives"]
+            others = [insert for insert in recorder.inserts if insert[0] != "archives"]
+            await self._write_batches(pool, self._split_batches(archives, batch_size))
+            await self._write_batches(pool, self._split_batches(others, batch_size))
+            export_id = await self._create_export(
+                pool, transformed_data.get("metadata", {}), data_to_insert["file_path"]
+            )
+            if aggregator is not None:
+                await self._write_aggregates(pool, aggregator, export_id)
+        finally:
+            if owns_pool:
+                await pool.close()
+
+        self._metrics["conversation_count"] = counts.get("conversations", 0)
+        self._metrics["message_count"] = counts.get("messages", 0)
+        self._metrics["user_count"] = counts.get("users", 0)
+        self._metrics["loading_time_ms"] = (loop.time() - start_time) * 1000
+
+        if file_source and self.context:
+            self.context.file_source = file_source
+
+        # Export IDs are reused when a database is recreated, so results
+        # cached under this ID may belong to an earlier export
+        invalidate_export(export_id)
+
+        logger.debug(f"Loading metrics: {self._metrics}")
+        logger.info("Data loaded successfully")
+
+        return counts
+
+    async def _create_export(self, pool, metadata: Dict[str, Any], file_source: str) -> int:
+        """Create the skype_exports row of the loaded export, as Loader.create_export does.
+
+        Args:
+            pool: Connection pool
+            metadata: Export metadata from the transformer
+            file_source: Source of the data
+
+        Returns:
+            Export ID
+        """
+        async with pool.acquire() as conn:
+            export_id = await conn.fetchval(
+                "INSERT INTO skype_exports (user_id, export_date, file_source, created_at) "
+                "VALUES ($1, $2, $3, $4) RETURNING id",
+                metadata.get("user_id"),
+                parse_timestamp(metadata.get("export_date")),
+                file_source,
+                datetime.now(),
+            )
+
+        if self.context is not None:
+            self.context.export_id = export_id
+        logger.info(f"Created export {export_id}")
+        return export_id
+
+    def _aggregate(self, data_to_insert: Dict[str, Any]) -> Optional[ExportAggregator]:
+        """Compute report aggregates for the data to insert.
+
+        Args:
+            data_to_insert: Data prepared for insertion
+
+        Returns:
+            Filled aggregator, or None if aggregates are not maintained
+        """
+        if not self.maintain_aggregates or FAST_TEST_MODE:
+            return None
+        return self._build_aggregator(data_to_insert)
+
+    async def _write_aggregates(self, pool, aggregator: ExportAggregator, export_id: int) -> None:
+        """Replace the stored aggregates of an export in one transaction, as ExportAggregator.write does.
+
+        Args:
+            pool: Connection pool
+            aggregator: Filled aggregator
+            export_id: Export the aggregates belong to
+        """
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                for statement in CREATE_AGGREGATE_TABLES_SQL:
+                    await conn.execute(statement)
+                for table, (columns, rows) in aggregator.table_rows(export_id).items():
+                    await conn.execute(f"DELETE FROM {table} WHERE export_id = $1", export_id)
+                    if rows:
+                        await self._write_batch(conn, table, columns, rows)
+        logger.info(f"Stored aggregates for export {export_id}")
+
+    def _build_rows(self, data_to_insert: Dict[str, Any]) -> Tuple[_BatchRecorder, Dict[str, int]]:
+        """Run the insertion handlers to collect the rows to write.
+
+        Args:
+            data_to_insert: Data prepared for insertion
+
+        Returns:
+            Tuple of the recorder holding the rows and the counts by data type
+        """
+        recorder = _BatchRecorder()
+        counts = {"archives": 0, "conversations": 0, "messages": 0, "users": 0}
+
+        archive_id = self.handler_registry.get_handler("archives").insert_bulk(
+            recorder, data_to_insert, self.batch_size
+        )
+        counts["archives"] = 1
+
+        for data_type in DEPENDENT_TABLES:
+            if not data_to_insert.get(data_type):
+                continue
+            handler = self.handler_registry.get_handler(data_type)
+            if data_type == "users":
+                counts[data_type] = handler.insert_bulk(recorder, data_to_insert[data_type], self.batch_size)
+            else:
+                counts[data_type] = handler.insert_bulk(
+                    recorder, data_to_insert[data_type], self.batch_size, archive_id
+                )
+
+        return recorder, counts
+
+    def _current_batch_size(self) -> int:
+        """Return the batch size, capped by the memory governor if present."""
+        memory_governor = getattr(self.context, "memory_governor", None)
+        if not isinstance(memory_governor, MemoryGovernor):
+            return self.batch_size
+
+        allowed_batch_size = memory_governor.get("batch_size", self.batch_size)
+        if allowed_batch_size < self.batch_size:
+            logger.info(
+                f"Reducing batch size from {self.batch_size} to "
+                f"{allowed_batch_size} due to memory pressure"
+            )
+            return allowed_batch_size
+        return self.batch_size
+
+    @staticmethod
+    def _split_batches(
+        inserts: List[Tuple[str, List[str], List[Tuple]]], batch_size: int
+    ) -> List[Tuple[str, List[str], List[Tuple]]]:
+        """Split recorded inserts into batches of at most batch_size rows.
+
+        Args:
+            inserts: Recorded (table, columns, rows) inserts
+            batch_size: Maximum rows per batch
+
+        Returns:
+            List of (table, columns, rows) batches
+        """
+        batch_size = max(1, batch_size)
+        return [
+            (table, columns, rows[i:i + batch_size])
+            for table, columns, rows in inserts
+            for i in range(0, len(rows), batch_size)
+        ]
+
+    async def _write_batches(self, pool, batches: List[Tuple[str, List[str], List[Tuple]]]) -> None:
+        """Write batches concurrently, at most max_concurrency at a time.
+
+        If a batch fails, the batches that have not finished are cancelled
+        and the error is raised.
+
+        Args:
+            pool: Connection pool
+            batches: (table, columns, rows) batches to write
+        """
+        if not batches:
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        in_flight = 0
+
+        async def write(table: str, columns: List[str], rows: List[Tuple]) -> None:
+            nonlocal in_flight
+            async with semaphore:
+                in_flight += 1
+                self._metrics["peak_concurrency"] = max(self._metrics["peak_concurrency"], in_flight)
+                try:
+                    async with pool.acquire() as conn:
+                        async with conn.transaction():
+                            await self._write_batch(conn, table, columns, rows)
+                finally:
+                    in_flight -= 1
+            self._metrics["batch_count"] += 1
+
+        tasks = [asyncio.ensure_future(write(*batch)) for batch in batches]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _write_batch(self, conn, table: str, columns: List[str], rows: Sequence[Tuple]) -> None:
+        """Write one batch of rows.
+
+        Args:
+            conn: Pooled connection
+            table: Table name
+            columns: Column names
+            rows: Rows to write
+        """
+        if self.use_copy:
+            await conn.copy_records_to_table(table, records=rows, columns=columns)
+        else:
+            column_list = ", ".join(f'"{column}"' for column in columns)
+            placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+            await conn.executemany(
+                f'INSERT INTO "{table}" ({column_list}) VALUES ({placeholders})', rows
+            )
+        logger.debug(f"Wrote {len(rows)} rows to {table}")
@@ -15,6 +15,7 @@ from typing import Any, ClassVar, Dict, List, Optional, BinaryIO
 from src.utils.checkpoint_manager import CheckpointManager
 from src.utils.configuration_validator import ConfigurationValidator
 from src.utils.error_logger import ErrorLogger
+from src.utils.memory_governor import MemoryGovernor
 from src.utils.memory_monitor import MemoryMonitor
 from src.utils.new_structured_logging import (
     get_logger,
@@ -110,6 +111,7 @@ class ETLContext:
         phase_manager: Optional[PhaseManager] = None,
         error_logger: Optional[ErrorLogger] = None,
         checkpoint_manager: Optional[CheckpointManager] = None,
+        memory_governor: Optional[MemoryGovernor] = None,
     ) -> None:
         """
         Initialize the ETL context.
@@ -136,6 +138,7 @@ class ETLContext:
             phase_manager: Optional phase manager instance
             error_logger: Optional error logger instance
             checkpoint_manager: Optional checkpoint manager instance
+            memory_governor: Optional memory governor instance
         """
         # Validate configuration parameters
         ConfigurationValidator.validate_configuration(
@@ -191,6 +194,7 @@ class ETLContext:
         # Initialize utility components
         self.progress_tracker = progress_tracker or ProgressTracker()
         self.memory_monitor = memory_monitor or MemoryMonitor(memory_limit_mb)
+        self.memory_governor = memory_governor or self._create_memory_governor(max_workers)
         self.phase_manager = phase_manager or PhaseManager()
         self.error_logger = error_logger or ErrorLogger()
         self.checkpoint_manager = checkpoint_manager or CheckpointManager(
@@ -218,6 +222,26 @@ class ETLContext:
         # Log initialization
         logger.info(f"Initialized ETL context with task ID: {self.task_id}")
 
+    def _create_memory_governor(self, max_workers: Optional[int] = None) -> MemoryGovernor:
+        """
+        Create a memory governor for this context's memory limit.
+
+        The transform chunk size, loader batch size and queue depth are
+        registered with their configured values as the upper bound.
+
+        Args:
+            max_workers: Maximum number of worker threads/processes
+
+        Returns:
+            Memory governor instance
+        """
+        governor = MemoryGovernor(self.memory_limit_mb)
+        governor.register("chunk_size", self.chunk_size, minimum=max(1, self.chunk_size // 16))
+        governor.register("batch_size", self.batch_size, minimum=max(1, self.batch_size // 16))
+        queue_depth = (max_workers or os.cpu_count() or 1) * 2
+        governor.register("queue_depth", queue_depth, minimum=1)
+        return governor
+
     def set_file_source(self, file_path: Optional[str] = None, file_obj: Optional[BinaryIO] = None) -> None:
         """
         Set the file source for this ETL context.
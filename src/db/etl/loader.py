@@ -14,9 +14,16 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 
 from src.db.data_inserter import DataInserter, BulkInsertionStrategy, IndividualInsertionStrategy
 from src.db.database_factory import DatabaseConnectionFactory
+from src.analysis.cache import invalidate_export
+from src.db.aggregates import ExportAggregator
+from src.db.handlers.archive_handler import ArchiveHandler
+from src.db.handlers.user_handler import UserHandler
 from src.db.schema_manager import SchemaManager
+from src.db.sqlite_manager import SQLiteDatabaseManager
 from src.utils.di import get_service
 from src.utils.interfaces import DatabaseConnectionProtocol, LoaderProtocol
+from src.utils.memory_governor import MemoryGovernor
+from src.utils.test_utils import get_fast_test_mode
 from src.utils.new_structured_logging import (
     get_logger,
     log_execution_time,
@@ -29,6 +36,7 @@ from src.utils.new_structured_logging import (
 from .context import ETLContext
 
 logger = get_logger(__name__)
+FAST_TEST_MODE = get_fast_test_mode()
 
 
 class Loader(LoaderProtocol):
@@ -41,6 +49,7 @@ class Loader(LoaderProtocol):
         db_config: Optional[Dict[str, Any]] = None,
         batch_size: int = 1000,
         create_schema: bool = False,
+        maintain_aggregates: bool = True,
     ):
         """Initialize the loader.
 
@@ -50,6 +59,7 @@ class Loader(LoaderProtocol):
             db_config: Database configuration
             batch_size: Batch size for bulk inserts
             create_schema: Whether to create the database schema
+            maintain_aggregates: Whether to store report aggregates for the export
         """
         # Initialize metrics
         self._metrics = {
@@ -67,6 +77,8 @@ class Loader(LoaderProtocol):
         # Set batch size
         self.batch_size = batch_size
 
+        self.maintain_aggregates = maintain_aggregates
+
         # Set database connection
         self.db_connection = db_connection
         if self.db_connection is None:
@@ -74,8 +86,9 @@ class Loader(LoaderProtocol):
             try:
                 self.db_connection = get_service("db_connection")
             except (ImportError, KeyError):
-                # Create database connection from config
-                self.db_connection = DatabaseConnectionFactory.create_connection(db_config)
+                # Create database connection from config ("type": "sqlite" selects SQLite)
+                connection_type = (db_config or {}).get("type", "postgres")
+                self.db_connection = DatabaseConnectionFactory.create_connection(db_config, connection_type)
 
         # Create schema manager
         self.schema_manager = SchemaManager(self.db_connection)
@@ -85,8 +98,12 @@ class Loader(LoaderProtocol):
             self.db_connection, BulkInsertionStrategy(batch_size=self.batch_size)
         )
 
+        # A new SQLite file has no tables; SchemaManager's tables do not match
+        # the columns the insertion handlers write
+        if isinstance(self.db_connection, SQLiteDatabaseManager):
+            self.db_connection.create_loader_schema()
         # Create schema if requested
-        if create_schema:
+        elif create_schema:
             try:
                 self.schema_manager.create_schema()
             except Exception as e:
@@ -129,6 +146,140 @@ class Loader(LoaderProtocol):
         data_to_insert = self._prepare_data_for_insertion(transformed_data)
 
         # Add archive information to the data
+        self._add_archive_info(data_to_insert, file_source)
+
+        # Cap the batch size at the value allowed by the memory governor
+        self._apply_memory_governor()
+
+        # Collect report aggregates before the handlers consume the data
+        aggregator = self._aggregate(data_to_insert)
+
+        # Insert data
+        counts = self.data_inserter.insert(data_to_insert)
+
+        export_id = self.create_export(transformed_data.get("metadata", {}), data_to_insert["file_path"])
+        if aggregator is not None:
+            aggregator.write(self.db_connection, export_id)
+
+        # Export IDs are reused when a database is recreated, so results
+        # cached under this ID may belong to an earlier export
+        if export_id is not None:
+            invalidate_export(export_id)
+
+        # Update metrics
+        self._metrics["conversation_count"] = counts.get("conversations", 0)
+        self._metrics["message_count"] = counts.get("messages", 0)
+        self._metrics["user_count"] = counts.get("users", 0)
+
+        # Store file source if provided
+        if file_source and self.context:
+            self.context.file_source = file_source
+
+        # Log loading metrics
+        logger.debug(f"Loading metrics: {self._metrics}")
+
+        logger.info("Data loaded successfully")
+
+        # Return the counts dictionary for tests to verify
+        return counts
+
+    @handle_errors(log_level="ERROR", default_message="Error creating export")
+    def create_export(self, metadata: Dict[str, Any], file_source: Optional[str] = None) -> Optional[int]:
+        """Create the skype_exports row of a loaded export.
+
+        Reports, report aggregates and cached analysis results are keyed by
+        its ID, which is also recorded on the context as export_id.
+
+        Args:
+            metadata: Export metadata from the transformer
+            file_source: Source of the data
+
+        Returns:
+            Export ID, or None in fast test mode
+        """
+        if FAST_TEST_MODE:
+            return None
+
+        self.db_connection.begin_transaction()
+        try:
+            row = self.db_connection.execute_and_fetch_one(
+                """
+                INSERT INTO skype_exports (user_id, export_date, file_source, created_at)
+                VALUES (%s, %s, %s, %s)
+                RETURNING id
+                """,
+                (metadata.get("user_id"), metadata.get("export_date"), file_source, datetime.now()),
+            )
+            self.db_connection.commit()
+        except Exception:
+            self.db_connection.rollback()
+            raise
+
+        export_id = int(row[0])
+        if self.context is not None:
+            self.context.export_id = export_id
+        logger.info(f"Created export {export_id}")
+        return export_id
+
+    def create_archive(
+        self, file_source: Optional[str] = None, users: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> str:
+        """Create the archive record that shards of an export are loaded into.
+
+        Args:
+            file_source: Source of the data
+            users: Users of the export, keyed by user ID
+
+        Returns:
+            Archive ID
+        """
+        data: Dict[str, Any] = {}
+        self._add_archive_info(data, file_source)
+        archive_id = ArchiveHandler.insert_bulk(self.db_connection, data, self.batch_size)
+        if users:
+            UserHandler.insert_bulk(self.db_connection, users, self.batch_size)
+        return archive_id
+
+    @log_execution_time(level=logging.INFO)
+    @handle_errors(log_level="ERROR", default_message="Error loading shard")
+    def load_shard(
+        self, transformed_data: Dict[str, Any], archive_id: str
+    ) -> Tuple[Dict[str, int], Optional[ExportAggregator]]:
+        """Load the conversations of one shard of an export.
+
+        Unlike load(), the data is added to an archive created with
+        create_archive(), and report aggregates are returned rather than
+        written, since they cover only part of the export.
+
+        Args:
+            transformed_data: Transformed data of the shard
+            archive_id: Archive the export is loaded into
+
+        Returns:
+            Counts of loaded data, and the shard's aggregates (None if
+            aggregates are not maintained)
+        """
+        self._validate_input_data(transformed_data)
+        data_to_insert = self._prepare_data_for_insertion(transformed_data)
+        data_to_insert["archive_id"] = archive_id
+        # Users are stored once, with the archive
+        data_to_insert["users"] = {}
+
+        self._apply_memory_governor()
+        aggregator = self._aggregate(data_to_insert)
+        counts = self.data_inserter.insert(data_to_insert)
+
+        self._metrics["conversation_count"] += counts.get("conversations", 0)
+        self._metrics["message_count"] += counts.get("messages", 0)
+        return counts, aggregator
+
+    def _add_archive_info(self, data_to_insert: Dict[str, Any], file_source: Optional[str]) -> None:
+        """Add the archive name, path and size to the data to insert.
+
+        Args:
+            data_to_insert: Data prepared for insertion, updated in place
+            file_source: Source of the data
+        """
         file_path = None
 
         # First try to get the file path from the context
@@ -162,25 +313,74 @@ class Loader(LoaderProtocol):
             data_to_insert["file_path"] = dummy_file_path
             data_to_insert["file_size"] = 0
 
-        # Insert data
-        counts = self.data_inserter.insert(data_to_insert)
+    def _aggregate(self, data_to_insert: Dict[str, Any]) -> Optional[ExportAggregator]:
+        """Compute report aggregates for the data to insert.
 
-        # Update metrics
-        self._metrics["conversation_count"] = counts.get("conversations", 0)
-        self._metrics["message_count"] = counts.get("messages", 0)
-        self._metrics["user_count"] = counts.get("users", 0)
+        Aggregates are only computed when they are maintained and the
+        connection can store them.
 
-        # Store file source if provided
-        if file_source and self.context:
-            self.context.file_source = file_source
+        Args:
+            data_to_insert: Data prepared for insertion
 
-        # Log loading metrics
-        logger.debug(f"Loading metrics: {self._metrics}")
+        Returns:
+            Filled aggregator, or None if aggregates are not maintained
+        """
+        if not self.maintain_aggregates or FAST_TEST_MODE:
+            return None
+        if not hasattr(self.db_connection, "bulk_insert"):
+            logger.warning("Database connection does not support bulk_insert, skipping aggregates")
+            return None
 
-        logger.info("Data loaded successfully")
+        return self._build_aggregator(data_to_insert)
 
-        # Return the counts dictionary for tests to verify
-        return counts
+    @staticmethod
+    def _build_aggregator(data_to_insert: Dict[str, Any]) -> ExportAggregator:
+        """Feed the conversations and messages to insert through an aggregator.
+
+        Args:
+            data_to_insert: Data prepared for insertion
+
+        Returns:
+            Filled aggregator
+        """
+        aggregator = ExportAggregator()
+        for conv_id, conv in data_to_insert["conversations"].items():
+            aggregator.add_conversation(conv_id, conv.get("display_name") or conv.get("displayName"))
+
+        for conv_id, messages in data_to_insert["messages"].items():
+            for msg in messages:
+                aggregator.add_message(
+                    conv_id,
+                    msg.get("timestamp"),
+                    msg.get("from_id") or msg.get("sender_id"),
+                    msg.get("from_name") or msg.get("sender_name"),
+                    msg.get("message_type"),
+                    msg.get("content"),
+                )
+
+        return aggregator
+
+    def _apply_memory_governor(self) -> None:
+        """Adapt the insertion batch size to the memory governor.
+
+        The size shrinks under memory pressure and grows back, up to the
+        configured batch size, once the pressure has eased.
+        """
+        memory_governor = getattr(self.context, "memory_governor", None)
+        if not isinstance(memory_governor, MemoryGovernor):
+            return
+
+        strategy = self.data_inserter.strategy
+        if not hasattr(strategy, "current_batch_size"):
+            return
+
+        batch_size = min(self.batch_size, memory_governor.get("batch_size", self.batch_size))
+        if strategy.current_batch_size != batch_size:
+            logger.info(
+                f"Changing batch size from {strategy.current_batch_size} to "
+                f"{batch_size} for the current memory pressure"
+            )
+            strategy.current_batch_size = batch_size
 
     @handle_errors(log_level="ERROR", default_message="Error validating input data")
     def _validate_input_data(self, transformed_data: Dict[str, Any]) -> None:
@@ -263,6 +463,15 @@ class Loader(LoaderProtocol):
 
         return data_to_insert
 
+    def connect_db(self) -> None:
+        """Connect to the database."""
+        if hasattr(self.db_connection, "connect"):
+            self.db_connection.connect()
+
+    def close_db(self) -> None:
+        """Close the database connection."""
+        self.close()
+
     @log_execution_time(level=logging.INFO)
     @handle_errors(log_level="ERROR", default_message="Error closing database connection")
     def close(self) -> None:
@@ -12,6 +12,7 @@ import time
 from datetime import datetime
 from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 
+from src.utils.di import ServiceScope
 from src.utils.error_handling import (
     ErrorContext,
     generate_error_response,
@@ -57,6 +58,10 @@ class ModularETLPipeline:
         self.transformer = transformer
         self.loader = loader
 
+        # Scope owning the components of this run (set by PipelineFactory),
+        # closed when the run finishes
+        self.scope: Optional[ServiceScope] = None
+
         # Track metrics
         self.start_time = None
         self.execution_times = {}
@@ -186,6 +191,9 @@ class ModularETLPipeline:
 
             # Re-raise exception
             raise
+        finally:
+            if self.scope is not None:
+                self.scope.close()
 
     def _validate_pipeline_input(
         self,
@@ -301,12 +309,14 @@ class ModularETLPipeline:
         self.loader.connect_db()
 
         try:
-            # Run load
-            export_id = self.loader.load(
+            # Run load. Loader.load returns counts and records the ID of the
+            # export it created on the context.
+            result = self.loader.load(
                 raw_data=raw_data,
                 transformed_data=transformed_data,
                 file_source=file_source,
             )
+            export_id = self.context.export_id if self.context.export_id is not None else result
 
             # Close database connection
             self.loader.close_db()
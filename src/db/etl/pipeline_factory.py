@@ -10,7 +10,7 @@ import logging
 import os
 from typing import Any, Dict, Optional, Type, TypeVar, cast
 
-from src.utils.di import ServiceProvider, get_service_provider
+from src.utils.di import ServiceProvider, ServiceScope, get_service_provider
 from src.utils.error_handling import ErrorContext, handle_errors
 from src.utils.interfaces import (
     ContentExtractorProtocol,
@@ -42,6 +42,12 @@ class PipelineFactory:
     This factory manages the creation and configuration of ETL components,
     ensuring they are properly initialized with the correct dependencies.
     It supports custom component registration and configuration validation.
+
+    The default extractor, transformer and loader keep state for one run, so
+    they are registered as scoped services: every pipeline gets a scope of its
+    own, which is closed when its run finishes. Components created without a
+    scope share a scope owned by the factory, which close() (or leaving a
+    with block) closes.
     """
 
     def __init__(
@@ -60,6 +66,7 @@ class PipelineFactory:
 
         # Initialize service provider
         self.service_provider = service_provider or get_service_provider()
+        self._scope: Optional[ServiceScope] = None
 
         # Create context
         self.context = self._create_context(self.config)
@@ -117,17 +124,22 @@ class PipelineFactory:
 
     def _register_default_services(self) -> None:
         """Register default service implementations."""
-        # Register core components if not already registered
-        if not self.service_provider._singletons.get(ExtractorProtocol):
-            self.register_component(ExtractorProtocol, Extractor(context=self.context))
+        # Register core components if not already registered; components
+        # registered with register_component() are shared singletons instead
+        if not self.service_provider.is_registered(ExtractorProtocol):
+            self.service_provider.register_scoped(
+                ExtractorProtocol, lambda: Extractor(context=self.context)
+            )
 
-        if not self.service_provider._singletons.get(TransformerProtocol):
-            self.register_component(
-                TransformerProtocol, Transformer(context=self.context)
+        if not self.service_provider.is_registered(TransformerProtocol):
+            self.service_provider.register_scoped(
+                TransformerProtocol, lambda: Transformer(context=self.context)
             )
 
-        if not self.service_provider._singletons.get(LoaderProtocol):
-            self.register_component(LoaderProtocol, Loader(context=self.context))
+        if not self.service_provider.is_registered(LoaderProtocol):
+            self.service_provider.register_scoped(
+                LoaderProtocol, lambda: Loader(context=self.context)
+            )
 
     def register_component(
         self, component_type: Type[T], component_instance: T
@@ -145,49 +157,80 @@ class PipelineFactory:
     @handle_errors(
         log_level="ERROR", default_message="Failed to create pipeline component"
     )
-    def create_component(self, component_type: Type[T]) -> T:
+    def create_component(
+        self, component_type: Type[T], scope: Optional[ServiceScope] = None
+    ) -> T:
         """
         Create a component of the specified type.
 
         Args:
             component_type: The type of component to create
+            scope: The scope of the pipeline run the component belongs to.
+                If None, the factory's own scope is used.
 
         Returns:
             An instance of the requested component
 
         Raises:
-            ValueError: If the component type is not registered
+            KeyError: If the component type is not registered
         """
         with ErrorContext(component_type=component_type.__name__):
-            component = self.service_provider.get(component_type)
-            return component
+            scope = scope or self._get_scope()
+            return scope.get(component_type)
+
+    def _get_scope(self) -> ServiceScope:
+        """Get the scope of components created without one, opening it if needed."""
+        if self._scope is None:
+            self._scope = self.service_provider.create_scope()
+        return self._scope
+
+    def close(self) -> None:
+        """Close the scope of components created without one."""
+        if self._scope is not None:
+            self._scope.close()
+            self._scope = None
+
+    def __enter__(self) -> "PipelineFactory":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
-    def create_extractor(self) -> ExtractorProtocol:
+    def create_extractor(self, scope: Optional[ServiceScope] = None) -> ExtractorProtocol:
         """
         Create an extractor component.
 
+        Args:
+            scope: Optional scope of the pipeline run
+
         Returns:
             Configured extractor instance
         """
-        return self.create_component(ExtractorProtocol)
+        return self.create_component(ExtractorProtocol, scope)
 
-    def create_transformer(self) -> TransformerProtocol:
+    def create_transformer(self, scope: Optional[ServiceScope] = None) -> TransformerProtocol:
         """
         Create a transformer component.
 
+        Args:
+            scope: Optional scope of the pipeline run
+
         Returns:
             Configured transformer instance
         """
-        return self.create_component(TransformerProtocol)
+        return self.create_component(TransformerProtocol, scope)
 
-    def create_loader(self) -> LoaderProtocol:
+    def create_loader(self, scope: Optional[ServiceScope] = None) -> LoaderProtocol:
         """
         Create a loader component.
 
+        Args:
+            scope: Optional scope of the pipeline run
+
         Returns:
             Configured loader instance
         """
-        return self.create_component(LoaderProtocol)
+        return self.create_component(LoaderProtocol, scope)
 
     def get_context(self) -> ETLContext:
         """
@@ -202,6 +245,9 @@ class PipelineFactory:
         """
         Create a complete ETL pipeline with all components.
 
+        The components are resolved from a new scope, which the pipeline
+        closes when its run finishes.
+
         Args:
             pipeline_class: Optional pipeline implementation class
 
@@ -213,10 +259,11 @@ class PipelineFactory:
         # Use specified pipeline class or default
         pipeline_cls = pipeline_class or ModularETLPipeline
 
-        # Create pipeline with components
-        extractor = self.create_extractor()
-        transformer = self.create_transformer()
-        loader = self.create_loader()
+        # Create pipeline with components from the scope of this run
+        scope = self.service_provider.create_scope()
+        extractor = self.create_extractor(scope)
+        transformer = self.create_transformer(scope)
+        loader = self.create_loader(scope)
 
         # Create and return pipeline
         pipeline = pipeline_cls(
@@ -225,5 +272,6 @@ class PipelineFactory:
             transformer=transformer,
             loader=loader,
         )
+        pipeline.scope = scope
 
         return pipeline
@@ -20,6 +20,7 @@ from src.utils.interfaces import (
     LoaderProtocol,
     TransformerProtocol,
 )
+from src.utils.memory_governor import MemoryGovernor
 
 from .context import ETLContext
 
@@ -224,6 +225,13 @@ class ETLPipeline:
             },
         }
 
+        # Sample memory in the background so components can adapt their sizes
+        memory_governor = getattr(self.context, "memory_governor", None)
+        if not isinstance(memory_governor, MemoryGovernor):
+            memory_governor = None
+        if memory_governor:
+            memory_governor.start()
+
         try:
             # Extract phase
             logger.info("Starting extraction phase")
@@ -294,6 +302,9 @@ class ETLPipeline:
 
             # Re-raise exception
             raise
+        finally:
+            if memory_governor:
+                memory_governor.stop()
 
     def _validate_pipeline_input(
         self,
@@ -873,8 +884,10 @@ class ETLPipeline:
             self.loader.connect_db()
 
             try:
-                # Run loading
-                export_id = self.loader.load(raw_data, transformed_data, file_source)
+                # Run loading. Loader.load returns counts and records the
+                # ID of the export it created on the context.
+                result = self.loader.load(raw_data, transformed_data, file_source)
+                export_id = self.context.export_id if self.context.export_id is not None else result
 
                 # Save checkpoint
                 if self.context.output_dir:
@@ -0,0 +1,425 @@
+"""
+Sharded processing of a single export.
+
+A large export is split into ranges of conversations that are transformed
+and loaded independently, so that several workers can process one export:
+
+1. build_export_index() records the byte range of every conversation.
+2. plan_shards() splits the conversations into contiguous ranges with
+   similar message counts.
+3. create_export_archive() creates the archive record shards are loaded into.
+4. process_shard() transforms and loads one range.
+5. finalize_sharded_export() combines the shard results, creates the
+   export and stores the report aggregates of the whole export.
+
+If a shard fails, discard_sharded_export() removes the archive and the
+messages the other shards loaded into it. Shards still running check that
+their archive exists around every batch, and stop and remove what they
+loaded once it is gone.
+
+Shard descriptions and results are JSON-compatible, so they can be passed
+between Celery tasks.
+"""
+
+import os
+import shutil
+import tarfile
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.analysis.cache import invalidate_export
+from src.db.aggregates import ExportAggregator
+from src.utils.new_structured_logging import get_logger
+from src.utils.raw_json_stream import index_conversations, iter_conversation_range
+
+from .loader import Loader
+from .transformer import Transformer
+
+logger = get_logger(__name__)
+
+# Default number of shards an export is split into
+DEFAULT_SHARD_COUNT = 8
+
+# Exports are not split into shards smaller than this
+MIN_SHARD_MESSAGES = 10000
+
+# Messages a shard transforms and loads at a time
+SHARD_BATCH_MESSAGES = 5000
+
+
+def _find_messages_member(tar: tarfile.TarFile) -> tarfile.TarInfo:
+    for member in tar.getmembers():
+        if member.name.endswith("messages.json"):
+            return member
+    raise ValueError("No messages.json file found in TAR archive")
+
+
+def locate_export_json(file_path: str, temp_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Locate the export JSON of a Skype export file.
+
+    messages.json is read in place inside an uncompressed TAR archive;
+    compressed archives are extracted to temp_dir first.
+
+    Args:
+        file_path: Path to the Skype export file (JSON or TAR)
+        temp_dir: Directory for extracted files (default: next to the export)
+
+    Returns:
+        The path of the file holding the JSON, and the offset and size of
+        the JSON within it
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == ".json":
+        return {"path": file_path, "offset": 0, "size": os.path.getsize(file_path)}
+    if file_ext != ".tar":
+        raise ValueError(f"Unsupported file extension: {file_ext}")
+
+    try:
+        with tarfile.open(file_path, "r:") as tar:
+            member = _find_messages_member(tar)
+            return {"path": file_path, "offset": member.offset_data, "size": member.size}
+    except tarfile.ReadError:
+        # Compressed archives cannot be read in place
+        pass
+
+    with tarfile.open(file_path, "r:*") as tar:
+        member = _find_messages_member(tar)
+        target = os.path.join(
+            temp_dir or os.path.dirname(file_path),
+            f"{os.path.basename(file_path)}.messages.json",
+        )
+        with tar.extractfile(member) as source, open(target, "wb") as out:
+            shutil.copyfileobj(source, out)
+    return {"path": target, "offset": 0, "size": member.size}
+
+
+def build_export_index(file_path: str, temp_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Index the conversations of an export.
+
+    Args:
+        file_path: Path to the Skype export file (JSON or TAR)
+        temp_dir: Directory for files extracted from compressed archives
+
+    Returns:
+        Index with the JSON source (see locate_export_json), the export
+        metadata (userId, exportDate, ...), one [id, start, end, message
+        count] entry per conversation and the total message count
+    """
+    source = locate_export_json(file_path, temp_dir)
+    with open(source["path"], "rb") as f:
+        f.seek(source["offset"])
+        metadata, entries = index_conversations(f)
+
+    index = {
+        "source": source,
+        "metadata": metadata,
+        "conversations": [list(entry) for entry in entries],
+        "message_count": sum(entry[3] for entry in entries),
+    }
+    logger.info(
+        f"Indexed {len(entries)} conversations with {index['message_count']} messages in {file_path}"
+    )
+    return index
+
+
+def plan_shards(
+    index: Dict[str, Any],
+    shard_count: int = DEFAULT_SHARD_COUNT,
+    min_shard_messages: int = MIN_SHARD_MESSAGES,
+) -> List[Dict[str, Any]]:
+    """
+    Split the conversations of an export into contiguous ranges.
+
+    Ranges are balanced by message count. A conversation is never split,
+    so one very large conversation gets a shard of its own at most.
+
+    Args:
+        index: Index from build_export_index()
+        shard_count: Maximum number of shards
+        min_shard_messages: Minimum number of messages per shard
+
+    Returns:
+        Shards with their number, byte range, conversation count and
+        message count
+    """
+    conversations = index["conversations"]
+    if not conversations:
+        return []
+
+    total_messages = index["message_count"]
+    shard_count = max(1, min(shard_count, len(conversations), total_messages // min_shard_messages))
+
+    # Empty conversations still have to be loaded
+    total_weight = total_messages + len(conversations)
+    shards: List[Dict[str, Any]] = []
+    first = 0
+    weight = 0
+    messages = 0
+    for i, (_, _, _, message_count) in enumerate(conversations):
+        weight += message_count + 1
+        messages += message_count
+        is_last = i == len(conversations) - 1
+        if is_last or (
+            len(shards) < shard_count - 1 and weight >= total_weight * (len(shards) + 1) / shard_count
+        ):
+            shards.append({
+                "shard": len(shards),
+                "start": conversations[first][1],
+                "end": conversations[i][2],
+                "conversations": i - first + 1,
+                "messages": messages,
+            })
+            first = i + 1
+            messages = 0
+
+    return shards
+
+
+def iter_shard_conversations(source: Dict[str, Any], shard: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the conversations of a shard.
+
+    Args:
+        source: JSON source from the export index
+        shard: Shard from plan_shards()
+
+    Yields:
+        Conversation dictionaries whose messages are RawMessage objects
+    """
+    with open(source["path"], "rb") as f:
+        yield from iter_conversation_range(
+            f, source["offset"] + shard["start"], source["offset"] + shard["end"]
+        )
+
+
+def create_export_archive(
+    loader: Loader, file_path: str, index: Dict[str, Any], user_display_name: Optional[str] = None
+) -> str:
+    """
+    Create the archive record the shards of an export are loaded into.
+
+    Args:
+        loader: Loader connected to the target database
+        file_path: Path to the Skype export file
+        index: Index from build_export_index()
+        user_display_name: Display name of the user
+
+    Returns:
+        Archive ID
+    """
+    user_id = index["metadata"].get("userId")
+    users = {user_id: {"id": user_id, "display_name": user_display_name or ""}} if user_id else None
+    return loader.create_archive(file_path, users)
+
+
+def _archive_exists(loader: Loader, archive_id: str) -> bool:
+    """Check whether an archive has not been discarded."""
+    row = loader.db_connection.execute_and_fetch_one(
+        "SELECT 1 FROM archives WHERE id = %s", (archive_id,)
+    )
+    return row is not None
+
+
+def process_shard(
+    transformer: Transformer,
+    loader: Loader,
+    source: Dict[str, Any],
+    metadata: Dict[str, Any],
+    shard: Dict[str, Any],
+    archive_id: str,
+    user_display_name: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    batch_messages: int = SHARD_BATCH_MESSAGES,
+) -> Dict[str, Any]:
+    """
+    Transform and load the conversations of one shard.
+
+    Conversations are processed in batches of about batch_messages
+    messages, so memory use does not grow with the size of the shard.
+    The shard stops if its archive is discarded because another shard
+    failed, removing a batch that was loaded while it was discarded.
+
+    Args:
+        transformer: Transformer for the shard's conversations
+        loader: Loader connected to the target database
+        source: JSON source from the export index
+        metadata: Export metadata from the export index
+        shard: Shard from plan_shards()
+        archive_id: Archive from create_export_archive()
+        user_display_name: Display name of the user
+        progress_callback: Called with (messages done, messages in shard)
+            after every batch
+        batch_messages: Approximate number of messages per batch
+
+    Returns:
+        Shard result with loaded conversation and message counts and the
+        serialized report aggregates of the shard
+
+    Raises:
+        RuntimeError: If the archive was discarded
+    """
+    result = {"shard": shard["shard"], "conversations": 0, "messages": 0, "aggregates": None}
+    aggregator: Optional[ExportAggregator] = None
+    messages_done = 0
+    batch: List[Dict[str, Any]] = []
+    batch_size = 0
+
+    def flush() -> None:
+        nonlocal aggregator, messages_done, batch, batch_size
+        if not _archive_exists(loader, archive_id):
+            raise RuntimeError(f"Archive {archive_id} was discarded, stopping shard {shard['shard']}")
+
+        raw_data = {
+            "userId": metadata.get("userId"),
+            "exportDate": metadata.get("exportDate"),
+            "conversations": batch,
+        }
+        transformed = transformer.transform(raw_data, user_display_name)
+        counts, part = loader.load_shard(transformed, archive_id)
+        if not _archive_exists(loader, archive_id):
+            # Discarded while this batch was loading, so its messages were missed
+            discard_sharded_export(loader, archive_id)
+            raise RuntimeError(f"Archive {archive_id} was discarded, stopping shard {shard['shard']}")
+        result["conversations"] += counts.get("conversations", 0)
+        result["messages"] += counts.get("messages", 0)
+        if part is not None:
+            if aggregator is None:
+                aggregator = part
+            else:
+                aggregator.merge(part)
+
+        messages_done += batch_size
+        batch, batch_size = [], 0
+        if progress_callback:
+            progress_callback(messages_done, shard["messages"])
+
+    for conversation in iter_shard_conversations(source, shard):
+        batch.append(conversation)
+        batch_size += len(conversation.get("MessageList") or [])
+        if batch_size >= batch_messages:
+            flush()
+    if batch:
+        flush()
+
+    if aggregator is not None:
+        result["aggregates"] = aggregator.to_dict()
+
+    logger.info(
+        f"Processed shard {shard['shard']}: {result['conversations']} conversations, "
+        f"{result['messages']} messages"
+    )
+    return result
+
+
+def finalize_sharded_export(
+    loader: Loader,
+    shard_results: List[Dict[str, Any]],
+    metadata: Dict[str, Any],
+    file_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Combine the results of all shards of an export.
+
+    The export row is created once every shard is loaded, and the shards'
+    report aggregates are merged and stored under its ID.
+
+    Args:
+        loader: Loader connected to the target database
+        shard_results: Results of process_shard() for every shard
+        metadata: Export metadata from build_export_index()
+        file_path: Path to the Skype export file
+
+    Returns:
+        The export ID, total conversation and message counts and the number
+        of shards
+    """
+    aggregator: Optional[ExportAggregator] = None
+    for shard_result in sorted(shard_results, key=lambda r: r["shard"]):
+        if shard_result.get("aggregates") is None:
+            continue
+        part = ExportAggregator.from_dict(shard_result["aggregates"])
+        if aggregator is None:
+            aggregator = part
+        else:
+            aggregator.merge(part)
+
+    export_id = loader.create_export(
+        {"user_id": metadata.get("userId"), "export_date": metadata.get("exportDate")}, file_path
+    )
+    if aggregator is not None and export_id is not None:
+        aggregator.write(loader.db_connection, export_id)
+    # Export IDs are reused when a database is recreated
+    if export_id is not None:
+        invalidate_export(export_id)
+
+    return {
+        "export_id": export_id,
+        "shards": len(shard_results),
+        "conversations": sum(r["conversations"] for r in shard_results),
+        "messages": sum(r["messages"] for r in shard_results),
+    }
+
+
+def discard_sharded_export(loader: Loader, archive_id: str) -> None:
+    """
+    Remove the archive of an export whose shards could not all be loaded.
+
+    The messages loaded by the shards that succeeded are deleted with the
+    archive. Conversation and user rows do not reference their archive and
+    are left, as when a load is repeated.
+
+    Args:
+        loader: Loader connected to the target database
+        archive_id: Archive created by create_export_archive()
+    """
+    db_connection = loader.db_connection
+    db_connection.begin_transaction()
+    try:
+        db_connection.execute("DELETE FROM messages WHERE archive_id = %s", (archive_id,))
+        db_connection.execute("DELETE FROM archives WHERE id = %s", (archive_id,))
+        db_connection.commit()
+    except Exception:
+        db_connection.rollback()
+        raise
+
+    logger.info(f"Discarded archive {archive_id} of a failed sharded export")
+
+
+def aggregate_shard_progress(shards: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine the progress of the shards of an export into one status.
+
+    Args:
+        shards: Progress of every shard, with "status" (pending, running,
+            completed or failed), "messages_done", "messages" and, for
+            failed shards, "error"
+
+    Returns:
+        Status in the format of ProgressTracker.get_status(), with shard
+        counts. A completed status means all shards are loaded; the export
+        still has to be finalized.
+    """
+    total = sum(shard["messages"] for shard in shards)
+    done = sum(min(shard["messages_done"], shard["messages"]) for shard in shards)
+    completed = sum(1 for shard in shards if shard["status"] == "completed")
+    failed = [shard for shard in shards if shard["status"] == "failed"]
+
+    if failed:
+        status = "failed"
+    elif completed == len(shards):
+        status = "completed"
+    elif any(shard["status"] != "pending" for shard in shards):
+        status = "processing"
+    else:
+        status = "pending"
+
+    progress = {
+        "status": status,
+        "progress": 100 if status == "completed" else min(99, done * 100 // total if total else 0),
+        "message": f"Processed {done} of {total} messages ({completed}/{len(shards)} shards done)",
+        "shards": {"total": len(shards), "completed": completed, "failed": len(failed)},
+    }
+    if failed:
+        progress["error"] = failed[0].get("error")
+    return progress
@@ -6,7 +6,6 @@ allowing the ETL pipeline to handle millions of messages efficiently.
 """
 
 import logging
-import json
 import os
 import gc
 import time
@@ -15,6 +14,8 @@ from datetime import datetime
 import ijson
 
 from src.utils.interfaces import DatabaseConnectionProtocol
+from src.utils.memory_governor import MemoryGovernor
+from src.utils.raw_json_stream import RawExportReader, raw_json_of
 from .context import ETLContext
 
 logger = logging.getLogger(__name__)
@@ -43,6 +44,9 @@ class StreamingProcessor:
         self.context = context
         self.db_connection = db_connection
         self.memory_monitor = self.context.memory_monitor
+        self.memory_governor = getattr(self.context, 'memory_governor', None)
+        if not isinstance(self.memory_governor, MemoryGovernor):
+            self.memory_governor = None
         self.progress_tracker = self.context.progress_tracker
 
         logger.info("Streaming processor initialized")
@@ -110,25 +114,21 @@ class StreamingProcessor:
         if 'exportDate' in metadata:
             self.context.export_date = metadata['exportDate']
 
-        # Stream conversations
+        # Get conversation count first for progress tracking
         with open(file_path, 'rb') as f:
-            # Get conversation count first for progress tracking
             conversation_count = 0
             for _ in ijson.items(f, 'conversations.item'):
                 conversation_count += 1
 
-            # Reset file pointer
-            f.seek(0)
-
-            # Initialize progress tracking
-            if self.progress_tracker:
-                self.progress_tracker.start_phase('extract', total_conversations=conversation_count)
+        # Initialize progress tracking
+        if self.progress_tracker:
+            self.progress_tracker.start_phase('extract', total_conversations=conversation_count)
 
-            # Stream conversations
-            for conversation in ijson.items(f, 'conversations.item'):
-                # Check memory usage and force garbage collection if needed
-                if self.memory_monitor:
-                    self.memory_monitor.check_memory()
+        # Stream conversations, keeping each message's source JSON for raw_content
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for conversation in RawExportReader(f).iter_conversations():
+                # Hold back while memory usage is critical
+                self._wait_for_memory_headroom()
 
                 # Update progress
                 if self.progress_tracker:
@@ -206,41 +206,51 @@ class StreamingProcessor:
         if self.progress_tracker:
             self.progress_tracker.start_phase('transform_load')
 
-        # Process conversations
-        for conversation in conversation_iterator:
-            # Get conversation ID and message list
-            conversation_id = conversation.get('id')
-            message_list = conversation.get('MessageList', [])
+        # Sample memory in the background while processing
+        if self.memory_governor:
+            self.memory_governor.start()
 
-            # Update message count for progress tracking
-            if self.progress_tracker:
-                self.progress_tracker.total_messages += len(message_list)
+        try:
+            # Process conversations
+            for conversation in conversation_iterator:
+                # Get conversation ID and message list
+                conversation_id = conversation.get('id')
+                message_list = conversation.get('MessageList', [])
 
-            # Process messages in batches
-            for i in range(0, len(message_list), batch_size):
-                # Get batch of messages
-                message_batch = message_list[i:i+batch_size]
+                # Update message count for progress tracking
+                if self.progress_tracker:
+                    self.progress_tracker.total_messages += len(message_list)
 
-                # Transform and load batch
-                self._process_message_batch(conversation_id, conversation, message_batch)
+                # Process messages in batches sized by the memory governor
+                i = 0
+                while i < len(message_list):
+                    # Get batch of messages
+                    current_batch_size = self._current_batch_size(batch_size)
+                    message_batch = message_list[i:i+current_batch_size]
+                    i += current_batch_size
 
-                # Update statistics
-                stats['messages_processed'] += len(message_batch)
+                    # Transform and load batch
+                    self._process_message_batch(conversation_id, conversation, message_batch)
 
-                # Update progress
-                if self.progress_tracker:
-                    self.progress_tracker.update_message_progress(len(message_batch))
+                    # Update statistics
+                    stats['messages_processed'] += len(message_batch)
 
-                # Check memory usage and force garbage collection if needed
-                if self.memory_monitor:
-                    self.memory_monitor.check_memory()
+                    # Update progress
+                    if self.progress_tracker:
+                        self.progress_tracker.update_message_progress(len(message_batch))
 
-            # Update statistics
-            stats['conversations_processed'] += 1
+                    # Hold back while memory usage is critical
+                    self._wait_for_memory_headroom()
 
-            # Update progress
-            if self.progress_tracker:
-                self.progress_tracker.update_conversation_progress()
+                # Update statistics
+                stats['conversations_processed'] += 1
+
+                # Update progress
+                if self.progress_tracker:
+                    self.progress_tracker.update_conversation_progress()
+        finally:
+            if self.memory_governor:
+                self.memory_governor.stop()
 
         # Update statistics
         stats['end_time'] = datetime.now()
@@ -254,6 +264,34 @@ class StreamingProcessor:
 
         return stats
 
+    def _current_batch_size(self, batch_size: int) -> int:
+        """
+        Get the batch size to use for the next batch.
+
+        Args:
+            batch_size: Requested batch size
+
+        Returns:
+            The requested batch size, capped by the memory governor if present
+        """
+        if not self.memory_governor:
+            return batch_size
+        return min(batch_size, self.memory_governor.get('batch_size', batch_size))
+
+    def _wait_for_memory_headroom(self, timeout: float = 5.0) -> None:
+        """
+        Block while the memory governor reports critical memory usage.
+
+        Args:
+            timeout: Maximum number of seconds to wait before continuing anyway
+        """
+        if not self.memory_governor:
+            return
+        if not self.memory_governor.wait_for_headroom(timeout):
+            logger.warning(
+                f"Memory usage still critical after waiting {timeout:.1f} seconds, continuing"
+            )
+
     def _process_message_batch(
         self,
         conversation_id: str,
@@ -283,7 +321,7 @@ class StreamingProcessor:
                     'timestamp': self._parse_timestamp(message.get('originalarrivaltime')),
                     'message_type': message.get('messagetype'),
                     'content': self._extract_content(message),
-                    'raw_content': json.dumps(message),
+                    'raw_content': raw_json_of(message),
                     'is_edited': 'skypeeditedid' in message
                 }
 
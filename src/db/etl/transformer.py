@@ -17,6 +17,7 @@ from src.utils.conversation_processor import ConversationProcessor
 from src.utils.data_validator import DataValidator
 from src.utils.di import get_service
 from src.utils.extractors import IExtractor, DefaultExtractor, CallableExtractor, ObjectExtractor
+from src.utils.memory_governor import MemoryGovernor
 from src.utils.interfaces import (
     ContentExtractorProtocol,
     MessageHandlerFactoryProtocol,
@@ -122,12 +123,18 @@ class Transformer(TransformerProtocol):
         else:
             self.extractor = ObjectExtractor(structured_data_extractor)
 
+        # Use the context's memory governor to adapt chunk sizes, if any
+        memory_governor = getattr(context, "memory_governor", None)
+        if not isinstance(memory_governor, MemoryGovernor):
+            memory_governor = None
+
         # Create processors
         self.validator = DataValidator(strict_mode=False)
         self.message_processor = MessageProcessor(
             parallel_processing=self.parallel_processing,
             chunk_size=self.chunk_size,
             max_workers=self.max_workers,
+            memory_governor=memory_governor,
         )
         self.conversation_processor = ConversationProcessor()
 
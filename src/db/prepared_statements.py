@@ -0,0 +1,156 @@
+"""
+Server-side prepared statement cache.
+
+Statements that are sent many times (per-row inserts, per-batch bulk inserts,
+lookups by key) are PREPAREd once per connection and then run with EXECUTE,
+so PostgreSQL skips parsing and planning them again. Statements are written
+with the usual psycopg2 %s placeholders; the cache rewrites them to $n
+parameters when preparing.
+"""
+
+import itertools
+import logging
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Statements prepared per connection before the least recently used is deallocated
+DEFAULT_MAX_STATEMENTS = 128
+
+# PostgreSQL limit on the number of parameters of a single statement
+MAX_PARAMETERS = 65535
+
+# A %s placeholder that is not an escaped %%s
+_PLACEHOLDER = re.compile(r"(?<!%)%s")
+
+# Statement names are unique per process, so caches never collide on a connection
+_statement_names = itertools.count(1)
+
+
+def to_positional(query: str) -> str:
+    """
+    Convert psycopg2 %s placeholders to PostgreSQL $n parameters.
+
+    Args:
+        query: SQL text with %s placeholders
+
+    Returns:
+        SQL text with $1..$n parameters, without a trailing semicolon
+    """
+    counter = itertools.count(1)
+    query = _PLACEHOLDER.sub(lambda _: f"${next(counter)}", query)
+    return query.replace("%%", "%").strip().rstrip(";")
+
+
+class PreparedStatementCache:
+    """
+    Per-connection cache of prepared statements.
+
+    Connections are tracked with weak references, so statements are
+    forgotten when their connection is garbage collected. The cache is safe
+    to share between threads as long as each connection is used by one
+    thread at a time, which is how the connection pools hand them out.
+    """
+
+    def __init__(self, max_statements: int = DEFAULT_MAX_STATEMENTS):
+        """
+        Initialize the cache.
+
+        Args:
+            max_statements: Maximum prepared statements kept per connection
+        """
+        self.max_statements = max_statements
+        self._statements: "weakref.WeakKeyDictionary[Any, OrderedDict]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _statement_name(self, cursor, query: str, key: Hashable) -> str:
+        """Return the prepared statement name for a key, preparing it if needed."""
+        conn = cursor.connection
+        evicted = None
+        with self._lock:
+            statements = self._statements.get(conn)
+            if statements is None:
+                statements = self._statements[conn] = OrderedDict()
+            name = statements.get(key)
+            if name is not None:
+                statements.move_to_end(key)
+                self.hits += 1
+                return name
+
+            name = f"skype_stmt_{next(_statement_names)}"
+            if len(statements) >= self.max_statements:
+                _, evicted = statements.popitem(last=False)
+                self.evictions += 1
+
+        if evicted is not None:
+            cursor.execute(f"DEALLOCATE {evicted}")
+        cursor.execute(f"PREPARE {name} AS {to_positional(query)}")
+
+        with self._lock:
+            self._statements[conn][key] = name
+            self.misses += 1
+        logger.debug(f"Prepared statement {name} for {key!r}")
+        return name
+
+    def execute(
+        self,
+        cursor,
+        query: str,
+        params: Sequence[Any] = (),
+        key: Optional[Hashable] = None
+    ) -> None:
+        """
+        Execute a statement through its prepared form.
+
+        Results, if any, are read from the cursor as usual.
+
+        Args:
+            cursor: psycopg2 cursor
+            query: SQL text with %s placeholders
+            params: Query parameters
+            key: Cache key for the statement (defaults to the query text)
+        """
+        name = self._statement_name(cursor, query, query if key is None else key)
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+    def forget(self, conn) -> None:
+        """
+        Drop the statements recorded for a connection.
+
+        Call this when a connection is reset or the session is discarded.
+
+        Args:
+            conn: psycopg2 connection
+        """
+        with self._lock:
+            self._statements.pop(conn, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses (statements prepared), evictions,
+            hit rate and the number of connections with prepared statements
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "connections": len(self._statements),
+                "prepared_statements": sum(len(s) for s in self._statements.values()),
+            }
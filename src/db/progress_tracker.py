@@ -3,11 +3,22 @@ Progress Tracker Module
 
 This module provides functionality for tracking progress during ETL operations
 and emitting progress events to listeners.
+
+Progress events are delivered by a ProgressBroadcaster on a background
+thread, so listeners never slow down the pipeline. Updates are coalesced per
+task to at most PROGRESS_EMIT_RATE events per second; the final state of a
+task is always delivered. The state of every tracked task is kept in a
+ProgressStore shared by all API and worker processes on the host.
 """
 
+import json
 import logging
+import os
+import sqlite3
+import tempfile
+import threading
 import time
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -15,6 +26,223 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Default number of progress events per second and task
+DEFAULT_EMIT_RATE = 4.0
+
+# Default location of the shared progress store
+DEFAULT_STORE_PATH = os.path.join(tempfile.gettempdir(), "skype_parser_progress.db")
+
+# Seconds the state of a task is kept in the store after its last update
+STATE_TTL = 24 * 60 * 60
+
+# Statuses after which a task is not updated anymore
+FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+Listener = Callable[[Dict[str, Any]], None]
+
+CREATE_PROGRESS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS progress (
+        task_id TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+"""
+
+
+class ProgressBroadcaster:
+    """
+    Delivers progress events to listeners on a background thread.
+
+    Events published for a task while an earlier event of the task was
+    delivered less than 1 / rate seconds ago are coalesced: only the latest
+    one is delivered once the interval has passed. Events with a final
+    status are delivered right away.
+    """
+
+    def __init__(self, rate: float = DEFAULT_EMIT_RATE):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            rate: Maximum number of events per second and task
+        """
+        if rate <= 0:
+            raise ValueError(f"Progress emit rate must be positive, got {rate}")
+        self.interval = 1.0 / rate
+        self._pending: Dict[str, Tuple[Dict[str, Any], List[Listener]]] = {}
+        self._last_emit: Dict[str, float] = {}
+        self._in_flight: List[str] = []
+        self._flushing = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, task_id: str, data: Dict[str, Any], listeners: List[Listener]) -> None:
+        """
+        Queue a progress event, replacing a queued event of the same task.
+
+        Args:
+            task_id: Task the event belongs to
+            data: Progress data
+            listeners: Functions to call with the progress data
+        """
+        with self._condition:
+            self._pending[task_id] = (data, listeners)
+            # Started lazily, so forked worker processes get their own thread
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="progress-broadcaster", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self, task_id: Optional[str] = None, timeout: float = 5.0) -> bool:
+        """
+        Deliver queued events without waiting for their interval.
+
+        Args:
+            task_id: Task whose events to deliver (default: all tasks)
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            bool: True if the events were delivered within the timeout
+        """
+
+        def delivered() -> bool:
+            if task_id is None:
+                return not self._pending and not self._in_flight
+            return task_id not in self._pending and task_id not in self._in_flight
+
+        with self._condition:
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(delivered, timeout)
+            finally:
+                self._flushing -= 1
+
+    def _due(self, now: float) -> Tuple[List[str], Optional[float]]:
+        """Get the tasks whose events are due and the seconds until the next one is."""
+        due = []
+        wait = None
+        for task_id, (data, _) in self._pending.items():
+            remaining = self._last_emit.get(task_id, float("-inf")) + self.interval - now
+            if self._flushing or remaining <= 0 or data.get("status") in FINAL_STATUSES:
+                due.append(task_id)
+            elif wait is None or remaining < wait:
+                wait = remaining
+        return due, wait
+
+    def _run(self) -> None:
+        """Deliver events until the process exits."""
+        while True:
+            with self._condition:
+                due, wait = self._due(time.monotonic())
+                while not due:
+                    self._condition.wait(wait)
+                    due, wait = self._due(time.monotonic())
+
+                now = time.monotonic()
+                batch = [(task_id, self._pending.pop(task_id)) for task_id in due]
+                for task_id, (data, _) in batch:
+                    if data.get("status") in FINAL_STATUSES:
+                        self._last_emit.pop(task_id, None)
+                    else:
+                        self._last_emit[task_id] = now
+                self._in_flight = due
+
+            for _, (data, listeners) in batch:
+                for listener in listeners:
+                    try:
+                        listener(data)
+                    except Exception as e:
+                        logger.error(f"Error notifying listener: {e}")
+
+            with self._condition:
+                self._in_flight = []
+                self._condition.notify_all()
+
+
+class ProgressStore:
+    """
+    Keeps the progress of tasks in a SQLite file shared between processes.
+
+    States are stored as returned by ProgressTracker listeners and expire
+    STATE_TTL seconds after their last update.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, ttl: float = STATE_TTL):
+        """
+        Initialize the store, creating the file if needed.
+
+        Args:
+            path: Path of the SQLite file
+            ttl: Seconds a state is kept after its last update
+        """
+        self.path = path
+        self.ttl = ttl
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(CREATE_PROGRESS_TABLE_SQL)
+            conn.execute("DELETE FROM progress WHERE updated_at < ?", (time.time() - ttl,))
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the store."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def save(self, data: Dict[str, Any]) -> None:
+        """
+        Store the state of a task.
+
+        Args:
+            data: Progress data with a task_id
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO progress (task_id, state, updated_at) VALUES (?, ?, ?)",
+                (data["task_id"], json.dumps(data), time.time()),
+            )
+        finally:
+            conn.close()
+
+    def load(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the state of a task.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            The stored progress data, or None if the task is unknown or expired
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT state FROM progress WHERE task_id = ? AND updated_at >= ?",
+                (task_id, time.time() - self.ttl),
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, task_id: str) -> None:
+        """
+        Forget the state of a task.
+
+        Args:
+            task_id: Task ID
+        """
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM progress WHERE task_id = ?", (task_id,))
+        finally:
+            conn.close()
+
 
 class ProgressTracker:
     """
@@ -24,13 +252,22 @@ class ProgressTracker:
     about progress changes.
     """
 
-    def __init__(self, task_id: str, total_steps: int = 100):
+    def __init__(
+        self,
+        task_id: str,
+        total_steps: int = 100,
+        store: Optional[ProgressStore] = None,
+        broadcaster: Optional[ProgressBroadcaster] = None,
+    ):
         """
         Initialize the progress tracker.
 
         Args:
             task_id: Unique identifier for the task
             total_steps: Total number of steps in the task
+            store: Store to keep the task's progress in, if shared
+            broadcaster: Broadcaster delivering progress events (default:
+                the global broadcaster)
         """
         self.task_id = task_id
         self.total_steps = total_steps
@@ -40,10 +277,37 @@ class ProgressTracker:
         self.start_time = time.time()
         self.listeners: List[Callable[[Dict[str, Any]], None]] = []
         self.export_id = None
-        self.error = None
+        self.error_details: Optional[str] = None
+        self.store = store
+        self.broadcaster = broadcaster or get_broadcaster()
+
+        # Store the initial progress right away, so other processes find the task
+        if self.store is not None:
+            self.store.save(self._get_progress_data())
+
+    @classmethod
+    def from_state(
+        cls, state: Dict[str, Any], store: Optional[ProgressStore] = None
+    ) -> "ProgressTracker":
+        """
+        Create a tracker that continues from a stored state.
 
-        # Emit initial progress
-        self._emit_progress()
+        Args:
+            state: Progress data from a ProgressStore
+            store: Store to keep further progress in
+
+        Returns:
+            ProgressTracker with the stored state
+        """
+        tracker = cls(state["task_id"], state.get("total_steps", 100))
+        tracker.current_step = state.get("current_step", 0)
+        tracker.status = state["status"]
+        tracker.message = state["message"]
+        tracker.start_time = state["timestamp"] - state.get("elapsed_time", 0)
+        tracker.export_id = state.get("export_id")
+        tracker.error_details = state.get("error")
+        tracker.store = store
+        return tracker
 
     def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
         """
@@ -124,7 +388,7 @@ class ProgressTracker:
         """
         self.status = "failed"
         self.message = message
-        self.error = error
+        self.error_details = error
         self._emit_progress()
 
     def fail(self, message: str = "Task failed") -> None:
@@ -160,20 +424,18 @@ class ProgressTracker:
             status_obj["export_id"] = self.export_id
 
         # Add error if available
-        if self.error is not None:
-            status_obj["error"] = self.error
+        if self.error_details is not None:
+            status_obj["error"] = self.error_details
 
         return status_obj
 
     def _emit_progress(self) -> None:
-        """Emit progress to all listeners."""
-        progress_data = self._get_progress_data()
-
-        for listener in self.listeners:
-            try:
-                listener(progress_data)
-            except Exception as e:
-                logger.error(f"Error notifying listener: {e}")
+        """Emit progress to all listeners and the store, off the calling thread."""
+        listeners = list(self.listeners)
+        if self.store is not None:
+            listeners.append(self.store.save)
+        if listeners:
+            self.broadcaster.publish(self.task_id, self._get_progress_data(), listeners)
 
     def _get_progress_data(self) -> Dict[str, Any]:
         """
@@ -203,14 +465,55 @@ class ProgressTracker:
             data["export_id"] = self.export_id
 
         # Add error if available
-        if self.error is not None:
-            data["error"] = self.error
+        if self.error_details is not None:
+            data["error"] = self.error_details
 
         return data
 
 
-# Global registry of progress trackers
+# Trackers of the tasks run by this process; other processes' tasks are
+# read from the progress store
 _trackers: Dict[str, ProgressTracker] = {}
+_progress_store: Optional[ProgressStore] = None
+_broadcaster: Optional[ProgressBroadcaster] = None
+_lock = threading.Lock()
+
+
+def get_progress_store() -> ProgressStore:
+    """
+    Get the global progress store.
+
+    The PROGRESS_STORE_PATH environment variable sets its location.
+
+    Returns:
+        ProgressStore instance
+    """
+    global _progress_store
+
+    with _lock:
+        if _progress_store is None:
+            _progress_store = ProgressStore(os.environ.get("PROGRESS_STORE_PATH", DEFAULT_STORE_PATH))
+
+    return _progress_store
+
+
+def get_broadcaster() -> ProgressBroadcaster:
+    """
+    Get the global progress broadcaster.
+
+    The PROGRESS_EMIT_RATE environment variable sets the maximum number of
+    progress events per second and task.
+
+    Returns:
+        ProgressBroadcaster instance
+    """
+    global _broadcaster
+
+    with _lock:
+        if _broadcaster is None:
+            _broadcaster = ProgressBroadcaster(float(os.environ.get("PROGRESS_EMIT_RATE", DEFAULT_EMIT_RATE)))
+
+    return _broadcaster
 
 
 def get_tracker(task_id: str) -> Optional[ProgressTracker]:
@@ -221,33 +524,44 @@ def get_tracker(task_id: str) -> Optional[ProgressTracker]:
         task_id: Task ID to look up
 
     Returns:
-        ProgressTracker if found, None otherwise
+        The tracker if the task runs in this process, a tracker continuing
+        from the stored state if another process tracks it, None otherwise
     """
-    return _trackers.get(task_id)
+    tracker = _trackers.get(task_id)
+    if tracker is not None:
+        return tracker
 
+    store = get_progress_store()
+    state = store.load(task_id)
+    return ProgressTracker.from_state(state, store) if state else None
 
-def create_tracker(task_id: str, total_steps: int = 100) -> ProgressTracker:
+
+def create_tracker(task_id: str, total_steps: int = 100, shared: bool = True) -> ProgressTracker:
     """
-    Create a new progress tracker.
+    Create a new progress tracker for a task run by this process.
 
     Args:
         task_id: Unique identifier for the task
         total_steps: Total number of steps in the task
+        shared: Whether to keep the task's progress in the progress store
 
     Returns:
         Newly created ProgressTracker
     """
-    tracker = ProgressTracker(task_id, total_steps)
+    tracker = ProgressTracker(task_id, total_steps, store=get_progress_store() if shared else None)
     _trackers[task_id] = tracker
     return tracker
 
 
 def remove_tracker(task_id: str) -> None:
     """
-    Remove a progress tracker.
+    Remove a progress tracker once its task is done.
+
+    Queued progress events of the task are delivered first. The task's
+    state stays in the progress store until it expires.
 
     Args:
         task_id: Task ID to remove
     """
-    if task_id in _trackers:
-        del _trackers[task_id]
+    get_broadcaster().flush(task_id)
+    _trackers.pop(task_id, None)
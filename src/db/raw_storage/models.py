@@ -2,7 +2,11 @@
 Database models for raw and cleaned Skype data storage.
 """
 
-CREATE_RAW_TABLES_SQL = """
+# SHA-256 of a JSONB value as PostgreSQL stores it, computed on the server
+# (the built-in sha256() needs PostgreSQL 11 or later)
+_CONTENT_DIGEST = "encode(sha256(convert_to({}::text, 'UTF8')), 'hex')"
+
+CREATE_RAW_TABLES_SQL = f"""
 -- Raw data storage
 CREATE TABLE IF NOT EXISTS raw_skype_exports (
     id SERIAL PRIMARY KEY,
@@ -14,9 +18,27 @@ CREATE TABLE IF NOT EXISTS raw_skype_exports (
     CONSTRAINT uq_file_hash UNIQUE (file_hash)
 );
 
+-- SHA-256 of the original file's bytes, and of raw_data as stored. file_hash
+-- stays the hash of the parsed data so older exports are still found. Rows
+-- written before content_hash existed are filled in by
+-- SkypeDataStorage.backfill_content_hashes().
+ALTER TABLE raw_skype_exports ADD COLUMN IF NOT EXISTS source_hash VARCHAR(64);
+ALTER TABLE raw_skype_exports ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
 -- Create index for faster JSON querying
 CREATE INDEX IF NOT EXISTS idx_raw_data_gin ON raw_skype_exports USING gin (raw_data);
 CREATE INDEX IF NOT EXISTS idx_export_date ON raw_skype_exports (export_date DESC);
+CREATE INDEX IF NOT EXISTS idx_raw_source_hash ON raw_skype_exports (source_hash);
+
+-- Compressed chunks of original export files for chunked raw storage
+CREATE TABLE IF NOT EXISTS raw_skype_export_chunks (
+    raw_export_id INTEGER NOT NULL REFERENCES raw_skype_exports(id) ON DELETE CASCADE,
+    chunk_index INTEGER NOT NULL,
+    data BYTEA NOT NULL,
+    chunk_hash VARCHAR(64) NOT NULL,
+    raw_size INTEGER NOT NULL,
+    PRIMARY KEY (raw_export_id, chunk_index)
+);
 
 -- Cleaned data storage
 CREATE TABLE IF NOT EXISTS cleaned_skype_exports (
@@ -58,14 +80,80 @@ FROM raw_skype_exports
 WHERE file_hash = %s;
 """
 
-# SQL for inserting raw data
-INSERT_RAW_DATA_SQL = """
-INSERT INTO raw_skype_exports (raw_data, file_name, file_hash, export_date)
-VALUES (%s, %s, %s, %s)
+# SQL for checking whether an original file was stored, by the hash of its
+# bytes (source_hash, or file_hash for chunked exports)
+CHECK_DUPLICATE_FILE_SQL = """
+SELECT id, file_name, export_date
+FROM raw_skype_exports
+WHERE source_hash = %s OR file_hash = %s
+LIMIT 1;
+"""
+
+# SQL for recording the digest of one batch of exports stored before
+# content_hash existed; returns a row per updated export
+BACKFILL_CONTENT_HASH_SQL = f"""
+UPDATE raw_skype_exports
+SET content_hash = {_CONTENT_DIGEST.format('raw_data')}
+WHERE id IN (
+    SELECT id FROM raw_skype_exports
+    WHERE content_hash IS NULL
+    ORDER BY id
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id;
+"""
+
+# SQL for verifying a stored export without transferring its data: the
+# digest of raw_data is recomputed on the server and compared with the one
+# recorded when it was written (NULL if none was), and file_hash with the
+# expected hash if given
+VERIFY_HASH_SQL = f"""
+SELECT
+    content_hash = {_CONTENT_DIGEST.format('raw_data')},
+    %s::text IS NULL OR file_hash = %s
+FROM raw_skype_exports
+WHERE id = %s;
+"""
+
+# SQL for inserting raw data; content_hash is the digest of raw_data as stored
+INSERT_RAW_DATA_SQL = f"""
+INSERT INTO raw_skype_exports (raw_data, file_name, file_hash, source_hash, export_date, content_hash)
+SELECT input.raw_data, %s, %s, %s, %s::timestamp, {_CONTENT_DIGEST.format('input.raw_data')}
+FROM (SELECT %s::jsonb AS raw_data) AS input
 ON CONFLICT (file_hash) DO NOTHING
 RETURNING id;
 """
 
+# SQL for inserting one compressed chunk of a raw export file
+INSERT_RAW_CHUNK_SQL = """
+INSERT INTO raw_skype_export_chunks (raw_export_id, chunk_index, data, chunk_hash, raw_size)
+VALUES (%s, %s, %s, %s, %s);
+"""
+
+# SQL for reading the number of chunks recorded for a raw export file
+GET_RAW_CHUNK_COUNT_SQL = """
+SELECT (raw_data->>'chunk_count')::integer
+FROM raw_skype_exports
+WHERE id = %s;
+"""
+
+# SQL for reading the chunks of a raw export file in order
+GET_RAW_CHUNKS_SQL = """
+SELECT chunk_index, data, chunk_hash, raw_size
+FROM raw_skype_export_chunks
+WHERE raw_export_id = %s
+ORDER BY chunk_index;
+"""
+
+# SQL for updating the metadata of a raw export
+UPDATE_RAW_METADATA_SQL = f"""
+UPDATE raw_skype_exports
+SET raw_data = input.raw_data, content_hash = {_CONTENT_DIGEST.format('input.raw_data')}
+FROM (SELECT %s::jsonb AS raw_data) AS input
+WHERE id = %s;
+"""
+
 # SQL for inserting cleaned data
 INSERT_CLEANED_DATA_SQL = """
 INSERT INTO cleaned_skype_exports (raw_export_id, cleaned_data, cleaning_version)
@@ -2,33 +2,79 @@
 Database operations for storing raw and cleaned Skype data.
 """
 
+import io
 import json
 import hashlib
 import logging
+import zlib
 from datetime import datetime
-from typing import Dict, Optional, Tuple
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple, Union
 
 from psycopg2.extras import Json
 from psycopg2.pool import SimpleConnectionPool
 
 from .models import (
+    BACKFILL_CONTENT_HASH_SQL,
     CREATE_RAW_TABLES_SQL,
     INSERT_RAW_DATA_SQL,
+    INSERT_RAW_CHUNK_SQL,
     INSERT_CLEANED_DATA_SQL,
     CHECK_DUPLICATE_SQL,
+    CHECK_DUPLICATE_FILE_SQL,
     GET_LATEST_CLEANED_SQL,
+    GET_RAW_CHUNK_COUNT_SQL,
+    GET_RAW_CHUNKS_SQL,
+    UPDATE_RAW_METADATA_SQL,
+    VERIFY_HASH_SQL,
 )
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class _ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = memoryview(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._chunks.close()
+        super().close()
+
+
 class SkypeDataStorage:
-    """Handles storage of raw and cleaned Skype data in PostgreSQL."""
+    """
+    Handles storage of raw and cleaned Skype data in PostgreSQL.
+
+    Raw exports can be stored either as a single JSONB value (store_raw_data)
+    or, for large exports, as the original file split into compressed chunks
+    with only metadata in JSONB (store_raw_file).
+    """
 
     CLEANING_VERSION = "1.0.0"  # Update this when cleaning logic changes
     MIN_CONNECTIONS = 1
     MAX_CONNECTIONS = 10
+    HASH_CHUNK_SIZE = 1024 * 1024
+    RAW_CHUNK_SIZE = 4 * 1024 * 1024
+    RAW_COMPRESSION_LEVEL = 6
+    BACKFILL_BATCH_SIZE = 500
 
     def __init__(self, connection_params: Dict[str, str]):
         """
@@ -82,9 +128,46 @@ class SkypeDataStorage:
         finally:
             self.return_connection(conn)
 
+    def backfill_content_hashes(self, batch_size: Optional[int] = None) -> int:
+        """
+        Record the content digest of exports stored before content_hash existed.
+
+        This is a one-off migration for databases created by older versions,
+        run separately from ensure_tables_exist(). Rows are updated in
+        batches, each in its own transaction, so no long lock is held on the
+        table; it can be interrupted and run again.
+
+        Args:
+            batch_size: Number of exports updated per transaction
+                (default: BACKFILL_BATCH_SIZE)
+
+        Returns:
+            int: Number of exports updated
+        """
+        batch_size = batch_size or self.BACKFILL_BATCH_SIZE
+        total = 0
+        conn = self.get_connection()
+        try:
+            while True:
+                with conn.cursor() as cur:
+                    cur.execute(BACKFILL_CONTENT_HASH_SQL, (batch_size,))
+                    updated = len(cur.fetchall())
+                conn.commit()
+                total += updated
+                if updated < batch_size:
+                    break
+            logger.info(f"Recorded the content digest of {total} raw exports")
+            return total
+        except Exception as e:
+            logger.error(f"Failed to backfill content digests: {e}")
+            conn.rollback()
+            raise
+        finally:
+            self.return_connection(conn)
+
     def calculate_file_hash(self, data: Dict) -> str:
         """
-        Calculate SHA-256 hash of the data for integrity verification.
+        Calculate SHA-256 hash of the data, stored as file_hash for duplicate detection.
 
         Args:
             data: Dictionary containing the Skype data
@@ -95,6 +178,55 @@ class SkypeDataStorage:
         data_str = json.dumps(data, sort_keys=True)
         return hashlib.sha256(data_str.encode()).hexdigest()
 
+    @classmethod
+    def hash_file(cls, file: Union[str, BinaryIO]) -> str:
+        """
+        Calculate the SHA-256 hash of a file's bytes, reading it in chunks.
+
+        This is much cheaper than hashing the parsed data and can be done
+        before the file is parsed at all. The result is stored as source_hash.
+
+        Args:
+            file: Path to the file, or a binary file object positioned at the start
+
+        Returns:
+            str: Hexadecimal representation of the SHA-256 hash
+        """
+        if isinstance(file, str):
+            with open(file, 'rb') as f:
+                return cls.hash_file(f)
+
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: file.read(cls.HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def check_duplicate_file(self, file: Union[str, BinaryIO]) -> Tuple[str, Optional[Dict]]:
+        """
+        Check whether a file has already been stored, without parsing it.
+
+        Args:
+            file: Path to the file, or a binary file object positioned at the start
+
+        Returns:
+            Tuple[str, Optional[Dict]]: The file hash, and the existing file info
+            if the file was stored before
+        """
+        file_hash = self.hash_file(file)
+        return file_hash, self.check_duplicate_source(file_hash)
+
+    def check_duplicate_source(self, source_hash: str) -> Optional[Dict]:
+        """
+        Check if an original file with the given hash was already stored.
+
+        Args:
+            source_hash: SHA-256 hash of the file's bytes from hash_file()
+
+        Returns:
+            Optional[Dict]: Existing file info if found, None otherwise
+        """
+        return self._find_export(CHECK_DUPLICATE_FILE_SQL, (source_hash, source_hash))
+
     def check_duplicate(self, file_hash: str) -> Optional[Dict]:
         """
         Check if a file with the given hash already exists.
@@ -105,10 +237,43 @@ class SkypeDataStorage:
         Returns:
             Optional[Dict]: Existing file info if found, None otherwise
         """
+        return self._find_export(CHECK_DUPLICATE_SQL, (file_hash,))
+
+    def _find_stored_export(
+        self,
+        data: Dict,
+        source_hash: Optional[str]
+    ) -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        Look up an export that was already stored, hashing its data only if needed.
+
+        The source hash is checked first, as it was computed from the file
+        without serializing the data. The data hash, which exports stored
+        without a source hash are found by and which new rows need as
+        file_hash, is only computed on a miss.
+
+        Args:
+            data: Dictionary containing the raw Skype data
+            source_hash: Optional hash of the original file from hash_file()
+
+        Returns:
+            Tuple[Optional[str], Optional[Dict]]: The data hash (None if the
+            export was found by its source hash), and the existing export info
+        """
+        if source_hash:
+            existing = self.check_duplicate_source(source_hash)
+            if existing:
+                return None, existing
+
+        file_hash = self.calculate_file_hash(data)
+        return file_hash, self.check_duplicate(file_hash)
+
+    def _find_export(self, query: str, params: Tuple) -> Optional[Dict]:
+        """Return the info of the raw export found by a duplicate check query."""
         conn = self.get_connection()
         try:
             with conn.cursor() as cur:
-                cur.execute(CHECK_DUPLICATE_SQL, (file_hash,))
+                cur.execute(query, params)
                 result = cur.fetchone()
                 if result:
                     return {
@@ -120,37 +285,52 @@ class SkypeDataStorage:
         finally:
             self.return_connection(conn)
 
-    def verify_data_integrity(self, raw_id: int, data: Dict) -> bool:
+    def verify_data_integrity(
+        self,
+        raw_id: int,
+        data: Optional[Dict] = None,
+        file_hash: Optional[str] = None
+    ) -> bool:
         """
-        Verify the integrity of stored data by comparing hashes.
+        Verify the integrity of stored data on the server.
+
+        The SHA-256 of the stored raw_data is recomputed by PostgreSQL and
+        compared with the digest recorded when it was written. Only booleans
+        come back from the database; the stored data is not transferred.
 
         Args:
             raw_id: ID of the raw data record
-            data: Original data to verify against
+            data: Original data, whose hash must match the stored file_hash
+            file_hash: Expected file_hash, used instead of hashing data
 
         Returns:
             bool: True if data matches, False otherwise
         """
+        if file_hash is None and data is not None:
+            file_hash = self.calculate_file_hash(data)
+
         conn = self.get_connection()
         try:
             with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT raw_data, file_hash FROM raw_skype_exports WHERE id = %s",
-                    (raw_id,)
-                )
-                stored_data, stored_hash = cur.fetchone()
+                cur.execute(VERIFY_HASH_SQL, (file_hash, file_hash, raw_id))
+                result = cur.fetchone()
 
-                # Calculate hash of original data
-                original_hash = self.calculate_file_hash(data)
+                if result is None:
+                    logger.error(f"Data integrity check failed: no raw export with ID {raw_id}")
+                    return False
 
-                # Compare hashes
-                if original_hash != stored_hash:
-                    logger.error("Data integrity check failed: hash mismatch")
+                content_matches, hash_matches = result
+                if content_matches is None:
+                    logger.warning(
+                        f"Raw export {raw_id} has no recorded content digest; "
+                        f"run backfill_content_hashes() to record it"
+                    )
+                elif not content_matches:
+                    logger.error("Data integrity check failed: stored data does not match its digest")
                     return False
 
-                # Compare actual data
-                if stored_data != data:
-                    logger.error("Data integrity check failed: content mismatch")
+                if not hash_matches:
+                    logger.error("Data integrity check failed: hash mismatch")
                     return False
 
                 return True
@@ -161,7 +341,8 @@ class SkypeDataStorage:
         self,
         data: Dict,
         file_name: str,
-        export_date: Optional[datetime] = None
+        export_date: Optional[datetime] = None,
+        source_hash: Optional[str] = None
     ) -> int:
         """
         Store raw Skype data in the database.
@@ -170,16 +351,15 @@ class SkypeDataStorage:
             data: Dictionary containing the raw Skype data
             file_name: Name of the original file
             export_date: Optional timestamp of when the data was exported from Skype
+            source_hash: Optional hash of the original file from hash_file()
 
         Returns:
             int: ID of the inserted record
         """
         conn = self.get_connection()
         try:
-            file_hash = self.calculate_file_hash(data)
-
             # Check for duplicates
-            existing = self.check_duplicate(file_hash)
+            file_hash, existing = self._find_stored_export(data, source_hash)
             if existing:
                 logger.info(f"File already exists with ID: {existing['id']}")
                 return existing['id']
@@ -188,10 +368,11 @@ class SkypeDataStorage:
                 cur.execute(
                     INSERT_RAW_DATA_SQL,
                     (
-                        Json(data),
                         file_name,
                         file_hash,
-                        export_date or datetime.now()
+                        source_hash,
+                        export_date or datetime.now(),
+                        Json(data)
                     )
                 )
                 raw_id = cur.fetchone()[0]
@@ -199,7 +380,7 @@ class SkypeDataStorage:
             conn.commit()
 
             # Verify data integrity
-            if not self.verify_data_integrity(raw_id, data):
+            if not self.verify_data_integrity(raw_id, file_hash=file_hash):
                 raise ValueError("Data integrity verification failed")
 
             logger.info(f"Stored raw data with ID: {raw_id}")
@@ -212,6 +393,191 @@ class SkypeDataStorage:
         finally:
             self.return_connection(conn)
 
+    def store_raw_file(
+        self,
+        file: Union[str, BinaryIO],
+        file_name: str,
+        export_date: Optional[datetime] = None,
+        metadata: Optional[Dict] = None,
+        file_hash: Optional[str] = None
+    ) -> int:
+        """
+        Store an original export file as compressed chunks.
+
+        The file is streamed in RAW_CHUNK_SIZE chunks, each compressed with zlib
+        and stored with its own SHA-256 hash. The raw_data column only holds
+        metadata, which keeps rows and the GIN index small for large exports.
+
+        Args:
+            file: Path to the file, or a seekable binary file object positioned at the start
+            file_name: Name of the original file
+            export_date: Optional timestamp of when the data was exported from Skype
+            metadata: Optional metadata to keep in the raw_data column (e.g. userId)
+            file_hash: Optional hash of the file from hash_file(); computed if not given
+
+        Returns:
+            int: ID of the raw export record
+
+        Raises:
+            ValueError: If the file changes while it is being stored
+        """
+        if isinstance(file, str):
+            with open(file, 'rb') as f:
+                return self.store_raw_file(f, file_name, export_date, metadata, file_hash)
+
+        if file_hash is None:
+            start = file.tell()
+            file_hash = self.hash_file(file)
+            file.seek(start)
+
+        existing = self.check_duplicate_source(file_hash)
+        if existing:
+            logger.info(f"File already exists with ID: {existing['id']}")
+            return existing['id']
+
+        conn = self.get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    INSERT_RAW_DATA_SQL,
+                    (
+                        file_name,
+                        file_hash,
+                        file_hash,
+                        export_date or datetime.now(),
+                        Json({'storage': 'chunked'})
+                    )
+                )
+                row = cur.fetchone()
+                if row is None:
+                    # Stored concurrently by another import
+                    conn.rollback()
+                    return self.check_duplicate(file_hash)['id']
+                raw_id = row[0]
+
+                digest = hashlib.sha256()
+                chunk_count = 0
+                file_size = 0
+                compressed_size = 0
+                for chunk in iter(lambda: file.read(self.RAW_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    compressed = zlib.compress(chunk, self.RAW_COMPRESSION_LEVEL)
+                    cur.execute(
+                        INSERT_RAW_CHUNK_SQL,
+                        (
+                            raw_id,
+                            chunk_count,
+                            compressed,
+                            hashlib.sha256(chunk).hexdigest(),
+                            len(chunk)
+                        )
+                    )
+                    chunk_count += 1
+                    file_size += len(chunk)
+                    compressed_size += len(compressed)
+
+                if digest.hexdigest() != file_hash:
+                    raise ValueError("File changed while it was being stored")
+
+                cur.execute(
+                    UPDATE_RAW_METADATA_SQL,
+                    (
+                        Json({
+                            'storage': 'chunked',
+                            'compression': 'zlib',
+                            'chunk_size': self.RAW_CHUNK_SIZE,
+                            'chunk_count': chunk_count,
+                            'file_size': file_size,
+                            'compressed_size': compressed_size,
+                            'metadata': metadata or {},
+                        }),
+                        raw_id
+                    )
+                )
+
+            conn.commit()
+            logger.info(
+                f"Stored raw file with ID: {raw_id} ({chunk_count} chunks, "
+                f"{file_size} bytes, {compressed_size} compressed)"
+            )
+            return raw_id
+
+        except Exception as e:
+            logger.error(f"Failed to store raw file: {e}")
+            conn.rollback()
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def iter_raw_file(self, raw_id: int, verify: bool = True) -> Iterator[bytes]:
+        """
+        Stream the original file of a chunked raw export.
+
+        Chunks are fetched a few at a time with a server-side cursor and
+        decompressed one by one, so the file is never held in memory.
+
+        Args:
+            raw_id: ID of the raw export record
+            verify: Whether to check each chunk against its stored hash
+
+        Yields:
+            bytes: Consecutive pieces of the original file
+
+        Raises:
+            ValueError: If the export was not stored as chunks, or a chunk is
+                missing or does not match its hash
+        """
+        conn = self.get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(GET_RAW_CHUNK_COUNT_SQL, (raw_id,))
+                row = cur.fetchone()
+            if row is None or row[0] is None:
+                raise ValueError(f"Raw export {raw_id} was not stored as chunks")
+            chunk_count = row[0]
+
+            with conn.cursor(name=f"raw_export_chunks_{raw_id}") as cur:
+                cur.itersize = 4
+                cur.execute(GET_RAW_CHUNKS_SQL, (raw_id,))
+                expected_index = 0
+                for chunk_index, data, chunk_hash, raw_size in cur:
+                    if chunk_index != expected_index:
+                        raise ValueError(f"Raw export {raw_id} is missing chunk {expected_index}")
+                    chunk = zlib.decompress(data)
+                    if verify and (
+                        len(chunk) != raw_size
+                        or hashlib.sha256(chunk).hexdigest() != chunk_hash
+                    ):
+                        raise ValueError(f"Chunk {chunk_index} of raw export {raw_id} is corrupt")
+                    expected_index += 1
+                    yield chunk
+
+                # Trailing chunks, or all of them, may be missing too
+                if expected_index != chunk_count:
+                    raise ValueError(
+                        f"Raw export {raw_id} has {expected_index} of its {chunk_count} chunks"
+                    )
+        finally:
+            # End the read-only transaction holding the cursor
+            conn.rollback()
+            self.return_connection(conn)
+
+    def open_raw_file(self, raw_id: int, verify: bool = True) -> BinaryIO:
+        """
+        Open the original file of a chunked raw export for streaming reads.
+
+        The result can be passed to streaming parsers such as ijson. Close it
+        to release its database connection early.
+
+        Args:
+            raw_id: ID of the raw export record
+            verify: Whether to check each chunk against its stored hash
+
+        Returns:
+            BinaryIO: Read-only binary file object
+        """
+        return io.BufferedReader(_ChunkReader(self.iter_raw_file(raw_id, verify)))
+
     def get_latest_cleaned_version(self, raw_export_id: int) -> Optional[Dict]:
         """
         Get the latest cleaned version of a raw export.
@@ -285,7 +651,8 @@ class SkypeDataStorage:
         raw_data: Dict,
         cleaned_data: Dict,
         file_name: str,
-        export_date: Optional[datetime] = None
+        export_date: Optional[datetime] = None,
+        source_hash: Optional[str] = None
     ) -> Tuple[int, int]:
         """
         Store both raw and cleaned Skype data in a single transaction.
@@ -295,6 +662,7 @@ class SkypeDataStorage:
             cleaned_data: Dictionary containing the cleaned Skype data
             file_name: Name of the original file
             export_date: Optional timestamp of when the data was exported from Skype
+            source_hash: Optional hash of the original file from hash_file()
 
         Returns:
             Tuple[int, int]: (raw_data_id, cleaned_data_id)
@@ -305,26 +673,27 @@ class SkypeDataStorage:
             with conn:
                 with conn.cursor() as cur:
                     # Check for duplicates
-                    file_hash = self.calculate_file_hash(raw_data)
-                    existing = self.check_duplicate(file_hash)
+                    file_hash, existing = self._find_stored_export(raw_data, source_hash)
                     if existing:
                         logger.info(f"File already exists with ID: {existing['id']}")
                         # Get latest cleaned version
                         latest = self.get_latest_cleaned_version(existing['id'])
                         if latest:
                             return existing['id'], latest['id']
-
-                    # Store raw data
-                    cur.execute(
-                        INSERT_RAW_DATA_SQL,
-                        (
-                            Json(raw_data),
-                            file_name,
-                            file_hash,
-                            export_date or datetime.now()
+                        raw_id = existing['id']
+                    else:
+                        # Store raw data
+                        cur.execute(
+                            INSERT_RAW_DATA_SQL,
+                            (
+                                file_name,
+                                file_hash,
+                                source_hash,
+                                export_date or datetime.now(),
+                                Json(raw_data)
+                            )
                         )
-                    )
-                    raw_id = cur.fetchone()[0]
+                        raw_id = cur.fetchone()[0]
 
                     # Store cleaned data
                     cur.execute(
@@ -337,8 +706,9 @@ class SkypeDataStorage:
                     )
                     cleaned_id = cur.fetchone()[0]
 
-            # Verify data integrity
-            if not self.verify_data_integrity(raw_id, raw_data):
+            # Verify data integrity (file_hash is None for an export found
+            # by its source hash, whose stored file_hash is not recomputed)
+            if not self.verify_data_integrity(raw_id, file_hash=file_hash):
                 raise ValueError("Data integrity verification failed")
 
             logger.info(f"Stored Skype export (raw_id: {raw_id}, cleaned_id: {cleaned_id})")
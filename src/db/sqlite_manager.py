@@ -0,0 +1,475 @@
+"""
+SQLite database manager for local runs.
+
+This module provides the SQLiteDatabaseManager class, a drop-in replacement
+for DatabaseManager that stores data in a single SQLite file. It lets exports
+be ingested and queried without a PostgreSQL server, and makes parse and
+transform benchmarks independent of database latency.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.utils.db_connection import DEFAULT_STREAM_ITERSIZE
+from src.utils.interfaces import DatabaseConnectionProtocol
+from src.utils.new_structured_logging import get_logger, log_execution_time, handle_errors
+
+logger = get_logger(__name__)
+
+# Default database file
+DEFAULT_SQLITE_PATH = "skype_parser.db"
+
+# Pragmas applied to every connection. WAL lets readers run while a load is
+# writing, and synchronous=NORMAL only syncs at checkpoints, which is safe
+# in WAL mode. A negative cache_size is in KiB.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+# A %s placeholder that is not an escaped %%s
+_PLACEHOLDER = re.compile(r"(?<!%)%s")
+
+# SQLite has no DROP ... CASCADE
+_CASCADE = re.compile(r"\s+CASCADE\s*;?\s*$", re.IGNORECASE)
+
+# Tables the loader writes to, with the columns it uses. The PostgreSQL
+# schema is managed outside this package; a SQLite file starts empty.
+# Conversations, messages and users have no key, so that an export can be
+# loaded more than once, as on PostgreSQL.
+LOADER_SCHEMA_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS skype_exports (
+        id INTEGER PRIMARY KEY,
+        user_id TEXT,
+        export_date TIMESTAMP,
+        file_source TEXT,
+        created_at TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS archives (
+        id TEXT PRIMARY KEY,
+        user_id TEXT,
+        name TEXT,
+        file_path TEXT,
+        file_size INTEGER,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conversations (
+        conversation_id TEXT,
+        display_name TEXT,
+        thread_type TEXT,
+        created_at TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS messages (
+        id TEXT,
+        archive_id TEXT,
+        sender_name TEXT,
+        sender_id TEXT,
+        content TEXT,
+        timestamp TIMESTAMP,
+        message_type TEXT,
+        created_at TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT,
+        display_name TEXT,
+        properties TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_loader_messages_archive_id ON messages (archive_id)",
+    "CREATE INDEX IF NOT EXISTS idx_loader_messages_timestamp ON messages (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_loader_conversations_id ON conversations (conversation_id)",
+)
+
+
+def to_sqlite(query: str) -> str:
+    """
+    Convert a query written for psycopg2 to SQLite syntax.
+
+    Args:
+        query: SQL text with %s placeholders
+
+    Returns:
+        SQL text with ? placeholders
+    """
+    query = _PLACEHOLDER.sub("?", query).replace("%%", "%")
+    return _CASCADE.sub("", query)
+
+
+def to_sqlite_value(value: Any) -> Any:
+    """
+    Convert a parameter value psycopg2 adapts itself to a SQLite value.
+
+    Timestamps are stored as ISO 8601 text and JSON values as JSON text.
+    This is done per query rather than with sqlite3.register_adapter, which
+    would change every SQLite connection in the process.
+
+    Args:
+        value: Parameter value
+
+    Returns:
+        Value SQLite can store
+    """
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def to_sqlite_params(params: Optional[Union[Tuple, List, Dict[str, Any]]]) -> Union[Tuple, Dict[str, Any]]:
+    """
+    Convert the parameters of a query with to_sqlite_value.
+
+    Args:
+        params: Query parameters
+
+    Returns:
+        Converted parameters
+    """
+    if not params:
+        return ()
+    if isinstance(params, dict):
+        return {key: to_sqlite_value(value) for key, value in params.items()}
+    return tuple(to_sqlite_value(value) for value in params)
+
+
+class SQLiteDatabaseManager(DatabaseConnectionProtocol):
+    """Manages a SQLite database with the same interface as DatabaseManager."""
+
+    def __init__(
+        self,
+        database_path: str = DEFAULT_SQLITE_PATH,
+        pragmas: Optional[Dict[str, Any]] = None,
+        connection_timeout: int = 30,
+    ):
+        """Initialize the database manager.
+
+        Args:
+            database_path: Path to the database file, or ":memory:"
+            pragmas: Pragmas overriding DEFAULT_PRAGMAS
+            connection_timeout: Seconds to wait for a lock held by another connection
+        """
+        self.database_path = database_path
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.connection_timeout = connection_timeout
+        self._conn = None
+        self._cursor = None
+
+        logger.info(
+            f"Initialized SQLiteDatabaseManager for {database_path}",
+            extra={
+                "database_path": database_path,
+                "pragmas": self.pragmas,
+            }
+        )
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Get the database connection, creating it if necessary.
+
+        Returns:
+            Database connection
+        """
+        if self._conn is None:
+            self._connect()
+        return self._conn
+
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """Get the database cursor, creating it if necessary.
+
+        Returns:
+            Database cursor
+        """
+        if self._cursor is None:
+            self._cursor = self.conn.cursor()
+        return self._cursor
+
+    def connect(self) -> None:
+        """Connect to the database."""
+        if self._conn is None:
+            self._connect()
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error connecting to database")
+    def _connect(self) -> None:
+        """Connect to the database and apply the pragmas."""
+        logger.info(f"Connecting to SQLite database {self.database_path}")
+
+        # Transactions are opened explicitly, so that a bulk load runs in
+        # one transaction instead of one per statement
+        self._conn = sqlite3.connect(
+            self.database_path,
+            timeout=self.connection_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+
+        for name, value in self.pragmas.items():
+            result = self._conn.execute(f"PRAGMA {name} = {value}").fetchone()
+            if name == "journal_mode" and result and str(result[0]).upper() != str(value).upper():
+                logger.warning(f"SQLite journal_mode is {result[0]}, not {value}")
+
+        logger.info(f"Connected to SQLite database {self.database_path}")
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error closing database connection")
+    def close(self) -> None:
+        """Close the database connection, committing any open transaction."""
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+
+        if self._conn is not None:
+            if self._conn.in_transaction:
+                self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+        logger.info("Database connection closed")
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error executing query")
+    def execute(self, query: str, params: Optional[Tuple] = None) -> None:
+        """Execute a query.
+
+        Args:
+            query: SQL query to execute, with %s placeholders
+            params: Query parameters
+        """
+        logger.debug(f"Executing query: {query}")
+        self.cursor.execute(to_sqlite(query), to_sqlite_params(params))
+
+    def fetch_one(self) -> Optional[Tuple]:
+        """Fetch one row from the result of the last query.
+
+        Returns:
+            Row or None if no more rows
+        """
+        return self.cursor.fetchone()
+
+    def fetch_all(self) -> List[Tuple]:
+        """Fetch all rows from the result of the last query.
+
+        Returns:
+            List of rows
+        """
+        return self.cursor.fetchall()
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error executing query and fetching results")
+    def execute_and_fetch(self, query: str, params: Optional[Tuple] = None) -> List[Tuple]:
+        """Execute a query and fetch all results.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+
+        Returns:
+            Query results
+        """
+        self.execute(query, params)
+        return self.cursor.fetchall()
+
+    def execute_query(self, query: str, params: Optional[Tuple] = None) -> List[Dict[str, Any]]:
+        """Execute a query and return the results as dictionaries.
+
+        This is the interface the analysis and reporting modules use.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+
+        Returns:
+            List of dictionaries containing the query results
+        """
+        self.execute(query, params)
+        if not self.cursor.description:
+            return []
+        columns = [column[0] for column in self.cursor.description]
+        return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+
+    def stream_query(
+        self, query: str, params: Optional[Tuple] = None, itersize: int = DEFAULT_STREAM_ITERSIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """Execute a query and stream the results.
+
+        SQLite steps through the result as rows are fetched, so only
+        itersize rows are held in memory at a time.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+            itersize: Number of rows to fetch at once
+
+        Yields:
+            Dictionaries containing the query results
+        """
+        logger.debug(f"Streaming query: {query}")
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(to_sqlite(query), to_sqlite_params(params))
+            if not cursor.description:
+                return
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}")
+            raise
+        finally:
+            cursor.close()
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error executing query and fetching one result")
+    def execute_and_fetch_one(self, query: str, params: Optional[Tuple] = None) -> Optional[Tuple]:
+        """Execute a query and fetch one result.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+
+        Returns:
+            Query result or None if no result
+        """
+        self.execute(query, params)
+        return self.cursor.fetchone()
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error executing bulk insert")
+    def bulk_insert(
+        self, table: str, columns: List[str], values: List[Tuple], page_size: int = 1000
+    ) -> int:
+        """Insert multiple rows into a table.
+
+        Rows are written with executemany. If no transaction is open, one
+        transaction is opened for the whole call and committed at the end.
+
+        Args:
+            table: Table name
+            columns: Column names
+            values: Values to insert
+            page_size: Number of rows passed to executemany at once
+
+        Returns:
+            Number of rows inserted
+        """
+        if not values:
+            logger.warning(f"No values to insert into {table}")
+            return 0
+
+        logger.info(f"Bulk inserting {len(values)} rows into {table}")
+
+        column_names = ", ".join(f'"{column}"' for column in columns)
+        placeholders = ", ".join(["?"] * len(columns))
+        insert_sql = f'INSERT INTO "{table}" ({column_names}) VALUES ({placeholders})'
+
+        owns_transaction = not self.conn.in_transaction
+        if owns_transaction:
+            self.conn.execute("BEGIN")
+
+        try:
+            total_inserted = 0
+            for i in range(0, len(values), page_size):
+                batch = values[i:i + page_size]
+                self.cursor.executemany(insert_sql, [to_sqlite_params(row) for row in batch])
+                total_inserted += len(batch)
+                logger.debug(f"Inserted batch {i // page_size + 1} ({len(batch)} rows)")
+            if owns_transaction:
+                self.conn.commit()
+        except Exception:
+            if owns_transaction:
+                self.conn.rollback()
+            raise
+
+        logger.info(f"Inserted {total_inserted} rows into {table}")
+        return total_inserted
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error beginning transaction")
+    def begin_transaction(self) -> None:
+        """Begin a transaction."""
+        logger.debug("Beginning transaction")
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+
+    begin = begin_transaction
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error committing transaction")
+    def commit(self) -> None:
+        """Commit the current transaction."""
+        logger.debug("Committing transaction")
+        self.conn.commit()
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error rolling back transaction")
+    def rollback(self) -> None:
+        """Roll back the current transaction."""
+        logger.debug("Rolling back transaction")
+        self.conn.rollback()
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error creating loader schema")
+    def create_loader_schema(self) -> None:
+        """Create the tables the loader writes to, if missing."""
+        for statement in LOADER_SCHEMA_SQL:
+            self.conn.execute(statement)
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error checking if table exists")
+    def table_exists(self, table_name: str) -> bool:
+        """Check if a table exists.
+
+        Args:
+            table_name: Table name
+
+        Returns:
+            Whether the table exists
+        """
+        result = self.execute_and_fetch_one(
+            "SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s)",
+            (table_name,),
+        )
+        return bool(result[0]) if result else False
+
+    @log_execution_time(level=logging.DEBUG)
+    @handle_errors(log_level="ERROR", default_message="Error checking if index exists")
+    def index_exists(self, index_name: str) -> bool:
+        """Check if an index exists.
+
+        Args:
+            index_name: Index name
+
+        Returns:
+            Whether the index exists
+        """
+        result = self.execute_and_fetch_one(
+            "SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = %s)",
+            (index_name,),
+        )
+        return bool(result[0]) if result else False
@@ -11,7 +11,7 @@ versions in PostgreSQL databases.
 Usage:
     python store_skype_export.py -f <skype_export_file> -u <your_display_name> -d <database_name>
                                 [-H <host>] [-P <port>] [-U <username>] [-W <password>]
-                                [--select-json <json_file>] [--create-tables]
+                                [--select-json <json_file>] [--create-tables] [--chunked]
 
 Example:
     python store_skype_export.py -f 8_live_dave.leathers113_export.tar -u "David Leathers"
@@ -170,6 +170,8 @@ def get_commandline_args():
                        help='Input file is a tar archive')
     parser.add_argument('--select-json',
                        help='Select a specific JSON file from the tar archive')
+    parser.add_argument('--chunked', action='store_true',
+                       help='Store the raw export as compressed file chunks instead of one JSONB value')
 
     # Configuration options
     parser.add_argument('--config',
@@ -222,6 +224,33 @@ def main():
             logger.error(f"File not found: {input_file}")
             sys.exit(1)
 
+        # Initialize storage with retry logic
+        max_retries = 3
+        retry_count = 0
+        storage = None
+
+        while retry_count < max_retries:
+            try:
+                storage = SkypeDataStorage(config)
+                break
+            except Exception as e:
+                retry_count += 1
+                if retry_count == max_retries:
+                    logger.error(f"Failed to initialize storage after {max_retries} attempts: {e}")
+                    sys.exit(1)
+                logger.warning(f"Attempt {retry_count} failed, retrying...")
+
+        # Skip files that were already stored, before parsing them
+        file_hash, existing = storage.check_duplicate_file(str(input_file))
+        if existing:
+            latest = storage.get_latest_cleaned_version(existing['id'])
+            if latest:
+                logger.info("Skype export already stored:")
+                logger.info(f"  Raw data ID: {existing['id']}")
+                logger.info(f"  Cleaned data ID: {latest['id']}")
+                storage.close()
+                return
+
         # Read the Skype export file
         try:
             raw_data = (
@@ -231,43 +260,45 @@ def main():
             )
         except Exception as e:
             logger.error(f"Error reading file: {e}")
+            storage.close()
             sys.exit(1)
 
         # Validate and clean the data
         try:
             if not validate_data(raw_data):
                 logger.error("Invalid Skype export data")
+                storage.close()
                 sys.exit(1)
 
             cleaned_data = clean_skype_data(raw_data)
         except Exception as e:
             logger.error(f"Error processing data: {e}")
+            storage.close()
             sys.exit(1)
 
-        # Initialize storage with retry logic
-        max_retries = 3
-        retry_count = 0
-        storage = None
-
-        while retry_count < max_retries:
-            try:
-                storage = SkypeDataStorage(config)
-                break
-            except Exception as e:
-                retry_count += 1
-                if retry_count == max_retries:
-                    logger.error(f"Failed to initialize storage after {max_retries} attempts: {e}")
-                    sys.exit(1)
-                logger.warning(f"Attempt {retry_count} failed, retrying...")
-
         try:
-            # Store both raw and cleaned data
-            raw_id, cleaned_id = storage.store_skype_export(
-                raw_data=raw_data,
-                cleaned_data=cleaned_data,
-                file_name=input_file.name,
-                export_date=datetime.now()
-            )
+            if args.chunked:
+                # Store the original file in chunks and only metadata as JSONB
+                raw_id = storage.store_raw_file(
+                    str(input_file),
+                    file_name=input_file.name,
+                    export_date=datetime.now(),
+                    metadata={
+                        'userId': raw_data.get('userId'),
+                        'exportDate': raw_data.get('exportDate'),
+                    },
+                    file_hash=file_hash
+                )
+                cleaned_id = storage.store_cleaned_data(raw_id, cleaned_data)
+            else:
+                # Store both raw and cleaned data
+                raw_id, cleaned_id = storage.store_skype_export(
+                    raw_data=raw_data,
+                    cleaned_data=cleaned_data,
+                    file_name=input_file.name,
+                    export_date=datetime.now(),
+                    source_hash=file_hash
+                )
 
             logger.info("Successfully stored Skype export data:")
             logger.info(f"  Raw data ID: {raw_id}")
@@ -95,10 +95,13 @@ class BulkInsertionStrategy(InsertionStrategy):
         transaction_manager = TransactionManager(db_manager)
 
         try:
-            # First, insert the archive to get the archive ID
-            archive_handler = self.handler_registry.get_handler("archives")
-            archive_id = archive_handler.insert_bulk(db_manager, data, self.current_batch_size)
-            counts["archives"] = 1
+            # First, insert the archive to get the archive ID, unless the
+            # data belongs to an archive that already exists
+            archive_id = data.get("archive_id")
+            if archive_id is None:
+                archive_handler = self.handler_registry.get_handler("archives")
+                archive_id = archive_handler.insert_bulk(db_manager, data, self.current_batch_size)
+                counts["archives"] = 1
 
             # Define a function to insert the rest of the data
             def insert_data():
@@ -71,10 +71,13 @@ class IndividualInsertionStrategy(InsertionStrategy):
         transaction_manager = TransactionManager(db_manager)
 
         try:
-            # First, insert the archive to get the archive ID
-            archive_handler = self.handler_registry.get_handler("archives")
-            archive_id = archive_handler.insert_individual(db_manager, data)
-            counts["archives"] = 1
+            # First, insert the archive to get the archive ID, unless the
+            # data belongs to an archive that already exists
+            archive_id = data.get("archive_id")
+            if archive_id is None:
+                archive_handler = self.handler_registry.get_handler("archives")
+                archive_id = archive_handler.insert_individual(db_manager, data)
+                counts["archives"] = 1
 
             # Define a function to insert the rest of the data
             def insert_data():
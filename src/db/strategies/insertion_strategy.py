@@ -17,7 +17,8 @@ class InsertionStrategy(ABC):
 
         Args:
             db_manager: Database manager instance
-            data: Data to insert
+            data: Data to insert. If it has an "archive_id", the data is
+                added to that archive instead of a new one.
 
         Returns:
             Dictionary with counts of inserted records
@@ -41,6 +41,7 @@ CREATE TABLE IF NOT EXISTS public.skype_messages (
     is_deleted BOOLEAN DEFAULT FALSE,
     reactions JSONB,
     attachments JSONB,
+    content_tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -99,8 +100,8 @@ CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON public.skype_messages(times
 CREATE INDEX IF NOT EXISTS idx_messages_sender_id ON public.skype_messages(sender_id);
 CREATE INDEX IF NOT EXISTS idx_messages_message_type ON public.skype_messages(message_type);
 CREATE INDEX IF NOT EXISTS idx_messages_conversation_timestamp ON public.skype_messages(conversation_id, timestamp);
-CREATE INDEX IF NOT EXISTS idx_messages_content_gin ON public.skype_messages USING gin(to_tsvector('english', content))
-    WITH (fastupdate = off) WHERE content IS NOT NULL AND length(content) > 0;
+CREATE INDEX IF NOT EXISTS idx_messages_content_tsv ON public.skype_messages USING gin(content_tsv)
+    WITH (fastupdate = off);
 
 -- Indexes for skype_participants
 CREATE INDEX IF NOT EXISTS idx_participants_conversation_id ON public.skype_participants(conversation_id);
@@ -7,7 +7,8 @@ interface for interacting with PostgreSQL databases.
 """
 
 import logging
-from typing import Dict, Any, List, Tuple, Optional, Union
+import uuid
+from typing import Dict, Any, Iterator, List, Tuple, Optional, Union
 import contextlib
 
 from src.utils.interfaces import DatabaseConnectionProtocol
@@ -17,6 +18,60 @@ from src.utils.validation import validate_db_config
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round trip when streaming query results
+DEFAULT_STREAM_ITERSIZE = 2000
+
+
+def iter_server_side_rows(
+    connection,
+    query: str,
+    params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+    itersize: int = DEFAULT_STREAM_ITERSIZE,
+    cursor_factory=None,
+    as_dicts: bool = False
+) -> Iterator[Any]:
+    """
+    Stream the results of a query through a server-side (named) cursor.
+
+    Only itersize rows are held in client memory at a time. The cursor lives
+    inside the connection's current transaction; on autocommit connections it
+    is declared WITH HOLD so it survives the implicit commit.
+
+    Args:
+        connection: psycopg2 connection
+        query: SQL query to execute
+        params: Parameters for the query
+        itersize: Number of rows to fetch per round trip
+        cursor_factory: Optional psycopg2 cursor factory for the rows
+        as_dicts: Whether to yield the rows as dictionaries keyed by column name
+
+    Yields:
+        Result rows
+    """
+    cursor = connection.cursor(
+        name=f"stream_{uuid.uuid4().hex}",
+        cursor_factory=cursor_factory,
+        withhold=connection.autocommit
+    )
+    try:
+        cursor.itersize = itersize
+        cursor.execute(query, params)
+        columns = None
+        while True:
+            rows = cursor.fetchmany(itersize)
+            if not rows:
+                break
+            if not as_dicts:
+                yield from rows
+                continue
+            # A named cursor only has a description once rows were fetched
+            if columns is None:
+                columns = [column[0] for column in cursor.description]
+            for row in rows:
+                yield dict(zip(columns, row))
+    finally:
+        cursor.close()
+
 
 class DatabaseConnection(DatabaseConnectionProtocol):
     """
@@ -194,6 +249,38 @@ class DatabaseConnection(DatabaseConnectionProtocol):
             logger.error(f"Query execution failed: {e}")
             raise
 
+    def stream_query(
+        self,
+        query: str,
+        params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+        itersize: int = DEFAULT_STREAM_ITERSIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a query and stream the results with a server-side cursor.
+
+        Args:
+            query: SQL query to execute
+            params: Parameters for the query
+            itersize: Number of rows to fetch per round trip
+
+        Yields:
+            Dictionaries containing the query results
+
+        Raises:
+            Exception: If query execution fails
+        """
+        self._ensure_connected()
+
+        try:
+            yield from iter_server_side_rows(
+                self._connection, query, params, itersize, as_dicts=True
+            )
+        except Exception as e:
+            if self._connection:
+                self._connection.rollback()
+            logger.error(f"Query execution failed: {e}")
+            raise
+
     def transaction(self):
         """
         Create a transaction context manager.
@@ -70,6 +70,26 @@ def get_psycopg2() -> Tuple[bool, Optional[Any]]:
 # Initialize database dependencies
 PSYCOPG2_AVAILABLE, psycopg2 = get_psycopg2()
 
+def get_asyncpg() -> Tuple[bool, Optional[Any]]:
+    """
+    Get asyncpg for asyncio PostgreSQL operations.
+
+    asyncpg is only needed by the asyncio loader, so it is imported on
+    demand rather than at module import time.
+
+    Returns:
+        Tuple[bool, Optional[Any]]: A tuple containing:
+            - Boolean indicating if asyncpg is available
+            - asyncpg module (or None if not available)
+    """
+    try:
+        import asyncpg
+        return True, asyncpg
+    except ImportError:
+        logger.warning("asyncpg is not installed. The asyncio loader will be disabled. "
+                      "Install with: pip install asyncpg")
+        return False, None
+
 # Utility functions for checking dependencies
 def check_dependency(dependency_name: str) -> bool:
     """
@@ -85,6 +105,8 @@ def check_dependency(dependency_name: str) -> bool:
         return BEAUTIFULSOUP_AVAILABLE
     elif dependency_name.lower() == 'psycopg2':
         return PSYCOPG2_AVAILABLE
+    elif dependency_name.lower() == 'asyncpg':
+        return get_asyncpg()[0]
     else:
         logger.warning(f"Unknown dependency: {dependency_name}")
         return False
@@ -7,12 +7,15 @@ It centralizes service registration and resolution, making it easier to manage d
 and improve testability.
 """
 
+import inspect
 import logging
+import threading
 from typing import (
     Any,
     Callable,
     Dict,
     Optional,
+    Tuple,
     Type,
     TypeVar,
     Union,
@@ -26,6 +29,18 @@ logger = logging.getLogger(__name__)
 # Type variable for generic service types
 T = TypeVar("T")
 
+# A constructor plan is the (parameter name, service type) pairs that the
+# container may inject, in declaration order.
+ConstructorPlan = Tuple[Tuple[str, Any], ...]
+
+
+_MISSING = object()
+
+
+def _service_name(service_type: Any) -> str:
+    """Return a readable name for a service type or string key."""
+    return getattr(service_type, "__name__", str(service_type))
+
 
 class ServiceProvider:
     """
@@ -34,14 +49,21 @@ class ServiceProvider:
     This container supports:
     - Singleton services (one instance shared across the application)
     - Transient services (new instance created each time)
+    - Scoped services (one instance per scope, e.g. per pipeline run or request)
     - Factory functions (custom instantiation logic)
+
+    Constructor dependencies are worked out once per implementation type and
+    cached as a plan, so repeated resolutions only do dictionary lookups.
     """
 
     def __init__(self):
         """Initialize the service provider with empty registrations."""
         self._singletons: Dict[Type, Any] = {}
         self._transients: Dict[Type, Type] = {}
+        self._scoped: Dict[Type, Callable[..., Any]] = {}
         self._factories: Dict[Type, Callable[..., Any]] = {}
+        self._plans: Dict[Type, ConstructorPlan] = {}
+        self._singleton_lock = threading.RLock()
 
     def register_singleton(
         self, service_type: Union[Type[T], str], instance: T
@@ -72,10 +94,15 @@ class ServiceProvider:
 
         # Create a factory function that will instantiate the implementation
         def factory():
-            instance = self._create_instance(implementation_type)
-            # Replace the factory with the instance for future resolutions
-            self._singletons[service_type] = instance
-            return instance
+            with self._singleton_lock:
+                current = self._singletons.get(service_type)
+                if current is not factory:
+                    # Another thread finished (or replaced) the registration
+                    return self.get(service_type)
+                instance = self._create_instance(implementation_type)
+                # Replace the factory with the instance for future resolutions
+                self._singletons[service_type] = instance
+                return instance
 
         # Store the factory in singletons dict
         self._singletons[service_type] = factory
@@ -98,6 +125,53 @@ class ServiceProvider:
             f"Registered transient {implementation_type.__name__} for {service_type.__name__}"
         )
 
+    def register_scoped(
+        self,
+        service_type: Type[T],
+        implementation: Union[Type[T], Callable[..., T]],
+    ) -> None:
+        """
+        Register a service that is instantiated once per scope.
+
+        Scoped services must be resolved through a scope created with
+        create_scope(); every scope gets its own instance.
+
+        Args:
+            service_type: The type/interface to register
+            implementation: The implementation class, or a factory function
+                taking no arguments
+        """
+        self._scoped[service_type] = implementation
+        logger.debug(
+            f"Registered scoped {_service_name(implementation)} for {_service_name(service_type)}"
+        )
+
+    def create_scope(self) -> "ServiceScope":
+        """
+        Create a new scope for resolving scoped services.
+
+        Returns:
+            A ServiceScope bound to this provider
+        """
+        return ServiceScope(self)
+
+    def is_registered(self, service_type: Union[Type[T], str]) -> bool:
+        """
+        Check whether a service type has any registration.
+
+        Args:
+            service_type: The type/interface or string name to check
+
+        Returns:
+            True if the service can be resolved from this provider or a scope
+        """
+        return (
+            service_type in self._singletons
+            or service_type in self._transients
+            or service_type in self._scoped
+            or service_type in self._factories
+        )
+
     def register_factory(
         self, service_type: Type[T], factory: Callable[..., T]
     ) -> None:
@@ -124,61 +198,134 @@ class ServiceProvider:
         Raises:
             KeyError: If the service type is not registered
         """
+        return self._resolve(service_type, None)
+
+    def _resolve(
+        self, service_type: Union[Type[T], str], scope: Optional["ServiceScope"]
+    ) -> T:
+        """
+        Resolve a service, using the given scope for scoped lifetimes.
+
+        Args:
+            service_type: The type/interface to resolve or a string name
+            scope: The scope that owns scoped instances, or None for the root
+
+        Returns:
+            An instance of the requested service
+
+        Raises:
+            KeyError: If the service type is not registered, or is scoped and
+                no scope was given
+        """
         # Check singletons first
-        if service_type in self._singletons:
-            singleton = self._singletons[service_type]
+        singleton = self._singletons.get(service_type, _MISSING)
+        if singleton is not _MISSING:
             # If the singleton is a factory function, call it to create the instance
             if callable(singleton) and not isinstance(singleton, type):
                 return singleton()
             return singleton
 
+        # Check scoped services
+        if service_type in self._scoped:
+            if scope is None:
+                raise KeyError(
+                    f"{_service_name(service_type)} is scoped; resolve it from a scope "
+                    "created with create_scope()"
+                )
+            return scope._get_scoped(service_type)
+
         # Check transients
-        if service_type in self._transients:
-            implementation_type = self._transients[service_type]
-            return self._create_instance(implementation_type)
+        implementation_type = self._transients.get(service_type)
+        if implementation_type is not None:
+            return self._create_instance(implementation_type, scope)
 
         # Check factories
-        if service_type in self._factories:
-            factory = self._factories[service_type]
+        factory = self._factories.get(service_type)
+        if factory is not None:
             return factory()
 
         # Service not found
-        if isinstance(service_type, type):
-            raise KeyError(f"No registration found for {service_type.__name__}")
-        else:
-            raise KeyError(f"No registration found for {service_type}")
+        raise KeyError(f"No registration found for {_service_name(service_type)}")
+
+    def _get_plan(self, implementation_type: Type[T]) -> ConstructorPlan:
+        """
+        Get the cached constructor plan for a type, compiling it on first use.
 
-    def _create_instance(self, implementation_type: Type[T]) -> T:
+        Args:
+            implementation_type: The type whose constructor is inspected
+
+        Returns:
+            The (parameter name, service type) pairs the constructor accepts
+        """
+        plan = self._plans.get(implementation_type)
+        if plan is None:
+            plan = self._compile_plan(implementation_type)
+            self._plans[implementation_type] = plan
+        return plan
+
+    @staticmethod
+    def _compile_plan(implementation_type: Type[T]) -> ConstructorPlan:
+        """
+        Inspect a constructor and list the parameters that may be injected.
+
+        Args:
+            implementation_type: The type whose constructor is inspected
+
+        Returns:
+            The (parameter name, service type) pairs in declaration order
+        """
+        init = implementation_type.__init__
+        if init is object.__init__:
+            return ()
+
+        try:
+            type_hints = get_type_hints(init)
+            parameters = inspect.signature(init).parameters
+        except Exception as e:
+            logger.warning(
+                f"Cannot inspect constructor of {implementation_type.__name__}: {e}"
+            )
+            return ()
+
+        plan = []
+        for param_name, param in parameters.items():
+            if param_name == "self" or param.kind in (
+                inspect.Parameter.VAR_POSITIONAL,
+                inspect.Parameter.VAR_KEYWORD,
+            ):
+                continue
+            param_type = type_hints.get(param_name)
+            if param_type is None:
+                continue
+            try:
+                hash(param_type)
+            except TypeError:
+                continue
+            plan.append((param_name, param_type))
+        return tuple(plan)
+
+    def _create_instance(
+        self, implementation_type: Type[T], scope: Optional["ServiceScope"] = None
+    ) -> T:
         """
         Create an instance of a type, resolving constructor dependencies if possible.
 
         Args:
             implementation_type: The type to instantiate
+            scope: The scope to resolve scoped dependencies from, if any
 
         Returns:
             An instance of the specified type
         """
         try:
-            # Get constructor parameter types
-            type_hints = get_type_hints(implementation_type.__init__)
-            # Remove return type
-            if "return" in type_hints:
-                del type_hints["return"]
-
-            # Try to resolve dependencies
+            # Resolve the dependencies that are registered; the constructor
+            # handles the rest (they might have default values)
             kwargs = {}
-            for param_name, param_type in type_hints.items():
-                # Skip self parameter
-                if param_name == "self":
+            for param_name, param_type in self._get_plan(implementation_type):
+                if param_type in self._scoped and scope is None:
                     continue
-
-                try:
-                    # Try to resolve the dependency
-                    kwargs[param_name] = self.get(param_type)
-                except KeyError:
-                    # If we can't resolve it, let the constructor handle it
-                    # (it might have default values)
-                    pass
+                if self.is_registered(param_type):
+                    kwargs[param_name] = self._resolve(param_type, scope)
 
             # Create the instance with resolved dependencies
             return implementation_type(**kwargs)
@@ -190,6 +337,87 @@ class ServiceProvider:
             return implementation_type()
 
 
+class ServiceScope:
+    """
+    A unit of work, such as a pipeline run or a request, that owns scoped services.
+
+    Scoped services are created on first resolution and reused for the rest of
+    the scope. Other lifetimes are delegated to the parent provider. When the
+    scope is closed, scoped instances that define close() are closed.
+    """
+
+    def __init__(self, provider: ServiceProvider):
+        """
+        Initialize the scope.
+
+        Args:
+            provider: The provider holding the registrations
+        """
+        self.provider = provider
+        self._instances: Dict[Type, Any] = {}
+        self._lock = threading.RLock()
+        self._closed = False
+
+    def get(self, service_type: Union[Type[T], str]) -> T:
+        """
+        Resolve a service within this scope.
+
+        Args:
+            service_type: The type/interface to resolve or a string name
+
+        Returns:
+            An instance of the requested service
+
+        Raises:
+            KeyError: If the service type is not registered
+            RuntimeError: If the scope has been closed
+        """
+        instance = self._instances.get(service_type, _MISSING)
+        if instance is not _MISSING:
+            return instance
+        return self.provider._resolve(service_type, self)
+
+    def _get_scoped(self, service_type: Type[T]) -> T:
+        """Return the scope's instance of a scoped service, creating it once."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot resolve services from a closed scope")
+            instance = self._instances.get(service_type, _MISSING)
+            if instance is _MISSING:
+                implementation = self.provider._scoped[service_type]
+                if isinstance(implementation, type):
+                    instance = self.provider._create_instance(implementation, self)
+                else:
+                    instance = implementation()
+                self._instances[service_type] = instance
+            return instance
+
+    def close(self) -> None:
+        """Close the scope and release the scoped instances it created."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            instances = list(self._instances.values())
+            self._instances.clear()
+
+        for instance in reversed(instances):
+            close = getattr(instance, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(
+                        f"Error closing scoped {type(instance).__name__}: {e}"
+                    )
+
+    def __enter__(self) -> "ServiceScope":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
 # Global service provider instance
 _global_provider = ServiceProvider()
 
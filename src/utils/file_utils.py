@@ -98,3 +98,28 @@ def is_tar_file(file_path):
         return False
     except Exception:
         return False
+
+
+def make_private_dir(path):
+    """
+    Create a directory only the current user can access.
+
+    Use this for directories under shared locations such as the temp
+    directory, where another user could create the path first.
+
+    Args:
+        path (str): Path to the directory
+
+    Returns:
+        str: The path
+
+    Raises:
+        PermissionError: If the directory is owned by another user
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"Refusing to use {path}: it is owned by another user")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
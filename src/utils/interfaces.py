@@ -271,6 +271,22 @@ class DatabaseConnectionProtocol(Protocol):
         """
         ...
 
+    def stream_query(
+        self, query: str, params: Optional[Tuple] = None, itersize: int = 2000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a query and stream the results with a server-side cursor.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+            itersize: Number of rows to fetch per round trip
+
+        Yields:
+            Dictionaries containing the query results
+        """
+        ...
+
     def bulk_insert(self, table: str, columns: List[str], values: List[Tuple]) -> int:
         """
         Insert multiple rows into a table.
@@ -76,6 +76,9 @@ def configure_logging(
     add_system_context: bool = True,
     configure_libraries: bool = True,
     external_handlers: Optional[List[logging.Handler]] = None,
+    async_mode: bool = False,
+    sample_rates: Optional[Dict[str, float]] = None,
+    rate_limits: Optional[Dict[str, float]] = None,
 ) -> None:
     """Configure logging for the application.
 
@@ -94,6 +97,9 @@ def configure_logging(
         add_system_context: Whether to add system information to the logging context
         configure_libraries: Whether to configure third-party libraries
         external_handlers: Additional logging handlers to add
+        async_mode: Whether to format and write records on a background thread
+        sample_rates: Fraction of records below WARNING to keep, per logger name
+        rate_limits: Maximum records per second below WARNING, per message prefix
     """
     # Get logger for this module
     logger = get_logger(__name__)
@@ -123,6 +129,12 @@ def configure_logging(
                 add_system_context = logging_config["add_system_context"]
             if "configure_libraries" in logging_config:
                 configure_libraries = logging_config["configure_libraries"]
+            if "async" in logging_config:
+                async_mode = logging_config["async"]
+            if "sample_rates" in logging_config and not sample_rates:
+                sample_rates = logging_config["sample_rates"]
+            if "rate_limits" in logging_config and not rate_limits:
+                rate_limits = logging_config["rate_limits"]
 
     # Get default log level for environment
     if not log_level:
@@ -149,7 +161,10 @@ def configure_logging(
         enable_console=enable_console,
         enable_json=enable_json,
         max_file_size_mb=max_file_size_mb,
-        backup_count=backup_count
+        backup_count=backup_count,
+        async_mode=async_mode,
+        sample_rates=sample_rates,
+        rate_limits=rate_limits,
     )
 
     # Add external handlers if provided
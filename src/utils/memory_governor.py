@@ -0,0 +1,308 @@
+"""
+Memory governor for ETL pipeline.
+
+This module provides the MemoryGovernor class that samples process memory
+on a background timer thread and adapts named size settings (transform
+chunk sizes, loader batch sizes, queue depths) to stay under a memory budget.
+"""
+
+import gc
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import psutil
+
+from src.utils.new_structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class MemoryGovernor:
+    """Adapts processing sizes to keep RSS under a memory limit.
+
+    Sizes are registered by name and read with :meth:`get`, which is a plain
+    dictionary lookup. RSS is only sampled by the timer thread, so hot loops
+    never call ``psutil`` themselves.
+    """
+
+    def __init__(
+        self,
+        memory_limit_mb: int = 1024,
+        sample_interval: float = 0.5,
+        grow_threshold: float = 0.6,
+        shrink_threshold: float = 0.8,
+        critical_threshold: float = 0.95,
+        shrink_factor: float = 0.5,
+        grow_factor: float = 1.25,
+        gc_interval: float = 5.0,
+        rss_provider: Optional[Callable[[], int]] = None,
+    ):
+        """
+        Initialize the memory governor.
+
+        Args:
+            memory_limit_mb: Memory budget in MB
+            sample_interval: Seconds between RSS samples
+            grow_threshold: Fraction of the limit below which sizes grow back
+            shrink_threshold: Fraction of the limit above which sizes shrink
+            critical_threshold: Fraction of the limit above which sizes drop to
+                their minimum and producers are held back
+            shrink_factor: Factor applied to sizes under memory pressure
+            grow_factor: Factor applied to sizes when there is headroom
+            gc_interval: Minimum seconds between forced garbage collections
+            rss_provider: Optional callable returning RSS in bytes (defaults to psutil)
+        """
+        if memory_limit_mb <= 0:
+            raise ValueError("memory_limit_mb must be a positive integer")
+        if not 0 < grow_threshold < shrink_threshold < critical_threshold:
+            raise ValueError(
+                "Thresholds must satisfy 0 < grow_threshold < shrink_threshold < critical_threshold"
+            )
+
+        self.memory_limit_mb = memory_limit_mb
+        self.sample_interval = sample_interval
+        self.grow_threshold = grow_threshold
+        self.shrink_threshold = shrink_threshold
+        self.critical_threshold = critical_threshold
+        self.shrink_factor = shrink_factor
+        self.grow_factor = grow_factor
+        self.gc_interval = gc_interval
+
+        if rss_provider is None:
+            process = psutil.Process(os.getpid())
+            rss_provider = lambda: process.memory_info().rss
+        self._rss_provider = rss_provider
+
+        # Registered sizes: name -> {"value", "minimum", "maximum"}
+        self._sizes: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+        # Producers wait on this event while memory is critical
+        self._headroom = threading.Event()
+        self._headroom.set()
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._users = 0
+
+        self.current_rss_mb = 0.0
+        self.peak_memory_mb = 0.0
+        self.last_gc_time = 0.0
+        self.stats: Dict[str, int] = {
+            "samples": 0,
+            "shrinks": 0,
+            "grows": 0,
+            "critical_events": 0,
+            "gc_collections": 0,
+            "throttled_waits": 0,
+        }
+
+        logger.debug(
+            "Initialized MemoryGovernor",
+            extra={
+                "memory_limit_mb": memory_limit_mb,
+                "sample_interval": sample_interval,
+                "grow_threshold": grow_threshold,
+                "shrink_threshold": shrink_threshold,
+                "critical_threshold": critical_threshold,
+            },
+        )
+
+    def register(
+        self,
+        name: str,
+        initial: int,
+        minimum: int = 1,
+        maximum: Optional[int] = None,
+    ) -> None:
+        """
+        Register a size setting to be governed.
+
+        Args:
+            name: Name of the setting (e.g. "chunk_size", "batch_size")
+            initial: Initial value of the setting
+            minimum: Smallest value the setting may shrink to
+            maximum: Largest value the setting may grow to (defaults to initial)
+        """
+        minimum = max(1, min(minimum, initial))
+        maximum = max(initial, maximum or initial)
+        with self._lock:
+            self._sizes[name] = {
+                "value": initial,
+                "minimum": minimum,
+                "maximum": maximum,
+            }
+
+    def get(self, name: str, default: Optional[int] = None) -> Optional[int]:
+        """
+        Get the current value of a governed size setting.
+
+        Args:
+            name: Name of the setting
+            default: Value to return if the setting is not registered
+
+        Returns:
+            Current value of the setting or the default
+        """
+        size = self._sizes.get(name)
+        if size is None:
+            return default
+        return size["value"]
+
+    @property
+    def pressure(self) -> float:
+        """Most recently sampled RSS as a fraction of the memory limit."""
+        return self.current_rss_mb / self.memory_limit_mb
+
+    def start(self) -> None:
+        """Start the sampling thread (reference counted)."""
+        with self._lock:
+            self._users += 1
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="memory-governor", daemon=True
+            )
+            self._thread.start()
+        logger.debug("Started memory governor sampling thread")
+
+    def stop(self) -> None:
+        """Stop the sampling thread once every caller of :meth:`start` has stopped."""
+        with self._lock:
+            self._users = max(0, self._users - 1)
+            if self._users > 0 or self._thread is None:
+                return
+            thread = self._thread
+            self._thread = None
+            self._stop_event.set()
+        thread.join(timeout=max(1.0, self.sample_interval * 2))
+        # Never leave producers blocked once nothing is sampling
+        self._headroom.set()
+        logger.debug("Stopped memory governor sampling thread")
+
+    def __enter__(self) -> "MemoryGovernor":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        """Sampling loop executed by the timer thread."""
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Error sampling memory usage: {e}")
+            self._stop_event.wait(self.sample_interval)
+
+    def sample(self) -> float:
+        """
+        Sample RSS once and adjust the governed sizes.
+
+        Returns:
+            Memory pressure as a fraction of the memory limit
+        """
+        used_mb = self._rss_provider() / (1024 * 1024)
+        self.current_rss_mb = used_mb
+        if used_mb > self.peak_memory_mb:
+            self.peak_memory_mb = used_mb
+        self.stats["samples"] += 1
+
+        pressure = self.pressure
+        if pressure >= self.critical_threshold:
+            self._on_critical(used_mb)
+        elif pressure >= self.shrink_threshold:
+            self._scale(self.shrink_factor)
+            self.stats["shrinks"] += 1
+        elif pressure < self.grow_threshold:
+            if self._scale(self.grow_factor):
+                self.stats["grows"] += 1
+
+        # Release held-back producers once below the shrink threshold
+        if pressure < self.shrink_threshold:
+            self._headroom.set()
+
+        return pressure
+
+    def _on_critical(self, used_mb: float) -> None:
+        """Handle critical memory pressure."""
+        self._headroom.clear()
+        self.stats["critical_events"] += 1
+        with self._lock:
+            for size in self._sizes.values():
+                size["value"] = size["minimum"]
+
+        logger.warning(
+            f"Memory usage is critical: {used_mb:.2f} MB "
+            f"({self.pressure * 100:.1f}% of {self.memory_limit_mb} MB). "
+            "Reducing processing sizes to their minimum.",
+            extra={"used_mb": used_mb, "limit_mb": self.memory_limit_mb},
+        )
+
+        current_time = time.time()
+        if current_time - self.last_gc_time >= self.gc_interval:
+            gc.collect()
+            self.last_gc_time = current_time
+            self.stats["gc_collections"] += 1
+
+    def _scale(self, factor: float) -> bool:
+        """
+        Scale every governed size by a factor within its bounds.
+
+        Args:
+            factor: Scaling factor
+
+        Returns:
+            True if any size changed
+        """
+        changed = False
+        with self._lock:
+            for size in self._sizes.values():
+                scaled = int(size["value"] * factor)
+                if factor > 1 and scaled == size["value"]:
+                    scaled += 1
+                new_value = max(size["minimum"], min(size["maximum"], scaled))
+                if new_value != size["value"]:
+                    size["value"] = new_value
+                    changed = True
+        return changed
+
+    def wait_for_headroom(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block while memory usage is critical.
+
+        Producers call this between batches to enforce the memory ceiling.
+
+        Args:
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            True if there is headroom, False if the wait timed out
+        """
+        if self._headroom.is_set():
+            return True
+        self.stats["throttled_waits"] += 1
+        logger.debug("Waiting for memory headroom")
+        return self._headroom.wait(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get governor statistics.
+
+        Returns:
+            Dictionary with memory usage, current sizes and adjustment counters
+        """
+        with self._lock:
+            sizes = {name: size["value"] for name, size in self._sizes.items()}
+        return {
+            "current_rss_mb": self.current_rss_mb,
+            "peak_memory_mb": self.peak_memory_mb,
+            "limit_mb": self.memory_limit_mb,
+            "pressure": self.pressure,
+            "sizes": sizes,
+            **self.stats,
+        }
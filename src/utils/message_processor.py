@@ -9,6 +9,7 @@ import concurrent.futures
 import logging
 from typing import List, Dict, Any, Callable, Optional
 
+from src.utils.memory_governor import MemoryGovernor
 from src.utils.new_structured_logging import get_logger
 
 logger = get_logger(__name__)
@@ -22,6 +23,7 @@ class MessageProcessor:
         parallel_processing: bool = True,
         chunk_size: int = 1000,
         max_workers: Optional[int] = None,
+        memory_governor: Optional[MemoryGovernor] = None,
     ):
         """Initialize the message processor.
 
@@ -29,10 +31,13 @@ class MessageProcessor:
             parallel_processing: Whether to use parallel processing
             chunk_size: Size of chunks for parallel processing
             max_workers: Maximum number of worker threads
+            memory_governor: Optional memory governor that adapts the chunk
+                size and the number of chunks in flight to memory pressure
         """
         self.parallel_processing = parallel_processing
         self.chunk_size = chunk_size
         self.max_workers = max_workers
+        self.memory_governor = memory_governor
         self.metrics = {
             "chunk_count": 0,
             "processing_times": [],
@@ -61,8 +66,9 @@ class MessageProcessor:
 
         logger.debug(f"Transforming {len(messages)} messages")
 
-        if self.parallel_processing and len(messages) > self.chunk_size:
-            logger.debug(f"Using parallel processing with chunk size {self.chunk_size}")
+        chunk_size = self._current_chunk_size()
+        if self.parallel_processing and len(messages) > chunk_size:
+            logger.debug(f"Using parallel processing with chunk size {chunk_size}")
             return self._transform_parallel(messages, transform_func, context)
 
         logger.debug("Using sequential processing")
@@ -84,41 +90,65 @@ class MessageProcessor:
         Returns:
             Transformed messages
         """
-        # Split messages into chunks
-        chunks = [
-            messages[i : i + self.chunk_size]
-            for i in range(0, len(messages), self.chunk_size)
-        ]
-
-        # Update metrics
-        self.metrics["chunk_count"] += len(chunks)
-        self.metrics["chunk_sizes"].extend([len(chunk) for chunk in chunks])
-
         transformed_messages = []
 
         # Process chunks in parallel
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit tasks
-            future_to_chunk = {
-                executor.submit(
-                    self._transform_chunk, chunk, transform_func, i, context
-                ): (chunk, i)
-                for i, chunk in enumerate(chunks)
-            }
-
-            # Process results as they complete
-            for future in concurrent.futures.as_completed(future_to_chunk):
-                chunk, chunk_index = future_to_chunk[future]
-                try:
-                    result = future.result()
-                    transformed_messages.extend(result)
-                    logger.debug(f"Processed chunk {chunk_index + 1}/{len(chunks)}")
-                except Exception as e:
-                    logger.error(f"Error processing chunk {chunk_index + 1}/{len(chunks)}: {e}")
-                    raise
+            future_to_chunk = {}
+
+            def collect(done):
+                for future in done:
+                    chunk, chunk_index = future_to_chunk.pop(future)
+                    try:
+                        result = future.result()
+                        transformed_messages.extend(result)
+                        logger.debug(f"Processed chunk {chunk_index + 1}")
+                    except Exception as e:
+                        logger.error(f"Error processing chunk {chunk_index + 1}: {e}")
+                        raise
+
+            # Submit tasks, keeping at most queue_depth chunks in flight. Each
+            # chunk is cut when it is submitted, so its size follows the
+            # memory governor as messages are consumed.
+            start = 0
+            chunk_index = 0
+            while start < len(messages):
+                while future_to_chunk and len(future_to_chunk) >= self._current_queue_depth():
+                    done, _ = concurrent.futures.wait(
+                        future_to_chunk, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    collect(done)
+
+                chunk = messages[start : start + self._current_chunk_size()]
+                start += len(chunk)
+
+                # Update metrics
+                self.metrics["chunk_count"] += 1
+                self.metrics["chunk_sizes"].append(len(chunk))
+
+                future = executor.submit(
+                    self._transform_chunk, chunk, transform_func, chunk_index, context
+                )
+                future_to_chunk[future] = (chunk, chunk_index)
+                chunk_index += 1
+
+            # Process remaining results as they complete
+            collect(concurrent.futures.as_completed(list(future_to_chunk)))
 
         return transformed_messages
 
+    def _current_chunk_size(self) -> int:
+        """Get the chunk size, as adapted by the memory governor if present."""
+        if self.memory_governor is None:
+            return self.chunk_size
+        return self.memory_governor.get("chunk_size", self.chunk_size)
+
+    def _current_queue_depth(self) -> float:
+        """Get the maximum number of chunks in flight (unbounded without a governor)."""
+        if self.memory_governor is None:
+            return float("inf")
+        return self.memory_governor.get("queue_depth", float("inf"))
+
     def _transform_sequential(
         self,
         messages: List[Dict[str, Any]],
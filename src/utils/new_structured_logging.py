@@ -7,11 +7,15 @@ It includes JSON formatting, context tracking, and helper functions for common
 logging patterns.
 """
 
+import atexit
 import datetime
 import functools
 import json
 import logging
+import logging.handlers
 import os
+import queue
+import reprlib
 import sys
 import threading
 import time
@@ -27,6 +31,36 @@ _context = threading.local()
 # Type variables for decorators
 F = TypeVar("F", bound=Callable[..., Any])
 
+# Production mode turns log_call and log_execution_time into plain pass-throughs
+_production_mode = os.environ.get("LOG_PRODUCTION_MODE", "").lower() in ("1", "true", "yes", "on")
+
+# Maximum length of an argument or return value repr in call logs
+MAX_REPR_LENGTH = 500
+
+# Size-limited repr that never walks more than a few items of large containers
+_repr = reprlib.Repr()
+_repr.maxlevel = 3
+_repr.maxdict = 10
+_repr.maxlist = 10
+_repr.maxtuple = 10
+_repr.maxset = 10
+_repr.maxstring = 200
+_repr.maxother = 200
+
+
+def _exception_data(exc_info: Tuple) -> Dict[str, Any]:
+    """Describe an exception for the "exception" field of a JSON log record."""
+    exc_type, exc_value, exc_traceback = exc_info
+    return {
+        "type": exc_type.__name__ if exc_type else "",
+        "message": str(exc_value) if exc_value else "",
+        "traceback": traceback.format_exception(
+            exc_type, exc_value, exc_traceback
+        )
+        if exc_traceback
+        else [],
+    }
+
 
 class JsonFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
@@ -43,23 +77,18 @@ class JsonFormatter(logging.Formatter):
             "line": record.lineno,
         }
 
-        # Add context data if available
-        context_data = get_context_data()
+        # Add context data if available (captured by the caller thread in async mode)
+        context_data = getattr(record, "_log_context", None)
+        if context_data is None:
+            context_data = get_context_data()
         if context_data:
             log_data["context"] = context_data
 
-        # Add exception info if available
+        # Add exception info if available (captured by the caller thread in async mode)
         if record.exc_info:
-            exc_type, exc_value, exc_traceback = record.exc_info
-            log_data["exception"] = {
-                "type": exc_type.__name__ if exc_type else "",
-                "message": str(exc_value) if exc_value else "",
-                "traceback": traceback.format_exception(
-                    exc_type, exc_value, exc_traceback
-                )
-                if exc_traceback
-                else [],
-            }
+            log_data["exception"] = _exception_data(record.exc_info)
+        elif getattr(record, "_exception", None):
+            log_data["exception"] = record._exception
 
         # Add extra fields from record
         for key, value in record.__dict__.items():
@@ -93,6 +122,344 @@ class JsonFormatter(logging.Formatter):
         return json.dumps(log_data, default=str)
 
 
+# Rate limits for the per-conversation and per-message ETL debug messages
+HOT_LOOP_RATE_LIMITS: Dict[str, float] = {
+    "Transforming conversation": 10.0,
+    "Extracted structured data": 10.0,
+}
+
+
+class SamplingFilter(logging.Filter):
+    """Samples and rate limits records below WARNING.
+
+    Records are sampled per logger name (including child loggers) and rate
+    limited per message prefix. Warnings and errors are never dropped.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+    ):
+        """Initialize the filter.
+
+        Args:
+            sample_rates: Fraction of records to keep (0.0-1.0), per logger name
+            rate_limits: Maximum records per second, per message prefix
+        """
+        super().__init__()
+        self.sample_rates = dict(sample_rates or {})
+        self.rate_limits = dict(rate_limits or {})
+        self._lock = threading.Lock()
+        self._sample_counters: Dict[str, int] = {}
+        # Token buckets: prefix -> [tokens, last refill time]
+        self._buckets: Dict[str, List[float]] = {
+            prefix: [limit, time.monotonic()] for prefix, limit in self.rate_limits.items()
+        }
+        self._logger_rates: Dict[str, Optional[Tuple[str, float]]] = {}
+        self._last_record: Optional[logging.LogRecord] = None
+        self._last_result = True
+        self.stats: Dict[str, Dict[str, int]] = {"sampled": {}, "rate_limited": {}}
+
+    def _sample_rate_for(self, logger_name: str) -> Optional[Tuple[str, float]]:
+        """Get the configured (name, rate) that applies to a logger, cached per name."""
+        if logger_name not in self._logger_rates:
+            match = None
+            name = logger_name
+            while name:
+                if name in self.sample_rates:
+                    match = (name, self.sample_rates[name])
+                    break
+                name = name.rpartition(".")[0]
+            self._logger_rates[logger_name] = match
+        return self._logger_rates[logger_name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether a record is kept."""
+        if record.levelno >= logging.WARNING:
+            return True
+
+        with self._lock:
+            # The same filter may be attached to several handlers
+            if record is self._last_record:
+                return self._last_result
+            self._last_record = record
+            self._last_result = self._decide(record)
+            return self._last_result
+
+    def _decide(self, record: logging.LogRecord) -> bool:
+        """Apply sampling and rate limiting to a record."""
+        if self.sample_rates:
+            match = self._sample_rate_for(record.name)
+            if match is not None:
+                name, rate = match
+                count = self._sample_counters.get(name, 0)
+                self._sample_counters[name] = count + 1
+                # Keep every n-th record so sampling is deterministic
+                if int(count * rate) == int((count + 1) * rate):
+                    self._count("sampled", name)
+                    return False
+
+        if self.rate_limits and isinstance(record.msg, str):
+            for prefix, limit in self.rate_limits.items():
+                if record.msg.startswith(prefix):
+                    bucket = self._buckets[prefix]
+                    now = time.monotonic()
+                    bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit)
+                    bucket[1] = now
+                    if bucket[0] < 1:
+                        self._count("rate_limited", prefix)
+                        return False
+                    bucket[0] -= 1
+                    break
+
+        return True
+
+    def _count(self, kind: str, key: str) -> None:
+        """Count a dropped record."""
+        self.stats[kind][key] = self.stats[kind].get(key, 0) + 1
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks the caller and defers JSON formatting.
+
+    Only the message is merged in the calling thread; the thread-local
+    logging context is captured on the record so the listener thread can
+    build the JSON document. Like QueueHandler.prepare, references to the
+    caller's objects (arguments, lazy reprs, exception frames) are replaced
+    with text so queued records do not keep them alive. Records are dropped
+    (and counted) when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        """Initialize the handler.
+
+        Args:
+            log_queue: Queue shared with the listener
+        """
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message and capture the context without formatting."""
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        record._log_context = get_context_data()
+
+        if record.exc_info:
+            record._exception = _exception_data(record.exc_info)
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+
+        for key, value in record.__dict__.items():
+            if isinstance(value, LazyRepr):
+                record.__dict__[key] = str(value)
+            elif isinstance(value, list) and any(isinstance(item, LazyRepr) for item in value):
+                record.__dict__[key] = [str(item) for item in value]
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Enqueue a record, dropping it if the queue is full."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Queue listener that drains and handles records in batches."""
+
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler, batch_size: int = 100):
+        """Initialize the listener.
+
+        Args:
+            log_queue: Queue shared with the queue handler
+            *handlers: Handlers that receive the records
+            batch_size: Maximum number of records handled per batch
+        """
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self._sentinel_pending = False
+        self.batches = 0
+
+    def start(self) -> None:
+        """Start the listener thread."""
+        self._sentinel_pending = False
+        super().start()
+
+    def dequeue(self, block: bool) -> Any:
+        """Dequeue a batch of records (or the sentinel) from the queue."""
+        if self._sentinel_pending:
+            # Taken from the queue with the previous batch; the base class
+            # calls task_done for it now
+            self._sentinel_pending = False
+            return self._sentinel
+
+        batch = [self.queue.get(block)]
+        if batch[0] is self._sentinel:
+            return self._sentinel
+
+        while len(batch) < self.batch_size:
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is self._sentinel:
+                self._sentinel_pending = True
+                break
+            # The base class calls task_done once per dequeue
+            self.queue.task_done()
+            batch.append(record)
+        return batch
+
+    def handle(self, records: Any) -> None:
+        """Pass a batch of records to the handlers."""
+        if not isinstance(records, list):
+            records = [records]
+        self.batches += 1
+
+        for handler in self.handlers:
+            if self.respect_handler_level:
+                handled = [r for r in records if r.levelno >= handler.level]
+            else:
+                handled = records
+            if not handled:
+                continue
+            if hasattr(handler, "handle_batch"):
+                handler.handle_batch(handled)
+            else:
+                for record in handled:
+                    handler.handle(record)
+
+
+class BatchingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that writes a batch of records with one write call."""
+
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        """Format and write a batch of records.
+
+        Args:
+            records: Records to write
+        """
+        lines = []
+        for record in records:
+            if not self.filter(record):
+                continue
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+
+        data = "".join(lines)
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0:
+                self.stream.seek(0, 2)
+                if self.stream.tell() and self.stream.tell() + len(data) >= self.maxBytes:
+                    self.doRollover()
+            self.stream.write(data)
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class AsyncLogPipeline:
+    """Moves log formatting and writing off the calling threads.
+
+    Callers only enqueue records through a NonBlockingQueueHandler; a
+    BatchingQueueListener thread formats them and writes them in batches.
+    """
+
+    def __init__(
+        self,
+        handlers: List[logging.Handler],
+        queue_size: int = 10000,
+        batch_size: int = 100,
+        sampling_filter: Optional[SamplingFilter] = None,
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            handlers: Handlers that receive the records on the listener thread
+            queue_size: Maximum number of queued records
+            batch_size: Maximum number of records handled per batch
+            sampling_filter: Optional filter applied before records are queued
+        """
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = NonBlockingQueueHandler(self.queue)
+        self.sampling_filter = sampling_filter
+        if sampling_filter:
+            self.queue_handler.addFilter(sampling_filter)
+        self.listener = BatchingQueueListener(self.queue, *handlers, batch_size=batch_size)
+        self._started = False
+
+    def start(self) -> None:
+        """Start the listener thread."""
+        if not self._started:
+            self.listener.start()
+            self._started = True
+
+    def stop(self) -> None:
+        """Flush queued records and stop the listener thread."""
+        if self._started:
+            self.listener.stop()
+            self._started = False
+            for handler in self.listener.handlers:
+                handler.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counts of dropped, sampled and rate limited records.
+
+        Returns:
+            Dictionary with pipeline statistics
+        """
+        stats: Dict[str, Any] = {
+            "dropped": self.queue_handler.dropped,
+            "queued": self.queue.qsize(),
+            "batches": self.listener.batches,
+        }
+        if self.sampling_filter:
+            stats["sampled"] = dict(self.sampling_filter.stats["sampled"])
+            stats["rate_limited"] = dict(self.sampling_filter.stats["rate_limited"])
+        return stats
+
+
+# Async pipeline installed by initialize_logging, if any
+_async_pipeline: Optional[AsyncLogPipeline] = None
+
+
+def _stop_async_pipeline() -> None:
+    """Stop the async pipeline installed by initialize_logging, if any."""
+    global _async_pipeline
+    if _async_pipeline is not None:
+        logging.getLogger().removeHandler(_async_pipeline.queue_handler)
+        _async_pipeline.stop()
+        _async_pipeline = None
+
+
+atexit.register(_stop_async_pipeline)
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Get statistics of the async logging pipeline.
+
+    Returns:
+        Dictionary with dropped, sampled and rate limited record counts
+        (empty if async logging is not enabled)
+    """
+    if _async_pipeline is None:
+        return {}
+    return _async_pipeline.get_stats()
+
+
 def initialize_logging(
     log_level: str = "INFO",
     log_format: Optional[str] = None,
@@ -101,6 +468,12 @@ def initialize_logging(
     enable_json: bool = True,
     max_file_size_mb: int = 10,
     backup_count: int = 5,
+    production_mode: Optional[bool] = None,
+    async_mode: bool = False,
+    queue_size: int = 10000,
+    batch_size: int = 100,
+    sample_rates: Optional[Dict[str, float]] = None,
+    rate_limits: Optional[Dict[str, float]] = None,
 ) -> None:
     """Initialize logging configuration for the application.
 
@@ -112,7 +485,17 @@ def initialize_logging(
         enable_json: Whether to use JSON formatting
         max_file_size_mb: Maximum log file size in MB before rotation
         backup_count: Number of backup log files to keep
+        production_mode: Whether to disable call/timing instrumentation
+            (if None, keeps the LOG_PRODUCTION_MODE environment setting)
+        async_mode: Whether to format and write records on a background thread
+        queue_size: Maximum number of queued records in async mode
+        batch_size: Maximum number of records written per batch in async mode
+        sample_rates: Fraction of records below WARNING to keep, per logger name
+        rate_limits: Maximum records per second below WARNING, per message prefix
     """
+    if production_mode is not None:
+        set_production_mode(production_mode)
+
     handlers: List[logging.Handler] = []
 
     # Create formatter
@@ -131,14 +514,18 @@ def initialize_logging(
 
     # File handler
     if log_file:
-        from logging.handlers import RotatingFileHandler
-
-        file_handler = RotatingFileHandler(
+        file_handler_class = (
+            BatchingRotatingFileHandler if async_mode else logging.handlers.RotatingFileHandler
+        )
+        file_handler = file_handler_class(
             log_file, maxBytes=max_file_size_mb * 1024 * 1024, backupCount=backup_count
         )
         file_handler.setFormatter(formatter)
         handlers.append(file_handler)
 
+    # Stop any previous async pipeline before replacing the handlers
+    _stop_async_pipeline()
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level))
@@ -147,9 +534,25 @@ def initialize_logging(
     for handler in list(root_logger.handlers):
         root_logger.removeHandler(handler)
 
-    # Add new handlers
-    for handler in handlers:
-        root_logger.addHandler(handler)
+    # Sampling and rate limiting are applied before records reach any handler
+    sampling_filter = None
+    if sample_rates or rate_limits:
+        sampling_filter = SamplingFilter(sample_rates, rate_limits)
+
+    if async_mode:
+        # Formatting and writing happen on the listener thread
+        global _async_pipeline
+        _async_pipeline = AsyncLogPipeline(
+            handlers, queue_size=queue_size, batch_size=batch_size, sampling_filter=sampling_filter
+        )
+        _async_pipeline.start()
+        root_logger.addHandler(_async_pipeline.queue_handler)
+    else:
+        # Add new handlers
+        for handler in handlers:
+            if sampling_filter:
+                handler.addFilter(sampling_filter)
+            root_logger.addHandler(handler)
 
     # Log initialization
     logger = get_logger("logging")
@@ -295,11 +698,100 @@ def with_context(**kwargs):
     return decorator
 
 
+def set_production_mode(enabled: bool = True) -> None:
+    """Enable or disable production mode for the instrumentation decorators.
+
+    In production mode log_call and log_execution_time call the wrapped
+    function directly without checking log levels, timing or formatting.
+
+    Args:
+        enabled: Whether production mode is enabled
+    """
+    global _production_mode
+    _production_mode = enabled
+
+
+def is_production_mode() -> bool:
+    """Check whether production mode is enabled.
+
+    Returns:
+        True if production mode is enabled
+    """
+    return _production_mode
+
+
+def safe_repr(value: Any, max_length: int = MAX_REPR_LENGTH) -> str:
+    """Get a truncated repr of a value.
+
+    Large containers are summarized instead of being walked in full.
+
+    Args:
+        value: Value to represent
+        max_length: Maximum length of the result
+
+    Returns:
+        Truncated repr of the value
+    """
+    try:
+        text = _repr.repr(value)
+    except Exception as e:
+        text = f"<unrepresentable {type(value).__name__}: {e}>"
+    if len(text) > max_length:
+        text = text[: max_length - 3] + "..."
+    return text
+
+
+class LazyRepr:
+    """Defers safe_repr of a value until a handler formats the record."""
+
+    __slots__ = ("value", "prefix", "_text")
+
+    def __init__(self, value: Any, prefix: str = ""):
+        """Initialize with the value to represent.
+
+        Args:
+            value: Value to represent
+            prefix: Text to prepend to the repr (e.g. "key=")
+        """
+        self.value = value
+        self.prefix = prefix
+        self._text: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = self.prefix + safe_repr(self.value)
+        return self._text
+
+    __repr__ = __str__
+
+
+class _LazyArguments:
+    """Defers formatting of a call's argument list."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: List[LazyRepr]):
+        self.items = items
+
+    def __str__(self) -> str:
+        return ", ".join(str(item) for item in self.items)
+
+
+def _qualified_name(func: Callable) -> str:
+    """Get the "Class.method" or "module.function" name used in call logs."""
+    parts = func.__qualname__.split(".")
+    if len(parts) > 1 and parts[-2] != "<locals>":
+        return ".".join(parts[-2:])
+    return f"{func.__module__}.{func.__name__}"
+
+
 def log_execution_time(
     logger: Optional[logging.Logger] = None, level: int = logging.INFO
 ):
     """Decorator for logging function execution time.
 
+    Timing is skipped entirely when the level is disabled or in production mode.
+
     Args:
         logger: Logger to use (defaults to module logger)
         level: Log level to use
@@ -309,38 +801,30 @@ def log_execution_time(
     """
 
     def decorator(func: F) -> F:
+        func_logger = logger or get_logger(func.__module__)
+        func_name = _qualified_name(func)
+        call_module = func.__module__
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Get logger
-            nonlocal logger
-            if logger is None:
-                logger = get_logger(func.__module__)
-
-            # Get function name with class if method
-            if (
-                args
-                and hasattr(args[0], "__class__")
-                and hasattr(args[0].__class__, func.__name__)
-            ):
-                func_name = f"{args[0].__class__.__name__}.{func.__name__}"
-            else:
-                func_name = f"{func.__module__}.{func.__name__}"
+            if _production_mode or not func_logger.isEnabledFor(level):
+                return func(*args, **kwargs)
 
             # Measure execution time
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
-                result = func(*args, **kwargs)
-                return result
+                return func(*args, **kwargs)
             finally:
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
-                logger.log(
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                func_logger.log(
                     level,
-                    f"{func_name} completed in {duration_ms:.2f} ms",
+                    "%s completed in %.2f ms",
+                    func_name,
+                    duration_ms,
                     extra={
                         "function_name": func_name,
                         "duration_ms": duration_ms,
-                        "call_module": func.__module__,
+                        "call_module": call_module,
                     },
                 )
 
@@ -352,6 +836,9 @@ def log_execution_time(
 def log_call(logger: Optional[logging.Logger] = None, level: int = logging.DEBUG):
     """Decorator for logging function calls.
 
+    Arguments and return values are only represented when the level is
+    enabled, and then lazily and truncated to MAX_REPR_LENGTH characters.
+
     Args:
         logger: Logger to use (defaults to module logger)
         level: Log level to use
@@ -361,38 +848,30 @@ def log_call(logger: Optional[logging.Logger] = None, level: int = logging.DEBUG
     """
 
     def decorator(func: F) -> F:
+        func_logger = logger or get_logger(func.__module__)
+        func_name = _qualified_name(func)
+        call_module = func.__module__
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Get logger
-            nonlocal logger
-            if logger is None:
-                logger = get_logger(func.__module__)
+            if _production_mode or not func_logger.isEnabledFor(level):
+                return func(*args, **kwargs)
 
-            # Format args and kwargs for logging
-            args_str = [repr(arg) for arg in args]
-            kwargs_str = [f"{key}={repr(value)}" for key, value in kwargs.items()]
-            all_args = args_str + kwargs_str
-            args_formatted = ", ".join(all_args)
-
-            # Get function name with class if method
-            if (
-                args
-                and hasattr(args[0], "__class__")
-                and hasattr(args[0].__class__, func.__name__)
-            ):
-                func_name = f"{args[0].__class__.__name__}.{func.__name__}"
-            else:
-                func_name = f"{func.__module__}.{func.__name__}"
+            # Arguments are only represented if a handler formats the record
+            args_str = [LazyRepr(arg) for arg in args]
+            kwargs_str = [LazyRepr(value, f"{key}=") for key, value in kwargs.items()]
 
             # Log the call
-            logger.log(
+            func_logger.log(
                 level,
-                f"Calling {func_name}({args_formatted})",
+                "Calling %s(%s)",
+                func_name,
+                _LazyArguments(args_str + kwargs_str),
                 extra={
                     "function_name": func_name,
                     "args_str": args_str,
                     "kwargs_str": kwargs_str,
-                    "call_module": func.__module__,
+                    "call_module": call_module,
                 },
             )
 
@@ -400,13 +879,16 @@ def log_call(logger: Optional[logging.Logger] = None, level: int = logging.DEBUG
             result = func(*args, **kwargs)
 
             # Log the return
-            logger.log(
+            result_repr = LazyRepr(result)
+            func_logger.log(
                 level,
-                f"{func_name} returned {repr(result)}",
+                "%s returned %s",
+                func_name,
+                result_repr,
                 extra={
                     "function_name": func_name,
-                    "result": repr(result),
-                    "call_module": func.__module__,
+                    "result": result_repr,
+                    "call_module": call_module,
                 },
             )
 
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Raw-slice streaming reader for Skype export JSON.
+
+This module streams conversations from a Skype export while keeping the exact
+source text of every message. Each message is decoded with the C JSON scanner
+(json.JSONDecoder.raw_decode), which reports where the value ends, so the
+original slice of the file can be attached to the decoded message without
+serializing it again.
+
+It can also index an export: index_conversations() records the byte range
+of every conversation, so that ranges of conversations can later be read
+independently with iter_conversation_range().
+"""
+
+import io
+import json
+import re
+from typing import Any, BinaryIO, Dict, Iterator, List, TextIO, Tuple
+
+# Whitespace allowed between JSON tokens
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class RawMessage(dict):
+    """
+    A decoded message that also carries its original JSON text.
+
+    Behaves exactly like a dict; the source text is available as raw_json.
+    """
+
+    __slots__ = ("raw_json",)
+
+    def __init__(self, data: Dict[str, Any], raw_json: str):
+        super().__init__(data)
+        self.raw_json = raw_json
+
+
+def raw_json_of(message: Dict[str, Any]) -> str:
+    """
+    Get the JSON text of a message, reusing the source slice when available.
+
+    Args:
+        message: Message dictionary, possibly a RawMessage
+
+    Returns:
+        The original JSON text, or a fresh serialization for plain dicts
+    """
+    raw = getattr(message, "raw_json", None)
+    if raw is not None:
+        return raw
+    return json.dumps(message)
+
+
+class RawExportReader:
+    """
+    Streams conversations from a Skype export JSON text stream.
+
+    Top-level scalar fields (userId, exportDate, ...) are collected in
+    metadata as they are read. Messages in each conversation's MessageList
+    are yielded as RawMessage objects.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Initialize the reader.
+
+        Args:
+            stream: Text stream positioned at the start of the export JSON
+            chunk_size: Number of characters to read at a time
+        """
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.metadata: Dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._consumed = 0
+        self._eof = False
+
+    @property
+    def position(self) -> int:
+        """Number of characters of the stream read so far."""
+        return self._consumed + self._pos
+
+    def _fill(self) -> bool:
+        """Read another chunk into the buffer, dropping consumed text."""
+        if self._eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._consumed += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self) -> None:
+        """Advance past whitespace, reading more input if needed."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            raise ValueError("Unexpected end of JSON input")
+        return self._buffer[self._pos]
+
+    def _expect(self, char: str) -> None:
+        """Consume the next non-whitespace character, which must be char."""
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos}, found {found!r}")
+        self._pos += 1
+
+    def _is_truncated(self, error: json.JSONDecodeError) -> bool:
+        """Whether a decode error may be caused by the value running past the buffer."""
+        return (
+            error.pos >= len(self._buffer) - 5
+            or error.msg.startswith("Unterminated string")
+        )
+
+    def _read_value(self) -> Tuple[Any, str]:
+        """
+        Decode the next JSON value.
+
+        Returns:
+            The decoded value and its source text
+        """
+        self._skip_whitespace()
+        while True:
+            start = self._pos
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, start)
+            except json.JSONDecodeError as e:
+                # The value may continue past the end of the buffer
+                if self._is_truncated(e) and self._fill():
+                    continue
+                raise
+            # A number that ends the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value, self._buffer[start:end]
+
+    def _separator(self, closing: str) -> bool:
+        """
+        Consume a comma or the closing bracket of a container.
+
+        Returns:
+            True if another item follows, False at the end of the container
+        """
+        char = self._peek()
+        self._pos += 1
+        if char == ",":
+            return True
+        if char == closing:
+            return False
+        raise ValueError(f"Expected ',' or {closing!r} at offset {self._pos - 1}, found {char!r}")
+
+    def _iter_items(self) -> Iterator[None]:
+        """Consume '[' and yield once per array item until the closing ']'."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            if not self._separator("]"):
+                return
+
+    def _iter_keys(self) -> Iterator[str]:
+        """Consume '{' and yield each key, positioned at its value."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key, _ = self._read_value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key at offset {self._pos}")
+            self._expect(":")
+            yield key
+            if not self._separator("}"):
+                return
+
+    def _read_conversation(self) -> Dict[str, Any]:
+        """Read one conversation object, keeping raw text for its messages."""
+        conversation: Dict[str, Any] = {}
+        for key in self._iter_keys():
+            if key == "MessageList" and self._peek() == "[":
+                messages = []
+                for _ in self._iter_items():
+                    message, raw = self._read_value()
+                    if isinstance(message, dict):
+                        message = RawMessage(message, raw)
+                    messages.append(message)
+                conversation[key] = messages
+            else:
+                conversation[key], _ = self._read_value()
+        return conversation
+
+    def iter_conversations(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield conversations one at a time.
+
+        Yields:
+            Conversation dictionaries whose messages are RawMessage objects
+
+        Raises:
+            ValueError: If the input is not a valid Skype export
+        """
+        for key in self._iter_keys():
+            if key == "conversations" and self._peek() == "[":
+                for _ in self._iter_items():
+                    if self._peek() == "{":
+                        yield self._read_conversation()
+                    else:
+                        self._read_value()
+            else:
+                self.metadata[key], _ = self._read_value()
+
+    def iter_conversation_sequence(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield conversations from a comma-separated run of conversation objects.
+
+        The stream holds a slice of the conversations array, as located by
+        index_conversations(), rather than a whole export.
+
+        Yields:
+            Conversation dictionaries whose messages are RawMessage objects
+        """
+        while True:
+            self._skip_whitespace()
+            if self._pos >= len(self._buffer):
+                return
+            if self._buffer[self._pos] == ",":
+                self._pos += 1
+                continue
+            yield self._read_conversation()
+
+
+class _ByteOffsetReader(RawExportReader):
+    """
+    Reader over an export decoded as Latin-1.
+
+    Every byte is one character, so positions are byte offsets. JSON syntax
+    is ASCII and UTF-8 continuation bytes never look like it, so the
+    structure is read correctly; strings that are kept are decoded again
+    from their UTF-8 source.
+    """
+
+    @staticmethod
+    def _decode(raw: str) -> Any:
+        return json.loads(raw.encode("latin-1").decode("utf-8"))
+
+    def _skip_conversation(self) -> Tuple[Any, int]:
+        """Read past one conversation object, returning its id and message count."""
+        conversation_id = None
+        message_count = 0
+        for key in self._iter_keys():
+            if key == "MessageList" and self._peek() == "[":
+                for _ in self._iter_items():
+                    self._read_value()
+                    message_count += 1
+            elif key == "id":
+                conversation_id = self._decode(self._read_value()[1])
+            else:
+                self._read_value()
+        return conversation_id, message_count
+
+    def iter_conversation_offsets(self) -> Iterator[Tuple[Any, int, int, int]]:
+        """Yield (id, start, end, message count) for every conversation."""
+        for key in self._iter_keys():
+            if key == "conversations" and self._peek() == "[":
+                for _ in self._iter_items():
+                    if self._peek() == "{":
+                        start = self.position
+                        conversation_id, message_count = self._skip_conversation()
+                        yield conversation_id, start, self.position, message_count
+                    else:
+                        self._read_value()
+            else:
+                self.metadata[key] = self._decode(self._read_value()[1])
+
+
+def index_conversations(
+    stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[Dict[str, Any], List[Tuple[Any, int, int, int]]]:
+    """
+    Record where every conversation of an export starts and ends.
+
+    Args:
+        stream: Binary stream positioned at the start of the export JSON
+        chunk_size: Number of bytes to read at a time
+
+    Returns:
+        The top-level metadata (userId, exportDate, ...) and one
+        (conversation id, start, end, message count) tuple per conversation,
+        with byte offsets relative to the start of the stream
+    """
+    text = io.TextIOWrapper(stream, encoding="latin-1", newline="")
+    reader = _ByteOffsetReader(text, chunk_size)
+    entries = list(reader.iter_conversation_offsets())
+    text.detach()
+    return reader.metadata, entries
+
+
+class _BoundedReader(io.RawIOBase):
+    """Raw stream over a byte range of a seekable file."""
+
+    def __init__(self, stream: BinaryIO, start: int, end: int):
+        self._stream = stream
+        self._stream.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        data = self._stream.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+def iter_conversation_range(
+    stream: BinaryIO, start: int, end: int, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the conversations stored in a byte range of an export.
+
+    Args:
+        stream: Seekable binary stream of the export JSON
+        start: Start offset of the first conversation
+        end: End offset of the last conversation
+        chunk_size: Number of characters to read at a time
+
+    Yields:
+        Conversation dictionaries whose messages are RawMessage objects
+    """
+    text = io.TextIOWrapper(
+        io.BufferedReader(_BoundedReader(stream, start, end)), encoding="utf-8", newline=""
+    )
+    yield from RawExportReader(text, chunk_size).iter_conversation_sequence()
+
+
+def iter_conversations_with_raw(
+    file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream conversations from an export file, keeping raw message text.
+
+    Args:
+        file_path: Path to the export JSON file
+        chunk_size: Number of characters to read at a time
+
+    Yields:
+        Conversation dictionaries whose messages are RawMessage objects
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        yield from RawExportReader(f, chunk_size).iter_conversations()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Synthetic Skype export generator.
+
+This module generates deterministic, seedable Skype exports in the same JSON
+and TAR layouts as real exports. Conversation counts, message-count
+distribution, message-type mix, markup density and edit rate are all
+configurable. Output is written incrementally, so exports with tens of
+millions of messages can be generated in constant memory.
+
+It can be used as a library:
+
+    generator = SyntheticExportGenerator(conversations=1000, mean_messages=500, seed=7)
+    generator.write_tar("export.tar")
+
+or from the command line:
+
+    python -m src.utils.synthetic_export export.tar --conversations 1000 --mean-messages 500
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tarfile
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+# Relative weights of message types in a typical personal export
+DEFAULT_MESSAGE_TYPE_MIX: Dict[str, float] = {
+    "RichText": 0.80,
+    "RichText/UriObject": 0.05,
+    "RichText/Media_GenericFile": 0.03,
+    "RichText/Media_Video": 0.02,
+    "Event/Call": 0.04,
+    "ThreadActivity/AddMember": 0.02,
+    "ThreadActivity/TopicUpdate": 0.02,
+    "Poll": 0.01,
+    "RichText/Location": 0.01,
+}
+
+MESSAGE_COUNT_DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "pareto")
+
+_WORDS = (
+    "the meeting is moved to tomorrow can you send me the report when you get a chance "
+    "thanks sounds good lunch later I will check and get back to you let me know what "
+    "you think about the new design did you see the latest build it looks great ok "
+    "running late be there in ten minutes happy birthday congrats on the release"
+).split()
+
+_EXPORT_DATE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class SyntheticExportGenerator:
+    """
+    Generates synthetic Skype exports.
+
+    The same parameters and seed always produce byte-identical output.
+    """
+
+    def __init__(
+        self,
+        conversations: int = 100,
+        mean_messages: int = 100,
+        distribution: str = "lognormal",
+        max_messages: Optional[int] = None,
+        message_type_mix: Optional[Dict[str, float]] = None,
+        markup_density: float = 0.2,
+        edit_rate: float = 0.05,
+        participants: int = 5,
+        seed: int = 0,
+        user_id: str = "8:synthetic.user",
+    ):
+        """
+        Initialize the generator.
+
+        Args:
+            conversations: Number of conversations to generate
+            mean_messages: Mean number of messages per conversation
+            distribution: Distribution of message counts per conversation
+                ("fixed", "uniform", "lognormal" or "pareto")
+            max_messages: Upper bound on messages in a single conversation
+                (defaults to 100x the mean)
+            message_type_mix: Relative weights per Skype message type
+            markup_density: Probability that a text message contains markup
+            edit_rate: Probability that a message has been edited
+            participants: Number of participants per conversation besides the user
+            seed: Random seed
+            user_id: Skype ID of the exporting user
+
+        Raises:
+            ValueError: If a parameter is out of range
+        """
+        if conversations < 0:
+            raise ValueError("conversations must be non-negative")
+        if mean_messages < 0:
+            raise ValueError("mean_messages must be non-negative")
+        if distribution not in MESSAGE_COUNT_DISTRIBUTIONS:
+            raise ValueError(
+                f"distribution must be one of {', '.join(MESSAGE_COUNT_DISTRIBUTIONS)}"
+            )
+        if not 0.0 <= markup_density <= 1.0:
+            raise ValueError("markup_density must be between 0 and 1")
+        if not 0.0 <= edit_rate <= 1.0:
+            raise ValueError("edit_rate must be between 0 and 1")
+        if participants < 1:
+            raise ValueError("participants must be at least 1")
+
+        mix = message_type_mix or DEFAULT_MESSAGE_TYPE_MIX
+        if not mix or any(weight < 0 for weight in mix.values()) or sum(mix.values()) <= 0:
+            raise ValueError("message_type_mix must have positive weights")
+
+        self.conversations = conversations
+        self.mean_messages = mean_messages
+        self.distribution = distribution
+        self.max_messages = max_messages or max(1, mean_messages * 100)
+        self.message_types: List[str] = list(mix)
+        self.message_type_weights: List[float] = list(mix.values())
+        self.markup_density = markup_density
+        self.edit_rate = edit_rate
+        self.participants = participants
+        self.seed = seed
+        self.user_id = user_id
+
+    def _message_count(self, rng: random.Random) -> int:
+        """Draw the number of messages for one conversation."""
+        mean = self.mean_messages
+        if mean == 0:
+            return 0
+        if self.distribution == "fixed":
+            count = mean
+        elif self.distribution == "uniform":
+            count = rng.randint(0, 2 * mean)
+        elif self.distribution == "lognormal":
+            # sigma=1 gives a long tail; mu is chosen so the mean is preserved
+            sigma = 1.0
+            count = round(rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma))
+        else:
+            # Pareto with alpha=1.5 has mean alpha/(alpha-1) = 3 times the scale
+            count = round(rng.paretovariate(1.5) * mean / 3)
+        return max(0, min(count, self.max_messages))
+
+    def _sentence(self, rng: random.Random, low: int = 3, high: int = 15) -> str:
+        """Build a sentence of random words."""
+        return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(low, high)))
+
+    def _text_content(self, rng: random.Random, members: List[str]) -> str:
+        """Build RichText content, sometimes with Skype markup."""
+        text = self._sentence(rng)
+        if rng.random() >= self.markup_density:
+            return text
+
+        markup = rng.randrange(5)
+        if markup == 0:
+            return f"<b>{text}</b>"
+        if markup == 1:
+            return f"{text} <i>{self._sentence(rng, 1, 4)}</i>"
+        if markup == 2:
+            member = rng.choice(members)
+            return f'<at id="{member}">{member.split(":", 1)[-1]}</at> {text}'
+        if markup == 3:
+            url = f"https://example.com/{rng.randrange(10 ** 6)}"
+            return f'{text} <a href="{url}">{url}</a>'
+        author = rng.choice(members)
+        return (
+            f'<quote author="{author}" authorname="{author.split(":", 1)[-1]}">'
+            f"<legacyquote>[quote]</legacyquote>{self._sentence(rng)}</quote>{text}"
+        )
+
+    def _content(self, rng: random.Random, message_type: str, members: List[str]) -> str:
+        """Build content for a message type."""
+        if message_type == "RichText":
+            return self._text_content(rng, members)
+        if message_type == "RichText/UriObject":
+            image_id = rng.randrange(10 ** 9)
+            return (
+                f'<URIObject type="Picture.1" uri="https://api.asm.skype.com/v1/objects/{image_id}">'
+                f"<OriginalName v=\"image_{image_id}.jpg\"/></URIObject>"
+            )
+        if message_type.startswith("RichText/Media_"):
+            file_id = rng.randrange(10 ** 9)
+            size = rng.randrange(10 ** 3, 10 ** 8)
+            return (
+                f'<URIObject type="File.1" uri="https://api.asm.skype.com/v1/objects/{file_id}">'
+                f'<OriginalName v="file_{file_id}.bin"/><FileSize v="{size}"/></URIObject>'
+            )
+        if message_type == "Event/Call":
+            return (
+                f'<partlist type="ended"><part identity="{rng.choice(members)}">'
+                f"<duration>{rng.randrange(1, 7200)}</duration></part></partlist>"
+            )
+        if message_type.startswith("ThreadActivity/"):
+            return (
+                f"<addmember><eventtime>{rng.randrange(10 ** 12)}</eventtime>"
+                f"<initiator>{rng.choice(members)}</initiator>"
+                f"<target>{rng.choice(members)}</target></addmember>"
+            )
+        if message_type == "Poll":
+            return f"<pollquestion>{self._sentence(rng, 3, 8)}?</pollquestion>"
+        if message_type == "RichText/Location":
+            return (
+                f'<location latitude="{rng.uniform(-90, 90):.6f}" '
+                f'longitude="{rng.uniform(-180, 180):.6f}">{self._sentence(rng, 1, 3)}</location>'
+            )
+        return self._sentence(rng)
+
+    def _conversation_rng(self, index: int) -> random.Random:
+        """Random generator for one conversation, independent of the others."""
+        return random.Random(f"{self.seed}:{index}")
+
+    def _conversation_header(self, index: int) -> Dict[str, Any]:
+        """Build the conversation fields that precede the message list."""
+        return {
+            "id": f"19:synthetic{index}@thread.skype",
+            "displayName": f"Synthetic Conversation {index}",
+            "version": 1,
+            "properties": {"conversationblocked": False, "lastimreceivedtime": None},
+            "threadProperties": {"membercount": self.participants + 1},
+        }
+
+    def _iter_messages(
+        self, index: int, rng: random.Random, count: int
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the messages of one conversation in chronological order."""
+        members = [self.user_id] + [
+            f"8:synthetic.member{index}.{n}" for n in range(self.participants)
+        ]
+        timestamp = _EXPORT_DATE - datetime.timedelta(days=365 * 3)
+        timestamp += datetime.timedelta(seconds=rng.randrange(86400 * 30))
+
+        for position in range(count):
+            timestamp += datetime.timedelta(seconds=rng.expovariate(1 / 600.0))
+            message_type = rng.choices(self.message_types, self.message_type_weights)[0]
+            sender = rng.choice(members)
+            message: Dict[str, Any] = {
+                "id": f"{index}-{position}",
+                "displayName": sender.split(":", 1)[-1],
+                "originalarrivaltime": timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",
+                "messagetype": message_type,
+                "version": position + 1,
+                "contenttype": "text",
+                "content": self._content(rng, message_type, members),
+                "conversationid": f"19:synthetic{index}@thread.skype",
+                "from": sender,
+                "properties": {},
+                "amsreferences": [],
+            }
+            if rng.random() < self.edit_rate:
+                edited = timestamp + datetime.timedelta(seconds=rng.randrange(1, 3600))
+                message["skypeeditedid"] = message["id"]
+                message["edittime"] = edited.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+            yield message
+
+    def iter_conversations(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield complete conversation objects.
+
+        Each conversation's messages are built in memory, so prefer write_json()
+        or write_tar() for very large conversations.
+
+        Yields:
+            Conversation dictionaries in Skype export format
+        """
+        for index in range(self.conversations):
+            rng = self._conversation_rng(index)
+            conversation = self._conversation_header(index)
+            count = self._message_count(rng)
+            conversation["MessageList"] = list(self._iter_messages(index, rng, count))
+            yield conversation
+
+    def generate(self) -> Dict[str, Any]:
+        """
+        Generate the whole export in memory.
+
+        Returns:
+            Export dictionary in Skype export format
+        """
+        return {
+            "userId": self.user_id,
+            "exportDate": _EXPORT_DATE.isoformat().replace("+00:00", "Z"),
+            "conversations": list(self.iter_conversations()),
+        }
+
+    def write(self, stream: TextIO) -> Dict[str, int]:
+        """
+        Write the export as JSON to a text stream, one message at a time.
+
+        Args:
+            stream: Writable text stream
+
+        Returns:
+            Counts of conversations and messages written
+        """
+        total_messages = 0
+        stream.write('{"userId": %s, "exportDate": %s, "conversations": [' % (
+            json.dumps(self.user_id),
+            json.dumps(_EXPORT_DATE.isoformat().replace("+00:00", "Z")),
+        ))
+        for index in range(self.conversations):
+            rng = self._conversation_rng(index)
+            header = json.dumps(self._conversation_header(index))
+            stream.write((", " if index else "") + header[:-1] + ', "MessageList": [')
+            count = self._message_count(rng)
+            for position, message in enumerate(self._iter_messages(index, rng, count)):
+                if position:
+                    stream.write(", ")
+                stream.write(json.dumps(message, ensure_ascii=False))
+            stream.write("]}")
+            total_messages += count
+        stream.write("]}")
+        return {"conversations": self.conversations, "messages": total_messages}
+
+    def write_json(self, path: str) -> Dict[str, int]:
+        """
+        Write the export to a JSON file.
+
+        Args:
+            path: Output file path
+
+        Returns:
+            Counts of conversations and messages written
+        """
+        with open(path, "w", encoding="utf-8", buffering=1024 * 1024) as f:
+            counts = self.write(f)
+        logger.info(
+            f"Wrote {counts['messages']} messages in {counts['conversations']} conversations to {path}"
+        )
+        return counts
+
+    def write_tar(self, path: str) -> Dict[str, int]:
+        """
+        Write the export to a TAR file containing messages.json.
+
+        Args:
+            path: Output file path
+
+        Returns:
+            Counts of conversations and messages written
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, json_path = tempfile.mkstemp(suffix=".json", dir=directory)
+        os.close(fd)
+        try:
+            counts = self.write_json(json_path)
+            with tarfile.open(path, "w") as tar:
+                info = tar.gettarinfo(json_path, arcname="messages.json")
+                # Fixed metadata keeps the archive byte-identical across runs
+                info.mtime = int(_EXPORT_DATE.timestamp())
+                info.uid = info.gid = 0
+                info.uname = info.gname = ""
+                info.mode = 0o644
+                with open(json_path, "rb") as f:
+                    tar.addfile(info, f)
+        finally:
+            os.remove(json_path)
+        return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic Skype export")
+    parser.add_argument("output", help="Output path (.json or .tar)")
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--mean-messages", type=int, default=100,
+                        help="Mean messages per conversation")
+    parser.add_argument("--distribution", choices=MESSAGE_COUNT_DISTRIBUTIONS,
+                        default="lognormal", help="Messages-per-conversation distribution")
+    parser.add_argument("--max-messages", type=int,
+                        help="Maximum messages in one conversation")
+    parser.add_argument("--type-mix",
+                        help='JSON object of message type weights, e.g. \'{"RichText": 0.9, "Event/Call": 0.1}\'')
+    parser.add_argument("--markup-density", type=float, default=0.2)
+    parser.add_argument("--edit-rate", type=float, default=0.05)
+    parser.add_argument("--participants", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=("json", "tar"),
+                        help="Output format (default: from the file extension)")
+    args = parser.parse_args(argv)
+
+    try:
+        generator = SyntheticExportGenerator(
+            conversations=args.conversations,
+            mean_messages=args.mean_messages,
+            distribution=args.distribution,
+            max_messages=args.max_messages,
+            message_type_mix=json.loads(args.type_mix) if args.type_mix else None,
+            markup_density=args.markup_density,
+            edit_rate=args.edit_rate,
+            participants=args.participants,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    output_format = args.format or ("tar" if args.output.lower().endswith(".tar") else "json")
+    if output_format == "tar":
+        counts = generator.write_tar(args.output)
+    else:
+        counts = generator.write_json(args.output)
+
+    print(
+        f"Wrote {counts['messages']} messages in {counts['conversations']} "
+        f"conversations to {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
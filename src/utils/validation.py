@@ -590,6 +590,14 @@ def validate_db_config(config: Dict[str, Any]) -> bool:
     if not isinstance(config, dict):
         raise ValidationError("Database configuration must be a dictionary")
 
+    # A SQLite database only needs a file path, which defaults to DEFAULT_SQLITE_PATH
+    if config.get("type") == "sqlite":
+        if "database_path" in config and (
+            not isinstance(config["database_path"], str) or not config["database_path"].strip()
+        ):
+            raise ValidationError("Database path must be a non-empty string")
+        return True
+
     # Check required fields
     required_fields = ["dbname", "user"]
     missing_fields = [f for f in required_fields if f not in config]
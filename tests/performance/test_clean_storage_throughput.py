@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for SkypeCleanDataStorage against a local PostgreSQL.
+
+Compares the per-row store_conversation/store_message path with the batched
+store_transformed_data path. Requires POSTGRES_TEST_DB=true.
+"""
+
+import os
+import sys
+import time
+import unittest
+import uuid
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from src.db.clean_storage.storage import SkypeCleanDataStorage
+from src.db.raw_storage.storage import SkypeDataStorage
+from tests.fixtures import get_test_db_config, is_db_available
+
+CONVERSATIONS = 20
+MESSAGES_PER_CONVERSATION = 500
+
+
+def build_transformed_data(prefix):
+    """Build transformed data with a mix of plain, media, poll and location messages."""
+    conversations = {}
+    for c in range(CONVERSATIONS):
+        conv_id = f"{prefix}-conv{c}"
+        messages = []
+        for m in range(MESSAGES_PER_CONVERSATION):
+            message = {
+                "id": f"{conv_id}-msg{m}",
+                "timestamp": f"2023-01-01T12:{m % 60:02d}:00Z",
+                "fromId": f"user{m % 5}",
+                "fromName": f"User {m % 5}",
+                "type": "RichText",
+                "content": f"Message {m} in conversation {c}",
+                "rawContent": f"<b>Message {m}</b> in conversation {c}",
+                "isEdited": m % 20 == 0,
+            }
+            if m % 10 == 1:
+                message["structuredData"] = {"media_filename": f"file{m}.jpg", "media_filesize": "1024"}
+            elif m % 50 == 2:
+                message["structuredData"] = {"poll_question": "Lunch?", "poll_options": ["Yes", "No"]}
+            elif m % 50 == 3:
+                message["structuredData"] = {"location_latitude": "1.0", "location_longitude": "2.0"}
+            messages.append(message)
+        conversations[conv_id] = {
+            "displayName": f"Conversation {c}",
+            "messageCount": len(messages),
+            "messages": messages,
+        }
+    return {"conversations": conversations}
+
+
+@pytest.mark.performance
+class TestCleanStorageThroughput(unittest.TestCase):
+    """Per-row vs. batched writes to the clean storage tables."""
+
+    def setUp(self):
+        """Set up storage and a raw export to attach data to."""
+        if not is_db_available():
+            self.skipTest("Performance tests disabled. Database not available.")
+
+        config = get_test_db_config()
+        self.raw_storage = SkypeDataStorage(config)
+        self.storage = SkypeCleanDataStorage(config)
+        self.raw_id = self.raw_storage.store_raw_data(
+            {"benchmark": str(uuid.uuid4())}, "clean_storage_benchmark.json"
+        )
+
+    def tearDown(self):
+        """Remove benchmark rows and close connections."""
+        conn = self.raw_storage.get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM raw_skype_exports WHERE id = %s", (self.raw_id,))
+            conn.commit()
+        finally:
+            self.raw_storage.return_connection(conn)
+        self.storage.close()
+        self.raw_storage.close()
+
+    def _store_per_row(self, transformed_data):
+        """The original path: one connection checkout and commit per row."""
+        for conv_id, conv_data in transformed_data["conversations"].items():
+            self.storage.store_conversation(
+                conversation_id=conv_id,
+                display_name=conv_data["displayName"],
+                raw_export_id=self.raw_id,
+                message_count=conv_data["messageCount"],
+            )
+            for msg in conv_data["messages"]:
+                self.storage.store_message(
+                    message_id=msg["id"],
+                    conversation_id=conv_id,
+                    timestamp=msg["timestamp"],
+                    sender_id=msg["fromId"],
+                    sender_name=msg["fromName"],
+                    message_type=msg["type"],
+                    content=msg["content"],
+                    raw_content=msg["rawContent"],
+                    is_edited=msg["isEdited"],
+                    structured_data=msg.get("structuredData", {}),
+                )
+
+    def test_batched_vs_per_row(self):
+        """Report messages per second for both write paths."""
+        total = CONVERSATIONS * MESSAGES_PER_CONVERSATION
+        results = {}
+
+        start = time.perf_counter()
+        self._store_per_row(build_transformed_data(f"row-{uuid.uuid4()}"))
+        results["per-row"] = total / (time.perf_counter() - start)
+
+        for batch_size in (100, 1000, 5000):
+            data = build_transformed_data(f"batch{batch_size}-{uuid.uuid4()}")
+            start = time.perf_counter()
+            self.storage.store_transformed_data(data, self.raw_id, batch_size=batch_size)
+            results[f"batched ({batch_size})"] = total / (time.perf_counter() - start)
+
+        print(f"\nClean storage throughput ({total} messages):")
+        for name, rate in results.items():
+            print(f"{name:<20}{rate:>12,.0f} msg/s")
+
+        self.assertGreater(results["batched (1000)"], results["per-row"])
+
+
+if __name__ == "__main__":
+    unittest.main()
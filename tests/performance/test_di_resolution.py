@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark for dependency resolution in the ServiceProvider.
+
+Reports resolutions per second for each lifetime, and for transient
+resolution with and without cached constructor plans.
+"""
+
+import os
+import sys
+import timeit
+import unittest
+from typing import Protocol
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils.di import ServiceProvider
+
+ITERATIONS = 20000
+
+
+class ConfigProtocol(Protocol):
+    pass
+
+
+class RepositoryProtocol(Protocol):
+    pass
+
+
+class ServiceProtocol(Protocol):
+    pass
+
+
+class Config:
+    def __init__(self, name: str = "benchmark"):
+        self.name = name
+
+
+class Repository:
+    def __init__(self, config: ConfigProtocol = None, table: str = "messages"):
+        self.config = config
+        self.table = table
+
+
+class Service:
+    def __init__(
+        self,
+        repository: RepositoryProtocol = None,
+        config: ConfigProtocol = None,
+        retries: int = 3,
+    ):
+        self.repository = repository
+        self.config = config
+        self.retries = retries
+
+
+class UncachedServiceProvider(ServiceProvider):
+    """Provider that re-inspects constructors on every resolution."""
+
+    def _get_plan(self, implementation_type):
+        return self._compile_plan(implementation_type)
+
+
+def _resolutions_per_second(resolve) -> float:
+    """Best-of-three resolutions per second for resolve()."""
+    timer = timeit.Timer(resolve)
+    return ITERATIONS / min(timer.repeat(repeat=3, number=ITERATIONS))
+
+
+@pytest.mark.performance
+class TestDIResolution(unittest.TestCase):
+    """Benchmark for ServiceProvider resolution throughput."""
+
+    def _register(self, provider: ServiceProvider) -> ServiceProvider:
+        """Register a small three-level object graph."""
+        provider.register_singleton(ConfigProtocol, Config())
+        provider.register_transient(RepositoryProtocol, Repository)
+        provider.register_transient(ServiceProtocol, Service)
+        return provider
+
+    def test_resolutions_per_second(self):
+        """Report resolutions per second for each lifetime."""
+        provider = self._register(ServiceProvider())
+        uncached = self._register(UncachedServiceProvider())
+
+        scoped = ServiceProvider()
+        scoped.register_singleton(ConfigProtocol, Config())
+        scoped.register_scoped(RepositoryProtocol, Repository)
+        scoped.register_transient(ServiceProtocol, Service)
+        scope = scoped.create_scope()
+
+        results = {
+            "singleton": _resolutions_per_second(lambda: provider.get(ConfigProtocol)),
+            "transient (uncached plan)": _resolutions_per_second(
+                lambda: uncached.get(ServiceProtocol)
+            ),
+            "transient (cached plan)": _resolutions_per_second(
+                lambda: provider.get(ServiceProtocol)
+            ),
+            "scoped": _resolutions_per_second(lambda: scope.get(RepositoryProtocol)),
+            "transient + scoped dep": _resolutions_per_second(
+                lambda: scope.get(ServiceProtocol)
+            ),
+        }
+        scope.close()
+
+        print("\nResolutions per second:")
+        for name, rate in results.items():
+            print(f"{name:<28}{rate:>14,.0f}")
+
+        self.assertGreater(
+            results["transient (cached plan)"], results["transient (uncached plan)"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
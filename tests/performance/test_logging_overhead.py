@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the structured logging decorators.
+
+Measures the per-call cost of log_call and log_execution_time when their
+level is disabled, when production mode is on, and when they actually log.
+"""
+
+import logging
+import os
+import sys
+import timeit
+import unittest
+
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.utils.new_structured_logging import (
+    log_call,
+    log_execution_time,
+    set_production_mode,
+)
+
+ITERATIONS = 20000
+
+
+def _per_call_ns(func, *args) -> float:
+    """Best-of-three per-call time of func(*args) in nanoseconds."""
+    timer = timeit.Timer(lambda: func(*args))
+    return min(timer.repeat(repeat=3, number=ITERATIONS)) / ITERATIONS * 1e9
+
+
+@pytest.mark.performance
+class TestLoggingOverhead(unittest.TestCase):
+    """Microbenchmark for log_call and log_execution_time."""
+
+    def setUp(self):
+        """Set up an isolated logger that discards its output."""
+        self.logger = logging.getLogger("benchmark.logging_overhead")
+        self.logger.propagate = False
+        self.logger.addHandler(logging.NullHandler())
+        self.logger.setLevel(logging.WARNING)
+
+        # A payload whose full repr would be very expensive
+        self.payload = {f"conversation{i}": {"messages": list(range(100))} for i in range(10000)}
+
+    def tearDown(self):
+        """Restore logger and production mode state."""
+        set_production_mode(False)
+        self.logger.handlers.clear()
+        self.logger.setLevel(logging.NOTSET)
+        self.logger.propagate = True
+
+    def _decorated(self):
+        """Build the undecorated and decorated variants of a trivial function."""
+
+        def plain(data):
+            return data
+
+        return {
+            "plain": plain,
+            "log_call": log_call(self.logger, level=logging.DEBUG)(plain),
+            "log_execution_time": log_execution_time(self.logger, level=logging.INFO)(plain),
+            "both": log_execution_time(self.logger, level=logging.INFO)(
+                log_call(self.logger, level=logging.DEBUG)(plain)
+            ),
+        }
+
+    def test_decorator_cost_per_call(self):
+        """Report decorator cost per call in each mode."""
+        variants = self._decorated()
+        results = {}
+
+        results["disabled"] = {
+            name: _per_call_ns(func, self.payload) for name, func in variants.items()
+        }
+
+        set_production_mode(True)
+        results["production"] = {
+            name: _per_call_ns(func, self.payload) for name, func in variants.items()
+        }
+        set_production_mode(False)
+
+        self.logger.setLevel(logging.DEBUG)
+        results["enabled"] = {
+            name: _per_call_ns(func, self.payload) for name, func in variants.items()
+        }
+
+        print("\nDecorator cost per call (ns):")
+        print(f"{'mode':<12}{'plain':>12}{'log_call':>12}{'exec_time':>12}{'both':>12}")
+        for mode, timings in results.items():
+            print(
+                f"{mode:<12}{timings['plain']:>12.0f}{timings['log_call']:>12.0f}"
+                f"{timings['log_execution_time']:>12.0f}{timings['both']:>12.0f}"
+            )
+
+        # Disabled decorators must not format the payload; a full repr of it
+        # takes tens of milliseconds, so even a generous bound catches that.
+        self.assertLess(results["disabled"]["both"], 50000)
+        self.assertLess(results["production"]["both"], 50000)
+
+
+if __name__ == "__main__":
+    unittest.main()
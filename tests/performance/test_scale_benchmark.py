@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark suite for the ETL pipeline.
+
+Generates synthetic exports at increasing scale tiers and measures parse,
+transform and load throughput and peak RSS for each. Results are written as
+JSON to tests/performance/results/ and can be compared against a previous run.
+
+Environment variables:
+    SCALE_BENCHMARK_TIERS: Comma-separated tiers to run (default: "smoke,small")
+    SCALE_BENCHMARK_BASELINE: Path to an earlier results file to compare against
+    SCALE_BENCHMARK_TOLERANCE: Allowed throughput drop vs. the baseline (default: 0.25)
+    POSTGRES_TEST_DB: Set to "true" to include the load phase
+"""
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+
+import psutil
+import pytest
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from src.db.etl import ETLPipeline
+from src.db.etl.transformer import Transformer
+from src.parser.core_parser import parse_skype_data, stream_conversations
+from src.utils.synthetic_export import SyntheticExportGenerator
+from tests.fixtures import get_test_db_config, is_db_available
+
+# Tier name -> (conversations, mean messages per conversation)
+SCALE_TIERS = {
+    "smoke": (20, 50),  # ~1K messages
+    "small": (100, 100),  # ~10K messages
+    "medium": (500, 200),  # ~100K messages
+    "large": (2000, 500),  # ~1M messages
+    "xlarge": (10000, 1000),  # ~10M messages
+    "xxlarge": (25000, 1000),  # ~25M messages
+}
+
+SEED = 20240101
+USER_DISPLAY_NAME = "Benchmark User"
+
+
+class PeakRssSampler:
+    """Samples the process RSS on a background thread and keeps the peak."""
+
+    def __init__(self, interval: float = 0.05):
+        """Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.process = psutil.Process(os.getpid())
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = self.process.memory_info().rss
+        if rss > self.peak_rss:
+            self.peak_rss = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def measure_phase(name, message_count, func):
+    """Run one benchmark phase and return its metrics.
+
+    Args:
+        name: Phase name
+        message_count: Number of messages the phase processes
+        func: Callable running the phase
+
+    Returns:
+        Dictionary of phase metrics
+    """
+    with PeakRssSampler() as sampler:
+        start = time.perf_counter()
+        func()
+        duration = time.perf_counter() - start
+
+    return {
+        "phase": name,
+        "duration_seconds": duration,
+        "messages_per_second": message_count / duration if duration > 0 else 0.0,
+        "peak_rss_mb": sampler.peak_rss / (1024 * 1024),
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Compare throughput against a baseline run.
+
+    Args:
+        results: Results of the current run
+        baseline: Results of the baseline run
+        tolerance: Allowed relative drop in throughput
+
+    Returns:
+        List of regression descriptions
+    """
+    regressions = []
+    for tier, tier_result in results["tiers"].items():
+        baseline_tier = baseline.get("tiers", {}).get(tier)
+        if not baseline_tier:
+            continue
+        for phase, metrics in tier_result["phases"].items():
+            baseline_phase = baseline_tier["phases"].get(phase)
+            if not baseline_phase or not baseline_phase["messages_per_second"]:
+                continue
+            ratio = metrics["messages_per_second"] / baseline_phase["messages_per_second"]
+            if ratio < 1.0 - tolerance:
+                regressions.append(
+                    f"{tier}/{phase}: {metrics['messages_per_second']:.0f} msg/s vs "
+                    f"{baseline_phase['messages_per_second']:.0f} msg/s ({ratio:.0%})"
+                )
+    return regressions
+
+
+@pytest.mark.performance
+class TestScaleBenchmark(unittest.TestCase):
+    """Parse, transform and load throughput at each scale tier."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up class-level test environment."""
+        cls.results_dir = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "results"
+        )
+        os.makedirs(cls.results_dir, exist_ok=True)
+
+        tiers = os.environ.get("SCALE_BENCHMARK_TIERS", "smoke,small")
+        cls.tiers = [tier.strip() for tier in tiers.split(",") if tier.strip()]
+        unknown = [tier for tier in cls.tiers if tier not in SCALE_TIERS]
+        if unknown:
+            raise ValueError(f"Unknown scale tiers: {', '.join(unknown)}")
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+
+    def _parse(self, export_path):
+        """Stream the export and run the core parser on each conversation."""
+        for conversation in stream_conversations(export_path):
+            parse_skype_data(
+                {
+                    "userId": "8:synthetic.user",
+                    "exportDate": "2024-01-01T00:00:00Z",
+                    "conversations": [conversation],
+                },
+                USER_DISPLAY_NAME,
+            )
+
+    def _transform(self, export_path):
+        """Stream the export and transform it one conversation at a time."""
+        transformer = Transformer(parallel_processing=False)
+        for conversation in stream_conversations(export_path):
+            transformer.transform(
+                {
+                    "userId": "8:synthetic.user",
+                    "exportDate": "2024-01-01T00:00:00Z",
+                    "conversations": [conversation],
+                },
+                USER_DISPLAY_NAME,
+            )
+
+    def _load(self, export_path):
+        """Run the full pipeline against the test database."""
+        pipeline = ETLPipeline(
+            db_config=get_test_db_config(),
+            output_dir=os.path.join(self.temp_dir, "output"),
+        )
+        result = pipeline.run_pipeline(
+            file_path=export_path, user_display_name=USER_DISPLAY_NAME
+        )
+        if not result.get("success"):
+            raise AssertionError(f"Pipeline failed: {result.get('error', 'Unknown error')}")
+
+    def _run_tier(self, tier):
+        """Generate an export for a tier and benchmark each phase."""
+        conversations, mean_messages = SCALE_TIERS[tier]
+        generator = SyntheticExportGenerator(
+            conversations=conversations, mean_messages=mean_messages, seed=SEED
+        )
+        export_path = os.path.join(self.temp_dir, f"{tier}.tar")
+
+        start = time.perf_counter()
+        counts = generator.write_tar(export_path)
+        generate_seconds = time.perf_counter() - start
+        message_count = counts["messages"]
+
+        # Phases read the extracted JSON so tar extraction isn't timed repeatedly
+        json_path = os.path.join(self.temp_dir, f"{tier}.json")
+        generator.write_json(json_path)
+
+        phases = {
+            "parse": measure_phase("parse", message_count, lambda: self._parse(json_path)),
+            "transform": measure_phase(
+                "transform", message_count, lambda: self._transform(json_path)
+            ),
+        }
+        if is_db_available():
+            phases["load"] = measure_phase(
+                "load", message_count, lambda: self._load(export_path)
+            )
+
+        os.remove(json_path)
+        return {
+            "conversations": counts["conversations"],
+            "messages": message_count,
+            "export_size_mb": os.path.getsize(export_path) / (1024 * 1024),
+            "generate_seconds": generate_seconds,
+            "phases": phases,
+        }
+
+    def test_scale_tiers(self):
+        """Benchmark each configured tier and store the results."""
+        results = {
+            "timestamp": datetime.now().isoformat(),
+            "seed": SEED,
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "total_memory_mb": psutil.virtual_memory().total / (1024 * 1024),
+            },
+            "tiers": {},
+        }
+
+        for tier in self.tiers:
+            tier_result = self._run_tier(tier)
+            results["tiers"][tier] = tier_result
+
+            print(
+                f"\n{tier}: {tier_result['messages']} messages in "
+                f"{tier_result['conversations']} conversations "
+                f"({tier_result['export_size_mb']:.1f} MB)"
+            )
+            for phase, metrics in tier_result["phases"].items():
+                print(
+                    f"  {phase:<10}{metrics['messages_per_second']:>12,.0f} msg/s"
+                    f"{metrics['duration_seconds']:>10.2f} s"
+                    f"{metrics['peak_rss_mb']:>10.1f} MB peak RSS"
+                )
+
+        results_file = os.path.join(
+            self.results_dir,
+            f'scale_benchmark_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json',
+        )
+        with open(results_file, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {results_file}")
+
+        baseline_path = os.environ.get("SCALE_BENCHMARK_BASELINE")
+        if baseline_path:
+            with open(baseline_path) as f:
+                baseline = json.load(f)
+            tolerance = float(os.environ.get("SCALE_BENCHMARK_TOLERANCE", "0.25"))
+            regressions = compare_to_baseline(results, baseline, tolerance)
+            self.assertEqual(regressions, [], "Throughput regressions:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    unittest.main()
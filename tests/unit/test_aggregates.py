@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Tests for the aggregates module.
+
+This module contains tests for ExportAggregator in src.db.aggregates and for
+SkypeReportGenerator reading the stored aggregates, run against SQLite.
+"""
+
+import shutil
+import statistics
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.analysis import cache
+from src.analysis.reporting import SkypeReportGenerator, _length_statistics
+from src.db.aggregates import ExportAggregator, delete_export
+from src.db.etl.context import ETLContext
+from src.db.etl.loader import Loader
+from src.db.etl.modular_pipeline import ModularETLPipeline
+from src.db.sqlite_manager import SQLiteDatabaseManager
+
+MESSAGES = [
+    # conversation, timestamp, sender id, sender name, type, content
+    ("conv1", "2023-01-01T09:15:00Z", "alice", "Alice", "RichText", "hello"),
+    ("conv1", "2023-01-01T09:45:00Z", "bob", "Bob", "RichText", "hi there"),
+    ("conv1", "2023-01-02T18:00:00Z", "alice", "Alice", "RichText", "how are you?"),
+    ("conv2", "2023-01-03T18:30:00Z", "alice", "Alice", "Event/Call", ""),
+    ("conv2", "2023-01-04T23:59:00Z", "carol", "Carol", "RichText", "late"),
+]
+
+
+class TestExportAggregator(unittest.TestCase):
+    """Test cases for the ExportAggregator class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.db = SQLiteDatabaseManager(":memory:")
+        self.addCleanup(self.db.close)
+        self.db.execute(
+            "CREATE TABLE skype_exports (id INTEGER PRIMARY KEY, user_id TEXT, "
+            "export_date TIMESTAMP, file_source TEXT, created_at TIMESTAMP)"
+        )
+        self.db.execute(
+            "INSERT INTO skype_exports VALUES (%s, %s, %s, %s, %s)",
+            (7, "alice", "2023-02-01 00:00:00", "export.tar", "2023-02-01 00:00:00"),
+        )
+
+        self.aggregator = ExportAggregator()
+        self.aggregator.add_conversation("conv1", "Chat")
+        self.aggregator.add_conversation("conv3", "Empty")
+        for message in MESSAGES:
+            self.aggregator.add_message(*message)
+        self.aggregator.write(self.db, 7)
+
+        self.reports = SkypeReportGenerator(self.db)
+
+    def test_export_summary(self):
+        """Test the summary is read from the aggregates."""
+        summary = self.reports.get_export_summary(7)
+
+        self.assertEqual(summary["conversation_count"], 3)
+        self.assertEqual(summary["message_count"], 5)
+        self.assertEqual(summary["first_message"].hour, 9)
+        self.assertEqual(summary["duration_days"], 3)
+
+    def test_activity_histograms(self):
+        """Test hour and day of week histograms match EXTRACT(HOUR/DOW)."""
+        self.assertEqual(
+            self.reports.get_activity_by_hour(7),
+            [
+                {"hour": 9, "message_count": 2},
+                {"hour": 18, "message_count": 2},
+                {"hour": 23, "message_count": 1},
+            ],
+        )
+        by_day = self.reports.get_activity_by_day_of_week(7)
+        # 2023-01-01 was a Sunday
+        self.assertEqual(by_day[0], {"day_of_week": 0, "message_count": 2, "day_name": "Sunday"})
+        self.assertEqual(sum(row["message_count"] for row in by_day), 5)
+
+    def test_senders_types_and_conversations(self):
+        """Test sender, message type and conversation statistics."""
+        senders = self.reports.get_top_senders(7, limit=2)
+        self.assertEqual(senders[0], {"sender_name": "Alice", "message_count": 3, "percentage": 60.0})
+        self.assertEqual(len(senders), 2)
+
+        types = self.reports.get_message_type_distribution(7)
+        self.assertEqual(types[0], {"message_type": "RichText", "count": 4, "percentage": 80.0})
+
+        conversations = self.reports.get_conversation_statistics(7)
+        self.assertEqual(conversations[0]["conversation_id"], "conv1")
+        self.assertEqual(conversations[0]["display_name"], "Chat")
+        self.assertEqual(conversations[0]["participant_count"], 2)
+        self.assertEqual(conversations[0]["duration_days"], 1)
+        self.assertEqual(conversations[-1]["message_count"], 0)
+
+    def test_write_replaces_previous_aggregates(self):
+        """Test writing the aggregates again replaces the stored rows."""
+        aggregator = ExportAggregator()
+        aggregator.add_message("conv9", datetime(2023, 5, 1, 12), "dave", "Dave", "RichText", "x")
+        aggregator.write(self.db, 7)
+
+        self.assertEqual(self.reports.get_export_summary(7)["message_count"], 1)
+        self.assertEqual(
+            self.db.execute_and_fetch_one(
+                "SELECT COUNT(*) FROM skype_conversation_aggregates WHERE export_id = %s", (7,)
+            )[0],
+            1,
+        )
+
+    def test_length_statistics(self):
+        """Test length statistics from the histogram match the exact values."""
+        lengths = [len(message[5]) for message in MESSAGES if message[4] == "RichText"]
+        result = self.reports.get_message_length_statistics(7)
+
+        self.assertEqual(result["min_length"], min(lengths))
+        self.assertEqual(result["max_length"], max(lengths))
+        self.assertAlmostEqual(result["avg_length"], statistics.mean(lengths))
+        self.assertAlmostEqual(result["median_length"], statistics.median(lengths))
+        self.assertAlmostEqual(result["stddev_length"], statistics.stdev(lengths))
+        self.assertIsNone(_length_statistics({})["median_length"])
+
+
+class TestLoadedAggregates(unittest.TestCase):
+    """Test cases for the aggregates stored by the loader."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.export_path = Path(self.temp_dir) / "export.tar"
+        self.export_path.write_bytes(b"")
+        self.db = SQLiteDatabaseManager(str(Path(self.temp_dir) / "skype.db"))
+        self.addCleanup(self.db.close)
+        self.analysis_cache = cache.AnalysisCache(cache_dir=str(Path(self.temp_dir) / "cache"))
+        patcher = patch.object(cache, "_analysis_cache", self.analysis_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_pipeline(self):
+        conversations = {}
+        for conv_id, timestamp, sender_id, sender_name, message_type, content in MESSAGES:
+            conversations.setdefault(conv_id, {"display_name": conv_id.title(), "messages": []})
+            conversations[conv_id]["messages"].append({
+                "timestamp": timestamp, "sender_id": sender_id, "sender_name": sender_name,
+                "message_type": message_type, "content": content,
+            })
+        transformer = MagicMock()
+        transformer.transform.return_value = {
+            "metadata": {"user_id": "alice", "export_date": "2023-02-01T00:00:00Z"},
+            "conversations": conversations,
+        }
+
+        context = ETLContext(db_config={"type": "sqlite"}, output_dir=self.temp_dir)
+        loader = Loader(context=context, db_connection=self.db)
+        pipeline = ModularETLPipeline(context, MagicMock(), transformer, loader)
+        return pipeline.run_pipeline(file_path=str(self.export_path))
+
+    def test_pipeline_stores_aggregates_under_its_export_id(self):
+        """Test a pipeline run creates the export and the aggregates reports read."""
+        first = self.run_pipeline()["export_id"]
+        second = self.run_pipeline()["export_id"]
+        self.assertNotEqual(first, second)
+
+        self.assertEqual(
+            self.db.execute_and_fetch(
+                "SELECT export_id, conversation_count, message_count FROM skype_export_aggregates ORDER BY export_id"
+            ),
+            [(first, 2, 5), (second, 2, 5)],
+        )
+        summary = SkypeReportGenerator(self.db).get_export_summary(second)
+        self.assertEqual(summary["message_count"], 5)
+        self.assertEqual(summary["user_id"], "alice")
+
+    def test_delete_export(self):
+        """Test deleting an export removes its rows and its cached results."""
+        export_id = self.run_pipeline()["export_id"]
+        kept = self.run_pipeline()["export_id"]
+        self.analysis_cache.get_or_compute("report", export_id, (), lambda: "old")
+
+        delete_export(self.db, export_id)
+
+        self.assertEqual(self.db.execute_and_fetch("SELECT id FROM skype_exports"), [(kept,)])
+        self.assertEqual(
+            self.db.execute_and_fetch("SELECT export_id FROM skype_export_aggregates"), [(kept,)]
+        )
+        self.assertIsNone(self.analysis_cache.get(self.analysis_cache.make_key("report", export_id)))
+
+
+if __name__ == "__main__":
+    unittest.main()
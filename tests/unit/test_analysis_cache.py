@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the analysis cache module.
+
+This module contains tests for AnalysisCache and CachedAnalysis in
+src.analysis.cache.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.analysis.cache import AnalysisCache, CachedAnalysis, get_analysis_cache
+
+
+class TestAnalysisCache(unittest.TestCase):
+    """Test cases for the AnalysisCache class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+
+    def test_computes_once_per_key(self):
+        """Test results are reused for the same method, export and params."""
+        cache = AnalysisCache()
+        compute = MagicMock(return_value={"message_count": 5})
+
+        first = cache.get_or_compute("report", 1, (), compute)
+        second = cache.get_or_compute("report", 1, (), compute)
+        cache.get_or_compute("report", 2, (), compute)
+
+        self.assertIs(first, second)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(len(first.etag), 32)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is dropped from memory."""
+        cache = AnalysisCache(max_entries=2)
+        for export_id in (1, 2):
+            cache.get_or_compute("report", export_id, (), lambda: export_id)
+        cache.get_or_compute("report", 1, (), lambda: 1)
+        cache.get_or_compute("report", 3, (), lambda: 3)
+
+        self.assertIsNone(cache.get(cache.make_key("report", 2)))
+        self.assertIsNotNone(cache.get(cache.make_key("report", 1)))
+
+    def test_invalidate_export(self):
+        """Test invalidation drops only the results of one export, in both tiers."""
+        cache = AnalysisCache(cache_dir=self.cache_dir)
+        cache.get_or_compute("report", 1, (), lambda: "old")
+        cache.get_or_compute("report", 2, (), lambda: "other")
+
+        cache.invalidate_export(1)
+
+        self.assertEqual(cache.get_or_compute("report", 1, (), lambda: "new").value, "new")
+        self.assertEqual(cache.get_or_compute("report", 2, (), lambda: "changed").value, "other")
+
+    def test_disk_tier_is_shared(self):
+        """Test a second cache on the same directory reads and invalidates entries."""
+        writer = AnalysisCache(cache_dir=self.cache_dir)
+        entry = writer.get_or_compute("report", 1, ("x",), lambda: {"a": 1})
+
+        reader = AnalysisCache(cache_dir=self.cache_dir)
+        cached = reader.get_or_compute("report", 1, ("x",), lambda: {"a": 2})
+        self.assertEqual(cached.value, {"a": 1})
+        self.assertEqual(cached.etag, entry.etag)
+        self.assertEqual(reader.get_stats()["disk_hits"], 1)
+
+        # Invalidation by another process is seen through the disk tier
+        writer.invalidate_export(1)
+        self.assertEqual(reader.get_or_compute("report", 1, ("x",), lambda: {"a": 3}).value, {"a": 3})
+
+    def test_disk_tier_is_private_json(self):
+        """Test the disk tier lives in a 0700 directory and stores JSON, not pickles."""
+        cache_dir = os.path.join(self.cache_dir, "analysis")
+        cache = AnalysisCache(cache_dir=cache_dir)
+        cache.get_or_compute("report", 1, (), lambda: {"a": [1, 2]})
+        # Results JSON cannot represent stay in memory only
+        cache.get_or_compute("report", 1, ("set",), lambda: {1, 2})
+
+        self.assertEqual(os.stat(cache_dir).st_mode & 0o777, 0o700)
+        export_dir = os.path.join(cache_dir, "export_1")
+        files = os.listdir(export_dir)
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(export_dir, files[0]), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["value"], {"a": [1, 2]})
+
+    def test_disk_tier_is_opt_in(self):
+        """Test the global cache only uses a disk tier when ANALYSIS_CACHE_DIR is set."""
+        with patch.dict(os.environ, {}, clear=True), patch("src.analysis.cache._analysis_cache", None):
+            self.assertIsNone(get_analysis_cache().cache_dir)
+        with patch.dict(os.environ, {"ANALYSIS_CACHE_DIR": self.cache_dir}), patch(
+            "src.analysis.cache._analysis_cache", None
+        ):
+            self.assertEqual(get_analysis_cache().cache_dir, self.cache_dir)
+
+    def test_result_computed_during_invalidation_is_not_stored(self):
+        """Test a result computed while its export was invalidated is discarded."""
+        cache = AnalysisCache()
+
+        def compute():
+            cache.invalidate_export(1)
+            return "stale"
+
+        self.assertEqual(cache.get_or_compute("report", 1, (), compute).value, "stale")
+        self.assertIsNone(cache.get(cache.make_key("report", 1)))
+
+    def test_cached_analysis_wrapper(self):
+        """Test get_* methods are cached by arguments and other attributes pass through."""
+        target = MagicMock()
+        target.get_top_senders.return_value = [{"sender_name": "Alice"}]
+        reports = CachedAnalysis(target, AnalysisCache())
+
+        reports.get_top_senders(1, limit=5)
+        reports.get_top_senders(1, limit=5)
+        reports.get_top_senders(1, limit=10)
+        reports.export_conversation_messages(1, "conv", "out.jsonl")
+        reports.export_conversation_messages(1, "conv", "out.jsonl")
+
+        self.assertEqual(target.get_top_senders.call_count, 2)
+        self.assertEqual(target.export_conversation_messages.call_count, 2)
+
+    def test_conditional_response(self):
+        """Test the validators let clients revalidate with a 304."""
+        from flask import Flask, Response, request
+
+        cache = AnalysisCache()
+        entry = cache.get_or_compute("report", 1, (), lambda: "<html></html>")
+        app = Flask(__name__)
+
+        def respond():
+            response = Response(entry.value, mimetype="text/html")
+            response.set_etag(entry.etag)
+            response.last_modified = entry.last_modified
+            return response.make_conditional(request)
+
+        with app.test_request_context(headers={"If-None-Match": f'"{entry.etag}"'}):
+            self.assertEqual(respond().status_code, 304)
+        with app.test_request_context(headers={"If-None-Match": '"other"'}):
+            self.assertEqual(respond().status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
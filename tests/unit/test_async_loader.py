@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Tests for the async_loader module.
+
+This module contains tests for AsyncLoader in src.db.etl.async_loader, run
+against an in-process stand-in for an asyncpg connection pool.
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.db.etl.async_loader import AsyncLoader
+from src.db.etl.context import ETLContext
+
+
+class FakeConnection:
+    """asyncpg-like connection that records the rows written to it."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def transaction(self):
+        return FakeTransaction()
+
+    async def copy_records_to_table(self, table, records, columns):
+        await self._write("copy", table, columns, records)
+
+    async def execute(self, query, *args):
+        self.pool.statements.append((query, args))
+
+    async def fetchval(self, query, *args):
+        self.pool.exports.append(args)
+        return len(self.pool.exports)
+
+    async def executemany(self, query, rows):
+        table = query.split('"')[1]
+        await self._write("executemany", table, query, rows)
+
+    async def _write(self, method, table, columns, rows):
+        pool = self.pool
+        if table in pool.fail_tables:
+            raise RuntimeError(f"cannot write {table}")
+        pool.in_flight += 1
+        pool.peak_in_flight = max(pool.peak_in_flight, pool.in_flight)
+        try:
+            # Yield so that other batches can start while this one is in flight
+            await asyncio.sleep(0.001)
+        finally:
+            pool.in_flight -= 1
+        pool.writes.append((method, table, columns, list(rows)))
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class FakeAcquire:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def __aenter__(self):
+        return FakeConnection(self.pool)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class FakePool:
+    """In-process stand-in for an asyncpg pool."""
+
+    def __init__(self, fail_tables=()):
+        self.fail_tables = set(fail_tables)
+        self.writes = []
+        self.statements = []
+        self.exports = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.closed = False
+
+    def acquire(self):
+        return FakeAcquire(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class TestAsyncLoader(unittest.TestCase):
+    """Test cases for the AsyncLoader class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.pool = FakePool()
+        self.transformed_data = {
+            "metadata": {"user_id": "user1", "user_display_name": "User 1"},
+            "conversations": {
+                f"conv{c}": {
+                    "id": f"conv{c}",
+                    "display_name": f"Conversation {c}",
+                    "messages": [
+                        {
+                            "id": f"msg{c}-{m}",
+                            "timestamp": "2023-01-01T12:30:00Z",
+                            "sender_id": "user1",
+                            "sender_name": "User 1",
+                            "content": f"Message {m}",
+                        }
+                        for m in range(25)
+                    ],
+                }
+                for c in range(4)
+            },
+        }
+
+    def _create_loader(self, **kwargs):
+        async def pool_factory():
+            return self.pool
+
+        kwargs.setdefault("batch_size", 10)
+        kwargs.setdefault("max_concurrency", 3)
+        return AsyncLoader(pool_factory=pool_factory, **kwargs)
+
+    def test_load_writes_all_rows_with_bounded_concurrency(self):
+        """Test batches run concurrently but never more than max_concurrency."""
+        loader = self._create_loader()
+
+        counts = loader.load({}, self.transformed_data, "export.tar")
+
+        self.assertEqual(counts, {"archives": 1, "conversations": 4, "messages": 100, "users": 1})
+        self.assertTrue(self.pool.closed)
+        self.assertEqual(self.pool.peak_in_flight, 3)
+
+        message_rows = [row for _, table, _, rows in self.pool.writes if table == "messages" for row in rows]
+        self.assertEqual(len(message_rows), 100)
+        self.assertTrue(all(len(rows) <= 10 for _, _, _, rows in self.pool.writes))
+        self.assertTrue(all(method == "copy" for method, _, _, _ in self.pool.writes))
+
+    def test_load_creates_export(self):
+        """Test the export row is created after the data and its ID set on the context."""
+        context = ETLContext(db_config={"type": "sqlite"}, output_dir=tempfile.gettempdir())
+        loader = self._create_loader(context=context)
+
+        loader.load({}, self.transformed_data, "export.tar")
+        loader.load({}, self.transformed_data, "export.tar")
+
+        self.assertEqual(context.export_id, 2)
+        self.assertEqual([(user_id, source) for user_id, _, source, _ in self.pool.exports], [("user1", "export.tar")] * 2)
+
+    def test_load_writes_aggregates(self):
+        """Test the export's report aggregates replace earlier ones under its ID."""
+        loader = self._create_loader()
+
+        with patch("src.db.etl.async_loader.FAST_TEST_MODE", False):
+            loader.load({}, self.transformed_data, "export.tar")
+
+        self.assertIn(("DELETE FROM skype_export_aggregates WHERE export_id = $1", (1,)), self.pool.statements)
+        writes = {table: rows for _, table, _, rows in self.pool.writes}
+        export_row = writes["skype_export_aggregates"][0]
+        self.assertEqual(export_row[:3], (1, 4, 100))
+        self.assertEqual(len(writes["skype_conversation_aggregates"]), 4)
+        total_length = 4 * sum(len(f"Message {m}") for m in range(25))
+        self.assertEqual(writes["skype_sender_aggregates"], [(1, "User 1", 100, total_length)])
+
+    def test_maintain_aggregates_false_skips_aggregates(self):
+        """Test maintain_aggregates=False writes no aggregate rows."""
+        loader = self._create_loader(maintain_aggregates=False)
+
+        with patch("src.db.etl.async_loader.FAST_TEST_MODE", False):
+            loader.load({}, self.transformed_data, "export.tar")
+
+        self.assertFalse(any(table.endswith("_aggregates") for _, table, _, _ in self.pool.writes))
+
+    def test_archive_is_written_first(self):
+        """Test dependent rows are only written after the archive row."""
+        loader = self._create_loader()
+
+        loader.load({}, self.transformed_data, "export.tar")
+
+        self.assertEqual(self.pool.writes[0][1], "archives")
+        archive_id = self.pool.writes[0][3][0][0]
+        message_rows = [rows for _, table, _, rows in self.pool.writes if table == "messages"]
+        self.assertTrue(all(row[1] == archive_id for rows in message_rows for row in rows))
+
+    def test_executemany_without_copy(self):
+        """Test use_copy=False writes batches with a parameterized INSERT."""
+        loader = self._create_loader(use_copy=False)
+
+        loader.load({}, self.transformed_data, "export.tar")
+
+        method, table, query, _ = self.pool.writes[0]
+        self.assertEqual(method, "executemany")
+        self.assertTrue(query.startswith('INSERT INTO "archives" ("id", "user_id"'))
+        self.assertIn("VALUES ($1, $2, $3, $4, $5, $6, $7)", query)
+
+    def test_failed_batch_aborts_load(self):
+        """Test a failing batch raises and still closes the pool."""
+        self.pool.fail_tables.add("messages")
+        loader = self._create_loader()
+
+        with self.assertRaises(RuntimeError):
+            loader.load({}, self.transformed_data, "export.tar")
+
+        self.assertTrue(self.pool.closed)
+        self.assertEqual(self.pool.in_flight, 0)
+
+    def test_load_inside_event_loop_requires_load_async(self):
+        """Test load() refuses to run in an event loop and load_async() works there."""
+        loader = self._create_loader()
+
+        async def run():
+            with self.assertRaises(RuntimeError):
+                loader.load({}, self.transformed_data)
+            async with loader:
+                return await loader.load_async({}, self.transformed_data, "export.tar")
+
+        counts = asyncio.run(run())
+
+        self.assertEqual(counts["messages"], 100)
+        self.assertTrue(self.pool.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
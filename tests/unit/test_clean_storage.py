@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Tests for the clean_storage module.
+
+This module contains tests for the functionality in src.db.clean_storage.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.db.clean_storage.models import (
+    BATCH_INSERT_CONVERSATIONS_SQL,
+    BATCH_INSERT_LOCATIONS_SQL,
+    BATCH_INSERT_MEDIA_SQL,
+    BATCH_INSERT_MESSAGES_SQL,
+    BATCH_INSERT_POLL_OPTIONS_SQL,
+    BATCH_INSERT_POLLS_SQL,
+    GET_LOCATIONS_BY_MESSAGE_IDS_SQL,
+    GET_MEDIA_BY_MESSAGE_IDS_SQL,
+    GET_MESSAGES_AFTER_KEY_SQL,
+    GET_MESSAGES_SQL,
+    GET_POLLS_BY_MESSAGE_IDS_SQL,
+)
+from src.db.clean_storage.storage import SkypeCleanDataStorage
+
+
+class TestSkypeCleanDataStorage(unittest.TestCase):
+    """Test cases for the SkypeCleanDataStorage class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.connection_params = {
+            "host": "localhost",
+            "database": "test_db",
+            "user": "test_user",
+            "password": "test_password",
+        }
+
+        messages = [
+            {
+                "id": f"msg{i}",
+                "timestamp": "2023-01-01T12:30:00Z",
+                "fromId": "user1",
+                "fromName": "User 1",
+                "type": "RichText",
+                "content": f"Message {i}",
+                "rawContent": f"Message {i}",
+                "isEdited": False,
+            }
+            for i in range(5)
+        ]
+        messages[1]["structuredData"] = {"media_filename": "photo.jpg", "media_filesize": "10"}
+        messages[2]["structuredData"] = {"poll_question": "Lunch?", "poll_options": ["Yes", "No"]}
+        messages[3]["structuredData"] = {"location_latitude": "1.0", "location_longitude": "2.0"}
+
+        self.transformed_data = {
+            "conversations": {
+                "conversation1": {
+                    "displayName": "Test Conversation 1",
+                    "messageCount": 5,
+                    "messages": messages,
+                },
+                "conversation2": {
+                    "displayName": "Empty Conversation",
+                    "messageCount": 0,
+                    "messages": [],
+                },
+            }
+        }
+
+    @patch("src.db.clean_storage.storage.execute_values")
+    @patch("src.db.clean_storage.storage.SimpleConnectionPool")
+    def test_store_transformed_data_batches(self, mock_pool, mock_execute_values):
+        """Test store_transformed_data writes set-based batches in one transaction each."""
+        mock_conn = MagicMock()
+        mock_pool_instance = MagicMock()
+        mock_pool_instance.getconn.return_value = mock_conn
+        mock_pool.return_value = mock_pool_instance
+
+        calls = []
+
+        def execute_values(cur, sql, rows, page_size=100, fetch=False):
+            calls.append((sql, list(rows)))
+            if sql == BATCH_INSERT_MESSAGES_SQL:
+                # msg0 already exists and is skipped by ON CONFLICT
+                return [(row[0],) for row in rows if row[0] != "msg0"]
+            if sql == BATCH_INSERT_POLLS_SQL:
+                return [(42, row[0]) for row in rows]
+            return None
+
+        mock_execute_values.side_effect = execute_values
+
+        with patch.object(SkypeCleanDataStorage, "ensure_tables_exist"):
+            storage = SkypeCleanDataStorage(self.connection_params)
+            result = storage.store_transformed_data(self.transformed_data, 1, batch_size=3)
+
+        self.assertEqual(result, (2, 5))
+
+        # Two batches: messages 0-2, then messages 3-4 with the empty conversation
+        self.assertEqual(mock_conn.commit.call_count, 2)
+        self.assertEqual(mock_pool_instance.putconn.call_count, 2)
+
+        statements = [sql for sql, _ in calls]
+        self.assertEqual(
+            statements,
+            [
+                BATCH_INSERT_CONVERSATIONS_SQL,
+                BATCH_INSERT_MESSAGES_SQL,
+                BATCH_INSERT_MEDIA_SQL,
+                BATCH_INSERT_POLLS_SQL,
+                BATCH_INSERT_POLL_OPTIONS_SQL,
+                BATCH_INSERT_CONVERSATIONS_SQL,
+                BATCH_INSERT_MESSAGES_SQL,
+                BATCH_INSERT_LOCATIONS_SQL,
+            ],
+        )
+        self.assertEqual([row[0] for row in calls[0][1]], ["conversation1"])
+        self.assertEqual([row[0] for row in calls[1][1]], ["msg0", "msg1", "msg2"])
+        self.assertEqual(calls[2][1][0][:3], ("msg1", "photo.jpg", 10))
+        self.assertEqual(calls[4][1], [(42, "Yes"), (42, "No")])
+        self.assertEqual([row[0] for row in calls[5][1]], ["conversation2"])
+
+    @patch("src.db.clean_storage.storage.execute_values")
+    @patch("src.db.clean_storage.storage.SimpleConnectionPool")
+    def test_store_transformed_data_rolls_back_failed_batch(self, mock_pool, mock_execute_values):
+        """Test a failed batch is rolled back and the error is raised."""
+        mock_conn = MagicMock()
+        mock_pool_instance = MagicMock()
+        mock_pool_instance.getconn.return_value = mock_conn
+        mock_pool.return_value = mock_pool_instance
+        mock_execute_values.side_effect = RuntimeError("database error")
+
+        with patch.object(SkypeCleanDataStorage, "ensure_tables_exist"):
+            storage = SkypeCleanDataStorage(self.connection_params)
+            with self.assertRaises(RuntimeError):
+                storage.store_transformed_data(self.transformed_data, 1)
+
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+        mock_pool_instance.putconn.assert_called_once_with(mock_conn)
+
+    @patch("src.db.clean_storage.storage.SimpleConnectionPool")
+    def test_get_messages_loads_specialized_data_per_page(self, mock_pool):
+        """Test get_messages enriches a page with one query per specialized table."""
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_pool_instance = MagicMock()
+        mock_pool_instance.getconn.return_value = mock_conn
+        mock_pool.return_value = mock_pool_instance
+
+        message_rows = [
+            (i, f"msg{i}", "conversation1", f"2023-01-01T12:3{i}:00", "user1",
+             "User 1", "RichText", f"Message {i}", f"Message {i}", False, {}, None)
+            for i in range(3)
+        ]
+        mock_cursor.fetchall.side_effect = [
+            message_rows,
+            [(10, "msg1", "photo.jpg", 10, "image/jpeg", None, None, None, None, None, None, None)],
+            [(20, "msg2", "Lunch?", None, ["Yes", "No"])],
+            [],
+        ]
+
+        with patch.object(SkypeCleanDataStorage, "ensure_tables_exist"):
+            storage = SkypeCleanDataStorage(self.connection_params)
+            messages = storage.get_messages("conversation1", limit=3)
+
+        queries = [c.args for c in mock_cursor.execute.call_args_list]
+        self.assertEqual(
+            queries,
+            [
+                (GET_MESSAGES_SQL, ("conversation1", 3)),
+                (GET_MEDIA_BY_MESSAGE_IDS_SQL, (["msg0", "msg1", "msg2"],)),
+                (GET_POLLS_BY_MESSAGE_IDS_SQL, (["msg0", "msg1", "msg2"],)),
+                (GET_LOCATIONS_BY_MESSAGE_IDS_SQL, (["msg0", "msg1", "msg2"],)),
+            ],
+        )
+        self.assertEqual([m["message_id"] for m in messages], ["msg0", "msg1", "msg2"])
+        self.assertNotIn("media", messages[0])
+        self.assertEqual(messages[1]["media"]["filename"], "photo.jpg")
+        self.assertEqual(messages[2]["poll"]["options"], ["Yes", "No"])
+
+    @patch("src.db.clean_storage.storage.SimpleConnectionPool")
+    def test_get_messages_keyset_page(self, mock_pool):
+        """Test get_messages continues after a (timestamp, id) key and skips enrichment when empty."""
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = []
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_pool_instance = MagicMock()
+        mock_pool_instance.getconn.return_value = mock_conn
+        mock_pool.return_value = mock_pool_instance
+
+        with patch.object(SkypeCleanDataStorage, "ensure_tables_exist"):
+            storage = SkypeCleanDataStorage(self.connection_params)
+            messages = storage.get_messages(
+                "conversation1", after_timestamp="2023-01-01T12:30:00", limit=100, after_id=7
+            )
+
+        self.assertEqual(messages, [])
+        mock_cursor.execute.assert_called_once_with(
+            GET_MESSAGES_AFTER_KEY_SQL, ("conversation1", "2023-01-01T12:30:00", 7, 100)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
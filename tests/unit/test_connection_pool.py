@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for the connection_pool module.
+
+This module contains tests for the waiting, statistics and validation
+behaviour of PostgresConnectionPool.
+"""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.db.connection_pool import PostgresConnectionPool
+
+
+def wait_until(predicate, timeout=2.0):
+    """Poll predicate until it is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class TestPostgresConnectionPool(unittest.TestCase):
+    """Test cases for the PostgresConnectionPool class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.db_config = {
+            "host": "localhost",
+            "dbname": "test_db",
+            "user": "test_user",
+            "password": "test_password",
+        }
+
+        pool_patcher = patch("src.db.connection_pool.pool.ThreadedConnectionPool")
+        self.mock_pool_class = pool_patcher.start()
+        self.addCleanup(pool_patcher.stop)
+        self.mock_pool = self.mock_pool_class.return_value
+        self.mock_pool.getconn.side_effect = lambda: MagicMock(closed=0)
+
+        maintenance_patcher = patch.object(PostgresConnectionPool, "_start_maintenance_thread")
+        maintenance_patcher.start()
+        self.addCleanup(maintenance_patcher.stop)
+
+    def _create_pool(self, **kwargs):
+        kwargs.setdefault("min_connections", 1)
+        kwargs.setdefault("max_connections", 1)
+        return PostgresConnectionPool(self.db_config, **kwargs)
+
+    def test_waiters_are_served_in_arrival_order(self):
+        """Test blocked callers get connections FIFO as they are released."""
+        pool = self._create_pool()
+        held = pool.get_connection()
+        served = []
+        acquired = {}
+
+        def worker(name):
+            acquired[name] = pool.get_connection()
+            served.append(name)
+
+        threads = []
+        for name in ("first", "second", "third"):
+            thread = threading.Thread(target=worker, args=(name,))
+            thread.start()
+            threads.append(thread)
+            self.assertTrue(wait_until(lambda: len(pool._waiters) == len(threads)))
+
+        self.assertEqual(pool.get_stats()["peak_waiting_threads"], 3)
+
+        pool.release_connection(*held)
+        for name in ("first", "second", "third"):
+            self.assertTrue(wait_until(lambda: name in acquired))
+            pool.release_connection(*acquired[name])
+
+        for thread in threads:
+            thread.join(timeout=2)
+
+        self.assertEqual(served, ["first", "second", "third"])
+        stats = pool.get_stats()
+        self.assertEqual(stats["waiting_threads"], 0)
+        self.assertEqual(stats["in_use_connections"], 0)
+        self.assertEqual(stats["wait_time"]["count"], 4)
+        self.assertEqual(stats["checkout_duration"]["count"], 4)
+        self.assertEqual(sum(stats["wait_time"]["buckets"].values()), 4)
+
+    def test_get_connection_times_out(self):
+        """Test a caller gives up after connection_timeout and is counted."""
+        pool = self._create_pool(connection_timeout=0.05)
+        pool.get_connection()
+
+        with self.assertRaises(Exception) as context:
+            pool.get_connection()
+
+        self.assertIn("Timed out", str(context.exception))
+        stats = pool.get_stats()
+        self.assertEqual(stats["wait_timeouts"], 1)
+        self.assertEqual(stats["waiting_threads"], 0)
+
+    def test_validation_discards_broken_connections(self):
+        """Test the "always" policy replaces connections that fail SELECT 1."""
+        broken = MagicMock(closed=0)
+        broken.cursor.return_value.__enter__.return_value.execute.side_effect = (
+            psycopg2.OperationalError("server closed the connection")
+        )
+        healthy = MagicMock(closed=0)
+
+        pool = self._create_pool(validation_policy="always")
+        self.mock_pool.getconn.side_effect = [broken, healthy]
+
+        conn, _ = pool.get_connection()
+
+        self.assertIs(conn, healthy)
+        self.mock_pool.putconn.assert_any_call(broken, close=True)
+        self.assertEqual(pool.get_stats()["validation_failures"], 1)
+
+    def test_validation_runs_outside_the_lock(self):
+        """Test a slow validation holds a slot but lets other threads release connections."""
+        pool = self._create_pool(max_connections=2, validation_policy="always")
+        held = pool.get_connection()
+
+        validating, finish = threading.Event(), threading.Event()
+        slow = MagicMock(closed=0)
+
+        def slow_select(query):
+            validating.set()
+            finish.wait(2)
+
+        slow.cursor.return_value.__enter__.return_value.execute.side_effect = slow_select
+        self.mock_pool.getconn.side_effect = [slow]
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(pool.get_connection()))
+        thread.start()
+        self.assertTrue(validating.wait(2))
+
+        # The pool lock is free, and the reserved slot still counts against capacity
+        release = threading.Thread(target=pool.release_connection, args=held)
+        release.start()
+        release.join(timeout=1)
+        self.assertFalse(release.is_alive())
+        self.assertEqual(pool._reserved, 1)
+
+        finish.set()
+        thread.join(timeout=2)
+        self.assertIs(acquired[0][0], slow)
+        self.assertEqual(pool.get_stats()["in_use_connections"], 1)
+
+    def test_idle_policy_skips_recently_used_connections(self):
+        """Test the "idle" policy only validates connections idle for long enough."""
+        pool = self._create_pool(validation_policy="idle", validation_idle_time=60)
+        conn = MagicMock(closed=0)
+        pool.connection_timestamps[id(conn)] = time.time()
+        self.mock_pool.getconn.side_effect = [conn]
+
+        self.assertIs(pool.get_connection()[0], conn)
+        conn.cursor.return_value.__enter__.return_value.execute.assert_not_called()
+
+    def test_unknown_validation_policy(self):
+        """Test an unknown validation policy is rejected."""
+        with self.assertRaises(ValueError):
+            self._create_pool(validation_policy="sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,10 +10,11 @@ import sys
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
-from src.utils.file_utils import get_file_extension, is_json_file, is_tar_file
+from src.utils.file_utils import get_file_extension, is_json_file, is_tar_file, make_private_dir
 
 
 class TestFileUtils(unittest.TestCase):
@@ -91,5 +92,23 @@ class TestFileUtils(unittest.TestCase):
         self.assertFalse(is_tar_file(self.no_extension_path))
 
 
+    def test_make_private_dir(self):
+        """Test private directories are created or tightened to mode 0700."""
+        path = os.path.join(self.temp_dir.name, "private")
+        self.assertEqual(make_private_dir(path), path)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+
+        os.chmod(path, 0o777)
+        make_private_dir(path)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "requires POSIX user IDs")
+    def test_make_private_dir_refuses_foreign_owner(self):
+        """Test a directory owned by another user is refused."""
+        with patch("os.getuid", return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                make_private_dir(self.temp_dir.name)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -10,6 +10,7 @@ from unittest.mock import MagicMock, patch
 from src.db.etl.loader import Loader
 from src.db.data_inserter import DataInserter
 from src.db.schema_manager import SchemaManager
+from src.utils.memory_governor import MemoryGovernor
 
 
 class TestLoader(unittest.TestCase):
@@ -243,6 +244,26 @@ class TestLoader(unittest.TestCase):
         # Assert the error message
         self.assertEqual(str(context.exception), "Conversations must be a dictionary")
 
+    def test_memory_governor_batch_size(self):
+        """Test the batch size follows the memory governor down and back up."""
+        used_mb = [85]
+        governor = MemoryGovernor(memory_limit_mb=100, rss_provider=lambda: used_mb[0] * 1024 * 1024)
+        governor.register("batch_size", 100, minimum=10)
+        self.loader.context = MagicMock(memory_governor=governor)
+        strategy = self.mock_data_inserter.strategy
+        strategy.current_batch_size = 100
+
+        governor.sample()
+        self.loader._apply_memory_governor()
+        self.assertEqual(strategy.current_batch_size, 50)
+
+        # Grows back once the pressure eases, but never above batch_size
+        used_mb[0] = 0
+        for _ in range(5):
+            governor.sample()
+        self.loader._apply_memory_governor()
+        self.assertEqual(strategy.current_batch_size, 100)
+
     def test_close(self):
         """Test closing the database connection."""
         # Call the close method
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the local executor module.
+
+This module contains tests for LocalTaskExecutor in src.api.local_executor.
+"""
+
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import psutil
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.api.local_executor import LocalTaskExecutor
+
+
+def record_task(task_id, log_path, value, seconds=0):
+    """Append a value to a file, optionally after sleeping."""
+    time.sleep(seconds)
+    with open(log_path, "a") as f:
+        f.write(f"{value}\n")
+    return {"success": True, "value": value}
+
+
+def failing_task(task_id):
+    """Fail like an ETL run that could not process its file."""
+    return {"success": False, "error": "Invalid export"}
+
+
+TASKS = {"record": record_task, "fail": failing_task}
+
+
+class TestLocalTaskExecutor(unittest.TestCase):
+    """Test cases for the LocalTaskExecutor class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.queue_path = os.path.join(self.folder, "tasks.db")
+        self.log_path = os.path.join(self.folder, "log.txt")
+
+    def make_executor(self, max_workers=1):
+        executor = LocalTaskExecutor(TASKS, self.queue_path, max_workers=max_workers, poll_interval=0.05)
+        self.addCleanup(executor.shutdown, True)
+        return executor
+
+    def wait_for(self, executor, job_id, statuses=("succeeded", "failed", "cancelled"), timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = executor.get_job(job_id)
+            if job["status"] in statuses:
+                return job
+            time.sleep(0.05)
+        self.fail(f"Job {job_id} is still {job['status']}")
+
+    def read_log(self):
+        with open(self.log_path) as f:
+            return f.read().split()
+
+    def test_priority_order_and_results(self):
+        """Test higher-priority jobs run first and results are stored."""
+        executor = self.make_executor()
+        first = executor.submit("record", {"log_path": self.log_path, "value": "first", "seconds": 0.5})
+        self.wait_for(executor, first, ("running",))
+        low = executor.submit("record", {"log_path": self.log_path, "value": "low"})
+        high = executor.submit("record", {"log_path": self.log_path, "value": "high"}, priority=5)
+        self.assertEqual(executor.get_job(low)["status"], "queued")
+
+        job = self.wait_for(executor, low)
+
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"], {"success": True, "value": "low"})
+        self.assertEqual(self.wait_for(executor, high)["status"], "succeeded")
+        self.assertEqual(self.read_log(), ["first", "high", "low"])
+
+    def test_cancel_queued_and_running(self):
+        """Test a running job's worker is terminated and a queued job never runs."""
+        executor = self.make_executor()
+        running = executor.submit("record", {"log_path": self.log_path, "value": "running", "seconds": 30})
+        queued = executor.submit("record", {"log_path": self.log_path, "value": "queued"})
+        self.wait_for(executor, running, ("running",))
+
+        self.assertTrue(executor.cancel(queued))
+        self.assertTrue(executor.cancel(running))
+        started = time.time()
+        while executor._workers and time.time() - started < 10:
+            time.sleep(0.05)
+
+        self.assertEqual(executor._workers, {})
+        self.assertEqual(executor.get_job(running)["status"], "cancelled")
+        self.assertEqual(executor.get_job(queued)["status"], "cancelled")
+        self.assertFalse(executor.cancel(running))
+        self.assertFalse(os.path.exists(self.log_path))
+
+    def test_failed_and_unknown_jobs(self):
+        """Test unsuccessful results fail the job and unknown tasks are rejected."""
+        executor = self.make_executor()
+
+        job = self.wait_for(executor, executor.submit("fail", {}))
+
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "Invalid export")
+        self.assertIsNone(executor.get_job("missing"))
+        with self.assertRaises(ValueError):
+            executor.submit("missing", {})
+
+    def test_orphaned_jobs_are_requeued(self):
+        """Test jobs left running by a stopped process run again on restart."""
+        executor = self.make_executor()
+        job_id = executor.submit("record", {"log_path": self.log_path, "value": "again"})
+        self.wait_for(executor, job_id)
+        executor.shutdown()
+
+        # Simulate a dispatcher that died while the job was running
+        stopped = subprocess.Popen([sys.executable, "-c", "pass"])
+        stopped.wait()
+        conn = sqlite3.connect(self.queue_path)
+        conn.execute("UPDATE jobs SET status = 'running', owner_pid = ? WHERE id = ?", (stopped.pid, job_id))
+        conn.commit()
+        conn.close()
+
+        restarted = self.make_executor()
+        self.assertEqual(restarted.get_job(job_id)["status"], "queued")
+        restarted.start()
+
+        self.assertEqual(self.wait_for(restarted, job_id)["status"], "succeeded")
+        self.assertEqual(self.read_log(), ["again", "again"])
+
+    def test_jobs_of_a_restarted_process_with_the_same_pid_are_requeued(self):
+        """Test a job claimed by an earlier process with this PID (e.g. PID 1 in a container) is requeued."""
+        executor = self.make_executor()
+        job_id = executor.submit("record", {"log_path": self.log_path, "value": "again"})
+        other_id = executor.submit("record", {"log_path": self.log_path, "value": "mine"})
+
+        conn = sqlite3.connect(self.queue_path)
+        started_at = psutil.Process(os.getpid()).create_time()
+        conn.execute(
+            "UPDATE jobs SET status = 'running', owner_pid = ?, owner_started_at = ? WHERE id = ?",
+            (os.getpid(), started_at - 60, job_id),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'running', owner_pid = ?, owner_started_at = ? WHERE id = ?",
+            (os.getpid(), started_at, other_id),
+        )
+        conn.commit()
+        conn.close()
+
+        restarted = self.make_executor()
+        self.assertEqual(restarted.get_job(job_id)["status"], "queued")
+        self.assertEqual(restarted.get_job(other_id)["status"], "running")
+
+
+    def test_queue_file_is_private(self):
+        """Test the queue file gets mode 0600 and a file owned by another user is refused."""
+        with open(self.queue_path, "w"):
+            pass
+        os.chmod(self.queue_path, 0o666)
+        self.make_executor()
+        self.assertEqual(os.stat(self.queue_path).st_mode & 0o777, 0o600)
+
+        with patch("os.getuid", return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                self.make_executor()
+
+if __name__ == "__main__":
+    unittest.main()
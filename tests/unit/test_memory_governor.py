@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the memory governor.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from src.utils.memory_governor import MemoryGovernor
+from src.utils.message_processor import MessageProcessor
+
+MB = 1024 * 1024
+
+
+class FakeRss:
+    """Settable RSS source for driving the governor deterministically."""
+
+    def __init__(self, used_mb: float = 0):
+        self.used_mb = used_mb
+
+    def __call__(self) -> int:
+        return int(self.used_mb * MB)
+
+
+@pytest.fixture
+def rss():
+    return FakeRss()
+
+
+@pytest.fixture
+def governor(rss):
+    governor = MemoryGovernor(memory_limit_mb=100, rss_provider=rss)
+    governor.register("batch_size", 1000, minimum=10)
+    governor.register("chunk_size", 400, minimum=50)
+    return governor
+
+
+def test_register_and_get(governor):
+    """Registered sizes start at their initial value."""
+    assert governor.get("batch_size") == 1000
+    assert governor.get("chunk_size") == 400
+    assert governor.get("unknown", 7) == 7
+
+
+def test_shrinks_under_pressure(governor, rss):
+    """Sizes shrink when RSS is above the shrink threshold."""
+    rss.used_mb = 85
+    governor.sample()
+    assert governor.get("batch_size") == 500
+    assert governor.get("chunk_size") == 200
+
+    governor.sample()
+    governor.sample()
+    assert governor.get("chunk_size") == 50
+    assert governor.stats["shrinks"] == 3
+
+
+def test_critical_drops_to_minimum_and_blocks(governor, rss):
+    """Critical pressure drops sizes to their minimum and holds back producers."""
+    rss.used_mb = 99
+    governor.sample()
+    assert governor.get("batch_size") == 10
+    assert governor.get("chunk_size") == 50
+    assert governor.wait_for_headroom(timeout=0.01) is False
+
+    # Headroom returns once below the shrink threshold
+    rss.used_mb = 70
+    governor.sample()
+    assert governor.wait_for_headroom(timeout=0.01) is True
+
+
+def test_grows_back_with_headroom(governor, rss):
+    """Sizes grow back towards, but never beyond, their initial value."""
+    rss.used_mb = 99
+    governor.sample()
+
+    rss.used_mb = 10
+    for _ in range(50):
+        governor.sample()
+    assert governor.get("batch_size") == 1000
+    assert governor.get("chunk_size") == 400
+
+
+def test_peak_memory_and_stats(governor, rss):
+    """Peak memory and current sizes are reported in the stats."""
+    rss.used_mb = 40
+    governor.sample()
+    rss.used_mb = 20
+    governor.sample()
+
+    stats = governor.get_stats()
+    assert stats["peak_memory_mb"] == pytest.approx(40)
+    assert stats["current_rss_mb"] == pytest.approx(20)
+    assert stats["samples"] == 2
+    assert stats["sizes"] == {"batch_size": 1000, "chunk_size": 400}
+
+
+def test_timer_thread_samples(rss):
+    """The sampling thread runs between start and stop."""
+    governor = MemoryGovernor(memory_limit_mb=100, sample_interval=0.01, rss_provider=rss)
+    rss.used_mb = 30
+
+    with governor:
+        deadline = time.time() + 2
+        while governor.stats["samples"] < 3 and time.time() < deadline:
+            time.sleep(0.01)
+
+    assert governor.stats["samples"] >= 3
+    assert not any(t.name == "memory-governor" and t.is_alive() for t in threading.enumerate())
+
+
+def test_start_is_reference_counted(rss):
+    """Nested start/stop calls keep the thread alive until the last stop."""
+    governor = MemoryGovernor(memory_limit_mb=100, sample_interval=0.01, rss_provider=rss)
+    governor.start()
+    governor.start()
+    governor.stop()
+    assert governor._thread is not None and governor._thread.is_alive()
+    governor.stop()
+    assert governor._thread is None
+
+
+def test_invalid_thresholds():
+    """Thresholds must be ordered."""
+    with pytest.raises(ValueError):
+        MemoryGovernor(memory_limit_mb=100, grow_threshold=0.9, shrink_threshold=0.8)
+    with pytest.raises(ValueError):
+        MemoryGovernor(memory_limit_mb=0)
+
+
+def test_message_processor_uses_governed_chunk_size(governor, rss):
+    """MessageProcessor chunks by the governed size and keeps results complete."""
+    processor = MessageProcessor(
+        parallel_processing=True, chunk_size=400, max_workers=2, memory_governor=governor
+    )
+    messages = [{"id": i} for i in range(1000)]
+
+    rss.used_mb = 99
+    governor.sample()
+    result = processor.transform_messages(messages, lambda m: {"id": m["id"]})
+
+    assert sorted(m["id"] for m in result) == list(range(1000))
+    assert max(processor.metrics["chunk_sizes"]) == 50
+
+
+def test_message_processor_reads_chunk_size_per_chunk():
+    """Each chunk is cut with the chunk size current when it is submitted."""
+
+    class SteppingGovernor:
+        def __init__(self, sizes):
+            self.sizes = iter(sizes)
+
+        def get(self, name, default=None):
+            return next(self.sizes) if name == "chunk_size" else default
+
+    processor = MessageProcessor(
+        parallel_processing=True, chunk_size=400, max_workers=2,
+        memory_governor=SteppingGovernor([400, 100, 300, 300, 300, 300]),
+    )
+    messages = [{"id": i} for i in range(1000)]
+
+    result = processor.transform_messages(messages, lambda m: {"id": m["id"]})
+
+    assert sorted(m["id"] for m in result) == list(range(1000))
+    assert processor.metrics["chunk_sizes"] == [100, 300, 300, 300]
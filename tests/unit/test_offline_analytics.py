@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline analytics module.
+
+This module contains tests for OfflineAnalytics in src.analysis.offline,
+including a comparison with SkypeReportGenerator over the same messages.
+"""
+
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.analysis.offline import OfflineAnalytics
+from src.analysis.reporting import SkypeReportGenerator
+from src.db.aggregates import ExportAggregator
+from src.db.sqlite_manager import SQLiteDatabaseManager
+
+MESSAGES = [
+    # conversation, timestamp, sender id, sender name, type, content
+    ("conv1", "2023-01-01T09:15:00Z", "alice", "Alice", "RichText", "hello"),
+    ("conv1", "2023-01-01T09:45:00Z", "bob", "Bob", "RichText", "hi there"),
+    ("conv1", "2023-01-02T18:00:00Z", "alice", "Alice", "RichText", "how are you?"),
+    ("conv2", "2023-01-03T18:30:00Z", "alice", "Alice", "Event/Call", ""),
+    ("conv2", "2023-01-31T23:59:00Z", "carol", "Carol", "RichText", "late"),
+]
+
+PARSED = {
+    "user_id": "alice",
+    "export_date": "2023-02-01",
+    "conversations": [
+        {
+            "id": "conv1",
+            "display_name": "Chat",
+            "messages": [
+                {"timestamp": m[1], "from_id": m[2], "from_name": m[3], "type": m[4], "content": m[5]}
+                for m in MESSAGES if m[0] == "conv1"
+            ],
+        },
+        {
+            # Raw export format, as yielded by stream_conversations()
+            "id": "conv2",
+            "displayName": None,
+            "MessageList": [
+                {"originalarrivaltime": m[1], "from": m[2], "messagetype": m[4], "content": m[5]}
+                for m in MESSAGES if m[0] == "conv2"
+            ],
+        },
+        {"id": "conv3", "display_name": "Empty", "messages": []},
+    ],
+    "id_to_display_name": {"alice": "Alice", "carol": "Carol"},
+}
+
+
+class TestOfflineAnalytics(unittest.TestCase):
+    """Test cases for the OfflineAnalytics class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.analytics = OfflineAnalytics.from_parsed(PARSED, file_source="export.tar")
+
+    def test_export_summary(self):
+        """Test the summary covers every conversation and message."""
+        summary = self.analytics.get_export_summary()
+
+        self.assertEqual(summary["user_id"], "alice")
+        self.assertEqual(summary["file_source"], "export.tar")
+        self.assertEqual(summary["conversation_count"], 3)
+        self.assertEqual(summary["message_count"], 5)
+        self.assertEqual(summary["first_message"], datetime(2023, 1, 1, 9, 15))
+        self.assertEqual(summary["duration_days"], 30)
+
+    def test_conversation_statistics(self):
+        """Test per-conversation counts, participants and time ranges."""
+        conversations = self.analytics.get_conversation_statistics(limit=2)
+
+        self.assertEqual([row["conversation_id"] for row in conversations], ["conv1", "conv2"])
+        self.assertEqual(conversations[0]["display_name"], "Chat")
+        self.assertEqual(conversations[0]["participant_count"], 2)
+        self.assertEqual(conversations[0]["last_message_time"], datetime(2023, 1, 2, 18))
+        self.assertEqual(conversations[1]["duration_days"], 28)
+
+    def test_timelines(self):
+        """Test timelines are bucketed like DATE_TRUNC."""
+        self.assertEqual(
+            self.analytics.get_conversation_timeline("conv1", "day"),
+            [
+                {"time_interval": datetime(2023, 1, 1), "message_count": 2},
+                {"time_interval": datetime(2023, 1, 2), "message_count": 1},
+            ],
+        )
+        # 2023-01-01 was a Sunday, so it belongs to the week of Monday 2022-12-26
+        self.assertEqual(
+            self.analytics.get_user_activity_timeline("Alice", "week"),
+            [
+                {"time_interval": datetime(2022, 12, 26), "message_count": 1},
+                {"time_interval": datetime(2023, 1, 2), "message_count": 2},
+            ],
+        )
+        self.assertEqual(self.analytics.get_user_activity_timeline("Nobody", "month"), [])
+
+    def test_timestamp_fallback(self):
+        """Test timestamps NumPy cannot parse are handled one by one."""
+        analytics = OfflineAnalytics()
+        analytics.add_message("c", datetime(2023, 1, 1, 12), "a", "A", "RichText", "x")
+        analytics.add_message("c", "2023-01-01T13:00:00+01:00", "a", "A", "RichText", "x")
+        analytics.add_message("c", "not a timestamp", "a", "A", "RichText", "x")
+
+        self.assertEqual(analytics.get_activity_by_hour(), [{"hour": 12, "message_count": 2}])
+        self.assertEqual(analytics.get_export_summary()["message_count"], 3)
+
+    def test_matches_report_generator(self):
+        """Test the report matches SkypeReportGenerator over the same messages."""
+        db = SQLiteDatabaseManager(":memory:")
+        self.addCleanup(db.close)
+        db.execute(
+            "CREATE TABLE skype_exports (id INTEGER PRIMARY KEY, user_id TEXT, "
+            "export_date TIMESTAMP, file_source TEXT, created_at TIMESTAMP)"
+        )
+        db.execute("INSERT INTO skype_exports VALUES (%s, %s, %s, %s, %s)", (1, "alice", None, None, None))
+        aggregator = ExportAggregator()
+        for conversation_id, display_name in (("conv1", "Chat"), ("conv2", None), ("conv3", "Empty")):
+            aggregator.add_conversation(conversation_id, display_name)
+        for message in MESSAGES:
+            aggregator.add_message(*message)
+        aggregator.write(db, 1)
+
+        expected = SkypeReportGenerator(db).generate_full_report(1)
+        report = self.analytics.generate_full_report()
+
+        for key in ("message_type_distribution", "activity_by_hour", "activity_by_day_of_week", "top_senders"):
+            self.assertEqual(report[key], expected[key], key)
+        for key, value in expected["message_length_statistics"].items():
+            self.assertAlmostEqual(report["message_length_statistics"][key], value)
+        self.assertEqual(
+            [(row["conversation_id"], row["message_count"], row["participant_count"], row["duration_days"])
+             for row in report["conversation_statistics"]],
+            [(row["conversation_id"], row["message_count"], row["participant_count"], row["duration_days"])
+             for row in expected["conversation_statistics"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the pipeline factory module.
+
+This module contains tests for PipelineFactory in src.db.etl.pipeline_factory.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.db.etl.extractor import Extractor
+from src.db.etl.loader import Loader
+from src.db.etl.pipeline_factory import PipelineFactory
+from src.utils.di import ServiceProvider
+from src.utils.interfaces import ExtractorProtocol, LoaderProtocol
+
+
+class TestPipelineFactory(unittest.TestCase):
+    """Test cases for the PipelineFactory class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.provider = ServiceProvider()
+        for patcher in (
+            patch("src.db.etl.loader.get_service", side_effect=KeyError),
+            # The etl_config schema is not shipped with the package
+            patch("src.db.etl.pipeline_factory.validate_config", side_effect=lambda config, **kwargs: config),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.factory = PipelineFactory(
+            {
+                "database": {"type": "sqlite", "database_path": os.path.join(self.folder, "skype.db")},
+                "output": {"directory": self.folder},
+            },
+            service_provider=self.provider,
+        )
+
+    def test_each_pipeline_has_its_own_components(self):
+        """Test pipelines get components from their own scope, closed after the run."""
+        first = self.factory.create_pipeline()
+        second = self.factory.create_pipeline()
+
+        self.assertIsInstance(first.loader, Loader)
+        self.assertIsNot(first.loader, second.loader)
+        self.assertIsNot(first.extractor, second.extractor)
+        self.assertIs(first.loader.context, self.factory.get_context())
+
+        with patch.object(first.loader, "close") as close:
+            with self.assertRaises(Exception):
+                first.run_pipeline()
+            close.assert_called_once()
+        with self.assertRaises(RuntimeError):
+            first.scope.get(LoaderProtocol)
+        second.scope.close()
+
+    def test_components_without_a_scope_are_closed_with_the_factory(self):
+        """Test components created without a scope share the factory's scope, closed by close()."""
+        with self.factory as factory:
+            loader = factory.create_loader()
+            self.assertIs(factory.create_loader(), loader)
+            close = patch.object(loader, "close").start()
+            self.addCleanup(patch.stopall)
+
+        close.assert_called_once()
+        self.assertIsNot(self.factory.create_loader(), loader)
+        self.factory.close()
+
+    def test_registered_components_are_shared(self):
+        """Test components registered with register_component() are used by every pipeline."""
+        extractor = Extractor(context=self.factory.get_context())
+        self.factory.register_component(ExtractorProtocol, extractor)
+
+        self.assertIs(self.factory.create_pipeline().extractor, extractor)
+        self.assertIs(self.factory.create_extractor(), extractor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the prepared_statements module.
+
+This module contains tests for PreparedStatementCache in src.db.prepared_statements.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, call
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.db.prepared_statements import PreparedStatementCache, to_positional
+
+INSERT_SQL = """
+INSERT INTO test (id, name)
+VALUES (%s, %s)
+RETURNING id;
+"""
+
+
+class TestPreparedStatementCache(unittest.TestCase):
+    """Test cases for the PreparedStatementCache class."""
+
+    def _cursor(self, conn=None):
+        cursor = MagicMock()
+        cursor.connection = conn or MagicMock()
+        return cursor
+
+    def test_to_positional(self):
+        """Test %s placeholders become $n parameters."""
+        self.assertEqual(
+            to_positional("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%' AND c = %s;"),
+            "SELECT * FROM t WHERE a = $1 AND b LIKE 'x%' AND c = $2",
+        )
+
+    def test_prepares_once_per_connection(self):
+        """Test a statement is prepared on first use and executed afterwards."""
+        cache = PreparedStatementCache()
+        cursor = self._cursor()
+
+        cache.execute(cursor, INSERT_SQL, (1, "a"))
+        cache.execute(cursor, INSERT_SQL, (2, "b"))
+
+        name = cursor.execute.call_args_list[0][0][0].split()[1]
+        self.assertEqual(
+            cursor.execute.call_args_list,
+            [
+                call(f"PREPARE {name} AS INSERT INTO test (id, name)\nVALUES ($1, $2)\nRETURNING id"),
+                call(f"EXECUTE {name} (%s, %s)", (1, "a")),
+                call(f"EXECUTE {name} (%s, %s)", (2, "b")),
+            ],
+        )
+
+        # A different connection prepares its own copy
+        other = self._cursor()
+        cache.execute(other, INSERT_SQL, (3, "c"))
+        self.assertTrue(other.execute.call_args_list[0][0][0].startswith("PREPARE"))
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["connections"], 2)
+
+    def test_evicts_least_recently_used(self):
+        """Test statements beyond max_statements are deallocated."""
+        cache = PreparedStatementCache(max_statements=2)
+        cursor = self._cursor()
+
+        cache.execute(cursor, "SELECT %s", (1,), key="one")
+        cache.execute(cursor, "SELECT %s", (2,), key="two")
+        second = cursor.execute.call_args_list[-2][0][0].split()[1]
+        cache.execute(cursor, "SELECT %s", (1,), key="one")
+        cache.execute(cursor, "SELECT %s", (3,), key="three")
+
+        cursor.execute.assert_any_call(f"DEALLOCATE {second}")
+        stats = cache.get_stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["prepared_statements"], 2)
+
+    def test_forget_drops_connection(self):
+        """Test forget drops the statements recorded for a connection."""
+        cache = PreparedStatementCache()
+        conn = MagicMock()
+        cache.execute(self._cursor(conn), "SELECT 1")
+        self.assertEqual(cache.get_stats()["connections"], 1)
+
+        cache.forget(conn)
+        self.assertEqual(cache.get_stats()["connections"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the progress tracker module.
+
+This module contains tests for ProgressTracker, ProgressBroadcaster and
+ProgressStore in src.db.progress_tracker.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.db import progress_tracker
+from src.db.progress_tracker import (
+    ProgressBroadcaster,
+    ProgressStore,
+    ProgressTracker,
+    create_tracker,
+    get_tracker,
+    remove_tracker,
+)
+
+
+class TestProgressBroadcaster(unittest.TestCase):
+    """Test cases for the ProgressBroadcaster class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.broadcaster = ProgressBroadcaster(rate=4)
+        self.events = []
+        self.threads = set()
+
+    def listener(self, data):
+        self.threads.add(threading.current_thread())
+        self.events.append(data)
+
+    def test_updates_are_coalesced_and_final_state_delivered(self):
+        """Test a burst of updates is delivered at the emit rate, ending with the final state."""
+        tracker = ProgressTracker("task-1", total_steps=1000, broadcaster=self.broadcaster)
+        tracker.add_listener(self.listener)
+        self.threads.clear()
+
+        for step in range(1000):
+            tracker.update(step=step, status="processing")
+        tracker.complete()
+        self.assertTrue(self.broadcaster.flush("task-1"))
+
+        self.assertLessEqual(len(self.events), 4)
+        self.assertEqual(self.events[-1]["status"], "completed")
+        self.assertEqual(self.events[-1]["current_step"], 1000)
+        self.assertNotIn(threading.current_thread(), self.threads)
+
+    def test_slow_listeners_do_not_block_updates(self):
+        """Test updates return while a listener is still busy."""
+        release = threading.Event()
+        tracker = ProgressTracker("task-1", broadcaster=self.broadcaster)
+        tracker.add_listener(lambda data: None)
+        tracker.listeners.append(lambda data: release.wait(5))
+
+        started = time.time()
+        for step in range(10):
+            tracker.update(step=step)
+        tracker.fail("Stopped")
+
+        self.assertLess(time.time() - started, 1)
+        release.set()
+        self.assertTrue(self.broadcaster.flush())
+
+    def test_invalid_rate(self):
+        """Test the emit rate must be positive."""
+        with self.assertRaises(ValueError):
+            ProgressBroadcaster(rate=0)
+
+
+class TestProgressStore(unittest.TestCase):
+    """Test cases for ProgressStore and the tracker registry."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.path = os.path.join(self.folder, "progress.db")
+        self.store = ProgressStore(self.path)
+        patcher = patch.object(progress_tracker, "_progress_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_state_is_shared_between_stores(self):
+        """Test a tracker's progress can be read and continued through another store."""
+        tracker = create_tracker("task-1", total_steps=10)
+        tracker.update(step=4, status="processing", message="Loading", export_id=7)
+        self.assertTrue(progress_tracker.get_broadcaster().flush("task-1"))
+
+        # Another process opens the same file
+        other = ProgressStore(self.path)
+        state = other.load("task-1")
+        continued = ProgressTracker.from_state(state, other)
+
+        self.assertEqual(continued.get_status(), tracker.get_status())
+        self.assertEqual(continued.get_status()["progress"], 40)
+        continued.error("Failed", error="Disk full")
+        remove_tracker("task-1")
+        self.assertEqual(self.store.load("task-1")["error"], "Disk full")
+        self.assertIsNone(other.load("missing"))
+
+    def test_tracker_registry(self):
+        """Test trackers of this process are live and others are loaded from the store."""
+        tracker = create_tracker("task-1")
+        self.assertIs(get_tracker("task-1"), tracker)
+
+        tracker.complete(export_id=3)
+        remove_tracker("task-1")
+
+        loaded = get_tracker("task-1")
+        self.assertIsNot(loaded, tracker)
+        self.assertEqual(loaded.get_status(), {
+            "status": "completed", "progress": 100,
+            "message": "Task completed successfully", "export_id": 3,
+        })
+        self.assertIsNone(get_tracker("missing"))
+
+        # Unshared trackers stay private to the process
+        create_tracker("task-2", shared=False)
+        remove_tracker("task-2")
+        self.assertIsNone(get_tracker("task-2"))
+
+    def test_states_expire(self):
+        """Test states older than the TTL are not returned and are pruned on open."""
+        self.store.save({"task_id": "task-1", "status": "completed"})
+
+        self.assertIsNone(ProgressStore(self.path, ttl=-1).load("task-1"))
+        self.assertIsNone(self.store.load("task-1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the raw-slice streaming export reader.
+"""
+
+import io
+import json
+
+import pytest
+
+from src.utils.raw_json_stream import (
+    RawExportReader,
+    RawMessage,
+    iter_conversations_with_raw,
+    raw_json_of,
+)
+
+EXPORT_TEXT = (
+    '{ "userId" : "8:user",\n'
+    '  "exportDate": "2024-01-01T00:00:00Z",\n'
+    '  "conversations": [\n'
+    '    {"id": "c1", "displayName": "One", "MessageList": [\n'
+    '      {"id": "m1",  "content": "caf\\u00e9 <b>bold</b>", "version": 12345678},\n'
+    '      {"id": "m2", "content": "\\"quoted\\" , ] }", "score": 1.50e2}\n'
+    '    ]},\n'
+    '    {"id": "c2", "MessageList": [], "properties": {"n": 1}}\n'
+    '  ]\n'
+    '}'
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 1024])
+def test_reader_matches_json_loads(chunk_size):
+    """Test that decoded conversations match json.loads for any chunk size."""
+    reader = RawExportReader(io.StringIO(EXPORT_TEXT), chunk_size=chunk_size)
+    conversations = list(reader.iter_conversations())
+
+    assert conversations == json.loads(EXPORT_TEXT)["conversations"]
+    assert reader.metadata == {"userId": "8:user", "exportDate": "2024-01-01T00:00:00Z"}
+
+
+def test_messages_keep_source_text():
+    """Test that messages carry their exact source slice."""
+    conversations = list(RawExportReader(io.StringIO(EXPORT_TEXT), chunk_size=5).iter_conversations())
+    first, second = conversations[0]["MessageList"]
+
+    assert isinstance(first, RawMessage)
+    assert first.raw_json == '{"id": "m1",  "content": "caf\\u00e9 <b>bold</b>", "version": 12345678}'
+    assert raw_json_of(second) == '{"id": "m2", "content": "\\"quoted\\" , ] }", "score": 1.50e2}'
+
+
+def test_raw_json_of_plain_dict():
+    """Test that plain dictionaries are serialized."""
+    assert json.loads(raw_json_of({"id": "m1"})) == {"id": "m1"}
+
+
+def test_invalid_json_raises():
+    """Test that malformed input raises instead of reading forever."""
+    reader = RawExportReader(io.StringIO('{"conversations": [{"MessageList": [{"a": tru}]}]}'), chunk_size=4)
+
+    with pytest.raises(ValueError):
+        list(reader.iter_conversations())
+
+
+def test_iter_conversations_with_raw(tmp_path):
+    """Test streaming from a file path."""
+    path = tmp_path / "messages.json"
+    path.write_text(EXPORT_TEXT, encoding="utf-8")
+
+    ids = [conversation["id"] for conversation in iter_conversations_with_raw(str(path))]
+
+    assert ids == ["c1", "c2"]
@@ -6,11 +6,13 @@ This module contains tests for the functionality in src.db.raw_storage.
 """
 
 import hashlib
+import io
 import json
 import os
 import sys
 import tempfile
 import unittest
+import zlib
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
@@ -18,11 +20,17 @@ from unittest.mock import MagicMock, mock_open, patch
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 from src.db.raw_storage.models import (
+    BACKFILL_CONTENT_HASH_SQL,
+    CHECK_DUPLICATE_FILE_SQL,
     CHECK_DUPLICATE_SQL,
     CREATE_RAW_TABLES_SQL,
     GET_LATEST_CLEANED_SQL,
+    GET_RAW_CHUNK_COUNT_SQL,
+    GET_RAW_CHUNKS_SQL,
     INSERT_CLEANED_DATA_SQL,
+    INSERT_RAW_CHUNK_SQL,
     INSERT_RAW_DATA_SQL,
+    VERIFY_HASH_SQL,
 )
 from src.db.raw_storage.storage import SkypeDataStorage
 
@@ -181,6 +189,96 @@ class TestSkypeDataStorage(unittest.TestCase):
             # Verify that the connection was returned to the pool
             mock_pool_instance.putconn.assert_called_once_with(mock_conn)
 
+    @patch("src.db.raw_storage.storage.SimpleConnectionPool")
+    def test_hash_file(self, mock_pool):
+        """Test hash_file hashes the file bytes in chunks."""
+        mock_pool.return_value = MagicMock()
+        content = json.dumps(self.sample_data).encode() * 100
+
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(content)
+            path = f.name
+
+        try:
+            with patch.object(SkypeDataStorage, "ensure_tables_exist"), patch.object(
+                SkypeDataStorage, "HASH_CHUNK_SIZE", 1000
+            ):
+                storage = SkypeDataStorage(self.connection_params)
+                expected = hashlib.sha256(content).hexdigest()
+
+                self.assertEqual(storage.hash_file(path), expected)
+                with open(path, "rb") as f:
+                    self.assertEqual(storage.hash_file(f), expected)
+        finally:
+            os.remove(path)
+
+    @patch("src.db.raw_storage.storage.SimpleConnectionPool")
+    def test_check_duplicate_file(self, mock_pool):
+        """Test check_duplicate_file looks up the file hash without parsing."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (7, "export.json", datetime.now())
+
+        mock_pool_instance = MagicMock()
+        mock_pool_instance.getconn.return_value = mock_conn
+        mock_pool.return_value = mock_pool_instance
+
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b"not even json")
+            path = f.name
+
+        try:
+            with patch.object(SkypeDataStorage, "ensure_tables_exist"):
+                storage = SkypeDataStorage(self.connection_params)
+                file_hash, existing = storage.check_duplicate_file(path)
+
+                self.assertEqual(file_hash, hashlib.sha256(b"not even json").hexdigest())
+                self.assertEqual(existing["id"], 7)
+                # Matches the source_hash of parsed exports and the file_hash of chunked ones
+                mock_cursor.execute.assert_called_once_with(
+                    CHECK_DUPLICATE_FILE_SQL, (file_hash, file_hash)
+                )
+        finally:
+            os.remove(path)
+
+    @patch("src.db.raw_storage.storage.SimpleConnectionPool")
+    def test_verify_data_integrity(self, mock_pool):
+        """Test verify_data_integrity recomputes the digest of the stored data on the server."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.side_effect = [
+            (True, True), (True, False), (False, True), None, (None, True)
+        ]
+
+        mock_pool_instance = MagicMock()
+        mock_pool_instance.getconn.return_value = mock_conn
+        mock_pool.return_value = mock_pool_instance
+
+        with patch.object(SkypeDataStorage, "ensure_tables_exist"):
+            storage = SkypeDataStorage(self.connection_params)
+
+            self.assertTrue(storage.verify_data_integrity(1, file_hash="abc"))
+            mock_cursor.execute.assert_called_with(VERIFY_HASH_SQL, ("abc", "abc", 1))
+
+            # Falls back to hashing the data when no hash is given
+            self.assertFalse(storage.verify_data_integrity(1, self.sample_data))
+            mock_cursor.execute.assert_called_with(
+                VERIFY_HASH_SQL, (self.expected_hash, self.expected_hash, 1)
+            )
+
+            # Stored data that no longer matches its digest fails verification
+            self.assertFalse(storage.verify_data_integrity(1))
+            mock_cursor.execute.assert_called_with(VERIFY_HASH_SQL, (None, None, 1))
+            self.assertIn("sha256(convert_to(raw_data::text", VERIFY_HASH_SQL)
+
+            # Missing rows fail verification
+            self.assertFalse(storage.verify_data_integrity(2, file_hash="abc"))
+
+            # Rows stored before content_hash existed are not rejected
+            self.assertTrue(storage.verify_data_integrity(3, file_hash="abc"))
+
     @patch("src.db.raw_storage.storage.SimpleConnectionPool")
     def test_store_raw_data(self, mock_pool):
         """Test store_raw_data method."""
@@ -199,28 +297,148 @@ class TestSkypeDataStorage(unittest.TestCase):
         # Create a storage instance with mocked connection pool
         with patch.object(SkypeDataStorage, "ensure_tables_exist"), patch.object(
             SkypeDataStorage, "check_duplicate", return_value=None
-        ), patch.object(SkypeDataStorage, "verify_data_integrity", return_value=True):
+        ), patch.object(
+            SkypeDataStorage, "check_duplicate_source", return_value=None
+        ) as check_duplicate_source, patch.object(
+            SkypeDataStorage, "verify_data_integrity", return_value=True
+        ):
             storage = SkypeDataStorage(self.connection_params)
 
             # Store raw data
             file_name = "test_file.json"
             export_date = datetime.now()
-            raw_id = storage.store_raw_data(self.sample_data, file_name, export_date)
+            raw_id = storage.store_raw_data(
+                self.sample_data, file_name, export_date, source_hash="source"
+            )
 
             # Verify that the cursor executed the INSERT_RAW_DATA_SQL
             from psycopg2.extras import Json
 
             mock_cursor.execute.assert_called_once()
 
+            # file_hash stays the hash of the data, so exports stored before
+            # source_hash existed are still found as duplicates
+            sql, params = mock_cursor.execute.call_args[0]
+            self.assertEqual(sql, INSERT_RAW_DATA_SQL)
+            self.assertEqual(params[:4], (file_name, self.expected_hash, "source", export_date))
+            self.assertEqual(params[4].adapted, self.sample_data)
+
             # Verify that the connection was committed
             mock_conn.commit.assert_called_once()
 
             # Verify that the raw_id is correct
             self.assertEqual(raw_id, 1)
+            check_duplicate_source.assert_called_once_with("source")
 
             # Verify that the connection was returned to the pool
             self.assertEqual(mock_pool_instance.putconn.call_count, 1)
 
+    @patch("src.db.raw_storage.storage.SimpleConnectionPool")
+    def test_store_raw_data_found_by_source_hash(self, mock_pool):
+        """Test a stored export found by its source hash is not serialized and hashed."""
+        mock_pool.return_value = MagicMock()
+
+        with patch.object(SkypeDataStorage, "ensure_tables_exist"), patch.object(
+            SkypeDataStorage, "check_duplicate_source", return_value={"id": 7}
+        ), patch.object(SkypeDataStorage, "calculate_file_hash") as calculate_file_hash:
+            storage = SkypeDataStorage(self.connection_params)
+
+            self.assertEqual(
+                storage.store_raw_data(self.sample_data, "test_file.json", source_hash="source"), 7
+            )
+            calculate_file_hash.assert_not_called()
+
+    @patch("src.db.raw_storage.storage.SimpleConnectionPool")
+    def test_backfill_content_hashes(self, mock_pool):
+        """Test the content digest of old exports is recorded in committed batches."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchall.side_effect = [[(1,), (2,)], [(3,), (4,)], [(5,)]]
+
+        mock_pool_instance = MagicMock()
+        mock_pool_instance.getconn.return_value = mock_conn
+        mock_pool.return_value = mock_pool_instance
+
+        with patch.object(SkypeDataStorage, "ensure_tables_exist"):
+            storage = SkypeDataStorage(self.connection_params)
+
+            self.assertEqual(storage.backfill_content_hashes(batch_size=2), 5)
+            mock_cursor.execute.assert_called_with(BACKFILL_CONTENT_HASH_SQL, (2,))
+            self.assertEqual(mock_conn.commit.call_count, 3)
+            self.assertNotIn("UPDATE", CREATE_RAW_TABLES_SQL)
+
+    @patch("src.db.raw_storage.storage.SimpleConnectionPool")
+    def test_store_and_read_raw_file(self, mock_pool):
+        """Test storing a file as compressed chunks and streaming it back."""
+        content = json.dumps(self.sample_data).encode() * 50
+        rows = []
+
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1,)
+
+        def execute(sql, params=None):
+            if sql == INSERT_RAW_CHUNK_SQL:
+                rows.append(params[1:])
+
+        mock_cursor.execute.side_effect = execute
+        mock_cursor.__iter__.side_effect = lambda: iter(rows)
+
+        mock_pool_instance = MagicMock()
+        mock_pool_instance.getconn.return_value = mock_conn
+        mock_pool.return_value = mock_pool_instance
+
+        with patch.object(SkypeDataStorage, "ensure_tables_exist"), patch.object(
+            SkypeDataStorage, "check_duplicate_source", return_value=None
+        ), patch.object(SkypeDataStorage, "RAW_CHUNK_SIZE", 1000):
+            storage = SkypeDataStorage(self.connection_params)
+
+            raw_id = storage.store_raw_file(
+                io.BytesIO(content), "export.json", metadata={"userId": "test_user"}
+            )
+
+            self.assertEqual(raw_id, 1)
+            self.assertEqual(len(rows), (len(content) + 999) // 1000)
+            self.assertTrue(all(len(row[1]) < row[3] for row in rows))
+            mock_conn.commit.assert_called_once()
+
+            # Only metadata is stored as JSONB
+            metadata = mock_cursor.execute.call_args_list[-1][0][1][0].adapted
+            self.assertEqual(metadata["storage"], "chunked")
+            self.assertEqual(metadata["chunk_count"], len(rows))
+            self.assertEqual(metadata["file_size"], len(content))
+            self.assertEqual(metadata["metadata"], {"userId": "test_user"})
+
+            # Streaming the chunks back yields the original bytes
+            mock_cursor.fetchone.return_value = (len(rows),)
+            with storage.open_raw_file(raw_id) as f:
+                self.assertEqual(f.read(), content)
+            mock_cursor.execute.assert_any_call(GET_RAW_CHUNK_COUNT_SQL, (1,))
+            mock_cursor.execute.assert_called_with(GET_RAW_CHUNKS_SQL, (1,))
+
+            # Missing trailing chunks, or missing chunks altogether, are detected
+            last = rows.pop()
+            with self.assertRaisesRegex(ValueError, "chunks"):
+                b"".join(storage.iter_raw_file(raw_id))
+            rows.append(last)
+            mock_cursor.__iter__.side_effect = lambda: iter([])
+            with self.assertRaisesRegex(ValueError, "chunks"):
+                b"".join(storage.iter_raw_file(raw_id))
+            mock_cursor.__iter__.side_effect = lambda: iter(rows)
+
+            # Exports stored as a single JSONB value have no chunks to read
+            mock_cursor.fetchone.return_value = (None,)
+            with self.assertRaisesRegex(ValueError, "not stored as chunks"):
+                b"".join(storage.iter_raw_file(raw_id))
+            mock_cursor.fetchone.return_value = (len(rows),)
+
+            # Corrupt chunks are detected
+            rows[1] = (1, zlib.compress(b"tampered"), rows[1][2], rows[1][3])
+            with self.assertRaises(ValueError):
+                b"".join(storage.iter_raw_file(raw_id))
+
     @patch("src.db.raw_storage.storage.SimpleConnectionPool")
     def test_store_cleaned_data(self, mock_pool):
         """Test store_cleaned_data method."""
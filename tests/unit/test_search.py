@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Tests for the search module.
+
+This module contains tests for query parsing, the in-process InvertedIndex
+and MessageSearch in src.analysis.search.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.analysis.queries import SkypeQueryExamples
+from src.analysis.search import (
+    CREATE_SEARCH_INDEX_SQL,
+    InvertedIndex,
+    MessageSearch,
+    highlight,
+    parse_query,
+    to_tsquery,
+)
+from src.db.sqlite_manager import SQLiteDatabaseManager
+
+MESSAGES = [
+    # id, conversation, timestamp, sender, content
+    (1, "conv1", "2023-01-01 09:00:00", "Alice", "The budget report is ready"),
+    (2, "conv1", "2023-01-02 09:00:00", "Bob", "Report the budget numbers, budget first"),
+    (3, "conv2", "2023-01-03 09:00:00", "Carol", "Budgeting meeting moved"),
+    (4, "conv2", "2023-01-04 09:00:00", "Alice", "lunch?"),
+]
+
+
+class TestQueryParsing(unittest.TestCase):
+    """Test cases for parse_query and to_tsquery."""
+
+    def test_parse_query(self):
+        """Test terms, phrases and prefixes are recognised."""
+        self.assertEqual(
+            parse_query('budget "Report is" meet* e-mail'),
+            [
+                ("term", ("budget",)),
+                ("phrase", ("report", "is")),
+                ("prefix", ("meet",)),
+                ("phrase", ("e", "mail")),
+            ],
+        )
+
+    def test_tsquery_drops_operators(self):
+        """Test tsquery operators in the input never reach PostgreSQL."""
+        self.assertEqual(to_tsquery(parse_query('budg* "big report"')), "budg:* & (big <-> report)")
+        self.assertEqual(to_tsquery(parse_query("a|b !c & ('d')")), "(a <-> b) & c & d")
+        self.assertEqual(to_tsquery(parse_query("!!! &")), "")
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """Test cases for the InvertedIndex class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.index = InvertedIndex()
+        for message_id, conversation_id, timestamp, sender, content in MESSAGES:
+            self.index.add({
+                "id": message_id, "conversation_id": conversation_id,
+                "timestamp": timestamp, "sender_name": sender, "content": content,
+            })
+
+    def ids(self, query, **kwargs):
+        return [row["id"] for row in self.index.search(query, **kwargs)["results"]]
+
+    def test_ranked_terms(self):
+        """Test every term must match and more matches rank higher."""
+        self.assertEqual(self.ids("budget"), [2, 1])
+        self.assertEqual(self.ids("budget ready"), [1])
+        self.assertEqual(self.ids("missing"), [])
+
+    def test_phrase_and_prefix(self):
+        """Test phrases need adjacent words and prefixes match word starts."""
+        self.assertEqual(self.ids('"budget report"'), [1])
+        self.assertEqual(self.ids("budg*"), [2, 3, 1])
+
+    def test_pagination(self):
+        """Test pages are consecutive and the last page has no next offset."""
+        first = self.index.search("budg*", limit=2)
+        second = self.index.search("budg*", limit=2, offset=first["next_offset"])
+
+        self.assertEqual([row["id"] for row in first["results"]], [2, 3])
+        self.assertEqual(first["next_offset"], 2)
+        self.assertEqual([row["id"] for row in second["results"]], [1])
+        self.assertIsNone(second["next_offset"])
+
+    def test_headline(self):
+        """Test matched words are highlighted in the original case."""
+        result = self.index.search('"budget report"')["results"][0]
+        self.assertEqual(result["headline"], "The <mark>budget</mark> <mark>report</mark> is ready")
+
+    def test_long_content_is_trimmed(self):
+        """Test long messages are cut to a window around the first match."""
+        content = " ".join(f"w{i}" for i in range(100))
+        snippet = highlight(content, [60])
+
+        self.assertIn("<mark>w60</mark>", snippet)
+        self.assertEqual(len(snippet.split()), 35)
+
+    def test_headline_is_escaped(self):
+        """Test message content is HTML-escaped around the highlight markers."""
+        snippet = highlight("<b>budget</b> & <script>", [1])
+        self.assertEqual(snippet, "&lt;b&gt;<mark>budget</mark>&lt;/b&gt; &amp; &lt;script&gt;")
+
+
+class TestMessageSearch(unittest.TestCase):
+    """Test cases for the MessageSearch class."""
+
+    def test_sqlite_uses_in_process_index(self):
+        """Test SQLite connections are searched through an InvertedIndex."""
+        db = SQLiteDatabaseManager(":memory:")
+        self.addCleanup(db.close)
+        db.execute("CREATE TABLE skype_conversations (export_id INTEGER, conversation_id TEXT, display_name TEXT)")
+        db.execute(
+            "CREATE TABLE skype_messages (id INTEGER, export_id INTEGER, conversation_id TEXT, "
+            "timestamp TEXT, sender_name TEXT, content TEXT)"
+        )
+        db.bulk_insert("skype_conversations", ["export_id", "conversation_id", "display_name"],
+                       [(1, "conv1", "Work"), (1, "conv2", "Lunch")])
+        db.bulk_insert("skype_messages",
+                       ["id", "export_id", "conversation_id", "timestamp", "sender_name", "content"],
+                       [(m[0], 1, m[1], m[2], m[3], m[4]) for m in MESSAGES])
+
+        search = MessageSearch(db)
+        self.assertEqual(search.backend, "memory")
+
+        results = SkypeQueryExamples(db).find_conversations_with_keyword(1, "budget")
+        self.assertEqual([row["id"] for row in results], [2, 1])
+        self.assertEqual(results[0]["conversation_name"], "Work")
+        self.assertEqual(search.search(2, "budget")["results"], [])
+
+    def test_postgres_query(self):
+        """Test PostgreSQL searches pass a sanitized tsquery and fetch one extra row."""
+        db_connection = MagicMock()
+        db_connection.execute_query.return_value = [
+            {"id": i, "headline": "<i>\x02budget\x03</i>"} for i in range(3)
+        ]
+        search = MessageSearch(db_connection)
+        search._has_index = True
+
+        page = search.search(5, "budg* report", limit=2, offset=4)
+
+        query, params = db_connection.execute_query.call_args[0]
+        self.assertIn("content_tsv @@ q", query)
+        self.assertEqual(params, ("budg:* & report", "budg:* & report", 5, 3, 4))
+        self.assertEqual(len(page["results"]), 2)
+        self.assertEqual(page["next_offset"], 6)
+        self.assertEqual(page["results"][0]["headline"], "&lt;i&gt;<mark>budget</mark>&lt;/i&gt;")
+
+        search.ensure_index()
+        self.assertEqual(db_connection.execute.call_count, len(CREATE_SEARCH_INDEX_SQL))
+
+    def test_postgres_without_index_uses_ilike(self):
+        """Test databases without content_tsv are searched with ILIKE."""
+        rows = [
+            {"id": m[0], "conversation_id": m[1], "timestamp": m[2], "sender_name": m[3], "content": m[4]}
+            for m in MESSAGES if "budget" in m[4].lower()
+        ]
+        db_connection = MagicMock()
+        db_connection.execute_query.side_effect = [[], rows]
+        search = MessageSearch(db_connection)
+
+        page = search.search(1, '"budget" my_budget*', limit=5)
+
+        query, params = db_connection.execute_query.call_args[0]
+        self.assertNotIn("content_tsv", query)
+        self.assertEqual(query.count("ILIKE %s"), 2)
+        self.assertEqual(params, (1, "%budget%", "%my\\_budget%"))
+        self.assertEqual(page["results"], [])
+
+        db_connection.execute_query.side_effect = [rows]
+        page = search.search(1, "budget")
+        self.assertEqual([row["id"] for row in page["results"]], [2, 1])
+        self.assertIn("<mark>", page["results"][0]["headline"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Tests for the sharding module.
+
+This module contains tests for the conversation offset index, shard
+planning and shard processing in src.db.etl.sharding.
+"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.db.aggregates import ExportAggregator
+from src.db.etl.sharding import (
+    aggregate_shard_progress,
+    build_export_index,
+    discard_sharded_export,
+    finalize_sharded_export,
+    iter_shard_conversations,
+    plan_shards,
+    process_shard,
+)
+from src.db.sqlite_manager import SQLiteDatabaseManager
+
+EXPORT = {
+    "userId": "8:alice",
+    "exportDate": "2023-02-01T00:00:00Z",
+    "conversations": [
+        {
+            "id": f"19:chat{i}@thread.skype",
+            "displayName": "Café ☕" if i % 2 else None,
+            "MessageList": [
+                {
+                    "id": f"{i}-{j}",
+                    "from": "8:alice" if j % 2 else "8:bob",
+                    "originalarrivaltime": f"2023-01-{1 + j % 28:02d}T{j % 24:02d}:00:00Z",
+                    "messagetype": "RichText",
+                    "content": f"héllo {i} {j}",
+                }
+                for j in range(i * 10)
+            ],
+        }
+        for i in range(12)
+    ],
+}
+
+
+class TestSharding(unittest.TestCase):
+    """Test cases for the sharding functions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.data = json.dumps(EXPORT, ensure_ascii=False, indent=2).encode("utf-8")
+        self.json_path = os.path.join(self.folder, "export.json")
+        with open(self.json_path, "wb") as f:
+            f.write(self.data)
+
+    def make_tar(self, name, mode):
+        path = os.path.join(self.folder, name)
+        with tarfile.open(path, mode) as tar:
+            for member, data in (("endpoints.json", b"{}"), ("messages.json", self.data)):
+                info = tarfile.TarInfo(member)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        return path
+
+    def read_all(self, index, shard_count=4):
+        shards = plan_shards(index, shard_count, min_shard_messages=1)
+        return shards, [c for shard in shards for c in iter_shard_conversations(index["source"], shard)]
+
+    def test_index_and_read_shards(self):
+        """Test shards of JSON and TAR exports read back every conversation exactly."""
+        for path in (self.json_path, self.make_tar("export.tar", "w"), self.make_tar("compressed.tar", "w:gz")):
+            index = build_export_index(path, temp_dir=self.folder)
+
+            self.assertEqual(index["metadata"], {"userId": "8:alice", "exportDate": "2023-02-01T00:00:00Z"})
+            self.assertEqual(index["message_count"], 660)
+            self.assertEqual(index["conversations"][1][0], "19:chat1@thread.skype")
+            shards, conversations = self.read_all(index)
+            self.assertEqual(conversations, EXPORT["conversations"], path)
+            self.assertEqual(conversations[3]["MessageList"][0].raw_json.count("héllo"), 1)
+
+        # Uncompressed archives are read in place
+        self.assertEqual(build_export_index(self.make_tar("export.tar", "w"))["source"]["offset"] % 512, 0)
+
+    def test_plan_shards(self):
+        """Test shards are contiguous, balanced and not smaller than the minimum."""
+        index = build_export_index(self.json_path)
+
+        shards = plan_shards(index, 4, min_shard_messages=1)
+
+        self.assertEqual(len(shards), 4)
+        self.assertEqual(sum(s["conversations"] for s in shards), 12)
+        self.assertEqual(sum(s["messages"] for s in shards), 660)
+        for previous, shard in zip(shards, shards[1:]):
+            self.assertLess(previous["end"], shard["start"])
+        self.assertLess(max(s["messages"] for s in shards), 2 * 660 / 4)
+        self.assertEqual(len(plan_shards(index, 4, min_shard_messages=300)), 2)
+        self.assertEqual(plan_shards({"conversations": [], "message_count": 0}), [])
+
+    def test_process_and_finalize_shards(self):
+        """Test shards are loaded in batches and their aggregates merged."""
+        index = build_export_index(self.json_path)
+        shards = plan_shards(index, 3, min_shard_messages=1)
+
+        def load_shard(transformed, archive_id):
+            aggregator = ExportAggregator()
+            for conversation in transformed["conversations"]:
+                for message in conversation["MessageList"]:
+                    aggregator.add_message(
+                        conversation["id"], message["originalarrivaltime"], message["from"],
+                        None, message["messagetype"], message["content"],
+                    )
+            count = sum(len(c["MessageList"]) for c in transformed["conversations"])
+            return {"conversations": len(transformed["conversations"]), "messages": count}, aggregator
+
+        transformer = MagicMock()
+        transformer.transform.side_effect = lambda raw_data, name: raw_data
+        loader = MagicMock()
+        loader.load_shard.side_effect = load_shard
+        loader.create_export.return_value = 7
+        progress = []
+
+        results = [
+            process_shard(
+                transformer, loader, index["source"], index["metadata"], shard, "archive-1",
+                progress_callback=lambda done, total: progress.append((done, total)), batch_messages=50,
+            )
+            for shard in shards
+        ]
+        # Shard results travel between Celery tasks as JSON
+        results = json.loads(json.dumps(results))
+        summary = finalize_sharded_export(loader, results, index["metadata"], self.json_path)
+
+        self.assertEqual(summary, {"export_id": 7, "shards": 3, "conversations": 12, "messages": 660})
+        loader.create_export.assert_called_once_with(
+            {"user_id": "8:alice", "export_date": "2023-02-01T00:00:00Z"}, self.json_path
+        )
+        self.assertGreater(transformer.transform.call_count, 3)
+        self.assertEqual(progress[-1], (shards[-1]["messages"], shards[-1]["messages"]))
+
+        expected = ExportAggregator()
+        for conversation in EXPORT["conversations"]:
+            for message in conversation["MessageList"]:
+                expected.add_message(
+                    conversation["id"], message["originalarrivaltime"], message["from"],
+                    None, message["messagetype"], message["content"],
+                )
+        merged = ExportAggregator()
+        for result in results:
+            merged.merge(ExportAggregator.from_dict(result["aggregates"]))
+        self.assertEqual(merged.export_rows(7), expected.export_rows(7))
+        self.assertEqual(sorted(merged.conversation_rows(7)), sorted(expected.conversation_rows(7)))
+        self.assertEqual(sorted(merged.sender_rows(7)), sorted(expected.sender_rows(7)))
+
+    def test_discard_sharded_export(self):
+        """Test a failed export's archive and messages are removed, other archives kept."""
+        db = SQLiteDatabaseManager(os.path.join(self.folder, "skype.db"))
+        self.addCleanup(db.close)
+        db.create_loader_schema()
+        for archive_id in ("archive-1", "archive-2"):
+            db.execute("INSERT INTO archives (id) VALUES (%s)", (archive_id,))
+            db.execute("INSERT INTO messages (id, archive_id) VALUES (%s, %s)", (f"{archive_id}-m", archive_id))
+        loader = MagicMock()
+        loader.db_connection = db
+
+        discard_sharded_export(loader, "archive-1")
+
+        self.assertEqual(db.execute_and_fetch("SELECT id FROM archives"), [("archive-2",)])
+        self.assertEqual(db.execute_and_fetch("SELECT archive_id FROM messages"), [("archive-2",)])
+
+    def test_shard_stops_when_archive_is_discarded(self):
+        """Test a running shard stops and removes its batch once another shard discarded the archive."""
+        index = build_export_index(self.json_path)
+        shard = plan_shards(index, 1, min_shard_messages=1)[0]
+        db = SQLiteDatabaseManager(os.path.join(self.folder, "skype.db"))
+        self.addCleanup(db.close)
+        db.create_loader_schema()
+        db.execute("INSERT INTO archives (id) VALUES (%s)", ("archive-1",))
+
+        def load_shard(transformed, archive_id):
+            batch = load_shard.calls = getattr(load_shard, "calls", 0) + 1
+            if batch == 2:
+                # Another shard failed and its errback discarded the archive
+                # while this batch was loading
+                discard_sharded_export(loader, archive_id)
+            db.execute("INSERT INTO messages (id, archive_id) VALUES (%s, %s)", (f"m{batch}", archive_id))
+            return {"conversations": 1, "messages": 1}, None
+
+        transformer = MagicMock()
+        transformer.transform.side_effect = lambda raw_data, name: raw_data
+        loader = MagicMock()
+        loader.db_connection = db
+        loader.load_shard.side_effect = load_shard
+
+        with self.assertRaises(RuntimeError):
+            process_shard(
+                transformer, loader, index["source"], index["metadata"], shard, "archive-1",
+                batch_messages=50,
+            )
+        self.assertEqual(loader.load_shard.call_count, 2)
+        self.assertEqual(db.execute_and_fetch("SELECT id FROM messages"), [])
+
+        # A shard that starts after the archive was discarded loads nothing
+        with self.assertRaises(RuntimeError):
+            process_shard(transformer, loader, index["source"], index["metadata"], shard, "archive-1")
+        self.assertEqual(loader.load_shard.call_count, 2)
+
+    def test_aggregate_shard_progress(self):
+        """Test shard progress is combined by message count."""
+        shards = [
+            {"status": "completed", "messages_done": 100, "messages": 100},
+            {"status": "running", "messages_done": 50, "messages": 300},
+            {"status": "pending", "messages_done": 0, "messages": 100},
+        ]
+
+        status = aggregate_shard_progress(shards)
+
+        self.assertEqual(status["status"], "processing")
+        self.assertEqual(status["progress"], 30)
+        self.assertEqual(status["shards"], {"total": 3, "completed": 1, "failed": 0})
+
+        shards[1].update(status="failed", error="Lost connection")
+        self.assertEqual(aggregate_shard_progress(shards)["error"], "Lost connection")
+        self.assertEqual(
+            aggregate_shard_progress([{"status": "completed", "messages_done": 0, "messages": 0}])["progress"],
+            100,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
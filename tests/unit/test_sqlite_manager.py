@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the sqlite_manager module.
+
+This module contains tests for SQLiteDatabaseManager in src.db.sqlite_manager,
+run against a temporary SQLite database.
+"""
+
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.analysis.reporting import SkypeReportGenerator
+from src.db.database_factory import DatabaseConnectionFactory
+from src.db.etl.loader import Loader
+from src.db.schema_manager import SchemaManager
+from src.db.sqlite_manager import SQLiteDatabaseManager, to_sqlite
+
+
+class TestSQLiteDatabaseManager(unittest.TestCase):
+    """Test cases for the SQLiteDatabaseManager class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.db = SQLiteDatabaseManager(str(Path(self.temp_dir) / "test.db"))
+        self.addCleanup(self.db.close)
+
+    def test_to_sqlite(self):
+        """Test psycopg2 placeholders and CASCADE are translated."""
+        self.assertEqual(
+            to_sqlite("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%'"),
+            "SELECT * FROM t WHERE a = ? AND b LIKE 'x%'",
+        )
+        self.assertEqual(to_sqlite("DROP TABLE messages CASCADE"), "DROP TABLE messages")
+
+    def test_parameters_are_converted_per_manager(self):
+        """Test JSON and timestamp parameters are converted without global sqlite3 adapters."""
+        self.db.execute("CREATE TABLE t (data TEXT, at TIMESTAMP)")
+        self.db.execute("INSERT INTO t VALUES (%s, %s)", ({"a": [1]}, datetime(2023, 1, 2, 3, 4, 5)))
+
+        self.assertEqual(self.db.execute_and_fetch_one("SELECT * FROM t"), ('{"a": [1]}', "2023-01-02 03:04:05"))
+        other = sqlite3.connect(":memory:")
+        self.addCleanup(other.close)
+        with self.assertRaises(sqlite3.Error):
+            other.execute("SELECT ?", ({"a": 1},))
+
+    def test_pragmas_are_applied(self):
+        """Test the connection runs in WAL mode with the tuned pragmas."""
+        self.assertEqual(self.db.execute_and_fetch_one("PRAGMA journal_mode")[0], "wal")
+        self.assertEqual(self.db.execute_and_fetch_one("PRAGMA synchronous")[0], 1)
+        self.assertEqual(self.db.execute_and_fetch_one("PRAGMA cache_size")[0], -64000)
+
+    def test_schema_manager_creates_schema(self):
+        """Test SchemaManager creates and drops its schema on SQLite."""
+        schema = SchemaManager(self.db)
+        schema.create_schema()
+
+        for table in ("conversations", "messages", "users", "attachments"):
+            self.assertTrue(self.db.table_exists(table))
+        self.assertTrue(self.db.index_exists("idx_messages_timestamp"))
+
+        schema.drop_schema()
+        self.assertFalse(self.db.table_exists("messages"))
+
+    def test_bulk_insert_and_stream(self):
+        """Test bulk_insert writes all rows and stream_query reads them back."""
+        SchemaManager(self.db).create_schema()
+        self.db.bulk_insert("conversations", ["id", "display_name"], [("conv1", "Conversation")])
+        rows = [
+            (f"msg{i}", "conv1", f"Message {i}", datetime(2023, 1, 1, 12, 0, i % 60), {"i": i})
+            for i in range(250)
+        ]
+
+        inserted = self.db.bulk_insert(
+            "messages", ["id", "conversation_id", "content", "timestamp", "properties"], rows, page_size=100
+        )
+
+        self.assertEqual(inserted, 250)
+        self.assertFalse(self.db.conn.in_transaction)
+        streamed = list(self.db.stream_query(
+            "SELECT id, timestamp, properties FROM messages WHERE conversation_id = %s ORDER BY rowid",
+            ("conv1",),
+            itersize=40,
+        ))
+        self.assertEqual(len(streamed), 250)
+        self.assertEqual(streamed[1], {"id": "msg1", "timestamp": "2023-01-01 12:00:01", "properties": '{"i": 1}'})
+
+    def test_export_conversation_messages(self):
+        """Test a conversation is exported through stream_query in timestamp order."""
+        self.db.execute(
+            "CREATE TABLE skype_messages (id TEXT, export_id INTEGER, conversation_id TEXT, "
+            "sender_id TEXT, sender_name TEXT, timestamp TEXT, message_type TEXT, content TEXT)"
+        )
+        rows = [
+            (f"msg{i}", 1, "conv1", "alice", "Alice", f"2023-01-01 12:00:{59 - i:02d}", "RichText", f"Hi {i}")
+            for i in range(5)
+        ]
+        self.db.bulk_insert(
+            "skype_messages",
+            ["id", "export_id", "conversation_id", "sender_id", "sender_name", "timestamp", "message_type", "content"],
+            rows + [("other", 2, "conv1", "bob", "Bob", "2023-01-01 12:00:00", "RichText", "Other export")],
+        )
+        output_file = str(Path(self.temp_dir) / "conv1.jsonl")
+
+        count = SkypeReportGenerator(self.db).export_conversation_messages(1, "conv1", output_file)
+
+        with open(output_file) as f:
+            messages = [json.loads(line) for line in f]
+        self.assertEqual(count, 5)
+        self.assertEqual([m["id"] for m in messages], [f"msg{i}" for i in range(4, -1, -1)])
+        self.assertEqual(messages[0]["content"], "Hi 4")
+
+    def test_bulk_insert_rolls_back_on_error(self):
+        """Test a failing bulk insert leaves no rows behind."""
+        SchemaManager(self.db).create_schema()
+        rows = [("user1", "User 1"), ("user1", "Duplicate")]
+
+        with self.assertRaises(Exception):
+            self.db.bulk_insert("users", ["id", "display_name"], rows)
+
+        self.assertEqual(self.db.execute_and_fetch_one("SELECT COUNT(*) FROM users")[0], 0)
+
+    def test_factory_creates_sqlite_connection(self):
+        """Test the factory returns a SQLite manager for the sqlite type."""
+        path = str(Path(self.temp_dir) / "factory.db")
+        db = DatabaseConnectionFactory.create_connection({"database_path": path}, "sqlite")
+        self.addCleanup(db.close)
+
+        self.assertIsInstance(db, SQLiteDatabaseManager)
+        self.assertEqual(db.database_path, path)
+
+    def test_loader_loads_export_into_new_file(self):
+        """Test an export is loaded end to end into a new SQLite file."""
+        path = str(Path(self.temp_dir) / "load.db")
+        transformed = {
+            "metadata": {"user_id": "alice", "user_display_name": "Alice"},
+            "conversations": {
+                "conv1": {
+                    "display_name": "Team",
+                    "messages": [
+                        {"id": "m1", "timestamp": "2023-01-01T10:00:00Z", "sender_id": "alice",
+                         "sender_name": "Alice", "content": "Hello", "message_type": "RichText"},
+                        {"id": "m2", "timestamp": "2023-01-01T10:05:00Z", "sender_id": "bob",
+                         "sender_name": "Bob", "content": "Hi", "message_type": "RichText"},
+                    ],
+                },
+            },
+        }
+
+        with patch("src.db.etl.loader.get_service", side_effect=KeyError("db_connection")):
+            loader = Loader(db_config={"type": "sqlite", "database_path": path})
+        self.addCleanup(loader.close)
+        counts = loader.load({}, transformed, "export.tar")
+
+        self.assertEqual((counts["archives"], counts["conversations"], counts["messages"], counts["users"]), (1, 1, 2, 1))
+        db = loader.db_connection
+        archive_id = db.execute_and_fetch_one("SELECT id FROM archives")[0]
+        self.assertEqual(
+            db.execute_and_fetch("SELECT id, archive_id, content FROM messages ORDER BY timestamp"),
+            [("m1", archive_id, "Hello"), ("m2", archive_id, "Hi")],
+        )
+        self.assertEqual(db.execute_and_fetch_one("SELECT display_name FROM conversations")[0], "Team")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,8 @@ import json
 import logging
 import os
 import sys
+import threading
+import time
 import pytest
 from io import StringIO
 from functools import wraps
@@ -13,6 +15,8 @@ from functools import wraps
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from src.utils.new_structured_logging import (
+    AsyncLogPipeline,
+    BatchingRotatingFileHandler,
     JsonFormatter,
     LogContext,
     clear_context,
@@ -21,7 +25,10 @@ from src.utils.new_structured_logging import (
     handle_errors,
     log_call,
     log_execution_time,
+    safe_repr,
+    SamplingFilter,
     set_context,
+    set_production_mode,
     with_context,
 )
 from tests.utils.test_logging import LogCapture
@@ -305,3 +312,222 @@ def test_handle_errors_no_reraise(logger, logs):
     assert logs.assert_log_contains("Function failed", "ERROR")
     assert logs.assert_log_contains("ValueError", "ERROR")
     assert logs.assert_log_contains("Test error", "ERROR")
+
+
+class ReprCounter:
+    """Object that counts how often it is represented."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __repr__(self):
+        self.calls += 1
+        return "ReprCounter()"
+
+
+def test_log_call_skips_repr_when_level_disabled(logger):
+    """log_call does not represent arguments when its level is disabled."""
+    counter = ReprCounter()
+    logger.setLevel(logging.INFO)
+    try:
+
+        @log_call(logger, level=logging.DEBUG)
+        def test_function(arg):
+            return arg
+
+        assert test_function(counter) is counter
+        assert counter.calls == 0
+    finally:
+        logger.setLevel(logging.NOTSET)
+
+
+def test_log_call_production_mode(logger, logs):
+    """Production mode disables call and timing logs entirely."""
+    counter = ReprCounter()
+    set_production_mode(True)
+    try:
+
+        @log_execution_time(logger)
+        @log_call(logger)
+        def test_function(arg):
+            return "result"
+
+        assert test_function(counter) == "result"
+    finally:
+        set_production_mode(False)
+
+    assert counter.calls == 0
+    assert logs.get_logs() == []
+
+
+def test_log_call_truncates_large_arguments(logger, logs):
+    """Large arguments are summarized rather than represented in full."""
+
+    @log_call(logger)
+    def test_function(data):
+        return len(data)
+
+    test_function({f"key{i}": "x" * 1000 for i in range(10000)})
+
+    call_log = next(log for log in logs.get_logs() if log["message"].startswith("Calling"))
+    assert len(call_log["message"]) < 1000
+    assert "..." in call_log["message"]
+
+
+def test_safe_repr():
+    """safe_repr truncates long values and survives broken __repr__."""
+
+    class Broken:
+        def __repr__(self):
+            raise RuntimeError("boom")
+
+    assert safe_repr("short") == "'short'"
+    assert len(safe_repr(list(range(100000)), max_length=50)) <= 50
+    assert "Broken" in safe_repr(Broken())
+
+
+def _make_record(name="test_logger", msg="message", level=logging.DEBUG):
+    """Create a log record for filter tests."""
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+def test_sampling_filter_keeps_fraction_per_logger():
+    """SamplingFilter keeps the configured fraction of a logger's records."""
+    sampling_filter = SamplingFilter(sample_rates={"src.db": 0.25})
+
+    kept = sum(
+        sampling_filter.filter(_make_record("src.db.etl.transformer")) for _ in range(100)
+    )
+    assert kept == 25
+    assert sampling_filter.stats["sampled"] == {"src.db": 75}
+
+    # Other loggers and warnings are never sampled
+    assert all(sampling_filter.filter(_make_record("other")) for _ in range(10))
+    assert all(
+        sampling_filter.filter(_make_record("src.db", level=logging.WARNING)) for _ in range(10)
+    )
+
+
+def test_sampling_filter_rate_limits_message_prefix():
+    """SamplingFilter rate limits hot-loop messages by prefix."""
+    sampling_filter = SamplingFilter(rate_limits={"Transforming conversation": 5})
+
+    kept = sum(
+        sampling_filter.filter(_make_record(msg=f"Transforming conversation: {i}"))
+        for i in range(100)
+    )
+    assert kept == 5
+    assert sampling_filter.stats["rate_limited"] == {"Transforming conversation": 95}
+    assert sampling_filter.filter(_make_record(msg="Transforming data"))
+
+
+def test_async_pipeline_writes_batches(tmp_path):
+    """AsyncLogPipeline formats records off-thread and writes them in batches."""
+    log_file = tmp_path / "async.log"
+    handler = BatchingRotatingFileHandler(str(log_file), maxBytes=10 * 1024 * 1024)
+    handler.setFormatter(JsonFormatter())
+    pipeline = AsyncLogPipeline([handler], batch_size=50)
+
+    logger = logging.getLogger("test_async_pipeline")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(pipeline.queue_handler)
+    pipeline.start()
+    try:
+        with LogContext(request_id="abc"):
+            for i in range(200):
+                logger.info("Record %d", i)
+    finally:
+        pipeline.stop()
+        logger.removeHandler(pipeline.queue_handler)
+        logger.propagate = True
+
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [r["message"] for r in records] == [f"Record {i}" for i in range(200)]
+    assert records[0]["context"] == {"request_id": "abc"}
+    assert "_log_context" not in records[0]
+    assert 0 < pipeline.listener.batches <= 200
+    assert pipeline.get_stats()["dropped"] == 0
+
+
+def test_async_pipeline_stops_with_backlog_and_restarts(monkeypatch):
+    """Stopping with queued records ends the listener cleanly, and it can be started again."""
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", errors.append)
+    handled = []
+    busy, release = threading.Event(), threading.Event()
+
+    def emit(record):
+        handled.append(record.getMessage())
+        if record.getMessage() == "Busy":
+            busy.set()
+            release.wait(5)
+
+    handler = logging.Handler()
+    handler.emit = emit
+    pipeline = AsyncLogPipeline([handler], batch_size=100)
+
+    for run in range(2):
+        busy.clear()
+        release.clear()
+        pipeline.start()
+        pipeline.queue_handler.handle(_make_record(msg="Busy", level=logging.INFO))
+        assert busy.wait(5)
+
+        # The sentinel is queued behind a backlog that is drained in one batch
+        for i in range(50):
+            pipeline.queue_handler.handle(_make_record(msg=f"Record {run}-{i}", level=logging.INFO))
+        stopper = threading.Thread(target=pipeline.stop)
+        stopper.start()
+        while pipeline.queue.qsize() < 51:
+            time.sleep(0.01)
+        release.set()
+        stopper.join(5)
+
+    assert errors == []
+    assert pipeline.queue.unfinished_tasks == 0
+    assert handled == [
+        message for run in range(2) for message in ["Busy"] + [f"Record {run}-{i}" for i in range(50)]
+    ]
+
+
+def test_async_pipeline_counts_dropped_records():
+    """The queue handler drops and counts records when the queue is full."""
+    pipeline = AsyncLogPipeline([logging.NullHandler()], queue_size=10)
+    for i in range(25):
+        pipeline.queue_handler.handle(_make_record(msg=f"Record {i}", level=logging.INFO))
+
+    assert pipeline.get_stats()["dropped"] == 15
+
+
+def test_async_pipeline_prepares_records_in_caller_thread(logger):
+    """Queued records hold text instead of the caller's objects and exception frames."""
+    pipeline = AsyncLogPipeline([logging.NullHandler()])
+    level = logger.level
+    logger.addHandler(pipeline.queue_handler)
+    logger.setLevel(logging.DEBUG)
+
+    @log_call(logger=logger)
+    def add(a, b):
+        return a + b
+
+    try:
+        add([1], b=[2])
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            logger.exception("Failed")
+    finally:
+        logger.removeHandler(pipeline.queue_handler)
+        logger.setLevel(level)
+
+    call, returned, failed = [pipeline.queue.get_nowait() for _ in range(3)]
+    assert call.args_str == ["[1]"]
+    assert call.kwargs_str == ["b=[2]"]
+    assert returned.result == "[1, 2]"
+    assert failed.exc_info is None
+    assert failed.exc_text.endswith("ValueError: bad value")
+
+    data = json.loads(JsonFormatter().format(failed))
+    assert data["exception"]["type"] == "ValueError"
+    assert data["exception"]["message"] == "bad value"
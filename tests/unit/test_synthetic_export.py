@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic Skype export generator.
+"""
+
+import io
+import json
+import tarfile
+
+import pytest
+
+from src.utils.synthetic_export import SyntheticExportGenerator, main
+
+
+def test_same_seed_is_deterministic():
+    """Test that the same parameters and seed produce identical output."""
+    first, second = io.StringIO(), io.StringIO()
+    SyntheticExportGenerator(conversations=5, mean_messages=20, seed=3).write(first)
+    SyntheticExportGenerator(conversations=5, mean_messages=20, seed=3).write(second)
+
+    assert first.getvalue() == second.getvalue()
+
+    other = io.StringIO()
+    SyntheticExportGenerator(conversations=5, mean_messages=20, seed=4).write(other)
+    assert other.getvalue() != first.getvalue()
+
+
+def test_streamed_json_matches_generate():
+    """Test that the streamed JSON is valid and equals the in-memory export."""
+    generator = SyntheticExportGenerator(conversations=4, mean_messages=10, seed=1)
+    stream = io.StringIO()
+    counts = generator.write(stream)
+
+    data = json.loads(stream.getvalue())
+    assert data == generator.generate()
+    assert counts["conversations"] == 4
+    assert counts["messages"] == sum(len(c["MessageList"]) for c in data["conversations"])
+
+
+def test_fixed_distribution_and_type_mix():
+    """Test message counts, type mix, markup density and edit rate settings."""
+    generator = SyntheticExportGenerator(
+        conversations=3,
+        mean_messages=50,
+        distribution="fixed",
+        message_type_mix={"RichText": 1.0},
+        markup_density=1.0,
+        edit_rate=1.0,
+    )
+    conversations = list(generator.iter_conversations())
+
+    assert [len(c["MessageList"]) for c in conversations] == [50, 50, 50]
+    for message in conversations[0]["MessageList"]:
+        assert message["messagetype"] == "RichText"
+        assert "<" in message["content"]
+        assert "edittime" in message and "skypeeditedid" in message
+
+
+def test_write_tar_contains_messages_json(tmp_path):
+    """Test that TAR exports contain a messages.json like real exports."""
+    path = tmp_path / "export.tar"
+    counts = SyntheticExportGenerator(conversations=2, mean_messages=5).write_tar(str(path))
+
+    with tarfile.open(path) as tar:
+        assert tar.getnames() == ["messages.json"]
+        data = json.load(tar.extractfile("messages.json"))
+
+    assert len(data["conversations"]) == counts["conversations"] == 2
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"conversations": -1},
+        {"distribution": "normal"},
+        {"markup_density": 1.5},
+        {"edit_rate": -0.1},
+        {"message_type_mix": {"RichText": 0}},
+    ],
+)
+def test_invalid_parameters(kwargs):
+    """Test that invalid parameters raise ValueError."""
+    with pytest.raises(ValueError):
+        SyntheticExportGenerator(**kwargs)
+
+
+def test_cli_writes_json(tmp_path, capsys):
+    """Test the command-line entry point."""
+    path = tmp_path / "export.json"
+
+    assert main([str(path), "--conversations", "2", "--mean-messages", "3",
+                 "--distribution", "fixed"]) == 0
+
+    data = json.loads(path.read_text())
+    assert sum(len(c["MessageList"]) for c in data["conversations"]) == 6
+    assert "Wrote 6 messages" in capsys.readouterr().out
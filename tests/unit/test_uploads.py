@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the uploads module.
+
+This module contains tests for UploadManager and the streaming validators
+in src.api.uploads.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.api.uploads import TarStreamValidator, UploadManager, UploadOffsetError
+from src.utils.validation import ValidationError
+
+
+def make_tar(members):
+    """Build a TAR archive in memory from (name, bytes) pairs."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+EXPORT = make_tar([
+    ("endpoints.json", b"{}" * 300),
+    ("messages.json", json.dumps({"userId": "alice", "conversations": []}).encode() * 50),
+])
+
+
+class TestUploadManager(unittest.TestCase):
+    """Test cases for the UploadManager class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+        self.on_complete = MagicMock(return_value="task-1")
+        self.manager = UploadManager(self.folder, on_complete=self.on_complete)
+
+    def send(self, manager, upload_id, data, offset):
+        return manager.write_chunk(upload_id, offset, io.BytesIO(data), len(data), owner="alice")
+
+    def test_chunked_upload_with_resume(self):
+        """Test an upload resumed by a new manager completes and is submitted."""
+        upload = self.manager.create(
+            "export.tar", len(EXPORT), "alice", sha256=hashlib.sha256(EXPORT).hexdigest()
+        )
+        upload_id = upload["upload_id"]
+
+        self.assertEqual(self.send(self.manager, upload_id, EXPORT[:700], 0)["offset"], 700)
+
+        # A restarted (or different) worker process replays the bytes on disk
+        other = UploadManager(self.folder, on_complete=self.on_complete)
+        self.assertEqual(other.get(upload_id, "alice")["offset"], 700)
+        self.send(other, upload_id, EXPORT[700:1500], 700)
+        result = self.send(other, upload_id, EXPORT[1500:], 1500)
+
+        self.assertEqual(result["status"], "complete")
+        self.assertEqual(result["task_id"], "task-1")
+        with open(result["file_path"], "rb") as f:
+            self.assertEqual(f.read(), EXPORT)
+        self.on_complete.assert_called_once()
+
+    def test_offset_mismatch(self):
+        """Test a chunk that does not continue the upload is rejected with the current offset."""
+        upload_id = self.manager.create("export.tar", len(EXPORT), "alice")["upload_id"]
+        self.send(self.manager, upload_id, EXPORT[:512], 0)
+
+        with self.assertRaises(UploadOffsetError) as context:
+            self.send(self.manager, upload_id, EXPORT[:512], 0)
+        self.assertEqual(context.exception.offset, 512)
+
+    def test_invalid_tar_fails_early(self):
+        """Test a corrupt header fails the upload as soon as it is received."""
+        corrupt = b"x" * 1024
+        upload_id = self.manager.create("export.tar", 4096, "alice")["upload_id"]
+
+        with self.assertRaises(ValidationError):
+            self.send(self.manager, upload_id, corrupt, 0)
+        self.assertEqual(self.manager.get(upload_id)["status"], "failed")
+        self.assertFalse(os.path.exists(os.path.join(self.folder, f"{upload_id}.part")))
+
+    def test_completion_checks(self):
+        """Test hash mismatches, missing messages.json and bad JSON are rejected."""
+        upload_id = self.manager.create("export.tar", len(EXPORT), "alice", sha256="0" * 64)["upload_id"]
+        with self.assertRaises(ValidationError):
+            self.send(self.manager, upload_id, EXPORT, 0)
+
+        no_messages = make_tar([("endpoints.json", b"{}")])
+        upload_id = self.manager.create("export.tar", len(no_messages), "alice")["upload_id"]
+        with self.assertRaises(ValidationError):
+            self.send(self.manager, upload_id, no_messages, 0)
+
+        upload_id = self.manager.create("export.json", 5, "alice")["upload_id"]
+        with self.assertRaises(ValidationError):
+            self.send(self.manager, upload_id, b"[1,2]", 0)
+        self.on_complete.assert_not_called()
+
+    def test_owner_and_create_validation(self):
+        """Test uploads are private to their owner and bad requests are rejected."""
+        upload_id = self.manager.create("export.json", 2, "alice")["upload_id"]
+
+        with self.assertRaises(LookupError):
+            self.manager.get(upload_id, "bob")
+        with self.assertRaises(LookupError):
+            self.manager.get("../../etc/passwd")
+        with self.assertRaises(ValidationError):
+            self.manager.create("export.exe", 10, "alice")
+        with self.assertRaises(ValidationError):
+            self.manager.create("export.tar", 0, "alice")
+
+    def test_tar_validator_skips_member_data(self):
+        """Test the validator accepts an archive fed in arbitrary pieces."""
+        validator = TarStreamValidator()
+        for i in range(0, len(EXPORT), 37):
+            validator.feed(EXPORT[i:i + 37])
+        validator.finish()
+
+        self.assertEqual(validator.members, ["endpoints.json", "messages.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the user management module.
+
+This module contains tests for UserManager and its JSON and SQLite user
+stores in src.api.user_management.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.api.user_management import JSONUserStore, SQLiteUserStore, UserManager
+
+
+class TestUserManager(unittest.TestCase):
+    """Test cases for the UserManager class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, True)
+
+    def make_manager(self, name, **kwargs):
+        manager = UserManager(os.path.join(self.folder, name), **kwargs)
+        self.addCleanup(manager.flush)
+        return manager
+
+    def check_api_keys(self, manager):
+        manager.register_user("alice", "secret", "alice@example.com", "Alice")
+        manager.register_user("bob", "secret", "bob@example.com", "Bob")
+        api_key = manager.get_user("alice")["api_key"]
+
+        self.assertEqual(manager.get_user_by_api_key(api_key)["username"], "alice")
+        self.assertIsNone(manager.get_user_by_api_key("unknown"))
+
+        new_key = manager.regenerate_api_key("alice")
+        self.assertIsNone(manager.get_user_by_api_key(api_key))
+        self.assertEqual(manager.get_user_by_api_key(new_key)["username"], "alice")
+
+        self.assertTrue(manager.update_user("alice", display_name="Alice B."))
+        self.assertEqual(manager.get_user_by_api_key(new_key)["display_name"], "Alice B.")
+        self.assertTrue(manager.authenticate_user("alice", "secret"))
+        self.assertFalse(manager.authenticate_user("alice", "wrong"))
+
+        self.assertTrue(manager.delete_user("alice"))
+        self.assertIsNone(manager.get_user_by_api_key(new_key))
+        self.assertEqual([user["username"] for user in manager.get_all_users()], ["bob"])
+        return manager.get_user("bob")["api_key"]
+
+    def test_json_api_keys_and_persistence(self):
+        """Test API-key lookups follow changes and the JSON file is reloaded intact."""
+        manager = self.make_manager("users.json")
+        self.assertIsInstance(manager.store, JSONUserStore)
+
+        bob_key = self.check_api_keys(manager)
+        manager.flush()
+
+        reloaded = self.make_manager("users.json")
+        self.assertEqual(reloaded.get_user_by_api_key(bob_key)["username"], "bob")
+        self.assertIsNone(reloaded.get_user("alice"))
+
+    def test_sqlite_api_keys_and_sharing(self):
+        """Test the SQLite backend and its use by several managers."""
+        manager = self.make_manager("users.db")
+        self.assertIsInstance(manager.store, SQLiteUserStore)
+
+        bob_key = self.check_api_keys(manager)
+
+        other = self.make_manager("users.db", auth_cache_ttl=0)
+        self.assertEqual(other.get_user_by_api_key(bob_key)["username"], "bob")
+        new_key = manager.regenerate_api_key("bob")
+        self.assertIsNone(other.get_user_by_api_key(bob_key))
+        self.assertEqual(other.get_user_by_api_key(new_key)["username"], "bob")
+
+    def test_writes_are_batched_and_atomic(self):
+        """Test several changes are written in one atomic replace of the user file."""
+        manager = self.make_manager("users.json")
+        manager.store.flush_delay = 0.2
+
+        with patch("src.api.user_management.os.replace", wraps=os.replace) as replace:
+            manager.register_user("alice", "secret", "alice@example.com", "Alice")
+            manager.regenerate_api_key("alice")
+            manager.update_user("alice", email="alice@example.org")
+            self.assertFalse(os.path.exists(manager.user_file))
+
+            deadline = time.time() + 5
+            while not replace.called and time.time() < deadline:
+                time.sleep(0.05)
+            time.sleep(0.1)
+
+        self.assertEqual(replace.call_count, 1)
+        with open(manager.user_file) as f:
+            self.assertEqual(json.load(f)["alice"]["email"], "alice@example.org")
+        self.assertEqual(os.listdir(self.folder), ["users.json"])
+
+    def test_auth_cache(self):
+        """Test recent lookups are served from a bounded cache."""
+        manager = self.make_manager("users.json", auth_cache_size=2)
+        manager.register_user("alice", "secret", "alice@example.com", "Alice")
+        api_key = manager.get_user("alice")["api_key"]
+
+        with patch.object(manager.store, "get_by_api_key_hash", wraps=manager.store.get_by_api_key_hash) as lookup:
+            for _ in range(3):
+                manager.get_user_by_api_key(api_key)
+            self.assertEqual(lookup.call_count, 1)
+
+            manager.get_user_by_api_key("unknown-1")
+            manager.get_user_by_api_key("unknown-2")
+            manager.get_user_by_api_key(api_key)
+            self.assertEqual(lookup.call_count, 4)
+        self.assertEqual(len(manager._auth_cache), 2)
+
+        with self.assertRaises(ValueError):
+            self.make_manager("users.json", backend="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualization module.
+
+This module contains tests for chart specs and SkypeDataVisualizer in
+src.analysis.visualization.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from src.analysis.reporting import DAY_NAMES
+from src.analysis.visualization import CHARTS, SkypeDataVisualizer, build_chart_spec
+
+REPORT = {
+    "message_type_distribution": [
+        {"message_type": "RichText", "count": 80, "percentage": 80.0},
+        {"message_type": "Event/Call", "count": 20, "percentage": 20.0},
+    ],
+    "activity_by_hour": [{"hour": 9, "message_count": 60}, {"hour": 18, "message_count": 40}],
+    "activity_by_day_of_week": [
+        {"day_of_week": 3, "message_count": 30, "day_name": DAY_NAMES[3]},
+        {"day_of_week": 1, "message_count": 70, "day_name": DAY_NAMES[1]},
+    ],
+    "top_senders": [{"sender_name": "Alice", "message_count": 70}, {"sender_name": "Bob", "message_count": 30}],
+    "conversation_statistics": [],
+}
+
+
+class TestSkypeDataVisualizer(unittest.TestCase):
+    """Test cases for the SkypeDataVisualizer class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir, True)
+        self.report_generator = MagicMock()
+        self.report_generator.generate_full_report.return_value = REPORT
+
+    def test_chart_specs(self):
+        """Test specs keep the ordering the charts are drawn with."""
+        days = build_chart_spec("activity_by_day_of_week", REPORT["activity_by_day_of_week"], 1)
+        senders = build_chart_spec("top_senders", REPORT["top_senders"], 1)
+
+        self.assertEqual(days["labels"], ["Monday", "Wednesday"])
+        self.assertEqual(senders["labels"], ["Bob", "Alice"])
+        self.assertIsNone(build_chart_spec("conversation_statistics", [], 1))
+
+    def test_json_specs_from_one_fetch(self):
+        """Test all charts come from one report fetch and can be written as specs."""
+        visualizer = SkypeDataVisualizer(self.report_generator, self.output_dir, output_format="json")
+
+        result = visualizer.generate_all_visualizations(1)
+
+        self.report_generator.generate_full_report.assert_called_once_with(1)
+        self.assertEqual(set(result), set(CHARTS))
+        self.assertIsNone(result["conversation_statistics"])
+        with open(result["message_type_distribution"]) as f:
+            self.assertEqual(json.load(f)["values"], [80, 20])
+
+    def test_images_rendered_in_process_pool(self):
+        """Test images are rendered by worker processes."""
+        visualizer = SkypeDataVisualizer(
+            self.report_generator, self.output_dir, output_format="svg", dpi=50, max_workers=2
+        )
+
+        result = visualizer.generate_all_visualizations(1)
+
+        self.assertTrue(result["top_senders"].endswith("top_senders.svg"))
+        for path in filter(None, result.values()):
+            self.assertGreater(os.path.getsize(path), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "visualizations_metadata_1.json")))
+
+    def test_unknown_format(self):
+        """Test unsupported output formats are rejected."""
+        with self.assertRaises(ValueError):
+            SkypeDataVisualizer(self.report_generator, self.output_dir, output_format="gif")
+
+
+if __name__ == "__main__":
+    unittest.main()
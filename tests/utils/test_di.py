@@ -183,4 +183,79 @@ def test_service_override():
     assert isinstance(service2, AnotherTestService)
 
     # Check that they are different instances
-    assert service1 is not service2
\ No newline at end of file
+    assert service1 is not service2
+
+class ClosableDependency(TestDependency):
+    def __init__(self, name: str = "Closable"):
+        super().__init__(name)
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_constructor_plan_is_cached():
+    """Test that constructor plans are compiled once per implementation type."""
+    provider = ServiceProvider()
+    provider.register_transient(TestDependencyProtocol, TestDependency)
+    provider.register_transient(TestServiceProtocol, TestService)
+
+    provider.get(TestServiceProtocol)
+    plan = provider._plans[TestService]
+    provider.get(TestServiceProtocol)
+
+    assert provider._plans[TestService] is plan
+    assert plan == (("dependency", TestDependencyProtocol),)
+
+
+def test_unregistered_dependencies_use_defaults():
+    """Test that parameters without a registration fall back to their defaults."""
+    provider = ServiceProvider()
+    provider.register_transient(TestServiceProtocol, TestService)
+
+    service = provider.get(TestServiceProtocol)
+
+    assert service.get_value() == "TestService with TestDependency"
+
+
+def test_scoped_service_per_scope():
+    """Test that scoped services are shared within a scope but not across scopes."""
+    provider = ServiceProvider()
+    provider.register_scoped(TestDependencyProtocol, TestDependency)
+    provider.register_transient(TestServiceProtocol, TestService)
+
+    with provider.create_scope() as scope1:
+        dependency = scope1.get(TestDependencyProtocol)
+        assert scope1.get(TestDependencyProtocol) is dependency
+        # Transients created in the scope receive the scoped instance
+        assert scope1.get(TestServiceProtocol).dependency is dependency
+
+    with provider.create_scope() as scope2:
+        assert scope2.get(TestDependencyProtocol) is not dependency
+
+
+def test_scoped_service_requires_scope():
+    """Test that scoped services cannot be resolved from the root provider."""
+    provider = ServiceProvider()
+    provider.register_scoped(TestDependencyProtocol, TestDependency)
+    provider.register_transient(TestServiceProtocol, TestService)
+
+    with pytest.raises(KeyError):
+        provider.get(TestDependencyProtocol)
+
+    # Dependents resolved from the root fall back to their defaults
+    assert provider.get(TestServiceProtocol).dependency.get_name() == "TestDependency"
+
+
+def test_scope_close_releases_instances():
+    """Test that closing a scope closes its scoped instances."""
+    provider = ServiceProvider()
+    provider.register_scoped(TestDependencyProtocol, lambda: ClosableDependency())
+
+    scope = provider.create_scope()
+    dependency = scope.get(TestDependencyProtocol)
+    scope.close()
+
+    assert dependency.closed
+    with pytest.raises(RuntimeError):
+        scope.get(TestDependencyProtocol)